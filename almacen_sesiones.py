@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+"""
+ALMACÉN DE SESIONES
+Backends intercambiables para guardar snapshots de asesorías fuera del proceso
+
+Con un almacén compartido (SQLite en un volumen común o Redis) cualquier
+réplica de la app puede retomar una asesoría por su token de sesión, así que
+se pueden correr varios procesos detrás de un balanceador.
+
+Backends disponibles (variable de entorno RIZKORA_ALMACEN_SESIONES):
+    memoria                     → dict LRU en el proceso (una sola réplica)
+    archivos:///ruta/directorio → un archivo por sesión (predeterminado)
+    sqlite:///ruta/sesiones.db  → tabla SQLite en modo WAL
+    redis://host:6379/0         → servidor Redis (requiere el paquete redis)
+
+Los snapshots contienen datos personales del cliente (nombre, ingresos,
+deudas): el directorio predeterminado es privado del usuario del servidor
+(~/.rizkora/sesiones, o RIZKORA_DIRECTORIO_SESIONES), se crea con permisos
+0o700 y cada archivo con 0o600. Todas las sesiones caducan a los
+TTL_SESIONES segundos: Redis con su expiración y los demás backends
+borrando lo caducado al leerlo y en una purga periódica.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Tiempo de vida de una sesión guardada (segundos)
+TTL_SESIONES = 7 * 24 * 3600
+
+# Intervalo mínimo entre purgas de sesiones caducadas (segundos)
+INTERVALO_PURGA = 3600
+
+# Sesiones que conserva como máximo el almacén en memoria
+MAX_SESIONES_MEMORIA = 1000
+
+
+def directorio_sesiones():
+    """Directorio de archivos de sesión (RIZKORA_DIRECTORIO_SESIONES o ~/.rizkora/sesiones)."""
+    return (os.environ.get('RIZKORA_DIRECTORIO_SESIONES')
+            or os.path.join(os.path.expanduser('~'), '.rizkora', 'sesiones'))
+
+
+class AlmacenSesiones:
+    """Interfaz común: guarda bytes opacos por token de sesión, con caducidad."""
+
+    ttl = TTL_SESIONES
+    _ultima_purga = 0.0
+
+    def guardar(self, token, blob):
+        raise NotImplementedError
+
+    def cargar(self, token):
+        raise NotImplementedError
+
+    def eliminar(self, token):
+        raise NotImplementedError
+
+    def purgar(self):
+        """Elimina las sesiones caducadas; devuelve cuántas se eliminaron."""
+        return 0
+
+    def _purgar_si_toca(self):
+        # Se llama al guardar: como mucho una purga cada INTERVALO_PURGA segundos
+        ahora = time.monotonic()
+        if ahora - self._ultima_purga >= INTERVALO_PURGA:
+            self._ultima_purga = ahora
+            self.purgar()
+
+# ================================
+# BACKEND: MEMORIA
+# ================================
+
+class AlmacenMemoria(AlmacenSesiones):
+    """
+    Diccionario LRU en el proceso; útil en desarrollo y con una sola réplica.
+
+    Conserva como máximo `max_sesiones` sesiones (descarta la usada hace más
+    tiempo) y cada una caduca a los `ttl` segundos.
+    """
+
+    def __init__(self, max_sesiones=MAX_SESIONES_MEMORIA, ttl=TTL_SESIONES):
+        self.max_sesiones = max_sesiones
+        self.ttl = ttl
+        self._sesiones = OrderedDict()  # token → (momento de guardado, blob)
+        self._lock = threading.Lock()
+
+    def guardar(self, token, blob):
+        with self._lock:
+            self._sesiones[token] = (time.time(), bytes(blob))
+            self._sesiones.move_to_end(token)
+            while len(self._sesiones) > self.max_sesiones:
+                self._sesiones.popitem(last=False)
+        self._purgar_si_toca()
+
+    def cargar(self, token):
+        with self._lock:
+            entrada = self._sesiones.get(token)
+            if entrada is None:
+                return None
+            if time.time() - entrada[0] > self.ttl:
+                del self._sesiones[token]
+                return None
+            self._sesiones.move_to_end(token)
+            return entrada[1]
+
+    def eliminar(self, token):
+        with self._lock:
+            self._sesiones.pop(token, None)
+
+    def purgar(self):
+        limite = time.time() - self.ttl
+        with self._lock:
+            caducadas = [token for token, (guardado, _) in self._sesiones.items() if guardado < limite]
+            for token in caducadas:
+                del self._sesiones[token]
+        return len(caducadas)
+
+# ================================
+# BACKEND: ARCHIVOS
+# ================================
+
+class AlmacenArchivos(AlmacenSesiones):
+    """
+    Un archivo por sesión con escritura atómica (os.replace).
+
+    El directorio se crea con permisos 0o700 y los archivos con 0o600; una
+    sesión caduca cuando su archivo lleva más de `ttl` segundos sin escribirse.
+    """
+
+    def __init__(self, directorio=None, ttl=TTL_SESIONES):
+        self.directorio = directorio or directorio_sesiones()
+        self.ttl = ttl
+        self._directorio_listo = False
+
+    def _ruta(self, token):
+        return os.path.join(self.directorio, f"{token}.snap")
+
+    def _preparar_directorio(self):
+        if not self._directorio_listo:
+            os.makedirs(self.directorio, mode=0o700, exist_ok=True)
+            os.chmod(self.directorio, 0o700)  # También si ya existía con otros permisos
+            self._directorio_listo = True
+
+    def guardar(self, token, blob):
+        self._preparar_directorio()
+        ruta = self._ruta(token)
+        temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+        descriptor = os.open(temporal, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(descriptor, 'wb') as archivo:
+            archivo.write(blob)
+        os.replace(temporal, ruta)
+        self._purgar_si_toca()
+
+    def cargar(self, token):
+        ruta = self._ruta(token)
+        try:
+            if time.time() - os.path.getmtime(ruta) > self.ttl:
+                self.eliminar(token)
+                return None
+            with open(ruta, 'rb') as archivo:
+                return archivo.read()
+        except FileNotFoundError:
+            return None
+
+    def eliminar(self, token):
+        try:
+            os.remove(self._ruta(token))
+        except FileNotFoundError:
+            pass
+
+    def purgar(self):
+        limite = time.time() - self.ttl
+        eliminadas = 0
+        try:
+            entradas = list(os.scandir(self.directorio))
+        except FileNotFoundError:
+            return 0
+        for entrada in entradas:
+            # Snapshots caducados y temporales huérfanos de escrituras interrumpidas
+            if not entrada.name.endswith(('.snap', '.tmp')):
+                continue
+            try:
+                if entrada.stat().st_mtime < limite:
+                    os.remove(entrada.path)
+                    eliminadas += 1
+            except FileNotFoundError:
+                pass
+        return eliminadas
+
+# ================================
+# BACKEND: SQLITE
+# ================================
+
+class AlmacenSQLite(AlmacenSesiones):
+    """Tabla SQLite compartida; el modo WAL permite lectores y un escritor concurrentes."""
+
+    def __init__(self, ruta, ttl=TTL_SESIONES):
+        self.ruta = ruta
+        self.ttl = ttl
+        self._local = threading.local()
+        with self._conexion() as conexion:
+            conexion.execute(
+                "CREATE TABLE IF NOT EXISTS sesiones ("
+                " token TEXT PRIMARY KEY,"
+                " blob BLOB NOT NULL,"
+                " actualizado REAL NOT NULL)"
+            )
+
+    def _conexion(self):
+        # Una conexión por hilo: sqlite3 no comparte conexiones entre hilos
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is None:
+            conexion = sqlite3.connect(self.ruta, timeout=10)
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.execute("PRAGMA synchronous=NORMAL")
+            self._local.conexion = conexion
+        return conexion
+
+    def guardar(self, token, blob):
+        with self._conexion() as conexion:
+            conexion.execute(
+                "INSERT INTO sesiones (token, blob, actualizado) VALUES (?, ?, ?) "
+                "ON CONFLICT(token) DO UPDATE SET blob = excluded.blob, actualizado = excluded.actualizado",
+                (token, sqlite3.Binary(blob), time.time())
+            )
+        self._purgar_si_toca()
+
+    def cargar(self, token):
+        fila = self._conexion().execute(
+            "SELECT blob FROM sesiones WHERE token = ? AND actualizado > ?",
+            (token, time.time() - self.ttl)
+        ).fetchone()
+        return bytes(fila[0]) if fila else None
+
+    def eliminar(self, token):
+        with self._conexion() as conexion:
+            conexion.execute("DELETE FROM sesiones WHERE token = ?", (token,))
+
+    def purgar(self):
+        with self._conexion() as conexion:
+            cursor = conexion.execute("DELETE FROM sesiones WHERE actualizado <= ?", (time.time() - self.ttl,))
+        return cursor.rowcount
+
+# ================================
+# BACKEND: REDIS
+# ================================
+
+class AlmacenRedis(AlmacenSesiones):
+    """
+    Backend sobre el protocolo Redis.
+
+    Acepta cualquier cliente con los métodos get/set/delete de redis-py, así
+    que puede probarse contra un sustituto local (p. ej. fakeredis).
+    """
+
+    def __init__(self, cliente, prefijo='rizkora:sesion:', ttl=TTL_SESIONES):
+        self.cliente = cliente
+        self.prefijo = prefijo
+        self.ttl = ttl
+
+    @classmethod
+    def desde_url(cls, url):
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("El almacén Redis requiere el paquete redis: pip install redis")
+        return cls(redis.Redis.from_url(url))
+
+    def guardar(self, token, blob):
+        self.cliente.set(self.prefijo + token, bytes(blob), ex=self.ttl)
+
+    def cargar(self, token):
+        return self.cliente.get(self.prefijo + token)
+
+    def eliminar(self, token):
+        self.cliente.delete(self.prefijo + token)
+
+# ================================
+# FÁBRICA
+# ================================
+
+def crear_almacen(url=None):
+    """
+    Crea un almacén a partir de una URL (o de RIZKORA_ALMACEN_SESIONES).
+
+    Example:
+    --------
+    >>> almacen = crear_almacen('sqlite:////var/lib/rizkora/sesiones.db')
+    >>> almacen.guardar(token, blob)
+    """
+    url = url or os.environ.get('RIZKORA_ALMACEN_SESIONES', 'archivos://')
+
+    if url == 'memoria':
+        return AlmacenMemoria()
+    if url.startswith('archivos://'):
+        return AlmacenArchivos(url[len('archivos://'):] or None)
+    if url.startswith('sqlite:///'):
+        return AlmacenSQLite(url[len('sqlite:///'):])
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return AlmacenRedis.desde_url(url)
+
+    raise ValueError(f"Almacén de sesiones no soportado: {url}")
+
+
+_almacen_predeterminado = None
+_lock_almacen = threading.Lock()
+
+
+def almacen_predeterminado():
+    """Almacén del proceso, creado una sola vez desde la configuración."""
+    global _almacen_predeterminado
+    if _almacen_predeterminado is None:
+        with _lock_almacen:
+            if _almacen_predeterminado is None:
+                _almacen_predeterminado = crear_almacen()
+    return _almacen_predeterminado
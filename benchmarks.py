@@ -0,0 +1,679 @@
+# -*- coding: utf-8 -*-
+"""
+BENCHMARKS DE RENDIMIENTO
+Mediciones reproducibles de las partes costosas de la asesoría
+
+Uso:
+    python benchmarks.py                # todos los benchmarks
+    python benchmarks.py estilos pdf    # solo los indicados (estilos, pdf, secciones, perfiles, graficos, memoria, reglas, umbrales, escenarios, deudas, exportacion, almacenes, trabajos)
+
+Cada benchmark imprime la mediana y el p95 en milisegundos sobre varias
+repeticiones con datos sintéticos (datos_sinteticos.py), así que los
+resultados son comparables entre commits en la misma máquina.
+"""
+
+import statistics
+import sys
+import time
+
+from datos_sinteticos import generar_asesoria_sintetica
+
+# ================================
+# UTILIDADES DE MEDICIÓN
+# ================================
+
+def medir(funcion, repeticiones=20, calentamiento=2):
+    """
+    Ejecuta `funcion` varias veces y devuelve sus tiempos.
+
+    Parameters:
+    -----------
+    funcion : callable
+        Función sin argumentos a medir
+    repeticiones : int
+        Ejecuciones medidas
+    calentamiento : int
+        Ejecuciones previas descartadas (imports, cachés de fuentes, etc.)
+
+    Returns:
+    --------
+    dict : {'mediana_ms', 'p95_ms', 'min_ms', 'repeticiones'}
+    """
+    for _ in range(calentamiento):
+        funcion()
+
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+
+    tiempos.sort()
+    return {
+        'mediana_ms': statistics.median(tiempos),
+        'p95_ms': tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))],
+        'min_ms': tiempos[0],
+        'repeticiones': repeticiones
+    }
+
+
+def imprimir(nombre, resultado):
+    print(f"  {nombre:<45} mediana {resultado['mediana_ms']:9.3f} ms   "
+          f"p95 {resultado['p95_ms']:9.3f} ms   (n={resultado['repeticiones']})")
+
+# ================================
+# BENCHMARKS
+# ================================
+
+def benchmark_estilos():
+    """Costo de armar los estilos por reporte frente al registro compartido."""
+    from estilos_pdf import construir_registro, ESTILOS, ESTILOS_TABLA
+
+    print("Estilos ReportLab (por reporte)")
+    por_reporte = medir(construir_registro, repeticiones=200)
+    imprimir("construir estilos en cada reporte", por_reporte)
+
+    def consultar_registro():
+        ESTILOS['titulo'], ESTILOS['subtitulo'], ESTILOS['subseccion'], ESTILOS['destacado']
+        for clave in ESTILOS_TABLA:
+            ESTILOS_TABLA[clave]
+
+    compartido = medir(consultar_registro, repeticiones=200)
+    imprimir("registro compartido (estilos_pdf)", compartido)
+    print(f"  ahorro por reporte: {por_reporte['mediana_ms'] - compartido['mediana_ms']:.3f} ms")
+    return {'por_reporte': por_reporte, 'compartido': compartido}
+
+
+def benchmark_pdf():
+    """Tiempo de generación del reporte completo."""
+    from generar_pdf_mejorado import generar_pdf_asesoria_mejorado
+
+    datos = generar_asesoria_sintetica(1)
+
+    print("Reporte PDF completo")
+    resultado = medir(lambda: generar_pdf_asesoria_mejorado(datos, usar_cache=False), repeticiones=10)
+    imprimir("generar_pdf_asesoria_mejorado (sin caché)", resultado)
+    return resultado
+
+
+def benchmark_secciones():
+    """Regeneración incremental con la caché de secciones."""
+    from generar_pdf_mejorado import generar_pdf_asesoria_mejorado, cache_secciones
+
+    datos = generar_asesoria_sintetica(1)
+    variantes = iter(range(10**6))
+
+    def cambiar_retiro():
+        # Solo cambia la sección 5; el resto (incluido el gráfico) sale de la caché
+        datos['retiro'] = dict(datos['retiro'], edad_retiro=55 + next(variantes) % 20)
+        generar_pdf_asesoria_mejorado(datos)
+
+    print("Caché de secciones del reporte")
+    cache_secciones.limpiar()
+    sin_cambios = medir(lambda: generar_pdf_asesoria_mejorado(datos), repeticiones=10)
+    imprimir("regenerar sin cambios", sin_cambios)
+    solo_retiro = medir(cambiar_retiro, repeticiones=10)
+    imprimir("regenerar tras cambiar solo retiro", solo_retiro)
+    print(f"  aciertos: {cache_secciones.aciertos}   fallos: {cache_secciones.fallos}")
+    return {'sin_cambios': sin_cambios, 'solo_retiro': solo_retiro}
+
+
+def benchmark_perfiles():
+    """Tamaño y tiempo del reporte completo con cada perfil de salida."""
+    from generar_pdf_mejorado import PERFILES_SALIDA, generar_reporte
+
+    datos = generar_asesoria_sintetica(1)
+
+    print("Perfiles de salida del PDF")
+    resultados = {}
+    for perfil in PERFILES_SALIDA:
+        tamano = len(generar_reporte(datos, 'completo', usar_cache=False, perfil=perfil).getvalue())
+        resultado = medir(lambda: generar_reporte(datos, 'completo', usar_cache=False, perfil=perfil), repeticiones=5)
+        imprimir(f"{perfil} ({tamano / 1024:.1f} KB)", resultado)
+        resultados[perfil] = dict(resultado, bytes=tamano)
+    return resultados
+
+
+def benchmark_graficos(hilos=4, graficos_por_hilo=6):
+    """
+    Prueba de estrés: gráficos en paralelo desde un pool de hilos.
+
+    Cada gráfico generado en paralelo debe ser idéntico byte a byte al
+    generado en serie con los mismos datos; cualquier estado compartido
+    entre hilos (p. ej. la figura "actual" de pyplot) rompe esa igualdad.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from graficos import generar_grafico_flujo_financiero
+
+    flujos = [generar_asesoria_sintetica(i)['flujo_financiero'] for i in range(hilos * graficos_por_hilo)]
+
+    def en_serie():
+        return [generar_grafico_flujo_financiero(flujo).getvalue() for flujo in flujos]
+
+    def en_paralelo():
+        with ThreadPoolExecutor(max_workers=hilos) as pool:
+            return [buffer.getvalue() for buffer in pool.map(generar_grafico_flujo_financiero, flujos)]
+
+    print(f"Gráficos en paralelo ({len(flujos)} gráficos, {hilos} hilos)")
+    esperados = en_serie()
+    obtenidos = en_paralelo()
+    distintos = sum(1 for a, b in zip(esperados, obtenidos) if a != b)
+    if distintos:
+        raise AssertionError(f"{distintos} gráficos generados en paralelo difieren de la versión en serie")
+
+    serie = medir(en_serie, repeticiones=3, calentamiento=0)
+    imprimir("en serie", serie)
+    paralelo = medir(en_paralelo, repeticiones=3, calentamiento=0)
+    imprimir(f"pool de {hilos} hilos", paralelo)
+    print(f"  {len(flujos)} gráficos idénticos a la versión en serie")
+    return {'serie': serie, 'paralelo': paralelo}
+
+
+def benchmark_memoria(graficos=500, tolerancia_kb=512, rondas_calentamiento=10):
+    """
+    Regresión de memoria: miles de gráficos, la mitad con datos que fallan.
+
+    Los datos inválidos hacen fallar el gráfico después de crear la figura,
+    que es justo el camino que antes dejaba figuras sin cerrar. Con tracemalloc
+    se compara la memoria retenida tras calentar (cachés de fuentes y de
+    matplotlib ya llenas) con la retenida al final; debe quedar plana. El
+    calentamiento repite tandas hasta que una crece menos que la tolerancia
+    (como máximo `rondas_calentamiento` tandas) y la comparación es directa:
+    final - inicial <= tolerancia_kb.
+    """
+    import contextlib
+    import gc
+    import io
+    import tracemalloc
+    from graficos import generar_grafico_flujo_financiero, generar_grafico_necesidades
+
+    datos = generar_asesoria_sintetica(1)
+    flujo = datos['flujo_financiero']
+    necesidades = {'montos': {'proteccion': 900000, 'retiro': 1500000, 'educacion': 400000, 'ahorro': 120000}}
+    # Ambos pasan los filtros previos y fallan dentro de matplotlib, con la figura ya construida
+    flujo_invalido = dict(flujo, porcentaje_flujo='n/d')
+    necesidades_invalidas = {'montos': dict(necesidades['montos'], ahorro=float('inf'))}
+
+    def tanda(n):
+        # Los gráficos fallidos imprimen su error; aquí solo estorba
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i in range(n):
+                if i % 2:
+                    generar_grafico_flujo_financiero(flujo_invalido, dpi=20)
+                    generar_grafico_necesidades(necesidades_invalidas, dpi=20)
+                else:
+                    generar_grafico_flujo_financiero(flujo, dpi=20)
+                    generar_grafico_necesidades(necesidades, dpi=20)
+
+    def retenida_kb():
+        gc.collect()
+        return tracemalloc.get_traced_memory()[0] / 1024
+
+    print(f"Memoria de gráficos ({2 * graficos} gráficos, la mitad fallidos)")
+    tracemalloc.start()
+    try:
+        # ScalarFormatter de matplotlib interna y libera el nombre de una fuente
+        # en cada eje; tras unos cientos de gráficos eso redimensiona una vez la
+        # tabla de strings internados (~1.9 MB). Se provoca aquí, ya con
+        # tracemalloc activo, para que no caiga dentro de la medición.
+        for i in range(200_000):
+            sys.intern(f"calentamiento_{i}")
+        inicial = retenida_kb()
+        for rondas in range(1, rondas_calentamiento + 1):
+            antes = inicial
+            tanda(max(graficos // 10, 20))
+            inicial = retenida_kb()
+            if inicial - antes < tolerancia_kb:
+                break
+        inicio = time.perf_counter()
+        tanda(graficos)
+        segundos = time.perf_counter() - inicio
+        final = retenida_kb()
+        pico = tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+    crecimiento = final - inicial
+    print(f"  retenida tras calentar {inicial:10.1f} KB   (tandas de calentamiento: {rondas})")
+    print(f"  retenida al final      {final:10.1f} KB   (crecimiento {crecimiento:+.1f} KB, pico {pico:.1f} KB)")
+    print(f"  {segundos / (2 * graficos) * 1000:.2f} ms por gráfico con tracemalloc activo")
+    if crecimiento > tolerancia_kb:
+        raise AssertionError(f"La memoria creció {crecimiento:.1f} KB (tolerancia {tolerancia_kb} KB)")
+    return {'inicial_kb': inicial, 'final_kb': final, 'pico_kb': pico}
+
+
+def benchmark_reglas(clientes=5000):
+    """
+    Reglas de recomendación: un cliente a la vez contra un DataFrame completo.
+
+    La evaluación vectorizada debe dar, fila por fila, los mismos códigos
+    que la evaluación individual, y las reglas de deudas deben seguir los
+    cortes de 'recomendacion_deudas' de la política.
+    """
+    import json
+    import pandas as pd
+    from reglas_recomendaciones import (
+        Recomendacion,
+        evaluar_recomendaciones,
+        evaluar_recomendaciones_lote,
+        reglas_compiladas
+    )
+    from umbrales import RUTA_PREDETERMINADA, compilar_politica
+
+    with open(RUTA_PREDETERMINADA, encoding='utf-8') as archivo:
+        config = json.load(archivo)
+    config['escalas']['recomendacion_deudas']['cortes'] = [0, 10, 25]
+    _, campos, evaluar = reglas_compiladas(compilar_politica(config))
+    valores = {campo: {'porcentaje_deudas': 28}.get(campo, 0) for campo in campos}
+    if Recomendacion.DEUDAS_CRITICAS not in evaluar(valores):
+        raise AssertionError("Las reglas de deudas no siguen los cortes de 'recomendacion_deudas'")
+
+    asesorias = [generar_asesoria_sintetica(i) for i in range(clientes)]
+    pares = [(datos['flujo_financiero'], datos['capacidad_ahorro']) for datos in asesorias]
+    df = pd.DataFrame([{**dict(capacidad), **dict(flujo)} for flujo, capacidad in pares])
+
+    print(f"Reglas de recomendación ({clientes} clientes)")
+    matriz = evaluar_recomendaciones_lote(df)
+    distintos = sum(
+        1 for i, (flujo, capacidad) in enumerate(pares)
+        if list(matriz.columns[matriz.iloc[i].to_numpy()]) != evaluar_recomendaciones(flujo, capacidad)
+    )
+    if distintos:
+        raise AssertionError(f"{distintos} clientes con recomendaciones distintas en la evaluación por lote")
+
+    individual = medir(lambda: [evaluar_recomendaciones(flujo, capacidad) for flujo, capacidad in pares],
+                       repeticiones=5, calentamiento=1)
+    imprimir("cliente por cliente", individual)
+    lote = medir(lambda: evaluar_recomendaciones_lote(df), repeticiones=5, calentamiento=1)
+    imprimir("DataFrame", lote)
+    return {'individual': individual, 'lote': lote}
+
+
+def benchmark_umbrales(clientes=20000):
+    """
+    Flujo y capacidad de ahorro: cliente por cliente (bisect) contra arreglos
+    (np.searchsorted) con la misma política de umbrales.
+
+    El estado financiero, el nivel de inversión y todos los montos en
+    centavos deben coincidir exactamente cliente por cliente.
+    """
+    import numpy as np
+    from modulo_financiero import (
+        calcular_capacidad_ahorro,
+        calcular_capacidad_ahorro_lote,
+        calcular_flujo_financiero,
+        calcular_flujo_financiero_lote
+    )
+
+    flujos = [generar_asesoria_sintetica(i)['flujo_financiero'] for i in range(clientes)]
+    totales = [(f['ingreso_mensual'], f['gastos_fijos'], f['gastos_variables'], f['deudas']) for f in flujos]
+    columnas = np.array(totales).T
+
+    def individual():
+        resultados = []
+        for ingreso, fijos, variables, deudas in totales:
+            flujo = calcular_flujo_financiero(ingreso, {'total': fijos}, {'total': variables}, {'total': deudas})
+            resultados.append((flujo, calcular_capacidad_ahorro(flujo)))
+        return resultados
+
+    def lote():
+        flujo = calcular_flujo_financiero_lote(*columnas)
+        return flujo, calcular_capacidad_ahorro_lote(flujo)
+
+    print(f"Umbrales financieros ({clientes} clientes)")
+    flujo_lote, capacidad_lote = lote()
+    for i, (flujo, capacidad) in enumerate(individual()):
+        nivel = capacidad.nivel.codigo if capacidad.nivel else 0
+        if flujo.estado.codigo != flujo_lote['estado'][i] or nivel != capacidad_lote['nivel'][i]:
+            raise AssertionError(f"Cliente {i}: estado o nivel distinto en el cálculo por lote")
+        montos = [(flujo, flujo_lote, monto) for monto in flujo._MONTOS]
+        montos += [(capacidad, capacidad_lote, monto) for monto in capacidad._MONTOS]
+        for registro, lote_campos, monto in montos:
+            campo = monto + '_centavos'
+            if getattr(registro, campo) != lote_campos[campo][i]:
+                raise AssertionError(f"Cliente {i}: {campo} distinto en el cálculo por lote")
+
+    resultado_individual = medir(individual, repeticiones=5, calentamiento=1)
+    imprimir("cliente por cliente", resultado_individual)
+    resultado_lote = medir(lote, repeticiones=5, calentamiento=1)
+    imprimir("arreglos", resultado_lote)
+    return {'individual': resultado_individual, 'lote': resultado_lote}
+
+
+def benchmark_escenarios(pasos=21):
+    """
+    Malla de escenarios del paso 3: recortes en dos categorías evaluados en
+    una llamada vectorizada contra una llamada al motor por celda.
+
+    Cada celda de la malla debe coincidir exactamente con el cálculo por cliente.
+    """
+    import itertools
+    from escenarios import cache_escenarios, categorias_ajustables, malla_escenarios
+    from modulo_financiero import calcular_capacidad_ahorro, calcular_flujo_financiero
+
+    flujo = generar_asesoria_sintetica(1)['flujo_financiero']
+    factores = [1 - i / (pasos - 1) for i in range(pasos)]
+    ejes = [(seccion, categoria, factores) for seccion, categoria, _ in categorias_ajustables(flujo)[:2]]
+
+    def celda(indice):
+        detalles = {seccion: dict(flujo[seccion]) for seccion, _, _ in ejes}
+        for (seccion, categoria, valores), i in zip(ejes, indice):
+            detalles[seccion][categoria] = flujo[seccion][categoria] * valores[i]
+        resultado = calcular_flujo_financiero(
+            flujo['ingreso_mensual'],
+            *(detalles.get(seccion, flujo[seccion]) for seccion in
+              ('detalle_gastos_fijos', 'detalle_gastos_variables', 'detalle_deudas'))
+        )
+        return resultado, calcular_capacidad_ahorro(resultado)
+
+    indices = list(itertools.product(range(pasos), repeat=len(ejes)))
+    print(f"Escenarios ({len(indices)} celdas)")
+    malla = malla_escenarios(flujo, ejes, usar_cache=False)
+    for indice in indices:
+        resultado, capacidad = celda(indice)
+        if (malla['flujo_libre_centavos'][indice] != resultado.flujo_libre_centavos
+                or malla['estado'][indice] != resultado.estado.codigo
+                or malla['ahorro_sugerido_centavos'][indice] != capacidad.ahorro_sugerido_centavos):
+            raise AssertionError(f"Celda {indice}: la malla no coincide con el cálculo por cliente")
+
+    por_celda = medir(lambda: [celda(indice) for indice in indices], repeticiones=5, calentamiento=1)
+    imprimir("una llamada por celda", por_celda)
+    vectorizada = medir(lambda: malla_escenarios(flujo, ejes, usar_cache=False))
+    imprimir("malla vectorizada", vectorizada)
+    cache_escenarios.limpiar()
+    en_cache = medir(lambda: malla_escenarios(flujo, ejes))
+    imprimir("malla en caché", en_cache)
+    return {'por_celda': por_celda, 'vectorizada': vectorizada, 'cache': en_cache}
+
+
+def benchmark_deudas(clientes=2000):
+    """
+    Plan de pago de deudas: la cartera completa en una simulación vectorizada
+    contra una simulación por cliente, para cada estrategia.
+
+    Meses, intereses y mes de liquidación de cada deuda deben coincidir
+    exactamente entre el lote y la simulación individual, y la cartera leída
+    de una exportación JSONL debe dar lo mismo que en memoria.
+    """
+    import io
+    import numpy as np
+    from deudas import ESTRATEGIAS, comparar_estrategias, simular_cartera
+    from serializacion import escribir_jsonl, leer_jsonl
+
+    asesorias = [generar_asesoria_sintetica(i) for i in range(clientes)]
+    extras = np.array([round(datos['ingresos']['ingreso_mensual'] * 0.05, -2) for datos in asesorias])
+
+    exportacion = io.BytesIO()
+    escribir_jsonl(asesorias, exportacion)
+    exportacion.seek(0)
+    registros = list(leer_jsonl(exportacion))
+
+    print(f"Deudas ({clientes} clientes, {len(ESTRATEGIAS)} estrategias)")
+    for estrategia in ESTRATEGIAS:
+        lote = simular_cartera(asesorias, estrategia, extras)
+        desde_jsonl = simular_cartera(registros, estrategia, extras)
+        for campo, valores in lote.items():
+            if not np.array_equal(valores, desde_jsonl[campo]):
+                raise AssertionError(f"{estrategia}: '{campo}' difiere entre la cartera en memoria y la leída de JSONL")
+        if not (lote['meses'] != 0).any():
+            raise AssertionError(f"{estrategia}: la cartera no tiene deudas que simular")
+        for i, datos in enumerate(asesorias):
+            individual = simular_cartera([datos], estrategia, extras[i])
+            if (lote['meses'][i] != individual['meses'][0]
+                    or lote['interes_total'][i] != individual['interes_total'][0]
+                    or (lote['liquidacion'][i] != individual['liquidacion'][0]).any()):
+                raise AssertionError(f"Cliente {i} ({estrategia}): el lote no coincide con la simulación individual")
+
+    individual = medir(lambda: [simular_cartera([datos], 'avalancha', extras[i]) for i, datos in enumerate(asesorias)],
+                       repeticiones=3, calentamiento=1)
+    imprimir("cliente por cliente", individual)
+    lote = medir(lambda: simular_cartera(asesorias, 'avalancha', extras), repeticiones=5, calentamiento=1)
+    imprimir("cartera vectorizada", lote)
+    en_vivo = medir(lambda: comparar_estrategias(asesorias[0], extras[0]))
+    imprimir("comparar estrategias (1 cliente)", en_vivo)
+    return {'individual': individual, 'lote': lote, 'en_vivo': en_vivo}
+
+
+def benchmark_exportacion(asesorias=4000, agentes=300, max_filas_pendientes=400):
+    """
+    Exportación Parquet con muchas particiones pequeñas (mes × agente).
+
+    Ninguna partición llega a FILAS_POR_GRUPO, así que sin el presupuesto
+    global todas las filas quedarían en memoria hasta el final. Se comprueba
+    que las filas pendientes nunca rebasan `max_filas_pendientes`, que el
+    dataset releído tiene todas las filas por partición, y se compara el pico
+    de tracemalloc con y sin presupuesto.
+    """
+    import shutil
+    import tempfile
+    import tracemalloc
+    from urllib.parse import unquote
+    import pyarrow.dataset as ds
+    from exportacion_analitica import exportar_parquet_particionado
+
+    def generar():
+        for i in range(asesorias):
+            datos = generar_asesoria_sintetica(i)
+            datos['datos_generales']['nombre_agente'] = f"Agente {i % agentes:03d}"
+            yield datos
+
+    def exportar(limite):
+        directorio = tempfile.mkdtemp(prefix='rizkora-parquet-')
+        tracemalloc.start()
+        try:
+            inicio = time.perf_counter()
+            resumen = exportar_parquet_particionado(generar(), directorio, max_filas_pendientes=limite)
+            segundos = time.perf_counter() - inicio
+            pico = tracemalloc.get_traced_memory()[1] / 1024
+        finally:
+            tracemalloc.stop()
+        return directorio, resumen, segundos, pico
+
+    print(f"Exportación Parquet ({asesorias} asesorías, {agentes} agentes)")
+    directorio, resumen, segundos, pico = exportar(max_filas_pendientes)
+    try:
+        if resumen['filas'] != asesorias:
+            raise AssertionError(f"Se exportaron {resumen['filas']} filas de {asesorias}")
+        if resumen['pico_pendientes'] > max_filas_pendientes:
+            raise AssertionError(f"{resumen['pico_pendientes']} filas pendientes (presupuesto {max_filas_pendientes})")
+        tabla = ds.dataset(directorio, format='parquet', partitioning='hive').to_table(columns=['mes', 'agente'])
+        leidas = {}
+        for mes, agente in zip(tabla.column('mes').to_pylist(), tabla.column('agente').to_pylist()):
+            clave = f"{mes}/{unquote(agente)}"
+            leidas[clave] = leidas.get(clave, 0) + 1
+        if leidas != resumen['particiones']:
+            raise AssertionError("Las filas releídas del dataset no coinciden con el resumen por partición")
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+    sin_limite, resumen_sin_limite, segundos_sin_limite, pico_sin_limite = exportar(asesorias)
+    shutil.rmtree(sin_limite, ignore_errors=True)
+
+    print(f"  {len(resumen['particiones'])} particiones, ~{asesorias / len(resumen['particiones']):.1f} filas cada una")
+    print(f"  con presupuesto ({max_filas_pendientes} filas)  pico {pico:10.1f} KB   "
+          f"pendientes máx {resumen['pico_pendientes']:6d}   {segundos:.2f}s")
+    print(f"  sin presupuesto             pico {pico_sin_limite:10.1f} KB   "
+          f"pendientes máx {resumen_sin_limite['pico_pendientes']:6d}   {segundos_sin_limite:.2f}s")
+    return {'pico_kb': pico, 'pico_sin_limite_kb': pico_sin_limite, 'segundos': segundos}
+
+
+class ClienteRedisLocal:
+    """Sustituto de redis-py en memoria (get/set con ex/delete) para probar AlmacenRedis sin servidor."""
+
+    def __init__(self):
+        self.datos = {}
+
+    def set(self, clave, valor, ex=None):
+        self.datos[clave] = (valor, time.time() + ex if ex else None)
+
+    def get(self, clave):
+        valor, expira = self.datos.get(clave, (None, None))
+        if expira is not None and time.time() >= expira:
+            del self.datos[clave]
+            return None
+        return valor
+
+    def delete(self, clave):
+        self.datos.pop(clave, None)
+
+
+def benchmark_almacenes(sesiones=200):
+    """
+    Almacenes de sesiones: guardar, restaurar y eliminar snapshots en cada
+    backend (Redis contra un cliente sustituto), más caducidad, purga, el
+    límite LRU del almacén en memoria y los permisos del directorio.
+    """
+    import os
+    import stat
+    import tempfile
+    from almacen_sesiones import AlmacenArchivos, AlmacenMemoria, AlmacenRedis, AlmacenSQLite
+    from snapshots import codificar_snapshot, decodificar_snapshot, nuevo_token
+
+    blob = codificar_snapshot(generar_asesoria_sintetica(0), 5)
+    tokens = [nuevo_token() for _ in range(sesiones)]
+
+    with tempfile.TemporaryDirectory() as directorio:
+        almacenes = {
+            'memoria': lambda ttl: AlmacenMemoria(ttl=ttl),
+            'archivos': lambda ttl: AlmacenArchivos(os.path.join(directorio, f'archivos_{ttl}'), ttl=ttl),
+            'sqlite': lambda ttl: AlmacenSQLite(os.path.join(directorio, f'sesiones_{ttl}.db'), ttl=ttl),
+            'redis': lambda ttl: AlmacenRedis(ClienteRedisLocal(), ttl=ttl),
+        }
+
+        print(f"Almacenes de sesiones ({sesiones} sesiones)")
+        resultados = {}
+        for nombre, crear in almacenes.items():
+            almacen = crear(3600)
+            for token in tokens:
+                almacen.guardar(token, blob)
+            if any(almacen.cargar(token) != blob for token in tokens):
+                raise AssertionError(f"{nombre}: un snapshot restaurado no coincide con el guardado")
+            if decodificar_snapshot(almacen.cargar(tokens[0]))['step'] != 5:
+                raise AssertionError(f"{nombre}: el snapshot restaurado no se decodifica")
+            almacen.eliminar(tokens[0])
+            if almacen.cargar(tokens[0]) is not None:
+                raise AssertionError(f"{nombre}: la sesión eliminada sigue disponible")
+
+            resultados[nombre] = medir(lambda: decodificar_snapshot(almacen.cargar(tokens[1])))
+            imprimir(f"{nombre}: restaurar snapshot", resultados[nombre])
+
+            # Caducidad: lo caducado no se entrega y la purga lo borra
+            caduco = crear(0.05)
+            for token in tokens[:10]:
+                caduco.guardar(token, blob)
+            time.sleep(0.1)
+            if caduco.cargar(tokens[0]) is not None:
+                raise AssertionError(f"{nombre}: entregó una sesión caducada")
+            if nombre != 'redis' and (caduco.purgar() < 9 or caduco.purgar() != 0):
+                raise AssertionError(f"{nombre}: la purga no eliminó las sesiones caducadas")
+
+        memoria = AlmacenMemoria(max_sesiones=50)
+        for token in tokens:
+            memoria.guardar(token, blob)
+        if len(memoria._sesiones) != 50 or memoria.cargar(tokens[-1]) != blob or memoria.cargar(tokens[0]) is not None:
+            raise AssertionError("memoria: el límite LRU no se respeta")
+
+        archivos = AlmacenArchivos(os.path.join(directorio, 'archivos_3600'))
+        permisos_directorio = stat.S_IMODE(os.stat(archivos.directorio).st_mode)
+        permisos_archivo = stat.S_IMODE(os.stat(archivos._ruta(tokens[1])).st_mode)
+        if permisos_directorio != 0o700 or permisos_archivo != 0o600:
+            raise AssertionError(f"archivos: permisos {oct(permisos_directorio)}/{oct(permisos_archivo)}, "
+                                 "se esperaban 0o700/0o600")
+    print("  caducidad, purga, límite LRU y permisos verificados")
+    return resultados
+
+
+def _trabajo_que_muere():
+    """Simula un proceso del pool que muere (OOM, segfault) sin lanzar una excepción."""
+    import os
+    os._exit(1)
+
+
+def _trabajo_lento(valor, segundos=0.3):
+    time.sleep(segundos)
+    return valor
+
+
+def benchmark_trabajos():
+    """
+    Recuperación del pool de procesos: un trabajo 'render' que mata a su
+    proceso no debe dejar el ejecutor inservible. Los trabajos que estaban
+    en curso se reenvían una vez y los siguientes usan un pool nuevo.
+
+    También mide el primer PDF de un pool recién creado, en frío y con
+    calentar_proceso_render como inicializador de los procesos.
+    """
+    from concurrent.futures.process import BrokenProcessPool
+    from calentamiento import calentar_proceso_render
+    from generar_pdf_mejorado import generar_reporte
+    from trabajos import EjecutorTrabajos
+
+    ejecutor = EjecutorTrabajos(hilos=1, procesos=2)
+    try:
+        print("Trabajos: recuperación del pool de procesos")
+        ejecutor.resultado(ejecutor.enviar(_trabajo_lento, 0, 0, tipo='render'), timeout=60)  # Arranque del pool
+
+        en_curso = ejecutor.enviar(_trabajo_lento, 'en curso', tipo='render')
+        time.sleep(0.1)
+        muere = ejecutor.enviar(_trabajo_que_muere, tipo='render')
+        if ejecutor.resultado(en_curso, timeout=60) != 'en curso':
+            raise AssertionError("El trabajo en curso durante la caída no se reenvió")
+        try:
+            ejecutor.resultado(muere, timeout=60)
+        except BrokenProcessPool:
+            pass  # Falla también en el reintento: error definitivo
+        else:
+            raise AssertionError("El trabajo que mata a su proceso no reportó error")
+        if ejecutor.estado(muere) != 'error':
+            raise AssertionError(f"Estado inesperado del trabajo fallido: {ejecutor.estado(muere)}")
+
+        despues = medir(lambda: ejecutor.resultado(ejecutor.enviar(_trabajo_lento, 1, 0, tipo='render'), timeout=60),
+                        repeticiones=5, calentamiento=1)
+        imprimir("trabajo tras la caída (pool nuevo)", despues)
+    finally:
+        ejecutor.cerrar()
+
+    datos = generar_asesoria_sintetica(1)
+    primer_pdf = {}
+    for nombre, inicializador in (('en frío', None), ('calentado', calentar_proceso_render)):
+        ejecutor = EjecutorTrabajos(hilos=1, procesos=1, inicializador=inicializador)
+        try:
+            if ejecutor.iniciar_procesos(timeout=120) != 1:
+                raise AssertionError(f"El pool {nombre} no arrancó su proceso")
+            inicio = time.perf_counter()
+            ejecutor.resultado(ejecutor.enviar(generar_reporte, datos, 'completo', tipo='render'), timeout=120)
+            primer_pdf[nombre] = (time.perf_counter() - inicio) * 1000
+        finally:
+            ejecutor.cerrar()
+        print(f"  primer PDF del pool ({nombre}){'':<14}{primer_pdf[nombre]:10.1f} ms")
+    return {'despues': despues, 'primer_pdf_ms': primer_pdf}
+
+
+BENCHMARKS = {
+    'estilos': benchmark_estilos,
+    'pdf': benchmark_pdf,
+    'secciones': benchmark_secciones,
+    'perfiles': benchmark_perfiles,
+    'graficos': benchmark_graficos,
+    'memoria': benchmark_memoria,
+    'reglas': benchmark_reglas,
+    'umbrales': benchmark_umbrales,
+    'escenarios': benchmark_escenarios,
+    'deudas': benchmark_deudas,
+    'exportacion': benchmark_exportacion,
+    'almacenes': benchmark_almacenes,
+    'trabajos': benchmark_trabajos,
+}
+
+
+if __name__ == "__main__":
+    seleccion = sys.argv[1:] or list(BENCHMARKS)
+
+    desconocidos = [nombre for nombre in seleccion if nombre not in BENCHMARKS]
+    if desconocidos:
+        print(f"Benchmarks desconocidos: {', '.join(desconocidos)}. Disponibles: {', '.join(BENCHMARKS)}")
+        sys.exit(1)
+
+    for nombre in seleccion:
+        BENCHMARKS[nombre]()
+        print()
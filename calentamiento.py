@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+CALENTAMIENTO DEL SERVIDOR
+Pre-genera un reporte sintético al arrancar el proceso
+
+El primer PDF tras un despliegue es mucho más lento que los siguientes:
+ReportLab carga las métricas de fuentes, matplotlib construye su caché de
+fuentes y el backend Agg se inicializa, todo de forma perezosa en el primer
+clic de un agente. Los PDFs y gráficos se generan en el pool de procesos
+'render' (trabajos.py), así que es ahí donde hay que pagar ese costo: con
+RIZKORA_CALENTAMIENTO=1 cada proceso del pool genera un reporte de una
+asesoría de datos_sinteticos.py al arrancar (calentar_proceso_render como
+inicializador), y al iniciar el servidor un hilo de fondo arranca todos los
+procesos del pool sin esperar al primer clic.
+
+Uso (una vez por proceso, p. ej. desde una función @st.cache_resource):
+    iniciar_calentamiento()
+"""
+
+import os
+import threading
+import time
+
+# Estado del calentamiento del proceso (para logs o una página de diagnóstico)
+estado_calentamiento = {'estado': 'inactivo', 'segundos': None, 'error': None}
+
+_lock_calentamiento = threading.Lock()
+_hilo_calentamiento = None
+
+
+def calentamiento_habilitado():
+    """True si RIZKORA_CALENTAMIENTO está activado ('1', 'true', 'si')."""
+    return os.environ.get('RIZKORA_CALENTAMIENTO', '').strip().lower() in ('1', 'true', 'si', 'sí')
+
+
+def calentar():
+    """
+    Genera un reporte completo y el gráfico de necesidades de una asesoría sintética.
+
+    Returns:
+    --------
+    float : Segundos que tomó el calentamiento
+    """
+    from datos_sinteticos import generar_asesoria_sintetica
+    from generar_pdf_mejorado import generar_pdf_asesoria_mejorado
+    from graficos import generar_grafico_necesidades
+    from modulo_financiero import detectar_necesidades_financieras
+
+    inicio = time.perf_counter()
+    datos = generar_asesoria_sintetica(0)
+    # Sin caché: la asesoría sintética no debe ocupar lugares de las sesiones reales
+    generar_pdf_asesoria_mejorado(datos, usar_cache=False)
+    generar_grafico_necesidades(detectar_necesidades_financieras(datos))
+    return time.perf_counter() - inicio
+
+
+def calentar_proceso_render():
+    """
+    Inicializador de los procesos del pool 'render': calienta el proceso.
+
+    Nunca lanza: una excepción en el inicializador rompe el pool completo.
+    """
+    try:
+        segundos = calentar()
+    except Exception as e:
+        print(f"Error al calentar el proceso {os.getpid()}: {str(e)}")
+        return
+    print(f"Proceso {os.getpid()} calentado en {segundos:.2f} s")
+
+
+def _ejecutar():
+    from trabajos import ejecutor_predeterminado
+
+    estado_calentamiento['estado'] = 'en curso'
+    try:
+        inicio = time.perf_counter()
+        ejecutor = ejecutor_predeterminado()
+        # Sin inicializador (forzar con RIZKORA_CALENTAMIENTO apagado) el
+        # calentamiento va como el primer trabajo de cada proceso
+        listos = ejecutor.iniciar_procesos(calentar if ejecutor.inicializador is None else os.getpid)
+        if not listos:
+            raise RuntimeError("ningún proceso del pool de render arrancó")
+        segundos = time.perf_counter() - inicio
+    except Exception as e:
+        estado_calentamiento.update(estado='error', error=str(e))
+        print(f"Error en el calentamiento del servidor: {str(e)}")
+        return
+    estado_calentamiento.update(estado='listo', segundos=segundos)
+    print(f"Calentamiento del servidor completado en {segundos:.2f} s ({listos} procesos de render)")
+
+
+def iniciar_calentamiento(forzar=False):
+    """
+    Lanza el calentamiento en un hilo de fondo, una sola vez por proceso.
+
+    Parameters:
+    -----------
+    forzar : bool
+        Calentar aunque RIZKORA_CALENTAMIENTO no esté activado
+
+    Returns:
+    --------
+    threading.Thread : Hilo del calentamiento, o None si está deshabilitado
+    """
+    global _hilo_calentamiento
+    if not (forzar or calentamiento_habilitado()):
+        return None
+
+    with _lock_calentamiento:
+        if _hilo_calentamiento is None:
+            _hilo_calentamiento = threading.Thread(
+                target=_ejecutar, name='calentamiento-rizkora', daemon=True
+            )
+            _hilo_calentamiento.start()
+    return _hilo_calentamiento
+
+
+if __name__ == "__main__":
+    # Mide el primer reporte en frío y el siguiente ya caliente
+    print(f"En frío:   {calentar():.2f} s")
+    print(f"Caliente:  {calentar():.2f} s")
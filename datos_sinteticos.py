@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+GENERADOR DE ASESORÍAS SINTÉTICAS
+Crea asesorías completas con la misma estructura que st.session_state.datos
+
+Útil para demostraciones, pruebas de volumen y exportaciones de ejemplo
+sin usar datos reales de clientes.
+"""
+
+import random
+from datetime import date, timedelta
+
+from modulo_financiero import calcular_flujo_financiero, calcular_capacidad_ahorro
+
+NOMBRES = ['Juan', 'María', 'Carlos', 'Laura', 'Ana', 'Luis', 'Sofía', 'Jorge', 'Elena', 'Miguel']
+APELLIDOS = ['Pérez', 'González', 'López', 'Hernández', 'Martínez', 'Ramírez', 'Torres', 'Flores']
+AGENTES = ['María González', 'Roberto Díaz', 'Patricia Ruiz', 'Fernando Castro']
+OCUPACIONES = ['Ingeniero', 'Contadora', 'Médico', 'Docente', 'Comerciante', 'Abogada', 'Diseñador']
+ESTADOS_CIVILES = ['Soltero', 'Casado', 'Unión libre', 'Divorciado', 'Viudo']
+
+
+def _nombre(rnd):
+    return f"{rnd.choice(NOMBRES)} {rnd.choice(APELLIDOS)} {rnd.choice(APELLIDOS)}"
+
+
+def generar_asesoria_sintetica(semilla=0, fecha_base=None):
+    """
+    Genera una asesoría completa (pasos 1 a 9) con datos aleatorios reproducibles.
+
+    Parameters:
+    -----------
+    semilla : int
+        Semilla del generador aleatorio; la misma semilla produce la misma asesoría
+    fecha_base : date
+        Fecha a partir de la cual se distribuyen las fechas de asesoría (últimos 90 días)
+
+    Returns:
+    --------
+    dict : Estructura equivalente a st.session_state.datos
+    """
+    rnd = random.Random(semilla)
+    fecha_base = fecha_base or date(2026, 3, 31)
+    fecha_asesoria = fecha_base - timedelta(days=rnd.randint(0, 90))
+    edad = rnd.randint(22, 60)
+
+    datos_generales = {
+        'nombre': _nombre(rnd),
+        'telefono': ''.join(str(rnd.randint(0, 9)) for _ in range(10)),
+        'correo': f"cliente{semilla}@ejemplo.com",
+        'ocupacion': rnd.choice(OCUPACIONES),
+        'estado_civil': rnd.choice(ESTADOS_CIVILES),
+        'fecha_nacimiento': date(fecha_asesoria.year - edad, rnd.randint(1, 12), rnd.randint(1, 28)),
+        'edad': edad,
+        'fumador': rnd.choice(['Sí', 'No']),
+        'tipo_cita': rnd.choice(['Presencial', 'Virtual']),
+        'nombre_agente': rnd.choice(AGENTES),
+        'fecha_asesoria': fecha_asesoria
+    }
+
+    tiene_pareja = rnd.random() < 0.6
+    num_hijos = rnd.choice([0, 0, 1, 2, 3])
+    hijos = [{'nombre': rnd.choice(NOMBRES), 'edad': rnd.randint(0, 17)} for _ in range(num_hijos)]
+    perfil_familiar = {
+        'tiene_pareja': 'Sí' if tiene_pareja else 'No',
+        'nombre_pareja': _nombre(rnd) if tiene_pareja else '',
+        'edad_pareja': rnd.randint(22, 60) if tiene_pareja else None,
+        'tiene_hijos': 'Sí' if hijos else 'No',
+        'num_hijos': len(hijos),
+        'hijos': hijos,
+        'tiene_dependientes': 'No',
+        'num_dependientes': 0,
+        'dependientes': []
+    }
+
+    # Flujo financiero (paso 3)
+    ingreso_mensual = float(rnd.randrange(12000, 150000, 500))
+    gastos_fijos = {
+        'vivienda': round(ingreso_mensual * rnd.uniform(0.15, 0.35), -2),
+        'servicios': round(ingreso_mensual * rnd.uniform(0.03, 0.06), -2),
+        'transporte': round(ingreso_mensual * rnd.uniform(0.03, 0.08), -2),
+        'alimentacion': round(ingreso_mensual * rnd.uniform(0.08, 0.15), -2),
+        'seguros': round(ingreso_mensual * rnd.uniform(0.0, 0.05), -2),
+        'educacion': round(ingreso_mensual * rnd.uniform(0.0, 0.08), -2) if hijos else 0.0
+    }
+    gastos_variables = {
+        'entretenimiento': round(ingreso_mensual * rnd.uniform(0.02, 0.08), -2),
+        'ropa': round(ingreso_mensual * rnd.uniform(0.01, 0.04), -2),
+        'salud': round(ingreso_mensual * rnd.uniform(0.01, 0.04), -2),
+        'otros': round(ingreso_mensual * rnd.uniform(0.0, 0.05), -2)
+    }
+    deudas = {
+        'tarjetas': round(ingreso_mensual * rnd.uniform(0.0, 0.12), -2),
+        'prestamos': round(ingreso_mensual * rnd.uniform(0.0, 0.08), -2),
+        'auto': round(ingreso_mensual * rnd.choice([0.0, 0.0, 0.06, 0.1]), -2),
+        'otras': 0.0
+    }
+    flujo = calcular_flujo_financiero(ingreso_mensual, gastos_fijos, gastos_variables, deudas)
+    capacidad = calcular_capacidad_ahorro(flujo)
+    ingresos = {
+        'ingreso_mensual': ingreso_mensual,
+        'ingreso_anual': ingreso_mensual * 12,
+        'ahorro_ideal_10': ingreso_mensual * 12 * 0.10,
+        'ahorro_conservador_7': ingreso_mensual * 0.07,
+        'inversion_mensual': capacidad.get('ahorro_sugerido', 0)
+    }
+
+    # Protección (paso 4)
+    if tiene_pareja or hijos:
+        presupuesto = round(ingreso_mensual * rnd.uniform(0.5, 0.8), -2)
+        proteccion = {
+            'aplica': True,
+            'reflexion': 'Mi familia dependería de mis ahorros.',
+            'responsable1': perfil_familiar['nombre_pareja'] or _nombre(rnd),
+            'responsable2': '',
+            'presupuesto_mensual': presupuesto,
+            'presupuesto_anual': presupuesto * 12,
+            'monto_proteccion_sugerido': presupuesto * 12 * 10
+        }
+    else:
+        proteccion = {'aplica': False}
+
+    # Ahorro / proyecto (paso 5)
+    ahorro = {'preparado_crisis': rnd.choice(['Sí', 'No', 'Parcialmente']), 'tiene_proyecto': 'No'}
+    if rnd.random() < 0.5:
+        costo = float(rnd.randrange(100000, 3000000, 50000))
+        ahorro_actual = round(costo * rnd.uniform(0.0, 0.3), -3)
+        plazo = rnd.randint(2, 15)
+        inversion_requerida = max(0, costo - ahorro_actual)
+        ahorro.update({
+            'tiene_proyecto': 'Sí',
+            'descripcion': rnd.choice(['Compra de casa', 'Iniciar negocio', 'Viaje familiar', 'Auto nuevo']),
+            'costo': costo,
+            'ahorro_actual': ahorro_actual,
+            'plazo_anos': plazo,
+            'inversion_requerida': inversion_requerida,
+            'ahorro_mensual_sugerido': inversion_requerida / (plazo * 12)
+        })
+
+    # Retiro (paso 6)
+    edad_retiro = rnd.randint(max(edad + 1, 55), 70)
+    ingreso_retiro = round(ingreso_mensual * rnd.uniform(0.4, 0.8), -2)
+    anos_para_retiro = edad_retiro - edad
+    anos_en_retiro = max(1, 80 - edad_retiro)
+    monto_total = ingreso_retiro * 12 * anos_en_retiro
+    retiro = {
+        'edad_retiro': edad_retiro,
+        'ingreso_mensual_retiro': ingreso_retiro,
+        'anos_para_retiro': anos_para_retiro,
+        'anos_en_retiro': anos_en_retiro,
+        'monto_anual_retiro': ingreso_retiro * 12,
+        'monto_total_retiro': monto_total,
+        'ahorro_mensual_sugerido': monto_total / max(1, anos_para_retiro * 12)
+    }
+
+    # Educación (paso 7)
+    if hijos:
+        educacion_hijos = []
+        for hijo in hijos:
+            costo_anual = float(rnd.randrange(50000, 250000, 10000))
+            anos_restantes = max(0, 18 - hijo['edad'])
+            costo_total = costo_anual * 4
+            educacion_hijos.append({
+                'nombre': hijo['nombre'],
+                'edad': hijo['edad'],
+                'costo_anual': costo_anual,
+                'anos_restantes': anos_restantes,
+                'costo_total': costo_total,
+                'ahorro_mensual': costo_total / (anos_restantes * 12) if anos_restantes > 0 else costo_anual / 12
+            })
+        educacion = {
+            'aplica': True,
+            'hijos': educacion_hijos,
+            'monto_total_educacion': sum(h['costo_total'] for h in educacion_hijos),
+            'ahorro_mensual_total': sum(h['ahorro_mensual'] for h in educacion_hijos)
+        }
+    else:
+        educacion = {'aplica': False, 'monto_total_educacion': 0}
+
+    # Cierre (paso 9)
+    cierre = {
+        'satisfaccion': 'La claridad del análisis de flujo.',
+        'segunda_cita': rnd.choice(['Sí', 'No']),
+        'fecha_segunda_cita': None,
+        'hora_segunda_cita': None,
+        'num_referidos': 0,
+        'referidos': []
+    }
+
+    # Saldos y tasas de las deudas (paso 3, opcional). Se generan al final
+    # para no alterar el resto de la asesoría de cada semilla. El saldo es el
+    # valor presente de los pagos restantes, así el pago actual lo amortiza
+    plazos_deuda = {'tarjetas': (6, 36), 'prestamos': (12, 48), 'auto': (12, 60), 'otras': (6, 24)}
+    tasas_deuda = {'tarjetas': (35.0, 75.0), 'prestamos': (18.0, 45.0), 'auto': (10.0, 18.0), 'otras': (15.0, 35.0)}
+    deudas_saldos = {}
+    for categoria, pago in deudas.items():
+        if pago <= 0:
+            continue
+        tasa_anual = round(rnd.uniform(*tasas_deuda[categoria]), 1)
+        tasa_mensual = tasa_anual / 100 / 12
+        plazo = rnd.randint(*plazos_deuda[categoria])
+        deudas_saldos[categoria] = {
+            'saldo': round(pago * (1 - (1 + tasa_mensual) ** -plazo) / tasa_mensual, -2),
+            'tasa_anual': tasa_anual
+        }
+
+    return {
+        'datos_generales': datos_generales,
+        'perfil_familiar': perfil_familiar,
+        'ingresos': ingresos,
+        'flujo_financiero': flujo,
+        'capacidad_ahorro': capacidad,
+        'deudas': deudas_saldos,
+        'proteccion': proteccion,
+        'ahorro': ahorro,
+        'retiro': retiro,
+        'educacion': educacion,
+        'cierre': cierre
+    }
+
+
+def generar_asesorias_sinteticas(cantidad, semilla_inicial=0):
+    """Genera perezosamente `cantidad` asesorías sintéticas consecutivas."""
+    for i in range(cantidad):
+        yield generar_asesoria_sintetica(semilla_inicial + i)
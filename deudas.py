@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+"""
+SIMULADOR DE PAGO DE DEUDAS
+Avalancha, bola de nieve y consolidación para las deudas del paso 3
+
+El paso 3 captura el pago mensual de cada deuda (tarjetas, préstamos, auto,
+otras) y, opcionalmente, su saldo y tasa anual (datos['deudas']). Con eso
+se simula mes a mes:
+
+    - minimos:       cada deuda solo con su pago; al liquidarse, su pago se libera
+    - avalancha:     pago total constante; el excedente va a la tasa más alta
+    - bola_nieve:    pago total constante; el excedente va al saldo más chico
+    - consolidacion: un solo crédito por la suma de saldos a otra tasa, con el mismo pago total
+
+La simulación trabaja en centavos enteros (como el motor financiero) y es
+vectorizada sobre una matriz clientes × deudas: cada mes es un puñado de
+operaciones de NumPy, así que una cartera completa cuesta casi lo mismo que
+un cliente. El excedente se reparte en cascada según la prioridad de la
+estrategia con una suma acumulada, sin ciclos por deuda.
+"""
+
+from datetime import date
+
+from modelo_datos import a_centavos, restaurar_registros
+
+CATEGORIAS_DEUDA = ('tarjetas', 'prestamos', 'auto', 'otras')
+
+NOMBRES_DEUDA = {
+    'tarjetas': 'Tarjetas de crédito',
+    'prestamos': 'Préstamos personales',
+    'auto': 'Crédito automotriz',
+    'otras': 'Otras deudas',
+}
+
+ESTRATEGIAS = ('minimos', 'avalancha', 'bola_nieve', 'consolidacion')
+
+NOMBRES_ESTRATEGIA = {
+    'minimos': 'Solo pagos actuales',
+    'avalancha': 'Avalancha (mayor tasa primero)',
+    'bola_nieve': 'Bola de nieve (menor saldo primero)',
+    'consolidacion': 'Consolidación',
+}
+
+TASA_CONSOLIDACION_PREDETERMINADA = 20.0  # % anual
+MAX_MESES = 600  # 50 años; una deuda que no se liquida en ese plazo se reporta como no liquidable
+# Un cliente cuyo saldo total supera este múltiplo del inicial no se liquidará
+# nunca (los pagos no cubren los intereses): se deja de simular
+CRECIMIENTO_MAXIMO = 10
+
+# ================================
+# SIMULACIÓN VECTORIZADA
+# ================================
+
+def _prioridad(estrategia, saldos, tasas):
+    """Orden de pago del excedente por fila (índices de columna)."""
+    import numpy as np
+
+    if estrategia == 'avalancha':
+        # Mayor tasa primero; a igual tasa, menor saldo
+        return np.lexsort((saldos, -tasas), axis=-1)
+    if estrategia == 'bola_nieve':
+        # Menor saldo primero (las columnas sin saldo no reciben excedente)
+        return np.lexsort((-tasas, np.where(saldos > 0, saldos, np.iinfo(np.int64).max)), axis=-1)
+    return np.broadcast_to(np.arange(saldos.shape[-1]), saldos.shape)
+
+
+def simular_lote(saldos, tasas_anuales, pagos, extra=0, estrategia='avalancha',
+                 tasa_consolidacion=TASA_CONSOLIDACION_PREDETERMINADA, max_meses=MAX_MESES,
+                 historial=False):
+    """
+    Simula el pago de deudas de varios clientes a la vez.
+
+    Parameters:
+    -----------
+    saldos : array-like (clientes × deudas)
+        Saldos en centavos (int64)
+    tasas_anuales : array-like (clientes × deudas)
+        Tasas anuales en porcentaje (45.0 = 45 %)
+    pagos : array-like (clientes × deudas)
+        Pago mensual actual de cada deuda, en centavos
+    extra : int o array-like (clientes)
+        Pago adicional mensual en centavos
+    estrategia : str
+        Una de ESTRATEGIAS
+    tasa_consolidacion : float
+        Tasa anual (%) del crédito consolidado
+    historial : bool
+        Guardar el saldo total de cada mes (para graficar)
+
+    Returns:
+    --------
+    dict : Arreglos numpy por cliente: 'meses' (-1 si no se liquida en
+           max_meses), 'interes_centavos', 'pagado_centavos',
+           'pago_mensual_centavos' (lo que se deja de pagar al terminar),
+           'liquidacion' (clientes × deudas: mes en que se liquidó cada deuda,
+           0 sin saldo, -1 sin liquidar) y, con historial, 'saldos_centavos'
+           (meses × clientes)
+    """
+    import numpy as np
+
+    if estrategia not in ESTRATEGIAS:
+        raise ValueError(f"Estrategia desconocida: {estrategia}")
+
+    saldos_iniciales = np.array(saldos, dtype=np.int64, ndmin=2)
+    saldo = saldos_iniciales.copy()
+    tasas = np.array(tasas_anuales, dtype=np.float64, ndmin=2)
+    pago = np.array(pagos, dtype=np.int64, ndmin=2)
+    extra = np.broadcast_to(np.asarray(extra, dtype=np.int64), saldo.shape[:1])
+    pago_total = np.where(saldo > 0, pago, 0).sum(axis=1) + extra
+
+    if estrategia == 'consolidacion':
+        # Un solo crédito por la suma de saldos, con el mismo pago mensual total
+        saldo = saldo.sum(axis=1, keepdims=True)
+        tasas = np.full(saldo.shape, float(tasa_consolidacion))
+        pago = pago_total[:, None]
+    orden = _prioridad(estrategia, saldo, tasas)
+    tasas_mensuales = tasas / 100 / 12
+
+    liquidacion = np.where(saldo > 0, -1, 0)
+    interes_total = np.zeros(saldo.shape[0], dtype=np.int64)
+    pagado_total = np.zeros(saldo.shape[0], dtype=np.int64)
+    meses = np.where(saldo.any(axis=1), -1, 0)
+    saldos_mes = [saldo.sum(axis=1)] if historial else None
+
+    # Solo se simulan los clientes con saldo pendiente: los que terminan salen
+    # de las matrices de trabajo, así una cartera no paga por su deuda más larga
+    filas = np.flatnonzero(meses == -1)
+    saldo, tasas_mensuales, pago, orden = saldo[filas], tasas_mensuales[filas], pago[filas], orden[filas]
+    extra, pago_total_filas = extra[filas], pago_total[filas]
+    limite = saldo.sum(axis=1) * CRECIMIENTO_MAXIMO
+
+    for mes in range(1, max_meses + 1):
+        if not filas.size:
+            break
+        interes = np.rint(saldo * tasas_mensuales).astype(np.int64)
+        saldo = saldo + interes
+        interes_total[filas] += interes.sum(axis=1)
+
+        # Pago de cada deuda (sin pasar de su saldo)
+        aplicado = np.minimum(pago, saldo)
+        saldo = saldo - aplicado
+        pagado = aplicado.sum(axis=1)
+
+        # Excedente: el extra más, salvo con 'minimos', los pagos ya liberados
+        excedente = extra if estrategia == 'minimos' else pago_total_filas - pagado
+        ordenado = np.take_along_axis(saldo, orden, axis=1)
+        previo = np.cumsum(ordenado, axis=1) - ordenado
+        cascada = np.clip(excedente[:, None] - previo, 0, ordenado)
+        np.put_along_axis(saldo, orden, ordenado - cascada, axis=1)
+        pagado_total[filas] += pagado + cascada.sum(axis=1)
+
+        pendiente = liquidacion[filas]
+        pendiente[(pendiente == -1) & (saldo == 0)] = mes
+        liquidacion[filas] = pendiente
+        total = saldo.sum(axis=1)
+        liquidados = total == 0
+        meses[filas[liquidados]] = mes
+        if historial:
+            saldos_mes.append(np.zeros_like(meses))
+            saldos_mes[-1][filas] = total
+
+        # Fuera: liquidados y deudas que crecen sin control (meses queda en -1)
+        siguen = ~liquidados & (total <= limite)
+        if not siguen.all():
+            filas, saldo, tasas_mensuales, pago, orden = (
+                filas[siguen], saldo[siguen], tasas_mensuales[siguen], pago[siguen], orden[siguen])
+            extra, pago_total_filas, limite = extra[siguen], pago_total_filas[siguen], limite[siguen]
+
+    if estrategia == 'consolidacion':
+        # Todas las deudas originales se liquidan el día de la consolidación
+        liquidacion = np.where(saldos_iniciales > 0, meses[:, None], 0)
+
+    resultado = {
+        'meses': meses,
+        'interes_centavos': interes_total,
+        'pagado_centavos': pagado_total,
+        'pago_mensual_centavos': pago_total,
+        'liquidacion': liquidacion,
+    }
+    if historial:
+        resultado['saldos_centavos'] = np.stack(saldos_mes)
+    return resultado
+
+# ================================
+# UN CLIENTE Y CARTERA
+# ================================
+
+def matrices_deudas(asesorias):
+    """
+    Saldos, tasas y pagos de varias asesorías como matrices clientes × CATEGORIAS_DEUDA.
+
+    Acepta datos directos (st.session_state.datos) o registros exportados
+    ({'datos_completos': ...}, p. ej. de leer_jsonl()), igual que libro_pdf.
+
+    Returns:
+    --------
+    tuple : (saldos en centavos, tasas anuales %, pagos en centavos)
+    """
+    import numpy as np
+
+    saldos, tasas, pagos = [], [], []
+    for registro in asesorias:
+        datos = restaurar_registros(registro.get('datos_completos', registro))
+        capturadas = datos.get('deudas') or {}
+        detalle = (datos.get('flujo_financiero') or {}).get('detalle_deudas') or {}
+        saldos.append([a_centavos((capturadas.get(c) or {}).get('saldo')) for c in CATEGORIAS_DEUDA])
+        tasas.append([(capturadas.get(c) or {}).get('tasa_anual') or 0.0 for c in CATEGORIAS_DEUDA])
+        pagos.append([a_centavos(detalle.get(c)) for c in CATEGORIAS_DEUDA])
+    return (np.array(saldos, dtype=np.int64).reshape(-1, len(CATEGORIAS_DEUDA)),
+            np.array(tasas, dtype=np.float64).reshape(-1, len(CATEGORIAS_DEUDA)),
+            np.array(pagos, dtype=np.int64).reshape(-1, len(CATEGORIAS_DEUDA)))
+
+
+def _sumar_meses(fecha, meses):
+    mes = fecha.month - 1 + meses
+    return date(fecha.year + mes // 12, mes % 12 + 1, 1)
+
+
+def comparar_estrategias(datos, extra=0.0, tasa_consolidacion=TASA_CONSOLIDACION_PREDETERMINADA,
+                         fecha_inicio=None):
+    """
+    Compara las estrategias de pago para la asesoría en curso.
+
+    Parameters:
+    -----------
+    datos : dict
+        st.session_state.datos (usa 'deudas' y flujo_financiero['detalle_deudas'])
+    extra : float
+        Pago adicional mensual en pesos
+    tasa_consolidacion : float
+        Tasa anual (%) del crédito consolidado
+    fecha_inicio : date
+        Mes del primer pago (por defecto, el mes actual)
+
+    Returns:
+    --------
+    dict : {estrategia: {'meses', 'fecha_liquidacion', 'interes_total',
+            'total_pagado', 'flujo_liberado', 'liquidacion_por_deuda',
+            'saldos'}}; montos en pesos, None donde no se liquida
+    """
+    saldos, tasas, pagos = matrices_deudas([datos])
+    fecha_inicio = fecha_inicio or date.today().replace(day=1)
+
+    resultados = {}
+    for estrategia in ESTRATEGIAS:
+        # La línea base es la situación actual: sin pago adicional
+        extra_centavos = 0 if estrategia == 'minimos' else a_centavos(extra)
+        simulacion = simular_lote(saldos, tasas, pagos, extra_centavos, estrategia,
+                                  tasa_consolidacion, historial=True)
+        meses = int(simulacion['meses'][0])
+        resultados[estrategia] = {
+            'meses': meses if meses >= 0 else None,
+            'fecha_liquidacion': _sumar_meses(fecha_inicio, meses - 1) if meses > 0 else None,
+            'interes_total': simulacion['interes_centavos'][0] / 100 if meses >= 0 else None,
+            'total_pagado': simulacion['pagado_centavos'][0] / 100 if meses >= 0 else None,
+            'flujo_liberado': simulacion['pago_mensual_centavos'][0] / 100,
+            'liquidacion_por_deuda': {
+                categoria: (int(mes) if mes >= 0 else None)
+                for categoria, mes, saldo in zip(CATEGORIAS_DEUDA, simulacion['liquidacion'][0], saldos[0])
+                if saldo > 0
+            },
+            'saldos': simulacion['saldos_centavos'][:, 0] / 100
+        }
+    return resultados
+
+
+def simular_cartera(asesorias, estrategia='avalancha', extra=0, tasa_consolidacion=TASA_CONSOLIDACION_PREDETERMINADA):
+    """
+    simular_lote() sobre todas las asesorías de una cartera.
+
+    Parameters:
+    -----------
+    asesorias : iterable
+        Datos de cada asesoría (st.session_state.datos) o registros
+        exportados como los que entrega serializacion.leer_jsonl()
+    estrategia : str
+        Una de ESTRATEGIAS
+    extra : float o array-like
+        Pago adicional mensual en pesos (uno para todos o uno por cliente)
+
+    Returns:
+    --------
+    dict : Arreglos por cliente en pesos: 'meses' (-1 si no se liquida),
+           'interes_total', 'total_pagado', 'flujo_liberado' y
+           'liquidacion' (mes por deuda, columnas en CATEGORIAS_DEUDA)
+    """
+    import numpy as np
+
+    saldos, tasas, pagos = matrices_deudas(asesorias)
+    extra = np.rint(np.asarray(extra, dtype=np.float64) * 100).astype(np.int64)
+    simulacion = simular_lote(saldos, tasas, pagos, extra, estrategia, tasa_consolidacion)
+    return {
+        'meses': simulacion['meses'],
+        'interes_total': simulacion['interes_centavos'] / 100,
+        'total_pagado': simulacion['pagado_centavos'] / 100,
+        'flujo_liberado': simulacion['pago_mensual_centavos'] / 100,
+        'liquidacion': simulacion['liquidacion']
+    }
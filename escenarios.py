@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+ESCENARIOS "¿QUÉ PASARÍA SI...?"
+Malla de ajustes por categoría sobre el flujo financiero del paso 3
+
+Cada eje es una categoría capturada en el paso 3 (p. ej. entretenimiento o
+el crédito automotriz) con una lista de factores sobre su monto actual
+(1.0 = sin cambio, 0.8 = recortar 20 %, 0.0 = liquidar la deuda). La malla
+completa (producto de todos los ejes) se evalúa en una sola llamada
+vectorizada con la misma aritmética en centavos y los mismos umbrales que
+calcular_flujo_financiero(), así que cada celda coincide con volver a
+enviar el formulario con esos montos.
+
+Las mallas se guardan en una caché LRU con clave = hash de las entradas y
+versión de la política de umbrales: mover un slider solo consulta la malla
+ya calculada.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+from modelo_datos import a_centavos
+from serializacion import a_json_bytes
+from umbrales import politica_actual
+
+# Secciones de FlujoFinanciero con montos por categoría, en el orden de los totales
+SECCIONES_CATEGORIAS = ('detalle_gastos_fijos', 'detalle_gastos_variables', 'detalle_deudas')
+
+NOMBRES_SECCION = {
+    'detalle_gastos_fijos': 'Gasto fijo',
+    'detalle_gastos_variables': 'Gasto variable',
+    'detalle_deudas': 'Deuda',
+}
+
+# Recortes ofrecidos en la app: 0 %, 10 %, ..., 100 %
+RECORTES_PREDETERMINADOS = tuple(range(0, 101, 10))
+
+MAX_MALLAS_CACHE = 64
+
+# ================================
+# EVALUACIÓN
+# ================================
+
+def categorias_ajustables(flujo_financiero):
+    """
+    Categorías del flujo con monto mayor a cero.
+
+    Returns:
+    --------
+    list : [(seccion, categoria, monto en pesos), ...]
+    """
+    return [
+        (seccion, categoria, monto)
+        for seccion in SECCIONES_CATEGORIAS
+        for categoria, monto in (flujo_financiero.get(seccion) or {}).items()
+        if monto and monto > 0
+    ]
+
+
+def evaluar_escenarios(flujo_financiero, ejes):
+    """
+    Evalúa la malla de escenarios en una sola llamada vectorizada.
+
+    Parameters:
+    -----------
+    flujo_financiero : dict
+        Resultado de calcular_flujo_financiero() (se usan ingreso y detalles)
+    ejes : list
+        [(seccion, categoria, factores), ...]; una dimensión de la malla por eje
+
+    Returns:
+    --------
+    dict : Arreglos numpy con forma (len(factores) de cada eje):
+           'flujo_libre_centavos', 'ahorro_sugerido_centavos' (int64),
+           'porcentaje_flujo' y 'estado' (código de EstadoFinanciero)
+    """
+    import numpy as np
+    from modulo_financiero import calcular_capacidad_ahorro_lote, calcular_flujo_centavos_lote
+
+    forma = tuple(len(factores) for _, _, factores in ejes)
+    totales = []
+    for seccion in SECCIONES_CATEGORIAS:
+        detalle = flujo_financiero.get(seccion) or {}
+        ajustadas = {categoria for s, categoria, _ in ejes if s == seccion}
+        # Categorías sin eje: monto fijo (mismo redondeo por categoría que el cálculo por cliente)
+        total = np.full(forma, sum(a_centavos(monto) for categoria, monto in detalle.items()
+                                   if categoria not in ajustadas), dtype=np.int64)
+        for eje, (s, categoria, factores) in enumerate(ejes):
+            if s != seccion:
+                continue
+            montos = np.asarray(factores, dtype=np.float64) * (detalle.get(categoria) or 0)
+            dimensiones = [1] * len(forma)
+            dimensiones[eje] = forma[eje]
+            total = total + np.rint(montos * 100).astype(np.int64).reshape(dimensiones)
+        totales.append(total)
+
+    flujo = calcular_flujo_centavos_lote(
+        np.int64(a_centavos(flujo_financiero.get('ingreso_mensual', 0))), *totales
+    )
+    capacidad = calcular_capacidad_ahorro_lote(flujo)
+    return {
+        'flujo_libre_centavos': flujo['flujo_libre_centavos'],
+        'porcentaje_flujo': flujo['porcentaje_flujo'],
+        'estado': flujo['estado'],
+        'ahorro_sugerido_centavos': capacidad['ahorro_sugerido_centavos'],
+    }
+
+# ================================
+# CACHÉ DE MALLAS
+# ================================
+
+class CacheEscenarios:
+    """
+    Caché LRU de mallas de escenarios, con clave = hash de las entradas.
+
+    Las mallas se entregan de solo lectura: varias sesiones pueden compartir
+    la misma sin copiarla.
+    """
+
+    def __init__(self, max_entradas=MAX_MALLAS_CACHE):
+        self.max_entradas = max_entradas
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave, construir):
+        """Devuelve la malla de `clave`, calculándola con `construir()` si no está."""
+        with self._lock:
+            malla = self._entradas.get(clave)
+            if malla is not None:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return malla
+            self.fallos += 1
+
+        malla = construir()
+        for arreglo in malla.values():
+            arreglo.flags.writeable = False
+
+        with self._lock:
+            self._entradas[clave] = malla
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+        return malla
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self.aciertos = 0
+            self.fallos = 0
+
+
+cache_escenarios = CacheEscenarios()
+
+
+def huella_escenarios(flujo_financiero, ejes):
+    """Hash de las entradas de la malla más la versión de la política de umbrales."""
+    entradas = (
+        flujo_financiero.get('ingreso_mensual', 0),
+        [flujo_financiero.get(seccion) or {} for seccion in SECCIONES_CATEGORIAS],
+        [(seccion, categoria, list(factores)) for seccion, categoria, factores in ejes],
+    )
+    return politica_actual().version, hashlib.blake2b(a_json_bytes(entradas), digest_size=16).hexdigest()
+
+
+def malla_escenarios(flujo_financiero, ejes, usar_cache=True):
+    """
+    evaluar_escenarios() con caché por hash de las entradas.
+
+    Example:
+    --------
+    >>> recortes = [1 - r / 100 for r in RECORTES_PREDETERMINADOS]
+    >>> malla = malla_escenarios(flujo, [('detalle_gastos_variables', 'entretenimiento', recortes),
+    ...                                  ('detalle_deudas', 'auto', [1.0, 0.0])])
+    >>> malla['flujo_libre_centavos'][2, 1]   # entretenimiento -20 % y auto liquidado
+    """
+    if not usar_cache:
+        return evaluar_escenarios(flujo_financiero, ejes)
+    clave = huella_escenarios(flujo_financiero, ejes)
+    return cache_escenarios.obtener(clave, lambda: evaluar_escenarios(flujo_financiero, ejes))
@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+"""
+ESTILOS DE LOS REPORTES PDF
+Registro de estilos de párrafo y de tabla construido una sola vez por proceso
+
+Todos los reportes (el resumen 'legacy' de la barra lateral y los conjuntos
+de generar_reporte / generar_pdf_asesoria_mejorado) toman sus estilos de aquí
+en lugar de llamar a getSampleStyleSheet() y de armar TableStyle con HexColor
+en cada reporte.
+
+Los registros son de solo lectura (MappingProxyType) y ReportLab no modifica
+los estilos al construir el documento, así que se comparten sin copia entre
+reportes e hilos. Para una variante crea un ParagraphStyle con parent=.
+"""
+
+from functools import lru_cache
+from types import MappingProxyType
+
+from reportlab.lib import colors as pdf_colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import TableStyle
+
+# Colores corporativos (ajusta según tus necesidades)
+COLORES = MappingProxyType({
+    'azul_principal': '#064c78',
+    'verde_oscuro': '#00796b',
+    'verde_agua': '#00bfa5',
+    'azul_claro': '#90caf9',
+    'amarillo': '#fff59d',
+    'rojo': '#ef5350',
+    'verde': '#66bb6a',
+    'naranja': '#ff9800'
+})
+
+# ================================
+# CONSTRUCCIÓN
+# ================================
+
+def _construir_estilos(hex_color):
+    """Estilos de párrafo: los de ReportLab más los personalizados de Rizkora."""
+    base = getSampleStyleSheet()
+
+    estilos = {nombre: base[nombre] for nombre in ('Normal', 'Heading1', 'Heading2', 'Heading3')}
+
+    estilos['titulo'] = ParagraphStyle(
+        'CustomTitle',
+        parent=base['Heading1'],
+        fontSize=18,
+        textColor=hex_color['azul_principal'],
+        spaceAfter=30,
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold'
+    )
+
+    estilos['subtitulo'] = ParagraphStyle(
+        'CustomSubtitle',
+        parent=base['Heading2'],
+        fontSize=14,
+        textColor=hex_color['verde_oscuro'],
+        spaceAfter=15,
+        fontName='Helvetica-Bold'
+    )
+
+    estilos['subseccion'] = ParagraphStyle(
+        'CustomSubsection',
+        parent=base['Heading3'],
+        fontSize=12,
+        textColor=hex_color['azul_principal'],
+        spaceAfter=10,
+        fontName='Helvetica-Bold'
+    )
+
+    estilos['destacado'] = ParagraphStyle(
+        'Highlight',
+        parent=base['Normal'],
+        fontSize=11,
+        textColor=hex_color['verde_oscuro'],
+        fontName='Helvetica-Bold',
+        spaceAfter=10
+    )
+
+    estilos['estado_titulo'] = ParagraphStyle(
+        'EstadoTitulo',
+        parent=base['Normal'],
+        alignment=TA_CENTER,
+        fontSize=14,
+        textColor=pdf_colors.white,
+        fontName='Helvetica-Bold',
+        spaceAfter=10
+    )
+
+    estilos['estado_mensaje'] = ParagraphStyle(
+        'EstadoMensaje',
+        parent=base['Normal'],
+        alignment=TA_CENTER,
+        fontSize=11,
+        textColor=pdf_colors.white,
+        fontName='Helvetica',
+        leading=14,  # Interlineado
+        wordWrap='CJK'  # Esto permite el word wrap
+    )
+
+    estilos['pie'] = ParagraphStyle(
+        'Footer',
+        parent=base['Normal'],
+        fontSize=8,
+        textColor=pdf_colors.grey,
+        alignment=TA_CENTER
+    )
+
+    return estilos
+
+
+def _tabla_etiquetas_simple(color_etiquetas):
+    """Tabla de dos columnas sin encabezado con la columna de etiquetas coloreada (reporte básico)."""
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), color_etiquetas),
+        ('TEXTCOLOR', (0, 0), (0, -1), pdf_colors.white),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ('TOPPADDING', (0, 0), (-1, -1), 6),
+        ('GRID', (0, 0), (-1, -1), 1, pdf_colors.grey)
+    ])
+
+
+def _tabla_detalle(color_encabezado):
+    """Desglose categoría/monto con fila de TOTAL al final."""
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), color_encabezado),
+        ('TEXTCOLOR', (0, 0), (-1, 0), pdf_colors.white),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('GRID', (0, 0), (-1, -1), 0.5, pdf_colors.grey),
+        ('BACKGROUND', (0, -1), (-1, -1), pdf_colors.lightgrey),
+        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold')
+    ])
+
+
+def _construir_estilos_tabla(hex_color):
+    """TableStyle de todas las tablas fijas de los reportes."""
+    ficha = [
+        ('BACKGROUND', (0, 0), (-1, 0), hex_color['azul_principal']),
+        ('TEXTCOLOR', (0, 0), (-1, 0), pdf_colors.white),
+        ('BACKGROUND', (0, 1), (0, -1), pdf_colors.white),
+        ('TEXTCOLOR', (0, 1), (0, -1), pdf_colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ('TOPPADDING', (0, 0), (-1, -1), 8),
+        ('GRID', (0, 0), (-1, -1), 1, pdf_colors.grey)
+    ]
+
+    concepto_detalle = [
+        ('TEXTCOLOR', (0, 0), (-1, 0), pdf_colors.white),
+        ('BACKGROUND', (0, 1), (0, -1), hex_color['azul_claro']),
+        ('TEXTCOLOR', (0, 1), (0, -1), pdf_colors.white),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('GRID', (0, 0), (-1, -1), 1, pdf_colors.grey)
+    ]
+
+    return {
+        # --- Reporte completo (generar_pdf_mejorado) ---
+        'cliente': TableStyle(ficha + [('VALIGN', (0, 0), (-1, -1), 'MIDDLE')]),
+        'perfil': TableStyle(ficha),
+        'flujo': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), hex_color['azul_principal']),
+            ('TEXTCOLOR', (0, 0), (-1, 0), pdf_colors.white),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+            ('TOPPADDING', (0, 0), (-1, -1), 8),
+            ('GRID', (0, 0), (-1, -1), 1, pdf_colors.grey),
+            ('BACKGROUND', (0, 1), (-1, 1), pdf_colors.lightgrey),
+            ('BACKGROUND', (0, 5), (-1, 5), pdf_colors.lightgrey),
+            ('BACKGROUND', (0, 6), (-1, 6), hex_color['azul_claro']),
+            ('FONTNAME', (0, 6), (-1, 6), 'Helvetica-Bold'),
+            ('TEXTCOLOR', (0, 6), (-1, 6), pdf_colors.black),
+            ('ROWBACKGROUNDS', (0, 2), (-1, 4), [pdf_colors.white, pdf_colors.lightgrey])
+        ]),
+        'detalle_gastos': _tabla_detalle(hex_color['azul_principal']),
+        'detalle_deudas': _tabla_detalle(hex_color['rojo']),
+        'capacidad': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), hex_color['verde_oscuro']),
+            ('TEXTCOLOR', (0, 0), (-1, 0), pdf_colors.white),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('GRID', (0, 0), (-1, -1), 0.5, pdf_colors.grey),
+            ('BACKGROUND', (0, 2), (-1, 2), hex_color['amarillo']),
+            ('FONTNAME', (0, 2), (-1, 2), 'Helvetica-Bold'),
+            ('BACKGROUND', (0, 4), (-1, 4), pdf_colors.white),
+            ('GRID', (0, 4), (-1, 4), 0, pdf_colors.white),
+            ('BACKGROUND', (0, 5), (-1, 6), pdf_colors.lightgrey)
+        ]),
+        'proteccion': TableStyle(
+            [('BACKGROUND', (0, 0), (-1, 0), hex_color['azul_principal'])] + concepto_detalle + [
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+                ('TOPPADDING', (0, 0), (-1, -1), 8)
+            ]
+        ),
+        'retiro': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), hex_color['verde_oscuro']),
+            ('TEXTCOLOR', (0, 0), (-1, 0), pdf_colors.white),
+            ('BACKGROUND', (0, 1), (0, -1), hex_color['azul_claro']),
+            ('TEXTCOLOR', (0, 1), (0, -1), pdf_colors.white),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
+            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+            ('BACKGROUND', (0, -1), (-1, -1), hex_color['amarillo']),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('GRID', (0, 0), (-1, -1), 1, pdf_colors.grey),
+            ('ALIGN', (1, 0), (1, -1), 'RIGHT')
+        ]),
+        'educacion_hijo': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), hex_color['verde_agua']),
+            ('TEXTCOLOR', (0, 0), (-1, 0), pdf_colors.white),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('GRID', (0, 0), (-1, -1), 0.5, pdf_colors.grey),
+            ('ALIGN', (1, 0), (1, -1), 'RIGHT')
+        ]),
+        'educacion_total': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -1), hex_color['amarillo']),
+            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('GRID', (0, 0), (-1, -1), 1, pdf_colors.grey),
+            ('ALIGN', (1, 0), (1, -1), 'RIGHT')
+        ]),
+        'proyecto': TableStyle(
+            [('BACKGROUND', (0, 0), (-1, 0), hex_color['verde_oscuro'])] + concepto_detalle
+        ),
+
+        # --- Reporte básico (conjunto 'legacy' de generar_reporte) ---
+        'basico_cliente': _tabla_etiquetas_simple(hex_color['azul_claro']),
+        'basico_perfil': _tabla_etiquetas_simple(hex_color['verde_agua']),
+        'basico_finanzas': _tabla_etiquetas_simple(hex_color['azul_principal']),
+        'basico_necesidades': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), hex_color['verde_oscuro']),
+            ('TEXTCOLOR', (0, 0), (-1, 0), pdf_colors.white),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+            ('TOPPADDING', (0, 0), (-1, -1), 8),
+            ('GRID', (0, 0), (-1, -1), 1, pdf_colors.grey),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [pdf_colors.white, pdf_colors.lightgrey])
+        ]),
+    }
+
+
+def construir_registro():
+    """
+    Construye los registros de estilos desde cero.
+
+    Es lo que antes pagaba cada reporte; se llama una sola vez al importar el
+    módulo (benchmarks.py también la usa para medir el ahorro).
+
+    Returns:
+    --------
+    tuple : (estilos de párrafo, estilos de tabla), ambos de solo lectura
+    """
+    hex_color = {nombre: pdf_colors.HexColor(valor) for nombre, valor in COLORES.items()}
+    return (
+        MappingProxyType(_construir_estilos(hex_color)),
+        MappingProxyType(_construir_estilos_tabla(hex_color))
+    )
+
+
+ESTILOS, ESTILOS_TABLA = construir_registro()
+
+# ================================
+# ESTILOS DEPENDIENTES DE LOS DATOS
+# ================================
+
+@lru_cache(maxsize=32)
+def estilo_tabla_estado(color_estado):
+    """
+    Recuadro del estado financiero, coloreado según el semáforo.
+
+    Solo hay un color por EstadoFinanciero, así que la caché se queda pequeña.
+    """
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, -1), pdf_colors.HexColor(color_estado)),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+        ('TOPPADDING', (0, 0), (-1, -1), 12),
+        ('LEFTPADDING', (0, 0), (-1, -1), 15),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 15),
+        ('BOX', (0, 0), (-1, -1), 1, pdf_colors.white)
+    ])
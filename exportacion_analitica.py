@@ -0,0 +1,370 @@
+# -*- coding: utf-8 -*-
+"""
+EXPORTACIÓN ANALÍTICA DE ASESORÍAS
+Aplana asesorías en columnas tipadas y las escribe como Parquet particionado
+
+El resultado se organiza por mes y agente (particionado estilo Hive:
+mes=2026-02/agente=Mar%C3%ADa%20Gonz%C3%A1lez/parte-00000.parquet) para que
+los analistas puedan filtrar con predicate pushdown, por ejemplo:
+
+    import pyarrow.dataset as ds
+    tabla = ds.dataset('salida/', partitioning='hive').to_table(
+        filter=(ds.field('mes') == '2026-02') & (ds.field('flujo_libre') < 0)
+    )
+
+Requiere pyarrow (opcional para el resto de la aplicación).
+"""
+
+import os
+from urllib.parse import quote
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow es opcional
+    pa = None
+    pq = None
+
+from modelo_datos import restaurar_registros
+from modulo_financiero import detectar_necesidades_financieras
+from reglas_recomendaciones import evaluar_recomendaciones
+from serializacion import leer_fecha
+
+# Filas acumuladas por partición antes de escribir un row group
+FILAS_POR_GRUPO = 50_000
+
+# Filas pendientes en memoria sumando todas las particiones. Con muchas
+# particiones pequeñas (mes × agente) casi ninguna llega a FILAS_POR_GRUPO;
+# al rebasar este total se vuelcan las particiones con más filas pendientes
+MAX_FILAS_PENDIENTES = 100_000
+
+# ================================
+# ESQUEMA DE COLUMNAS
+# ================================
+
+# (columna, tipo) — los tipos se resuelven contra pyarrow al crear el esquema
+COLUMNAS = [
+    # Datos generales
+    ('fecha_asesoria', 'date32'),
+    ('agente', 'string'),
+    ('cliente', 'string'),
+    ('edad', 'int16'),
+    ('ocupacion', 'string'),
+    ('estado_civil', 'dictionary'),
+    ('fumador', 'bool'),
+    ('tipo_cita', 'dictionary'),
+
+    # Perfil familiar
+    ('tiene_pareja', 'bool'),
+    ('tiene_hijos', 'bool'),
+    ('num_hijos', 'int8'),
+    ('num_dependientes', 'int8'),
+
+    # Ingresos
+    ('ingreso_mensual', 'float64'),
+    ('ingreso_anual', 'float64'),
+    ('inversion_mensual', 'float64'),
+
+    # Flujo financiero
+    ('gastos_fijos', 'float64'),
+    ('gastos_variables', 'float64'),
+    ('deudas', 'float64'),
+    ('gastos_totales', 'float64'),
+    ('flujo_libre', 'float64'),
+    ('porcentaje_flujo', 'float32'),
+    ('porcentaje_gastos_fijos', 'float32'),
+    ('porcentaje_gastos_variables', 'float32'),
+    ('porcentaje_deudas', 'float32'),
+    ('estado_financiero', 'dictionary'),
+
+    # Capacidad de ahorro
+    ('ahorro_posible', 'bool'),
+    ('rango_min', 'float64'),
+    ('rango_max', 'float64'),
+    ('ahorro_sugerido', 'float64'),
+    ('ahorro_minimo', 'float64'),
+    ('ahorro_optimo', 'float64'),
+    ('nivel_inversion', 'dictionary'),
+
+    # Necesidades
+    ('necesidad_principal', 'dictionary'),
+    ('monto_proteccion', 'float64'),
+    ('monto_retiro', 'float64'),
+    ('monto_educacion', 'float64'),
+    ('monto_ahorro', 'float64'),
+
+    # Códigos de recomendación (reglas_recomendaciones.Recomendacion)
+    ('recomendaciones', 'list_int8'),
+]
+
+
+def _tipo_arrow(tipo):
+    if tipo == 'dictionary':
+        return pa.dictionary(pa.int8(), pa.string())
+    if tipo == 'list_int8':
+        return pa.list_(pa.int8())
+    return pa.type_for_alias(tipo)
+
+
+def crear_esquema():
+    """Construye el esquema Arrow de la exportación (sin columnas de partición)."""
+    _verificar_pyarrow()
+    return pa.schema([(nombre, _tipo_arrow(tipo)) for nombre, tipo in COLUMNAS])
+
+
+def _verificar_pyarrow():
+    if pa is None:
+        raise ImportError("La exportación a Parquet requiere pyarrow: pip install pyarrow")
+
+# ================================
+# APLANADO DE ASESORÍAS
+# ================================
+
+def _si_no(valor):
+    if valor in (None, ''):
+        return None
+    return valor == 'Sí' if isinstance(valor, str) else bool(valor)
+
+
+def _numero(valor):
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def aplanar_asesoria(asesoria):
+    """
+    Convierte una asesoría en una fila plana de columnas tipadas.
+
+    Parameters:
+    -----------
+    asesoria : dict
+        st.session_state.datos o el contenido de una exportación JSON
+        (con las claves 'datos_completos' y 'necesidades_detectadas')
+
+    Returns:
+    --------
+    dict : Fila con las columnas definidas en COLUMNAS
+    """
+    datos = restaurar_registros(asesoria.get('datos_completos', asesoria))
+    necesidades = asesoria.get('necesidades_detectadas') or detectar_necesidades_financieras(datos)
+
+    datos_gen = datos.get('datos_generales', {})
+    perfil = datos.get('perfil_familiar', {})
+    ingresos = datos.get('ingresos', {})
+    flujo = datos.get('flujo_financiero', {})
+    capacidad = datos.get('capacidad_ahorro', {})
+    montos = necesidades.get('montos', {})
+
+    edad = datos_gen.get('edad')
+
+    recomendaciones = asesoria.get('recomendaciones')
+    if recomendaciones is None:
+        recomendaciones = [int(codigo) for codigo in evaluar_recomendaciones(flujo, capacidad)] if flujo else []
+
+    return {
+        'fecha_asesoria': leer_fecha(datos_gen.get('fecha_asesoria')),
+        'agente': datos_gen.get('nombre_agente') or None,
+        'cliente': datos_gen.get('nombre') or None,
+        'edad': int(edad) if isinstance(edad, (int, float)) else None,
+        'ocupacion': datos_gen.get('ocupacion') or None,
+        'estado_civil': datos_gen.get('estado_civil') or None,
+        'fumador': _si_no(datos_gen.get('fumador')),
+        'tipo_cita': datos_gen.get('tipo_cita') or None,
+
+        'tiene_pareja': _si_no(perfil.get('tiene_pareja')),
+        'tiene_hijos': _si_no(perfil.get('tiene_hijos')),
+        'num_hijos': perfil.get('num_hijos', 0),
+        'num_dependientes': perfil.get('num_dependientes', 0),
+
+        'ingreso_mensual': _numero(ingresos.get('ingreso_mensual')),
+        'ingreso_anual': _numero(ingresos.get('ingreso_anual')),
+        'inversion_mensual': _numero(ingresos.get('inversion_mensual')),
+
+        'gastos_fijos': _numero(flujo.get('gastos_fijos')),
+        'gastos_variables': _numero(flujo.get('gastos_variables')),
+        'deudas': _numero(flujo.get('deudas')),
+        'gastos_totales': _numero(flujo.get('gastos_totales')),
+        'flujo_libre': _numero(flujo.get('flujo_libre')),
+        'porcentaje_flujo': _numero(flujo.get('porcentaje_flujo')),
+        'porcentaje_gastos_fijos': _numero(flujo.get('porcentaje_gastos_fijos')),
+        'porcentaje_gastos_variables': _numero(flujo.get('porcentaje_gastos_variables')),
+        'porcentaje_deudas': _numero(flujo.get('porcentaje_deudas')),
+        'estado_financiero': flujo.get('estado_financiero'),
+
+        'ahorro_posible': capacidad.get('ahorro_posible') if capacidad else None,
+        'rango_min': _numero(capacidad.get('rango_min')),
+        'rango_max': _numero(capacidad.get('rango_max')),
+        'ahorro_sugerido': _numero(capacidad.get('ahorro_sugerido')),
+        'ahorro_minimo': _numero(capacidad.get('ahorro_minimo')),
+        'ahorro_optimo': _numero(capacidad.get('ahorro_optimo')),
+        'nivel_inversion': capacidad.get('nivel_inversion'),
+
+        'necesidad_principal': necesidades.get('principal'),
+        'monto_proteccion': _numero(montos.get('proteccion')),
+        'monto_retiro': _numero(montos.get('retiro')),
+        'monto_educacion': _numero(montos.get('educacion')),
+        'monto_ahorro': _numero(montos.get('ahorro')),
+
+        'recomendaciones': recomendaciones,
+    }
+
+# ================================
+# ESCRITURA PARQUET PARTICIONADA
+# ================================
+
+def _clave_particion(fila):
+    fecha = fila['fecha_asesoria']
+    mes = fecha.strftime("%Y-%m") if fecha else 'sin_fecha'
+    agente = fila['agente'] or 'sin_agente'
+    return mes, agente
+
+
+class _ParticionParquet:
+    """
+    Acumula filas de una partición y las vuelca como row groups.
+
+    Los volcados normales agregan row groups al archivo abierto; un volcado
+    por presupuesto de memoria (cerrar_archivo=True) cierra el archivo, y el
+    siguiente volcado de la partición abre otra parte (parte-00001...), así
+    que no queda un descriptor abierto por cada partición pequeña.
+    """
+
+    def __init__(self, directorio, esquema):
+        self.directorio = directorio
+        self.esquema = esquema
+        self.escritor = None
+        self.partes = 0
+        self.columnas = {nombre: [] for nombre in esquema.names}
+        self.pendientes = 0
+        self.filas_escritas = 0
+
+    def agregar(self, fila):
+        for nombre, valores in self.columnas.items():
+            valores.append(fila[nombre])
+        self.pendientes += 1
+
+    def volcar(self, cerrar_archivo=False):
+        if self.pendientes:
+            if self.escritor is None:
+                os.makedirs(self.directorio, exist_ok=True)
+                ruta = os.path.join(self.directorio, f"parte-{self.partes:05d}.parquet")
+                self.escritor = pq.ParquetWriter(ruta, self.esquema, compression='zstd')
+                self.partes += 1
+            lote = pa.RecordBatch.from_pydict(self.columnas, schema=self.esquema)
+            self.escritor.write_batch(lote, row_group_size=self.pendientes)
+            self.filas_escritas += self.pendientes
+            for valores in self.columnas.values():
+                valores.clear()
+            self.pendientes = 0
+        if cerrar_archivo and self.escritor is not None:
+            self.escritor.close()
+            self.escritor = None
+
+    def cerrar(self):
+        self.volcar(cerrar_archivo=True)
+
+
+def _volcar_mayores(particiones, pendientes, objetivo):
+    """Vuelca las particiones con más filas pendientes hasta bajar a `objetivo`; devuelve las que quedan."""
+    for particion in sorted(particiones, key=lambda p: p.pendientes, reverse=True):
+        if pendientes <= objetivo or not particion.pendientes:
+            break
+        pendientes -= particion.pendientes
+        particion.volcar(cerrar_archivo=True)
+    return pendientes
+
+
+def exportar_parquet_particionado(asesorias, directorio, filas_por_grupo=FILAS_POR_GRUPO,
+                                  max_filas_pendientes=MAX_FILAS_PENDIENTES):
+    """
+    Escribe asesorías como un dataset Parquet particionado por mes y agente.
+
+    Las asesorías se consumen de forma perezosa. Cada partición escribe un
+    row group al juntar `filas_por_grupo` filas; además, si las filas
+    pendientes de todas las particiones llegan a `max_filas_pendientes`,
+    se vuelcan las particiones más grandes hasta bajar a la mitad. Así la
+    memoria queda acotada aunque haya muchas particiones pequeñas.
+
+    Parameters:
+    -----------
+    asesorias : iterable de dict
+        Asesorías completas (st.session_state.datos o exportaciones JSON)
+    directorio : str
+        Directorio raíz del dataset
+    filas_por_grupo : int
+        Filas por row group dentro de cada archivo
+    max_filas_pendientes : int
+        Filas en memoria, entre todas las particiones, antes de volcar
+
+    Returns:
+    --------
+    dict : Resumen con filas totales, filas por partición y el máximo de
+           filas que llegaron a estar pendientes en memoria
+
+    Example:
+    --------
+    >>> resumen = exportar_parquet_particionado(leer_asesorias(), 'salida/')
+    >>> print(resumen['filas'])
+    """
+    _verificar_pyarrow()
+    esquema = crear_esquema()
+    particiones = {}
+    pendientes = 0
+    pico_pendientes = 0
+
+    try:
+        for asesoria in asesorias:
+            fila = aplanar_asesoria(asesoria)
+            mes, agente = _clave_particion(fila)
+
+            particion = particiones.get((mes, agente))
+            if particion is None:
+                ruta = os.path.join(directorio, f"mes={mes}", f"agente={quote(agente, safe='')}")
+                particion = particiones[(mes, agente)] = _ParticionParquet(ruta, esquema)
+
+            particion.agregar(fila)
+            pendientes += 1
+            pico_pendientes = max(pico_pendientes, pendientes)
+            if particion.pendientes >= filas_por_grupo:
+                pendientes -= particion.pendientes
+                particion.volcar()
+            elif pendientes >= max_filas_pendientes:
+                pendientes = _volcar_mayores(particiones.values(), pendientes, max_filas_pendientes // 2)
+    finally:
+        for particion in particiones.values():
+            particion.cerrar()
+
+    por_particion = {f"{mes}/{agente}": p.filas_escritas for (mes, agente), p in particiones.items()}
+    return {
+        'filas': sum(por_particion.values()),
+        'particiones': por_particion,
+        'pico_pendientes': pico_pendientes
+    }
+
+
+# ================================
+# EJEMPLO DE USO
+# ================================
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    # Uso: python exportacion_analitica.py [destino] [asesorias.jsonl | cantidad_sinteticas]
+    destino = sys.argv[1] if len(sys.argv) > 1 else 'exportacion_parquet'
+    origen = sys.argv[2] if len(sys.argv) > 2 else '10000'
+
+    if origen.isdigit():
+        from datos_sinteticos import generar_asesorias_sinteticas
+        asesorias = generar_asesorias_sinteticas(int(origen))
+    else:
+        from serializacion import leer_jsonl
+        asesorias = leer_jsonl(origen)
+
+    inicio = time.perf_counter()
+    resumen = exportar_parquet_particionado(asesorias, destino)
+    duracion = time.perf_counter() - inicio
+
+    print(f"✅ {resumen['filas']} asesorías exportadas en {len(resumen['particiones'])} particiones ({duracion:.2f}s)")
@@ -1,34 +1,35 @@
 # -*- coding: utf-8 -*-
 """
-FUNCIÓN MEJORADA DE GENERACIÓN DE PDF
+MOTOR DE REPORTES PDF
 Incluye análisis de flujo financiero en el reporte
 
-Integración: Reemplaza la función generar_pdf_asesoria() en tu código principal
+Un solo motor para todos los reportes de la app: cada reporte es un conjunto
+de secciones (CONJUNTOS_SECCIONES) construidas por SECCIONES, con estilos de
+estilos_pdf y caché por sección.
+
+    generar_reporte(datos, 'completo')  → reporte final (paso 9)
+    generar_reporte(datos, 'parcial')   → análisis financiero (paso 3)
+    generar_reporte(datos, 'legacy')    → resumen de necesidades (barra lateral)
 """
 
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 from io import BytesIO
 from datetime import datetime
 from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, PageBreak, Image
 from reportlab.lib.units import inch
-from reportlab.lib import colors as pdf_colors
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use('Agg')
-
-# Colores corporativos (ajusta según tus necesidades)
-COLORES = {
-    'azul_principal': '#064c78',
-    'verde_oscuro': '#00796b',
-    'verde_agua': '#00bfa5',
-    'azul_claro': '#90caf9',
-    'amarillo': '#fff59d',
-    'rojo': '#ef5350',
-    'verde': '#66bb6a',
-    'naranja': '#ff9800'
-}
+from reportlab import rl_config
+
+# Colores corporativos y estilos compartidos (construidos una vez por proceso)
+from estilos_pdf import COLORES, ESTILOS, ESTILOS_TABLA, estilo_tabla_estado
+from graficos import generar_grafico_flujo_financiero, generar_grafico_necesidades
+from serializacion import a_json_bytes
+from modulo_financiero import detectar_necesidades_financieras
+from umbrales import politica_actual
 
 def formatear_moneda(monto):
     """Formatea número como moneda"""
@@ -37,106 +38,940 @@ def formatear_moneda(monto):
     except:
         return "$0.00"
 
-def generar_grafico_flujo_financiero(flujo_financiero):
+# ====================================================================
+# PERFILES DE SALIDA
+# ====================================================================
+
+# Cada perfil fija la compresión de los streams de página, la codificación
+# ASCII85 de los streams binarios y cómo se rasterizan los gráficos de flujo y
+# de necesidades (lo que más pesa en el PDF: el texto ronda 10 KB). Las fuentes
+# son las 14 estándar de PDF (Helvetica), que nunca se incrustan, así que no
+# hay subconjunto de fuentes que optimizar en ningún perfil.
+# ASCII85 (heredada de transportes de 7 bits) agrega ~25% a cada imagen.
+# Resolución efectiva en la página = dpi × 1.67 (figura de 10" dibujada a 6").
+PERFILES_SALIDA = {
+    # Lectura en pantalla y envío por correo: la misma resolución de siempre
+    'pantalla': {'compresion': True, 'ascii85': False, 'grafico': {'formato': 'png', 'dpi': 150}},
+    # Impresión (~300 dpi efectivos); el tamaño no importa y se ahorra el
+    # deflate de las páginas (las imágenes PNG van comprimidas de todos modos)
+    'impresion': {'compresion': False, 'ascii85': False, 'grafico': {'formato': 'png', 'dpi': 180}},
+    # Archivo masivo (libros, respaldos): lo más liviano que sigue siendo legible (~120 dpi)
+    'archivo': {'compresion': True, 'ascii85': False, 'grafico': {'formato': 'png', 'dpi': 72}},
+}
+
+PERFIL_PREDETERMINADO = 'pantalla'
+
+# Secciones que rasterizan gráficos: reciben las opciones 'grafico' del perfil
+# como última entrada (así forman parte del hash de la caché)
+SECCIONES_CON_GRAFICO = frozenset({'flujo'})
+
+
+# ReportLab lee rl_config.useA85 (global del proceso) al escribir el documento;
+# cada construcción lo fija según su perfil con este lock tomado
+_lock_codificacion = threading.RLock()
+
+
+def _perfil(nombre):
+    if nombre not in PERFILES_SALIDA:
+        raise ValueError(f"Perfil de salida desconocido: {nombre}")
+    return PERFILES_SALIDA[nombre]
+
+
+def opciones_documento(perfil):
+    """Argumentos de compresión del perfil para SimpleDocTemplate/BaseDocTemplate."""
+    return {'pageCompression': int(_perfil(perfil)['compresion'])}
+
+
+@contextmanager
+def codificacion_perfil(perfil):
     """
-    Genera un gráfico visual del flujo financiero
+    Aplica la codificación ASCII85 del perfil mientras se construye un documento.
+
+    Envuelve doc.build() o doc.multiBuild(); restaura el valor anterior al salir.
     """
+    usar_a85 = int(_perfil(perfil)['ascii85'])
+    with _lock_codificacion:
+        anterior = rl_config.useA85
+        rl_config.useA85 = usar_a85
+        try:
+            yield
+        finally:
+            rl_config.useA85 = anterior
+
+# ====================================================================
+# SECCIONES DEL REPORTE
+# ====================================================================
+
+def _seccion_portada(datos_gen, flujo):
+    """Portada: cliente, agente, fecha y estado financiero."""
+    story = []
+    
+    story.append(Spacer(1, 1*inch))
+    story.append(Paragraph("REPORTE DE ASESORÍA FINANCIERA INTEGRAL", ESTILOS['titulo']))
+    story.append(Spacer(1, 0.3*inch))
+    story.append(Paragraph("Rizkora - Análisis Completo de Finanzas Personales", ESTILOS['Normal']))
+    story.append(Spacer(1, 0.5*inch))
+
+    portada_info = f"""
+    <para alignment="center">
+    <b>Cliente:</b> {datos_gen.get('nombre', 'N/A')}<br/>
+    <b>Agente:</b> {datos_gen.get('nombre_agente', 'N/A')}<br/>
+    <b>Fecha:</b> {datos_gen.get('fecha_asesoria', 'N/A')}<br/>
+    <br/>
+    <font size="12" color="{flujo.get('color_estado', '#000000')}">
+    <b>{flujo.get('semaforo', '')} Estado Financiero: {flujo.get('estado_financiero', 'N/A').upper()}</b>
+    </font>
+    </para>
+    """
+    story.append(Paragraph(portada_info, ESTILOS['Normal']))
+
+    story.append(PageBreak())
+    
+    return story
+
+def _seccion_cliente(datos_gen, perfil):
+    """Sección 1: información del cliente y perfil familiar."""
+    story = []
+    
+    story.append(Paragraph("1. INFORMACIÓN DEL CLIENTE", ESTILOS['subtitulo']))
+
+    cliente_data = [
+        ["Campo", "Información"],
+        ["Nombre Completo", datos_gen.get('nombre', 'N/A')],
+        ["Edad", f"{datos_gen.get('edad', 'N/A')} años"],
+        ["Estado Civil", datos_gen.get('estado_civil', 'N/A')],
+        ["Ocupación", datos_gen.get('ocupacion', 'N/A')],
+        ["Teléfono", datos_gen.get('telefono', 'N/A')],
+        ["Correo Electrónico", datos_gen.get('correo', 'N/A')],
+        ["Fumador", datos_gen.get('fumador', 'N/A')],
+        ["Tipo de Cita", datos_gen.get('tipo_cita', 'N/A')],
+        ["Agente Asesor", datos_gen.get('nombre_agente', 'N/A')],
+        ["Fecha de Asesoría", str(datos_gen.get('fecha_asesoria', 'N/A'))]
+    ]
+
+    cliente_table = Table(cliente_data, colWidths=[2.5*inch, 3.5*inch])
+    cliente_table.setStyle(ESTILOS_TABLA['cliente'])
+
+    story.append(cliente_table)
+    story.append(Spacer(1, 0.3*inch))
+
+    # Perfil Familiar
+    story.append(Paragraph("Perfil Familiar", ESTILOS['subseccion']))
+    perfil_info = [
+        ["Característica", "Detalle"],
+        ["Tiene Pareja", perfil.get('tiene_pareja', 'No')],
+        ["Nombre de Pareja", perfil.get('nombre_pareja', 'N/A') if perfil.get('tiene_pareja') == 'Sí' else 'N/A'],
+        ["Tiene Hijos", perfil.get('tiene_hijos', 'No')],
+        ["Número de Hijos", str(perfil.get('num_hijos', 0))],
+        ["Tiene Otros Dependientes", perfil.get('tiene_dependientes', 'No')],
+        ["Número de Dependientes", str(perfil.get('num_dependientes', 0))]
+    ]
+
+    perfil_table = Table(perfil_info, colWidths=[2.5*inch, 3.5*inch])
+    perfil_table.setStyle(ESTILOS_TABLA['perfil'])
+
+    story.append(perfil_table)
+
+    story.append(PageBreak())
+    
+    return story
+
+def _seccion_flujo(flujo, grafico=None):
+    """Sección 2: análisis de flujo financiero (incluye el gráfico con las opciones `grafico` del perfil)."""
+    story = []
+    
+    story.append(Paragraph("2. ANÁLISIS DE FLUJO FINANCIERO", ESTILOS['subtitulo']))
+
+    if flujo:
+        # Estado Financiero en recuadro destacado
+        estado = flujo.get('estado_financiero', 'N/A').upper()
+        semaforo = flujo.get('semaforo', '')
+        mensaje_estado = flujo.get('mensaje_estado', '')
+
+        # Crear el contenido del recuadro
+        estado_text = f"<b>{semaforo} ESTADO FINANCIERO: {estado}</b>"
+        mensaje_text = mensaje_estado
+
+        # Crear una tabla con dos filas (título y mensaje)
+        estado_celda = Paragraph(estado_text, ESTILOS['estado_titulo'])
+        mensaje_celda = Paragraph(mensaje_text, ESTILOS['estado_mensaje'])
+
+        # Crear tabla con las dos celdas
+        estado_table = Table([[estado_celda], [mensaje_celda]], colWidths=[6*inch])
+        estado_table.setStyle(estilo_tabla_estado(flujo.get('color_estado', '#CCCCCC')))
+
+        story.append(estado_table)
+        story.append(Spacer(1, 0.2*inch))
+
+        # Tabla de Flujo Financiero
+        story.append(Paragraph("2.1 Resumen del Flujo Mensual", ESTILOS['subseccion']))
+
+        flujo_data = [
+            ["Concepto", "Monto", "% del Ingreso"],
+            ["Ingreso Mensual Neto", formatear_moneda(flujo.get('ingreso_mensual', 0)), "100.0%"],
+            ["Gastos Fijos", formatear_moneda(flujo.get('gastos_fijos', 0)), 
+             f"{flujo.get('porcentaje_gastos_fijos', 0):.1f}%"],
+            ["Gastos Variables", formatear_moneda(flujo.get('gastos_variables', 0)), 
+             f"{flujo.get('porcentaje_gastos_variables', 0):.1f}%"],
+            ["Pagos de Deudas", formatear_moneda(flujo.get('deudas', 0)), 
+             f"{flujo.get('porcentaje_deudas', 0):.1f}%"],
+            ["Total de Gastos", formatear_moneda(flujo.get('gastos_totales', 0)),
+             f"{flujo.get('porcentaje_gastos_fijos', 0) + flujo.get('porcentaje_gastos_variables', 0) + flujo.get('porcentaje_deudas', 0):.1f}%"],
+            ["FLUJO LIBRE", formatear_moneda(flujo.get('flujo_libre', 0)), 
+             f"{flujo.get('porcentaje_flujo', 0):.1f}%"]
+        ]
+
+        flujo_table = Table(flujo_data, colWidths=[2.5*inch, 2*inch, 1.5*inch])
+        flujo_table.setStyle(ESTILOS_TABLA['flujo'])
+
+        story.append(flujo_table)
+        story.append(Spacer(1, 0.3*inch))
+
+        # Desglose Detallado de Gastos
+        story.append(Paragraph("2.2 Desglose Detallado de Gastos", ESTILOS['subseccion']))
+
+        # Gastos Fijos
+        detalle_gastos_fijos = flujo.get('detalle_gastos_fijos', {})
+        if detalle_gastos_fijos and any(detalle_gastos_fijos.values()):
+            story.append(Paragraph("<b>Gastos Fijos:</b>", ESTILOS['destacado']))
+
+            gastos_fijos_data = [["Categoría", "Monto Mensual"]]
+            for categoria, monto in detalle_gastos_fijos.items():
+                if monto > 0:
+                    gastos_fijos_data.append([categoria.capitalize(), formatear_moneda(monto)])
+            gastos_fijos_data.append(["TOTAL", formatear_moneda(flujo.get('gastos_fijos', 0))])
+
+            gastos_fijos_table = Table(gastos_fijos_data, colWidths=[3*inch, 2*inch])
+            gastos_fijos_table.setStyle(ESTILOS_TABLA['detalle_gastos'])
+
+            story.append(gastos_fijos_table)
+            story.append(Spacer(1, 0.2*inch))
+
+        # Gastos Variables
+        detalle_gastos_variables = flujo.get('detalle_gastos_variables', {})
+        if detalle_gastos_variables and any(detalle_gastos_variables.values()):
+            story.append(Paragraph("<b>Gastos Variables:</b>", ESTILOS['destacado']))
+
+            gastos_var_data = [["Categoría", "Monto Mensual"]]
+            for categoria, monto in detalle_gastos_variables.items():
+                if monto > 0:
+                    gastos_var_data.append([categoria.capitalize(), formatear_moneda(monto)])
+            gastos_var_data.append(["TOTAL", formatear_moneda(flujo.get('gastos_variables', 0))])
+
+            gastos_var_table = Table(gastos_var_data, colWidths=[3*inch, 2*inch])
+            gastos_var_table.setStyle(ESTILOS_TABLA['detalle_gastos'])
+
+            story.append(gastos_var_table)
+            story.append(Spacer(1, 0.2*inch))
+
+        # Deudas
+        detalle_deudas = flujo.get('detalle_deudas', {})
+        if detalle_deudas and any(detalle_deudas.values()):
+            story.append(Paragraph("<b>Pagos de Deudas:</b>", ESTILOS['destacado']))
+
+            deudas_data = [["Tipo de Deuda", "Pago Mensual"]]
+            for categoria, monto in detalle_deudas.items():
+                if monto > 0:
+                    deudas_data.append([categoria.capitalize(), formatear_moneda(monto)])
+            deudas_data.append(["TOTAL", formatear_moneda(flujo.get('deudas', 0))])
+
+            deudas_table = Table(deudas_data, colWidths=[3*inch, 2*inch])
+            deudas_table.setStyle(ESTILOS_TABLA['detalle_deudas'])
+
+            story.append(deudas_table)
+            story.append(Spacer(1, 0.2*inch))
+
+        # Gráficos de Flujo Financiero
+        story.append(Paragraph("2.3 Visualización del Flujo Financiero", ESTILOS['subseccion']))
+
+        grafico_buffer = generar_grafico_flujo_financiero(flujo, **(grafico or {}))
+        if grafico_buffer:
+            img = Image(grafico_buffer, width=6*inch, height=2.4*inch)
+            story.append(img)
+            story.append(Spacer(1, 0.2*inch))
+
+        # Indicadores de Salud Financiera
+        story.append(Paragraph("2.4 Indicadores de Salud Financiera", ESTILOS['subseccion']))
+
+        # Tramos según umbrales.json (mismas escalas que el motor financiero)
+        politica = politica_actual()
+        pct_flujo = flujo.get('porcentaje_flujo', 0)
+        pct_deudas = flujo.get('porcentaje_deudas', 0)
+        pct_gastos_fijos = flujo.get('porcentaje_gastos_fijos', 0)
+
+        indicadores = [
+            # Indicador de flujo libre
+            (
+                "🚨 <b>Flujo NEGATIVO</b>: " + f"{pct_flujo:.1f}% - URGENTE: Gastos superan ingresos",
+                "🚨 <b>Flujo Libre CRÍTICO</b>: " + f"{pct_flujo:.1f}% - Acción urgente requerida",
+                "⚠️ <b>Flujo Libre AJUSTADO</b>: " + f"{pct_flujo:.1f}% - Margen limitado, requiere atención",
+                "✅ <b>Flujo Libre SALUDABLE</b>: " + f"{pct_flujo:.1f}% - Buena posición financiera",
+                "✅ <b>Flujo Libre EXCELENTE</b>: " + f"{pct_flujo:.1f}% - Posición financiera óptima",
+            )[politica['estado_flujo'].tramo(pct_flujo)],
+            # Indicador de deudas
+            (
+                "✅ <b>Sin Deudas</b>: Excelente posición",
+                "✅ <b>Deudas Bajo Control</b>: " + f"{pct_deudas:.1f}% del ingreso",
+                "⚠️ <b>Deudas Moderadas</b>: " + f"{pct_deudas:.1f}% del ingreso - Mantén control",
+                "🚨 <b>Deudas Altas</b>: " + f"{pct_deudas:.1f}% del ingreso - Requiere plan de reducción",
+            )[politica['indicador_deudas'].tramo(pct_deudas)],
+            # Indicador de gastos fijos
+            (
+                "✅ <b>Gastos Fijos Adecuados</b>: " + f"{pct_gastos_fijos:.1f}% del ingreso",
+                "⚠️ <b>Gastos Fijos Elevados</b>: " + f"{pct_gastos_fijos:.1f}% del ingreso",
+                "🚨 <b>Gastos Fijos Muy Elevados</b>: " + f"{pct_gastos_fijos:.1f}% - Busca reducirlos",
+            )[politica['indicador_gastos_fijos'].tramo(pct_gastos_fijos)],
+        ]
+
+        for indicador in indicadores:
+            story.append(Paragraph(f"• {indicador}", ESTILOS['Normal']))
+            story.append(Spacer(1, 5))
+
+    story.append(PageBreak())
+    
+    return story
+
+def _seccion_capacidad(capacidad, inversion_mensual):
+    """Sección 3: capacidad de ahorro e inversión."""
+    story = []
+    
+    story.append(Paragraph("3. CAPACIDAD DE AHORRO E INVERSIÓN", ESTILOS['subtitulo']))
+
+    if capacidad:
+        if capacidad.get('ahorro_posible', False):
+            # Tabla de capacidad
+            capacidad_data = [
+                ["Concepto", "Monto Mensual"],
+                ["Rango Mínimo de Ahorro", formatear_moneda(capacidad.get('rango_min', 0))],
+                ["Ahorro Mensual Sugerido", formatear_moneda(capacidad.get('ahorro_sugerido', 0))],
+                ["Rango Máximo de Ahorro", formatear_moneda(capacidad.get('rango_max', 0))],
+                ["", ""],
+                ["Ahorro Mínimo Ideal (5% ingreso)", formatear_moneda(capacidad.get('ahorro_minimo', 0))],
+                ["Ahorro Óptimo Ideal (10% ingreso)", formatear_moneda(capacidad.get('ahorro_optimo', 0))]
+            ]
+
+            capacidad_table = Table(capacidad_data, colWidths=[3.5*inch, 2.5*inch])
+            capacidad_table.setStyle(ESTILOS_TABLA['capacidad'])
+
+            story.append(capacidad_table)
+            story.append(Spacer(1, 0.2*inch))
+
+            # Mensaje de capacidad
+            mensaje_capacidad = capacidad.get('mensaje', '')
+            story.append(Paragraph(f"<b>Análisis:</b> {mensaje_capacidad}", ESTILOS['Normal']))
+            story.append(Spacer(1, 0.2*inch))
+
+            # Inversión mensual comprometida
+            if inversion_mensual > 0:
+                story.append(Paragraph("<b>Inversión Mensual Comprometida:</b> " + 
+                                     formatear_moneda(inversion_mensual), ESTILOS['destacado']))
+
+                # Validar si está dentro del rango
+                if inversion_mensual <= capacidad.get('rango_max', 0):
+                    validacion_msg = "✅ La inversión comprometida está dentro de la capacidad calculada."
+                else:
+                    validacion_msg = "⚠️ La inversión comprometida excede la capacidad máxima sugerida."
+
+                story.append(Paragraph(validacion_msg, ESTILOS['Normal']))
+
+        else:
+            # No hay capacidad de ahorro
+            mensaje_sin_capacidad = capacidad.get('mensaje', 'No hay capacidad de ahorro disponible.')
+
+            warning_text = f"""
+            <para alignment="center" backColor="{COLORES['rojo']}" 
+                  leftIndent="10" rightIndent="10" spaceBefore="5" spaceAfter="5">
+            <font size="12" color="white"><b>⚠️ SIN CAPACIDAD DE AHORRO</b></font><br/>
+            <font size="10" color="white">{mensaje_sin_capacidad}</font>
+            </para>
+            """
+            story.append(Paragraph(warning_text, ESTILOS['Normal']))
+            story.append(Spacer(1, 0.2*inch))
+
+            story.append(Paragraph("<b>Recomendación Urgente:</b>", ESTILOS['destacado']))
+            story.append(Paragraph("Es necesario estabilizar la situación financiera antes de realizar inversiones:", 
+                                 ESTILOS['Normal']))
+            story.append(Paragraph("• Reducir gastos no esenciales", ESTILOS['Normal']))
+            story.append(Paragraph("• Generar un plan de pago de deudas", ESTILOS['Normal']))
+            story.append(Paragraph("• Buscar formas de aumentar ingresos", ESTILOS['Normal']))
+
+    story.append(PageBreak())
+    
+    return story
+
+def _seccion_proteccion(proteccion):
+    """Sección 4: protección financiera."""
+    story = []
+    
+    if proteccion.get('aplica', False):
+        story.append(Paragraph("4. PROTECCIÓN FINANCIERA", ESTILOS['subtitulo']))
+
+        proteccion_data = [
+            ["Concepto", "Detalle"],
+            ["Presupuesto Mensual Familiar", formatear_moneda(proteccion.get('presupuesto_mensual', 0))],
+            ["Presupuesto Anual", formatear_moneda(proteccion.get('presupuesto_anual', 0))],
+            ["Monto de Protección Sugerido (10 años)", formatear_moneda(proteccion.get('monto_proteccion_sugerido', 0))],
+            ["Responsable Principal", proteccion.get('responsable1', 'N/A')],
+            ["Responsable Secundario", proteccion.get('responsable2', 'N/A') if proteccion.get('responsable2') else 'N/A']
+        ]
+
+        proteccion_table = Table(proteccion_data, colWidths=[3*inch, 3*inch])
+        proteccion_table.setStyle(ESTILOS_TABLA['proteccion'])
+
+        story.append(proteccion_table)
+        story.append(Spacer(1, 0.2*inch))
+
+        reflexion = proteccion.get('reflexion', '')
+        if reflexion:
+            story.append(Paragraph("<b>Reflexión del Cliente:</b>", ESTILOS['destacado']))
+            story.append(Paragraph(reflexion, ESTILOS['Normal']))
+
+        story.append(Spacer(1, 0.3*inch))
+    
+    return story
+
+def _seccion_retiro(retiro, edad):
+    """Sección 5: plan de retiro."""
+    story = []
+    
+    if retiro.get('ingreso_mensual_retiro', 0) > 0:
+        story.append(Paragraph("5. PLAN DE RETIRO", ESTILOS['subtitulo']))
+
+        retiro_data = [
+            ["Concepto", "Valor"],
+            ["Edad Actual", f"{edad} años"],
+            ["Edad de Retiro Deseada", f"{retiro.get('edad_retiro', 'N/A')} años"],
+            ["Años para el Retiro", f"{retiro.get('anos_para_retiro', 'N/A')} años"],
+            ["Años en Retiro (estimado)", f"{retiro.get('anos_en_retiro', 'N/A')} años"],
+            ["Ingreso Mensual Deseado en Retiro", formatear_moneda(retiro.get('ingreso_mensual_retiro', 0))],
+            ["Ingreso Anual en Retiro", formatear_moneda(retiro.get('monto_anual_retiro', 0))],
+            ["Monto Total Requerido", formatear_moneda(retiro.get('monto_total_retiro', 0))],
+            ["Ahorro Mensual Sugerido", formatear_moneda(retiro.get('ahorro_mensual_sugerido', 0))]
+        ]
+
+        retiro_table = Table(retiro_data, colWidths=[3.5*inch, 2.5*inch])
+        retiro_table.setStyle(ESTILOS_TABLA['retiro'])
+
+        story.append(retiro_table)
+        story.append(Spacer(1, 0.3*inch))
+    
+    return story
+
+def _seccion_educacion(educacion):
+    """Sección 6: plan de educación."""
+    story = []
+    
+    if educacion.get('aplica', False):
+        story.append(Paragraph("6. PLAN DE EDUCACIÓN", ESTILOS['subtitulo']))
+
+        hijos_educacion = educacion.get('hijos', [])
+        if hijos_educacion:
+            for i, hijo in enumerate(hijos_educacion, 1):
+                story.append(Paragraph(f"<b>Hijo {i}: {hijo.get('nombre', 'N/A')}</b> ({hijo.get('edad', 'N/A')} años)", 
+                                     ESTILOS['destacado']))
+
+                hijo_data = [
+                    ["Concepto", "Valor"],
+                    ["Años hasta Universidad", f"{hijo.get('anos_restantes', 'N/A')} años"],
+                    ["Costo Anual Estimado Universidad", formatear_moneda(hijo.get('costo_anual', 0))],
+                    ["Costo Total (4 años)", formatear_moneda(hijo.get('costo_total', 0))],
+                    ["Ahorro Mensual Sugerido", formatear_moneda(hijo.get('ahorro_mensual', 0))]
+                ]
+
+                hijo_table = Table(hijo_data, colWidths=[3.5*inch, 2.5*inch])
+                hijo_table.setStyle(ESTILOS_TABLA['educacion_hijo'])
+
+                story.append(hijo_table)
+                story.append(Spacer(1, 0.15*inch))
+
+        # Total de educación
+        story.append(Paragraph("<b>Resumen Total de Educación:</b>", ESTILOS['destacado']))
+        total_educacion = [
+            ["Inversión Total en Educación", formatear_moneda(educacion.get('monto_total_educacion', 0))],
+            ["Ahorro Mensual Total Sugerido", formatear_moneda(educacion.get('ahorro_mensual_total', 0))]
+        ]
+
+        total_edu_table = Table(total_educacion, colWidths=[3.5*inch, 2.5*inch])
+        total_edu_table.setStyle(ESTILOS_TABLA['educacion_total'])
+
+        story.append(total_edu_table)
+        story.append(Spacer(1, 0.3*inch))
+    
+    return story
+
+def _seccion_proyecto(ahorro):
+    """Sección 7: proyecto personal."""
+    story = []
+    
+    if ahorro.get('tiene_proyecto') == 'Sí':
+        story.append(Paragraph("7. PROYECTO PERSONAL", ESTILOS['subtitulo']))
+
+        proyecto_data = [
+            ["Concepto", "Detalle"],
+            ["Descripción del Proyecto", ahorro.get('descripcion', 'N/A')],
+            ["Costo Total del Proyecto", formatear_moneda(ahorro.get('costo', 0))],
+            ["Ahorro Actual Disponible", formatear_moneda(ahorro.get('ahorro_actual', 0))],
+            ["Inversión Requerida", formatear_moneda(ahorro.get('inversion_requerida', 0))],
+            ["Plazo", f"{ahorro.get('plazo_anos', 'N/A')} años"],
+            ["Ahorro Mensual Sugerido", formatear_moneda(ahorro.get('ahorro_mensual_sugerido', 0))]
+        ]
+
+        proyecto_table = Table(proyecto_data, colWidths=[3*inch, 3*inch])
+        proyecto_table.setStyle(ESTILOS_TABLA['proyecto'])
+
+        story.append(proyecto_table)
+        story.append(Spacer(1, 0.3*inch))
+    
+    return story
+
+def _seccion_recomendaciones(flujo, capacidad):
+    """Sección 8: recomendaciones personalizadas."""
+    story = []
+    
+    story.append(PageBreak())
+    
+    story.append(Paragraph("8. RECOMENDACIONES PERSONALIZADAS", ESTILOS['subtitulo']))
+
+    # Importar función de recomendaciones si está disponible
     try:
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(10, 4))
-        
-        # Gráfico 1: Distribución de gastos (pastel)
-        categorias = []
-        valores = []
-        colores_grafico = []
-        
-        if flujo_financiero.get('gastos_fijos', 0) > 0:
-            categorias.append('Gastos\nFijos')
-            valores.append(flujo_financiero['gastos_fijos'])
-            colores_grafico.append(COLORES['azul_claro'])
-        
-        if flujo_financiero.get('gastos_variables', 0) > 0:
-            categorias.append('Gastos\nVariables')
-            valores.append(flujo_financiero['gastos_variables'])
-            colores_grafico.append(COLORES['verde_agua'])
-        
-        if flujo_financiero.get('deudas', 0) > 0:
-            categorias.append('Deudas')
-            valores.append(flujo_financiero['deudas'])
-            colores_grafico.append(COLORES['rojo'])
-        
-        if flujo_financiero.get('flujo_libre', 0) > 0:
-            categorias.append('Flujo\nLibre')
-            valores.append(flujo_financiero['flujo_libre'])
-            colores_grafico.append(COLORES['verde'])
-        
-        if valores:
-            wedges, texts, autotexts = ax1.pie(
-                valores,
-                labels=categorias,
-                colors=colores_grafico,
-                autopct='%1.1f%%',
-                startangle=90,
-                textprops={'fontsize': 8, 'weight': 'bold'}
-            )
-            
-            for autotext in autotexts:
-                autotext.set_color('white')
-                autotext.set_fontsize(8)
-        
-        ax1.set_title('Distribución del Ingreso', fontsize=10, fontweight='bold', pad=10)
-        
-        # Gráfico 2: Comparación de porcentajes (barras horizontales)
-        categorias_pct = ['G. Fijos', 'G. Variables', 'Deudas', 'Flujo Libre']
-        valores_pct = [
-            flujo_financiero.get('porcentaje_gastos_fijos', 0),
-            flujo_financiero.get('porcentaje_gastos_variables', 0),
-            flujo_financiero.get('porcentaje_deudas', 0),
-            flujo_financiero.get('porcentaje_flujo', 0)
+        from modulo_financiero import generar_recomendaciones_financieras
+
+        if flujo and capacidad:
+            recomendaciones = generar_recomendaciones_financieras(flujo, capacidad)
+
+            story.append(Paragraph("Basándose en el análisis de tu flujo financiero y capacidad de ahorro, " +
+                                 "se sugieren las siguientes acciones priorizadas:", ESTILOS['Normal']))
+            story.append(Spacer(1, 0.15*inch))
+
+            for i, rec in enumerate(recomendaciones[:10], 1):  # Máximo 10 en PDF
+                story.append(Paragraph(f"{i}. {rec}", ESTILOS['Normal']))
+                story.append(Spacer(1, 8))
+
+    except ImportError:
+        # Si no hay módulo, usar recomendaciones básicas
+        story.append(Paragraph("Recomendaciones generales basadas en tu perfil financiero:", ESTILOS['Normal']))
+        story.append(Spacer(1, 0.15*inch))
+
+        recomendaciones_basicas = [
+            "Mantén un registro detallado de tus gastos mensuales",
+            "Establece un fondo de emergencia equivalente a 3-6 meses de gastos",
+            "Revisa y ajusta tu presupuesto periódicamente",
+            "Considera diversificar tus fuentes de ingreso",
+            "Planifica tus objetivos financieros a corto, mediano y largo plazo"
         ]
-        colores_barras = [COLORES['azul_claro'], COLORES['verde_agua'], COLORES['rojo'], COLORES['verde']]
-        
-        bars = ax2.barh(categorias_pct, valores_pct, color=colores_barras, edgecolor='black', linewidth=1)
-        
-        # Agregar valores en las barras
-        for i, (bar, val) in enumerate(zip(bars, valores_pct)):
-            width = bar.get_width()
-            ax2.text(width + 1, bar.get_y() + bar.get_height()/2, 
-                    f'{val:.1f}%', ha='left', va='center', fontsize=8, fontweight='bold')
-        
-        ax2.set_xlabel('Porcentaje del Ingreso (%)', fontsize=9, fontweight='bold')
-        ax2.set_title('Análisis por Categoría', fontsize=10, fontweight='bold', pad=10)
-        ax2.set_xlim(0, max(valores_pct) + 15)
-        ax2.grid(axis='x', alpha=0.3, linestyle='--')
-        
-        plt.tight_layout()
-        
-        # Guardar en buffer
-        buffer = BytesIO()
-        plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-        buffer.seek(0)
-        plt.close(fig)
-        
-        return buffer
-        
-    except Exception as e:
-        print(f"Error al generar gráfico de flujo: {str(e)}")
-        return None
 
-def generar_pdf_asesoria_mejorado(datos_completos):
+        for i, rec in enumerate(recomendaciones_basicas, 1):
+            story.append(Paragraph(f"{i}. {rec}", ESTILOS['Normal']))
+            story.append(Spacer(1, 8))
+
+    story.append(Spacer(1, 0.3*inch))
+    
+    return story
+
+def _seccion_resumen(nombre, flujo, capacidad, inversion_mensual):
+    """Resumen ejecutivo y pie del reporte."""
+    story = []
+    
+    story.append(Paragraph("RESUMEN EJECUTIVO", ESTILOS['subtitulo']))
+
+    resumen_text = f"""
+    Este reporte presenta un análisis integral de la situación financiera de {nombre}.
+
+    <b>Estado Financiero Actual:</b> {flujo.get('semaforo', '')} {flujo.get('estado_financiero', 'N/A').upper()}
+
+    <b>Puntos Clave:</b>
+    • Flujo libre mensual: {formatear_moneda(flujo.get('flujo_libre', 0))} ({flujo.get('porcentaje_flujo', 0):.1f}% del ingreso)
+    • Capacidad de ahorro: {formatear_moneda(capacidad.get('ahorro_sugerido', 0)) if capacidad.get('ahorro_posible') else '$0.00'} mensuales
+    • Inversión comprometida: {formatear_moneda(inversion_mensual)}
+
+    <b>Próximos Pasos:</b>
+    1. Implementar las recomendaciones priorizadas
+    2. Establecer seguimiento mensual del flujo financiero
+    3. Ajustar plan según evolución de la situación
+    4. Programar revisión trimestral
     """
-    Genera PDF completo con análisis financiero incluido
+
+    story.append(Paragraph(resumen_text, ESTILOS['Normal']))
+
+    # Footer
+    story.append(Spacer(1, 0.5*inch))
+
+    footer_text = f"""
+    <para alignment="center">
+    <font size="8" color="gray">
+
+    Asesoría Financiera Rizkora - Análisis Integral de Finanzas Personales<br/>
+    Este reporte es confidencial y para uso exclusivo del cliente.<br/>
+    <br/>
+    <i>Nota: Los montos y recomendaciones son estimados basados en la información proporcionada.
+    Se recomienda una sesión de seguimiento para revisar opciones de ahorro/inversión específicas.</i>
+    </font>
+    </para>
+    """
+
+    story.append(Paragraph(footer_text, ESTILOS['Normal']))
+    
+    return story
+
+
+# ====================================================================
+# SECCIONES DEL REPORTE BÁSICO (conjunto 'legacy' de generar_reporte)
+# ====================================================================
+
+def _prioridad(necesidades, clave):
+    """'#1' para la necesidad principal, '#2+' para las demás con monto, '-' si no aplica."""
+    if necesidades['prioridades'][0][0] == clave:
+        return "#1"
+    return "#2+" if necesidades['montos'][clave] > 0 else "-"
+
+def _seccion_basico_cliente(datos_gen, perfil, ingresos):
+    """Reporte básico: cliente, perfil familiar e información financiera."""
+    story = []
+    
+    # Título
+    story.append(Paragraph("REPORTE DE ASESORÍA FINANCIERA", ESTILOS['titulo']))
+    story.append(Paragraph("Rizkora - Detección de Necesidades", ESTILOS['Normal']))
+    story.append(Spacer(1, 20))
+    
+    # Datos del cliente
+    story.append(Paragraph("INFORMACIÓN DEL CLIENTE", ESTILOS['subtitulo']))
+    
+    cliente_data = [
+        ["Nombre:", datos_gen.get('nombre', '')],
+        ["Edad:", f"{datos_gen.get('edad', '')} años"],
+        ["Teléfono:", datos_gen.get('telefono', '')],
+        ["Correo:", datos_gen.get('correo', '')],
+        ["Ocupación:", datos_gen.get('ocupacion', '')],
+        ["Estado Civil:", datos_gen.get('estado_civil', '')],
+        ["Fumador:", datos_gen.get('fumador', '')],
+        ["Tipo de Cita:", datos_gen.get('tipo_cita', '')],
+        ["Agente:", datos_gen.get('nombre_agente', '')],
+        ["Fecha Asesoría:", str(datos_gen.get('fecha_asesoria', ''))]
+    ]
+    
+    cliente_table = Table(cliente_data, colWidths=[2*inch, 4*inch])
+    cliente_table.setStyle(ESTILOS_TABLA['basico_cliente'])
+    
+    story.append(cliente_table)
+    story.append(Spacer(1, 20))
+    
+    # Perfil Familiar
+    story.append(Paragraph("PERFIL FAMILIAR", ESTILOS['subtitulo']))
+    
+    perfil_info = [
+        ["Tiene Pareja:", perfil.get('tiene_pareja', 'No')],
+        ["Tiene Hijos:", perfil.get('tiene_hijos', 'No')],
+        ["Número de Hijos:", str(perfil.get('num_hijos', 0))],
+        ["Otros Dependientes:", perfil.get('tiene_dependientes', 'No')]
+    ]
+    
+    perfil_table = Table(perfil_info, colWidths=[2*inch, 4*inch])
+    perfil_table.setStyle(ESTILOS_TABLA['basico_perfil'])
+    
+    story.append(perfil_table)
+    story.append(Spacer(1, 20))
+    
+    # Información Financiera
+    story.append(Paragraph("INFORMACIÓN FINANCIERA", ESTILOS['subtitulo']))
+    
+    finanzas_info = [
+        ["Ingreso Mensual:", formatear_moneda(ingresos.get('ingreso_mensual', 0))],
+        ["Ingreso Anual:", formatear_moneda(ingresos.get('ingreso_anual', 0))],
+        ["Inversión Mensual Disponible:", formatear_moneda(ingresos.get('inversion_mensual', 0))],
+        ["Ahorro Ideal 10%:", formatear_moneda(ingresos.get('ahorro_ideal_10', 0))],
+        ["Ahorro Conservador 7%:", formatear_moneda(ingresos.get('ahorro_conservador_7', 0))]
+    ]
+    
+    finanzas_table = Table(finanzas_info, colWidths=[2.5*inch, 3.5*inch])
+    finanzas_table.setStyle(ESTILOS_TABLA['basico_finanzas'])
+    
+    story.append(finanzas_table)
+    story.append(Spacer(1, 20))
+    
+    return story
+
+def _seccion_basico_necesidades(necesidades):
+    """Reporte básico: tabla de necesidades detectadas (en página nueva)."""
+    story = []
+    
+    story.append(PageBreak())
+    
+    story.append(Paragraph("NECESIDADES DETECTADAS", ESTILOS['subtitulo']))
+    story.append(Paragraph(f"<b>Necesidad Principal:</b> {necesidades['principal'].upper()}", ESTILOS['Normal']))
+    story.append(Spacer(1, 10))
+    
+    necesidades_data = [
+        ["Categoría", "Monto Estimado", "Prioridad"],
+        ["Protección", formatear_moneda(necesidades['montos']['proteccion']), _prioridad(necesidades, 'proteccion')],
+        ["Retiro", formatear_moneda(necesidades['montos']['retiro']), _prioridad(necesidades, 'retiro')],
+        ["Educación", formatear_moneda(necesidades['montos']['educacion']), _prioridad(necesidades, 'educacion')],
+        ["Ahorro/Proyecto", formatear_moneda(necesidades['montos']['ahorro']), _prioridad(necesidades, 'ahorro')]
+    ]
+    
+    necesidades_table = Table(necesidades_data, colWidths=[2*inch, 2.5*inch, 1.5*inch])
+    necesidades_table.setStyle(ESTILOS_TABLA['basico_necesidades'])
+    
+    story.append(necesidades_table)
+    story.append(Spacer(1, 20))
+    
+    return story
+
+def _seccion_basico_pilares(proteccion, retiro, educacion, ahorro):
+    """Reporte básico: detalle breve de cada pilar financiero."""
+    story = []
+    
+    story.append(Paragraph("DETALLES POR PILAR FINANCIERO", ESTILOS['subtitulo']))
+    
+    # Protección
+    if proteccion.get('aplica'):
+        story.append(Paragraph("<b>🛡️ PROTECCIÓN</b>", ESTILOS['Normal']))
+        story.append(Paragraph(f"Presupuesto Mensual Familiar: {formatear_moneda(proteccion.get('presupuesto_mensual', 0))}", ESTILOS['Normal']))
+        story.append(Paragraph(f"Monto de Protección Sugerido: {formatear_moneda(proteccion.get('monto_proteccion_sugerido', 0))}", ESTILOS['Normal']))
+        story.append(Spacer(1, 10))
+    
+    # Retiro
+    if retiro.get('ingreso_mensual_retiro', 0) > 0:
+        story.append(Paragraph("<b>👴 RETIRO</b>", ESTILOS['Normal']))
+        story.append(Paragraph(f"Edad de Retiro Deseada: {retiro.get('edad_retiro', '')} años", ESTILOS['Normal']))
+        story.append(Paragraph(f"Ingreso Mensual Deseado: {formatear_moneda(retiro.get('ingreso_mensual_retiro', 0))}", ESTILOS['Normal']))
+        story.append(Paragraph(f"Monto Total Requerido: {formatear_moneda(retiro.get('monto_total_retiro', 0))}", ESTILOS['Normal']))
+        story.append(Paragraph(f"Ahorro Mensual Sugerido: {formatear_moneda(retiro.get('ahorro_mensual_sugerido', 0))}", ESTILOS['Normal']))
+        story.append(Spacer(1, 10))
+    
+    # Educación
+    if educacion.get('aplica'):
+        story.append(Paragraph("<b>🎓 EDUCACIÓN</b>", ESTILOS['Normal']))
+        story.append(Paragraph(f"Monto Total para Educación: {formatear_moneda(educacion.get('monto_total_educacion', 0))}", ESTILOS['Normal']))
+        story.append(Paragraph(f"Ahorro Mensual Total: {formatear_moneda(educacion.get('ahorro_mensual_total', 0))}", ESTILOS['Normal']))
+        story.append(Spacer(1, 10))
+    
+    # Proyecto
+    if ahorro.get('tiene_proyecto') == "Sí":
+        story.append(Paragraph("<b>💰 PROYECTO</b>", ESTILOS['Normal']))
+        story.append(Paragraph(f"Proyecto: {ahorro.get('descripcion', '')}", ESTILOS['Normal']))
+        story.append(Paragraph(f"Costo: {formatear_moneda(ahorro.get('costo', 0))}", ESTILOS['Normal']))
+        story.append(Paragraph(f"Ahorro Mensual Sugerido: {formatear_moneda(ahorro.get('ahorro_mensual_sugerido', 0))}", ESTILOS['Normal']))
+        story.append(Spacer(1, 10))
+    
+    return story
+
+def _seccion_basico_recomendaciones(necesidades, ahorro_retiro, ahorro_educacion, ahorro_proyecto):
+    """Reporte básico: recomendaciones por necesidad detectada (en página nueva)."""
+    story = []
+    
+    story.append(PageBreak())
+    story.append(Paragraph("RECOMENDACIONES", ESTILOS['subtitulo']))
+    
+    recomendaciones = []
+    if necesidades['montos']['proteccion'] > 0:
+        recomendaciones.append(f"• Protección: Considerar seguro de vida por {formatear_moneda(necesidades['montos']['proteccion'])}")
+    if necesidades['montos']['retiro'] > 0:
+        recomendaciones.append(f"• Retiro: Plan de ahorro con {formatear_moneda(ahorro_retiro)} mensuales")
+    if necesidades['montos']['educacion'] > 0:
+        recomendaciones.append(f"• Educación: Inversión de {formatear_moneda(ahorro_educacion)} mensuales")
+    if necesidades['montos']['ahorro'] > 0:
+        recomendaciones.append(f"• Proyecto: Ahorro de {formatear_moneda(ahorro_proyecto)} mensuales")
+    
+    for rec in recomendaciones:
+        story.append(Paragraph(rec, ESTILOS['Normal']))
+        story.append(Spacer(1, 5))
+    
+    return story
+
+def _seccion_basico_pie(generado):
+    """Reporte básico: pie con la fecha de generación (a resolución de minuto)."""
+    return [
+        Spacer(1, 30),
+        Paragraph(f"Reporte generado: {generado} | Asesoría Financiera Rizkora", ESTILOS['pie'])
+    ]
+
+# ====================================================================
+# CACHÉ DE SECCIONES
+# ====================================================================
+
+MAX_SECCIONES_CACHE = 128
+
+
+class CacheSecciones:
+    """
+    Caché LRU de flowables por sección, con clave = hash de las entradas de la sección.
+
+    Los flowables de ReportLab se pueden volver a maquetar en otro documento
+    (wrap/split se recalculan en cada build), así que una sección cuyas
+    entradas no cambiaron se reutiliza tal cual. Se entregan copias
+    superficiales para que dos builds simultáneos no compartan el estado
+    de maquetación.
+    """
+
+    def __init__(self, max_entradas=MAX_SECCIONES_CACHE):
+        self.max_entradas = max_entradas
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave, construir):
+        """Devuelve los flowables de `clave`, construyéndolos con `construir()` si no están."""
+        with self._lock:
+            flowables = self._entradas.get(clave)
+            if flowables is not None:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return [copy.copy(flowable) for flowable in flowables]
+            self.fallos += 1
+
+        flowables = construir()
+
+        with self._lock:
+            self._entradas[clave] = flowables
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+        return [copy.copy(flowable) for flowable in flowables]
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self.aciertos = 0
+            self.fallos = 0
+
+
+cache_secciones = CacheSecciones()
+
+
+def huella_seccion(nombre, entradas):
+    """
+    Hash estable de las entradas de una sección (mismo hook de serialización que la exportación).
+
+    Incluye la versión de la política de umbrales: al recargarla, las secciones
+    con indicadores se reconstruyen aunque los datos no hayan cambiado.
+    """
+    return nombre, politica_actual().version, hashlib.blake2b(a_json_bytes(entradas), digest_size=16).hexdigest()
+
+# ====================================================================
+# ENSAMBLADO DEL REPORTE
+# ====================================================================
+
+# Secciones disponibles: nombre → (entradas a partir de datos_completos, constructor).
+# Cada constructor recibe solo sus entradas, así el hash cubre todo lo que usa.
+SECCIONES = {
+    'portada': (lambda d: (d.get('datos_generales', {}), d.get('flujo_financiero', {})), _seccion_portada),
+    'cliente': (lambda d: (d.get('datos_generales', {}), d.get('perfil_familiar', {})), _seccion_cliente),
+    'flujo': (lambda d: (d.get('flujo_financiero', {}),), _seccion_flujo),
+    'capacidad': (lambda d: (d.get('capacidad_ahorro', {}), d.get('ingresos', {}).get('inversion_mensual', 0)), _seccion_capacidad),
+    'proteccion': (lambda d: (d.get('proteccion', {}),), _seccion_proteccion),
+    'retiro': (lambda d: (d.get('retiro', {}), d.get('datos_generales', {}).get('edad', 'N/A')), _seccion_retiro),
+    'educacion': (lambda d: (d.get('educacion', {}),), _seccion_educacion),
+    'proyecto': (lambda d: (d.get('ahorro', {}),), _seccion_proyecto),
+    'recomendaciones': (lambda d: (d.get('flujo_financiero', {}), d.get('capacidad_ahorro', {})), _seccion_recomendaciones),
+    'resumen': (lambda d: (
+        d.get('datos_generales', {}).get('nombre', 'el cliente'),
+        d.get('flujo_financiero', {}),
+        d.get('capacidad_ahorro', {}),
+        d.get('ingresos', {}).get('inversion_mensual', 0)
+    ), _seccion_resumen),
+
+    'basico_cliente': (lambda d: (
+        d.get('datos_generales', {}), d.get('perfil_familiar', {}), d.get('ingresos', {})
+    ), _seccion_basico_cliente),
+    'basico_necesidades': (lambda d: (detectar_necesidades_financieras(d),), _seccion_basico_necesidades),
+    'basico_pilares': (lambda d: (
+        d.get('proteccion', {}), d.get('retiro', {}), d.get('educacion', {}), d.get('ahorro', {})
+    ), _seccion_basico_pilares),
+    'basico_recomendaciones': (lambda d: (
+        detectar_necesidades_financieras(d),
+        d.get('retiro', {}).get('ahorro_mensual_sugerido', 0),
+        d.get('educacion', {}).get('ahorro_mensual_total', 0),
+        d.get('ahorro', {}).get('ahorro_mensual_sugerido', 0)
+    ), _seccion_basico_recomendaciones),
+    'basico_pie': (lambda d: (datetime.now().strftime('%d/%m/%Y %H:%M'),), _seccion_basico_pie),
+}
+
+# Conjuntos de secciones que forman cada tipo de reporte
+CONJUNTOS_SECCIONES = {
+    # Reporte final (paso 9)
+    'completo': (
+        'portada', 'cliente', 'flujo', 'capacidad', 'proteccion', 'retiro',
+        'educacion', 'proyecto', 'recomendaciones', 'resumen'
+    ),
+    # Análisis financiero del paso 3: sin los pilares que se capturan después
+    'parcial': ('portada', 'cliente', 'flujo', 'capacidad', 'recomendaciones', 'resumen'),
+    # Resumen de necesidades de la barra lateral
+    'legacy': (
+        'basico_cliente', 'basico_necesidades', 'basico_pilares',
+        'basico_recomendaciones', 'basico_pie'
+    ),
+}
+
+
+def construir_story(datos_completos, conjunto='completo', usar_cache=True, perfil=PERFIL_PREDETERMINADO):
+    """
+    Arma la lista de flowables de un reporte, sección por sección.
+
+    Con usar_cache=True solo se reconstruyen las secciones cuyas entradas
+    cambiaron desde la última vez (p. ej. al editar retiro solo se rehace la
+    sección 5; el gráfico de flujo se reutiliza).
+
+    Parameters:
+    -----------
+    datos_completos : dict
+        st.session_state.datos
+    conjunto : str
+        Clave de CONJUNTOS_SECCIONES: 'completo', 'parcial' o 'legacy'
+    perfil : str
+        Clave de PERFILES_SALIDA: 'pantalla', 'impresion' o 'archivo'
+
+    Returns:
+    --------
+    list : Flowables listos para doc.build()
+    """
+    if conjunto not in CONJUNTOS_SECCIONES:
+        raise ValueError(f"Conjunto de secciones desconocido: {conjunto}")
+    grafico = _perfil(perfil)['grafico']
+
+    story = []
+    for nombre in CONJUNTOS_SECCIONES[conjunto]:
+        entradas_de, constructor = SECCIONES[nombre]
+        entradas = entradas_de(datos_completos)
+        if nombre in SECCIONES_CON_GRAFICO:
+            entradas += (grafico,)
+        if not usar_cache:
+            story.extend(constructor(*entradas))
+            continue
+        try:
+            clave = huella_seccion(nombre, entradas)
+        except TypeError:
+            # Entradas no serializables: se construye sin caché
+            story.extend(constructor(*entradas))
+            continue
+        story.extend(cache_secciones.obtener(clave, lambda: constructor(*entradas)))
+    return story
+
+
+def generar_reporte(datos_completos, conjunto='completo', usar_cache=True, perfil=PERFIL_PREDETERMINADO):
+    """
+    Motor único de reportes PDF
     
     Parameters:
     -----------
     datos_completos : dict
         Diccionario completo con todos los datos de st.session_state.datos
-        Debe incluir las claves: 'datos_generales', 'perfil_familiar', 'ingresos',
-        'flujo_financiero', 'capacidad_ahorro', 'proteccion', 'retiro', 'educacion', 'ahorro'
+    conjunto : str
+        'completo' (paso 9), 'parcial' (análisis del paso 3) o 'legacy'
+        (resumen de necesidades de la barra lateral)
+    usar_cache : bool
+        Reutilizar las secciones sin cambios de reportes anteriores (ver CacheSecciones)
+    perfil : str
+        Perfil de salida (PERFILES_SALIDA): 'pantalla', 'impresion' o 'archivo'
     
     Returns:
     --------
-    BytesIO : Buffer con el PDF generado
+    BytesIO : Buffer con el PDF generado, o None si hubo un error
     """
+    if conjunto not in CONJUNTOS_SECCIONES:
+        raise ValueError(f"Conjunto de secciones desconocido: {conjunto}")
+    _perfil(perfil)
+
     try:
         buffer = BytesIO()
         doc = SimpleDocTemplate(
@@ -145,715 +980,15 @@ def generar_pdf_asesoria_mejorado(datos_completos):
             rightMargin=72, 
             leftMargin=72, 
             topMargin=72, 
-            bottomMargin=72
-        )
-        
-        # Estilos
-        styles = getSampleStyleSheet()
-        
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=18,
-            textColor=pdf_colors.HexColor(COLORES['azul_principal']),
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        )
-        
-        subtitle_style = ParagraphStyle(
-            'CustomSubtitle',
-            parent=styles['Heading2'],
-            fontSize=14,
-            textColor=pdf_colors.HexColor(COLORES['verde_oscuro']),
-            spaceAfter=15,
-            fontName='Helvetica-Bold'
-        )
-        
-        subsection_style = ParagraphStyle(
-            'CustomSubsection',
-            parent=styles['Heading3'],
-            fontSize=12,
-            textColor=pdf_colors.HexColor(COLORES['azul_principal']),
-            spaceAfter=10,
-            fontName='Helvetica-Bold'
+            bottomMargin=72,
+            **opciones_documento(perfil)
         )
         
-        highlight_style = ParagraphStyle(
-            'Highlight',
-            parent=styles['Normal'],
-            fontSize=11,
-            textColor=pdf_colors.HexColor(COLORES['verde_oscuro']),
-            fontName='Helvetica-Bold',
-            spaceAfter=10
-        )
-        
-        story = []
-        
-        # ====================================================================
-        # PORTADA
-        # ====================================================================
-        story.append(Spacer(1, 1*inch))
-        story.append(Paragraph("REPORTE DE ASESORÍA FINANCIERA INTEGRAL", title_style))
-        story.append(Spacer(1, 0.3*inch))
-        story.append(Paragraph("Rizkora - Análisis Completo de Finanzas Personales", styles['Normal']))
-        story.append(Spacer(1, 0.5*inch))
-        
-        datos_gen = datos_completos.get('datos_generales', {})
-        flujo = datos_completos.get('flujo_financiero', {})
-        
-        portada_info = f"""
-        <para alignment="center">
-        <b>Cliente:</b> {datos_gen.get('nombre', 'N/A')}<br/>
-        <b>Agente:</b> {datos_gen.get('nombre_agente', 'N/A')}<br/>
-        <b>Fecha:</b> {datos_gen.get('fecha_asesoria', 'N/A')}<br/>
-        <br/>
-        <font size="12" color="{flujo.get('color_estado', '#000000')}">
-        <b>{flujo.get('semaforo', '')} Estado Financiero: {flujo.get('estado_financiero', 'N/A').upper()}</b>
-        </font>
-        </para>
-        """
-        story.append(Paragraph(portada_info, styles['Normal']))
-        
-        story.append(PageBreak())
-        
-        # ====================================================================
-        # SECCIÓN 1: INFORMACIÓN DEL CLIENTE
-        # ====================================================================
-        story.append(Paragraph("1. INFORMACIÓN DEL CLIENTE", subtitle_style))
-        
-        cliente_data = [
-            ["Campo", "Información"],
-            ["Nombre Completo", datos_gen.get('nombre', 'N/A')],
-            ["Edad", f"{datos_gen.get('edad', 'N/A')} años"],
-            ["Estado Civil", datos_gen.get('estado_civil', 'N/A')],
-            ["Ocupación", datos_gen.get('ocupacion', 'N/A')],
-            ["Teléfono", datos_gen.get('telefono', 'N/A')],
-            ["Correo Electrónico", datos_gen.get('correo', 'N/A')],
-            ["Fumador", datos_gen.get('fumador', 'N/A')],
-            ["Tipo de Cita", datos_gen.get('tipo_cita', 'N/A')],
-            ["Agente Asesor", datos_gen.get('nombre_agente', 'N/A')],
-            ["Fecha de Asesoría", str(datos_gen.get('fecha_asesoria', 'N/A'))]
-        ]
-        
-        cliente_table = Table(cliente_data, colWidths=[2.5*inch, 3.5*inch])
-        cliente_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), pdf_colors.HexColor(COLORES['azul_principal'])),
-            ('TEXTCOLOR', (0, 0), (-1, 0), pdf_colors.white),
-            ('BACKGROUND', (0, 1), (0, -1), pdf_colors.white),
-            ('TEXTCOLOR', (0, 1), (0, -1), pdf_colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 1, pdf_colors.grey),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE')
-        ]))
-        
-        story.append(cliente_table)
-        story.append(Spacer(1, 0.3*inch))
-        
-        # Perfil Familiar
-        story.append(Paragraph("Perfil Familiar", subsection_style))
-        perfil = datos_completos.get('perfil_familiar', {})
-        
-        perfil_info = [
-            ["Característica", "Detalle"],
-            ["Tiene Pareja", perfil.get('tiene_pareja', 'No')],
-            ["Nombre de Pareja", perfil.get('nombre_pareja', 'N/A') if perfil.get('tiene_pareja') == 'Sí' else 'N/A'],
-            ["Tiene Hijos", perfil.get('tiene_hijos', 'No')],
-            ["Número de Hijos", str(perfil.get('num_hijos', 0))],
-            ["Tiene Otros Dependientes", perfil.get('tiene_dependientes', 'No')],
-            ["Número de Dependientes", str(perfil.get('num_dependientes', 0))]
-        ]
-        
-        perfil_table = Table(perfil_info, colWidths=[2.5*inch, 3.5*inch])
-        perfil_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), pdf_colors.HexColor(COLORES['azul_principal'])),
-            ('TEXTCOLOR', (0, 0), (-1, 0), pdf_colors.white),
-            ('BACKGROUND', (0, 1), (0, -1), pdf_colors.white),
-            ('TEXTCOLOR', (0, 1), (0, -1), pdf_colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 1, pdf_colors.grey)
-        ]))
-        
-        story.append(perfil_table)
-        
-        story.append(PageBreak())
-        
-        # ====================================================================
-        # SECCIÓN 2: ANÁLISIS DE FLUJO FINANCIERO (NUEVO)
-        # ====================================================================
-        story.append(Paragraph("2. ANÁLISIS DE FLUJO FINANCIERO", subtitle_style))
-        
-        if flujo:
-            # Estado Financiero en recuadro destacado
-            estado = flujo.get('estado_financiero', 'N/A').upper()
-            semaforo = flujo.get('semaforo', '')
-            mensaje_estado = flujo.get('mensaje_estado', '')
-            
-            # Crear el contenido del recuadro
-            estado_text = f"<b>{semaforo} ESTADO FINANCIERO: {estado}</b>"
-            mensaje_text = mensaje_estado
-            
-            # Crear una tabla con dos filas (título y mensaje)
-            estado_celda = Paragraph(estado_text, 
-                ParagraphStyle(
-                    'EstadoTitulo',
-                    parent=styles['Normal'],
-                    alignment=TA_CENTER,
-                    fontSize=14,
-                    textColor=pdf_colors.white,
-                    fontName='Helvetica-Bold',
-                    spaceAfter=10
-                )
-            )
-            
-            mensaje_celda = Paragraph(mensaje_text, 
-                ParagraphStyle(
-                    'EstadoMensaje',
-                    parent=styles['Normal'],
-                    alignment=TA_CENTER,
-                    fontSize=11,
-                    textColor=pdf_colors.white,
-                    fontName='Helvetica',
-                    leading=14,  # Interlineado
-                    wordWrap='CJK'  # Esto permite el word wrap
-                )
-            )
-            
-            # Crear tabla con las dos celdas
-            estado_table = Table([[estado_celda], [mensaje_celda]], colWidths=[6*inch])
-            estado_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, -1), pdf_colors.HexColor(flujo.get('color_estado', '#CCCCCC'))),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-                ('TOPPADDING', (0, 0), (-1, -1), 12),
-                ('LEFTPADDING', (0, 0), (-1, -1), 15),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 15),
-                ('BOX', (0, 0), (-1, -1), 1, pdf_colors.white)
-            ]))
-            
-            story.append(estado_table)
-            story.append(Spacer(1, 0.2*inch))
-            
-            # Tabla de Flujo Financiero
-            story.append(Paragraph("2.1 Resumen del Flujo Mensual", subsection_style))
-            
-            flujo_data = [
-                ["Concepto", "Monto", "% del Ingreso"],
-                ["Ingreso Mensual Neto", formatear_moneda(flujo.get('ingreso_mensual', 0)), "100.0%"],
-                ["Gastos Fijos", formatear_moneda(flujo.get('gastos_fijos', 0)), 
-                 f"{flujo.get('porcentaje_gastos_fijos', 0):.1f}%"],
-                ["Gastos Variables", formatear_moneda(flujo.get('gastos_variables', 0)), 
-                 f"{flujo.get('porcentaje_gastos_variables', 0):.1f}%"],
-                ["Pagos de Deudas", formatear_moneda(flujo.get('deudas', 0)), 
-                 f"{flujo.get('porcentaje_deudas', 0):.1f}%"],
-                ["Total de Gastos", formatear_moneda(flujo.get('gastos_totales', 0)),
-                 f"{flujo.get('porcentaje_gastos_fijos', 0) + flujo.get('porcentaje_gastos_variables', 0) + flujo.get('porcentaje_deudas', 0):.1f}%"],
-                ["FLUJO LIBRE", formatear_moneda(flujo.get('flujo_libre', 0)), 
-                 f"{flujo.get('porcentaje_flujo', 0):.1f}%"]
-            ]
-            
-            flujo_table = Table(flujo_data, colWidths=[2.5*inch, 2*inch, 1.5*inch])
-            flujo_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), pdf_colors.HexColor(COLORES['azul_principal'])),
-                ('TEXTCOLOR', (0, 0), (-1, 0), pdf_colors.white),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-                ('TOPPADDING', (0, 0), (-1, -1), 8),
-                ('GRID', (0, 0), (-1, -1), 1, pdf_colors.grey),
-                ('BACKGROUND', (0, 1), (-1, 1), pdf_colors.lightgrey),
-                ('BACKGROUND', (0, 5), (-1, 5), pdf_colors.lightgrey),
-                ('BACKGROUND', (0, 6), (-1, 6), pdf_colors.HexColor(COLORES['azul_claro'])),
-                ('FONTNAME', (0, 6), (-1, 6), 'Helvetica-Bold'),
-                ('TEXTCOLOR', (0, 6), (-1, 6), pdf_colors.black),
-                ('ROWBACKGROUNDS', (0, 2), (-1, 4), [pdf_colors.white, pdf_colors.lightgrey])
-            ]))
-            
-            story.append(flujo_table)
-            story.append(Spacer(1, 0.3*inch))
-            
-            # Desglose Detallado de Gastos
-            story.append(Paragraph("2.2 Desglose Detallado de Gastos", subsection_style))
-            
-            # Gastos Fijos
-            detalle_gastos_fijos = flujo.get('detalle_gastos_fijos', {})
-            if detalle_gastos_fijos and any(detalle_gastos_fijos.values()):
-                story.append(Paragraph("<b>Gastos Fijos:</b>", highlight_style))
-                
-                gastos_fijos_data = [["Categoría", "Monto Mensual"]]
-                for categoria, monto in detalle_gastos_fijos.items():
-                    if monto > 0:
-                        gastos_fijos_data.append([categoria.capitalize(), formatear_moneda(monto)])
-                gastos_fijos_data.append(["TOTAL", formatear_moneda(flujo.get('gastos_fijos', 0))])
-                
-                gastos_fijos_table = Table(gastos_fijos_data, colWidths=[3*inch, 2*inch])
-                gastos_fijos_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), pdf_colors.HexColor(COLORES['azul_principal'])),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), pdf_colors.white),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 9),
-                    ('GRID', (0, 0), (-1, -1), 0.5, pdf_colors.grey),
-                    ('BACKGROUND', (0, -1), (-1, -1), pdf_colors.lightgrey),
-                    ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold')
-                ]))
-                
-                story.append(gastos_fijos_table)
-                story.append(Spacer(1, 0.2*inch))
-            
-            # Gastos Variables
-            detalle_gastos_variables = flujo.get('detalle_gastos_variables', {})
-            if detalle_gastos_variables and any(detalle_gastos_variables.values()):
-                story.append(Paragraph("<b>Gastos Variables:</b>", highlight_style))
-                
-                gastos_var_data = [["Categoría", "Monto Mensual"]]
-                for categoria, monto in detalle_gastos_variables.items():
-                    if monto > 0:
-                        gastos_var_data.append([categoria.capitalize(), formatear_moneda(monto)])
-                gastos_var_data.append(["TOTAL", formatear_moneda(flujo.get('gastos_variables', 0))])
-                
-                gastos_var_table = Table(gastos_var_data, colWidths=[3*inch, 2*inch])
-                gastos_var_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), pdf_colors.HexColor(COLORES['azul_principal'])),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), pdf_colors.white),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 9),
-                    ('GRID', (0, 0), (-1, -1), 0.5, pdf_colors.grey),
-                    ('BACKGROUND', (0, -1), (-1, -1), pdf_colors.lightgrey),
-                    ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold')
-                ]))
-                
-                story.append(gastos_var_table)
-                story.append(Spacer(1, 0.2*inch))
-            
-            # Deudas
-            detalle_deudas = flujo.get('detalle_deudas', {})
-            if detalle_deudas and any(detalle_deudas.values()):
-                story.append(Paragraph("<b>Pagos de Deudas:</b>", highlight_style))
-                
-                deudas_data = [["Tipo de Deuda", "Pago Mensual"]]
-                for categoria, monto in detalle_deudas.items():
-                    if monto > 0:
-                        deudas_data.append([categoria.capitalize(), formatear_moneda(monto)])
-                deudas_data.append(["TOTAL", formatear_moneda(flujo.get('deudas', 0))])
-                
-                deudas_table = Table(deudas_data, colWidths=[3*inch, 2*inch])
-                deudas_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), pdf_colors.HexColor(COLORES['rojo'])),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), pdf_colors.white),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 9),
-                    ('GRID', (0, 0), (-1, -1), 0.5, pdf_colors.grey),
-                    ('BACKGROUND', (0, -1), (-1, -1), pdf_colors.lightgrey),
-                    ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold')
-                ]))
-                
-                story.append(deudas_table)
-                story.append(Spacer(1, 0.2*inch))
-            
-            # Gráficos de Flujo Financiero
-            story.append(Paragraph("2.3 Visualización del Flujo Financiero", subsection_style))
-            
-            grafico_buffer = generar_grafico_flujo_financiero(flujo)
-            if grafico_buffer:
-                img = Image(grafico_buffer, width=6*inch, height=2.4*inch)
-                story.append(img)
-                story.append(Spacer(1, 0.2*inch))
-            
-            # Indicadores de Salud Financiera
-            story.append(Paragraph("2.4 Indicadores de Salud Financiera", subsection_style))
-            
-            indicadores = []
-            
-            # Indicador de flujo libre
-            pct_flujo = flujo.get('porcentaje_flujo', 0)
-            if pct_flujo >= 30:
-                indicadores.append("✅ <b>Flujo Libre EXCELENTE</b>: " + f"{pct_flujo:.1f}% - Posición financiera óptima")
-            elif pct_flujo >= 20:
-                indicadores.append("✅ <b>Flujo Libre SALUDABLE</b>: " + f"{pct_flujo:.1f}% - Buena posición financiera")
-            elif pct_flujo >= 10:
-                indicadores.append("⚠️ <b>Flujo Libre AJUSTADO</b>: " + f"{pct_flujo:.1f}% - Margen limitado, requiere atención")
-            elif pct_flujo >= 0:
-                indicadores.append("🚨 <b>Flujo Libre CRÍTICO</b>: " + f"{pct_flujo:.1f}% - Acción urgente requerida")
-            else:
-                indicadores.append("🚨 <b>Flujo NEGATIVO</b>: " + f"{pct_flujo:.1f}% - URGENTE: Gastos superan ingresos")
-            
-            # Indicador de deudas
-            pct_deudas = flujo.get('porcentaje_deudas', 0)
-            if pct_deudas == 0:
-                indicadores.append("✅ <b>Sin Deudas</b>: Excelente posición")
-            elif pct_deudas <= 20:
-                indicadores.append("✅ <b>Deudas Bajo Control</b>: " + f"{pct_deudas:.1f}% del ingreso")
-            elif pct_deudas <= 35:
-                indicadores.append("⚠️ <b>Deudas Moderadas</b>: " + f"{pct_deudas:.1f}% del ingreso - Mantén control")
-            else:
-                indicadores.append("🚨 <b>Deudas Altas</b>: " + f"{pct_deudas:.1f}% del ingreso - Requiere plan de reducción")
-            
-            # Indicador de gastos fijos
-            pct_gastos_fijos = flujo.get('porcentaje_gastos_fijos', 0)
-            if pct_gastos_fijos <= 50:
-                indicadores.append("✅ <b>Gastos Fijos Adecuados</b>: " + f"{pct_gastos_fijos:.1f}% del ingreso")
-            elif pct_gastos_fijos <= 60:
-                indicadores.append("⚠️ <b>Gastos Fijos Elevados</b>: " + f"{pct_gastos_fijos:.1f}% del ingreso")
-            else:
-                indicadores.append("🚨 <b>Gastos Fijos Muy Elevados</b>: " + f"{pct_gastos_fijos:.1f}% - Busca reducirlos")
-            
-            for indicador in indicadores:
-                story.append(Paragraph(f"• {indicador}", styles['Normal']))
-                story.append(Spacer(1, 5))
-            
-        story.append(PageBreak())
-        
-        # ====================================================================
-        # SECCIÓN 3: CAPACIDAD DE AHORRO E INVERSIÓN (NUEVO)
-        # ====================================================================
-        capacidad = datos_completos.get('capacidad_ahorro', {})
-        
-        story.append(Paragraph("3. CAPACIDAD DE AHORRO E INVERSIÓN", subtitle_style))
-        
-        if capacidad:
-            if capacidad.get('ahorro_posible', False):
-                # Tabla de capacidad
-                capacidad_data = [
-                    ["Concepto", "Monto Mensual"],
-                    ["Rango Mínimo de Ahorro", formatear_moneda(capacidad.get('rango_min', 0))],
-                    ["Ahorro Mensual Sugerido", formatear_moneda(capacidad.get('ahorro_sugerido', 0))],
-                    ["Rango Máximo de Ahorro", formatear_moneda(capacidad.get('rango_max', 0))],
-                    ["", ""],
-                    ["Ahorro Mínimo Ideal (5% ingreso)", formatear_moneda(capacidad.get('ahorro_minimo', 0))],
-                    ["Ahorro Óptimo Ideal (10% ingreso)", formatear_moneda(capacidad.get('ahorro_optimo', 0))]
-                ]
-                
-                capacidad_table = Table(capacidad_data, colWidths=[3.5*inch, 2.5*inch])
-                capacidad_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), pdf_colors.HexColor(COLORES['verde_oscuro'])),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), pdf_colors.white),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 10),
-                    ('GRID', (0, 0), (-1, -1), 0.5, pdf_colors.grey),
-                    ('BACKGROUND', (0, 2), (-1, 2), pdf_colors.HexColor(COLORES['amarillo'])),
-                    ('FONTNAME', (0, 2), (-1, 2), 'Helvetica-Bold'),
-                    ('BACKGROUND', (0, 4), (-1, 4), pdf_colors.white),
-                    ('GRID', (0, 4), (-1, 4), 0, pdf_colors.white),
-                    ('BACKGROUND', (0, 5), (-1, 6), pdf_colors.lightgrey)
-                ]))
-                
-                story.append(capacidad_table)
-                story.append(Spacer(1, 0.2*inch))
-                
-                # Mensaje de capacidad
-                mensaje_capacidad = capacidad.get('mensaje', '')
-                story.append(Paragraph(f"<b>Análisis:</b> {mensaje_capacidad}", styles['Normal']))
-                story.append(Spacer(1, 0.2*inch))
-                
-                # Inversión mensual comprometida
-                ingresos = datos_completos.get('ingresos', {})
-                inversion_mensual = ingresos.get('inversion_mensual', 0)
-                
-                if inversion_mensual > 0:
-                    story.append(Paragraph("<b>Inversión Mensual Comprometida:</b> " + 
-                                         formatear_moneda(inversion_mensual), highlight_style))
-                    
-                    # Validar si está dentro del rango
-                    if inversion_mensual <= capacidad.get('rango_max', 0):
-                        validacion_msg = "✅ La inversión comprometida está dentro de la capacidad calculada."
-                    else:
-                        validacion_msg = "⚠️ La inversión comprometida excede la capacidad máxima sugerida."
-                    
-                    story.append(Paragraph(validacion_msg, styles['Normal']))
-                
-            else:
-                # No hay capacidad de ahorro
-                mensaje_sin_capacidad = capacidad.get('mensaje', 'No hay capacidad de ahorro disponible.')
-                
-                warning_text = f"""
-                <para alignment="center" backColor="{COLORES['rojo']}" 
-                      leftIndent="10" rightIndent="10" spaceBefore="5" spaceAfter="5">
-                <font size="12" color="white"><b>⚠️ SIN CAPACIDAD DE AHORRO</b></font><br/>
-                <font size="10" color="white">{mensaje_sin_capacidad}</font>
-                </para>
-                """
-                story.append(Paragraph(warning_text, styles['Normal']))
-                story.append(Spacer(1, 0.2*inch))
-                
-                story.append(Paragraph("<b>Recomendación Urgente:</b>", highlight_style))
-                story.append(Paragraph("Es necesario estabilizar la situación financiera antes de realizar inversiones:", 
-                                     styles['Normal']))
-                story.append(Paragraph("• Reducir gastos no esenciales", styles['Normal']))
-                story.append(Paragraph("• Generar un plan de pago de deudas", styles['Normal']))
-                story.append(Paragraph("• Buscar formas de aumentar ingresos", styles['Normal']))
-        
-        story.append(PageBreak())
-        
-        # ====================================================================
-        # SECCIÓN 4: PROTECCIÓN FINANCIERA
-        # ====================================================================
-        proteccion = datos_completos.get('proteccion', {})
-        
-        if proteccion.get('aplica', False):
-            story.append(Paragraph("4. PROTECCIÓN FINANCIERA", subtitle_style))
-            
-            proteccion_data = [
-                ["Concepto", "Detalle"],
-                ["Presupuesto Mensual Familiar", formatear_moneda(proteccion.get('presupuesto_mensual', 0))],
-                ["Presupuesto Anual", formatear_moneda(proteccion.get('presupuesto_anual', 0))],
-                ["Monto de Protección Sugerido (10 años)", formatear_moneda(proteccion.get('monto_proteccion_sugerido', 0))],
-                ["Responsable Principal", proteccion.get('responsable1', 'N/A')],
-                ["Responsable Secundario", proteccion.get('responsable2', 'N/A') if proteccion.get('responsable2') else 'N/A']
-            ]
-            
-            proteccion_table = Table(proteccion_data, colWidths=[3*inch, 3*inch])
-            proteccion_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), pdf_colors.HexColor(COLORES['azul_principal'])),
-                ('TEXTCOLOR', (0, 0), (-1, 0), pdf_colors.white),
-                ('BACKGROUND', (0, 1), (0, -1), pdf_colors.HexColor(COLORES['azul_claro'])),
-                ('TEXTCOLOR', (0, 1), (0, -1), pdf_colors.white),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('GRID', (0, 0), (-1, -1), 1, pdf_colors.grey),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-                ('TOPPADDING', (0, 0), (-1, -1), 8)
-            ]))
-            
-            story.append(proteccion_table)
-            story.append(Spacer(1, 0.2*inch))
-            
-            reflexion = proteccion.get('reflexion', '')
-            if reflexion:
-                story.append(Paragraph("<b>Reflexión del Cliente:</b>", highlight_style))
-                story.append(Paragraph(reflexion, styles['Normal']))
-            
-            story.append(Spacer(1, 0.3*inch))
-        
-        # ====================================================================
-        # SECCIÓN 5: PLAN DE RETIRO
-        # ====================================================================
-        retiro = datos_completos.get('retiro', {})
-        
-        if retiro.get('ingreso_mensual_retiro', 0) > 0:
-            story.append(Paragraph("5. PLAN DE RETIRO", subtitle_style))
-            
-            retiro_data = [
-                ["Concepto", "Valor"],
-                ["Edad Actual", f"{datos_gen.get('edad', 'N/A')} años"],
-                ["Edad de Retiro Deseada", f"{retiro.get('edad_retiro', 'N/A')} años"],
-                ["Años para el Retiro", f"{retiro.get('anos_para_retiro', 'N/A')} años"],
-                ["Años en Retiro (estimado)", f"{retiro.get('anos_en_retiro', 'N/A')} años"],
-                ["Ingreso Mensual Deseado en Retiro", formatear_moneda(retiro.get('ingreso_mensual_retiro', 0))],
-                ["Ingreso Anual en Retiro", formatear_moneda(retiro.get('monto_anual_retiro', 0))],
-                ["Monto Total Requerido", formatear_moneda(retiro.get('monto_total_retiro', 0))],
-                ["Ahorro Mensual Sugerido", formatear_moneda(retiro.get('ahorro_mensual_sugerido', 0))]
-            ]
-            
-            retiro_table = Table(retiro_data, colWidths=[3.5*inch, 2.5*inch])
-            retiro_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), pdf_colors.HexColor(COLORES['verde_oscuro'])),
-                ('TEXTCOLOR', (0, 0), (-1, 0), pdf_colors.white),
-                ('BACKGROUND', (0, 1), (0, -1), pdf_colors.HexColor(COLORES['azul_claro'])),
-                ('TEXTCOLOR', (0, 1), (0, -1), pdf_colors.white),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
-                ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-                ('BACKGROUND', (0, -1), (-1, -1), pdf_colors.HexColor(COLORES['amarillo'])),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('GRID', (0, 0), (-1, -1), 1, pdf_colors.grey),
-                ('ALIGN', (1, 0), (1, -1), 'RIGHT')
-            ]))
-            
-            story.append(retiro_table)
-            story.append(Spacer(1, 0.3*inch))
-        
-        # ====================================================================
-        # SECCIÓN 6: EDUCACIÓN
-        # ====================================================================
-        educacion = datos_completos.get('educacion', {})
-        
-        if educacion.get('aplica', False):
-            story.append(Paragraph("6. PLAN DE EDUCACIÓN", subtitle_style))
-            
-            hijos_educacion = educacion.get('hijos', [])
-            if hijos_educacion:
-                for i, hijo in enumerate(hijos_educacion, 1):
-                    story.append(Paragraph(f"<b>Hijo {i}: {hijo.get('nombre', 'N/A')}</b> ({hijo.get('edad', 'N/A')} años)", 
-                                         highlight_style))
-                    
-                    hijo_data = [
-                        ["Concepto", "Valor"],
-                        ["Años hasta Universidad", f"{hijo.get('anos_restantes', 'N/A')} años"],
-                        ["Costo Anual Estimado Universidad", formatear_moneda(hijo.get('costo_anual', 0))],
-                        ["Costo Total (4 años)", formatear_moneda(hijo.get('costo_total', 0))],
-                        ["Ahorro Mensual Sugerido", formatear_moneda(hijo.get('ahorro_mensual', 0))]
-                    ]
-                    
-                    hijo_table = Table(hijo_data, colWidths=[3.5*inch, 2.5*inch])
-                    hijo_table.setStyle(TableStyle([
-                        ('BACKGROUND', (0, 0), (-1, 0), pdf_colors.HexColor(COLORES['verde_agua'])),
-                        ('TEXTCOLOR', (0, 0), (-1, 0), pdf_colors.white),
-                        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                        ('FONTSIZE', (0, 0), (-1, -1), 9),
-                        ('GRID', (0, 0), (-1, -1), 0.5, pdf_colors.grey),
-                        ('ALIGN', (1, 0), (1, -1), 'RIGHT')
-                    ]))
-                    
-                    story.append(hijo_table)
-                    story.append(Spacer(1, 0.15*inch))
-            
-            # Total de educación
-            story.append(Paragraph("<b>Resumen Total de Educación:</b>", highlight_style))
-            total_educacion = [
-                ["Inversión Total en Educación", formatear_moneda(educacion.get('monto_total_educacion', 0))],
-                ["Ahorro Mensual Total Sugerido", formatear_moneda(educacion.get('ahorro_mensual_total', 0))]
-            ]
-            
-            total_edu_table = Table(total_educacion, colWidths=[3.5*inch, 2.5*inch])
-            total_edu_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, -1), pdf_colors.HexColor(COLORES['amarillo'])),
-                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('GRID', (0, 0), (-1, -1), 1, pdf_colors.grey),
-                ('ALIGN', (1, 0), (1, -1), 'RIGHT')
-            ]))
-            
-            story.append(total_edu_table)
-            story.append(Spacer(1, 0.3*inch))
-        
-        # ====================================================================
-        # SECCIÓN 7: PROYECTO / AHORRO
-        # ====================================================================
-        ahorro = datos_completos.get('ahorro', {})
-        
-        if ahorro.get('tiene_proyecto') == 'Sí':
-            story.append(Paragraph("7. PROYECTO PERSONAL", subtitle_style))
-            
-            proyecto_data = [
-                ["Concepto", "Detalle"],
-                ["Descripción del Proyecto", ahorro.get('descripcion', 'N/A')],
-                ["Costo Total del Proyecto", formatear_moneda(ahorro.get('costo', 0))],
-                ["Ahorro Actual Disponible", formatear_moneda(ahorro.get('ahorro_actual', 0))],
-                ["Inversión Requerida", formatear_moneda(ahorro.get('inversion_requerida', 0))],
-                ["Plazo", f"{ahorro.get('plazo_anos', 'N/A')} años"],
-                ["Ahorro Mensual Sugerido", formatear_moneda(ahorro.get('ahorro_mensual_sugerido', 0))]
-            ]
-            
-            proyecto_table = Table(proyecto_data, colWidths=[3*inch, 3*inch])
-            proyecto_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), pdf_colors.HexColor(COLORES['verde_oscuro'])),
-                ('TEXTCOLOR', (0, 0), (-1, 0), pdf_colors.white),
-                ('BACKGROUND', (0, 1), (0, -1), pdf_colors.HexColor(COLORES['azul_claro'])),
-                ('TEXTCOLOR', (0, 1), (0, -1), pdf_colors.white),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('GRID', (0, 0), (-1, -1), 1, pdf_colors.grey)
-            ]))
-            
-            story.append(proyecto_table)
-            story.append(Spacer(1, 0.3*inch))
-        
-        story.append(PageBreak())
-        
-        # ====================================================================
-        # SECCIÓN 8: RECOMENDACIONES PERSONALIZADAS (BASADAS EN FLUJO FINANCIERO)
-        # ====================================================================
-        story.append(Paragraph("8. RECOMENDACIONES PERSONALIZADAS", subtitle_style))
-        
-        # Importar función de recomendaciones si está disponible
-        try:
-            from modulo_financiero import generar_recomendaciones_financieras
-            
-            if flujo and capacidad:
-                recomendaciones = generar_recomendaciones_financieras(flujo, capacidad)
-                
-                story.append(Paragraph("Basándose en el análisis de tu flujo financiero y capacidad de ahorro, " +
-                                     "se sugieren las siguientes acciones priorizadas:", styles['Normal']))
-                story.append(Spacer(1, 0.15*inch))
-                
-                for i, rec in enumerate(recomendaciones[:10], 1):  # Máximo 10 en PDF
-                    story.append(Paragraph(f"{i}. {rec}", styles['Normal']))
-                    story.append(Spacer(1, 8))
-        
-        except ImportError:
-            # Si no hay módulo, usar recomendaciones básicas
-            story.append(Paragraph("Recomendaciones generales basadas en tu perfil financiero:", styles['Normal']))
-            story.append(Spacer(1, 0.15*inch))
-            
-            recomendaciones_basicas = [
-                "Mantén un registro detallado de tus gastos mensuales",
-                "Establece un fondo de emergencia equivalente a 3-6 meses de gastos",
-                "Revisa y ajusta tu presupuesto periódicamente",
-                "Considera diversificar tus fuentes de ingreso",
-                "Planifica tus objetivos financieros a corto, mediano y largo plazo"
-            ]
-            
-            for i, rec in enumerate(recomendaciones_basicas, 1):
-                story.append(Paragraph(f"{i}. {rec}", styles['Normal']))
-                story.append(Spacer(1, 8))
-        
-        story.append(Spacer(1, 0.3*inch))
-        
-        # ====================================================================
-        # RESUMEN EJECUTIVO
-        # ====================================================================
-        story.append(Paragraph("RESUMEN EJECUTIVO", subtitle_style))
-        
-        resumen_text = f"""
-        Este reporte presenta un análisis integral de la situación financiera de {datos_gen.get('nombre', 'el cliente')}.
-        
-        <b>Estado Financiero Actual:</b> {flujo.get('semaforo', '')} {flujo.get('estado_financiero', 'N/A').upper()}
-        
-        <b>Puntos Clave:</b>
-        • Flujo libre mensual: {formatear_moneda(flujo.get('flujo_libre', 0))} ({flujo.get('porcentaje_flujo', 0):.1f}% del ingreso)
-        • Capacidad de ahorro: {formatear_moneda(capacidad.get('ahorro_sugerido', 0)) if capacidad.get('ahorro_posible') else '$0.00'} mensuales
-        • Inversión comprometida: {formatear_moneda(datos_completos.get('ingresos', {}).get('inversion_mensual', 0))}
-        
-        <b>Próximos Pasos:</b>
-        1. Implementar las recomendaciones priorizadas
-        2. Establecer seguimiento mensual del flujo financiero
-        3. Ajustar plan según evolución de la situación
-        4. Programar revisión trimestral
-        """
-        
-        story.append(Paragraph(resumen_text, styles['Normal']))
-        
-        # ====================================================================
-        # FOOTER
-        # Reporte generado: {datetime.now().strftime('%d/%m/%Y a las %H:%M')}
-        # ====================================================================
-        story.append(Spacer(1, 0.5*inch))
-        
-        footer_text = f"""
-        <para alignment="center">
-        <font size="8" color="gray">
-       
-        Asesoría Financiera Rizkora - Análisis Integral de Finanzas Personales<br/>
-        Este reporte es confidencial y para uso exclusivo del cliente.<br/>
-        <br/>
-        <i>Nota: Los montos y recomendaciones son estimados basados en la información proporcionada.
-        Se recomienda una sesión de seguimiento para revisar opciones de ahorro/inversión específicas.</i>
-        </font>
-        </para>
-        """
-        
-        story.append(Paragraph(footer_text, styles['Normal']))
+        story = construir_story(datos_completos, conjunto=conjunto, usar_cache=usar_cache, perfil=perfil)
         
         # Construir PDF
-        doc.build(story)
+        with codificacion_perfil(perfil):
+            doc.build(story)
         buffer.seek(0)
         
         return buffer
@@ -865,6 +1000,50 @@ def generar_pdf_asesoria_mejorado(datos_completos):
         return None
 
 
+def generar_pdf_asesoria_mejorado(datos_completos, usar_cache=True, perfil=PERFIL_PREDETERMINADO):
+    """
+    Genera PDF completo con análisis financiero incluido
+    
+    Parameters:
+    -----------
+    datos_completos : dict
+        Diccionario completo con todos los datos de st.session_state.datos
+        Debe incluir las claves: 'datos_generales', 'perfil_familiar', 'ingresos',
+        'flujo_financiero', 'capacidad_ahorro', 'proteccion', 'retiro', 'educacion', 'ahorro'
+    
+    Returns:
+    --------
+    BytesIO : Buffer con el PDF generado
+    """
+    return generar_reporte(datos_completos, 'completo', usar_cache=usar_cache, perfil=perfil)
+
+
+def generar_grafico_necesidades_perfil(necesidades, perfil=PERFIL_PREDETERMINADO):
+    """
+    Gráfico de necesidades (descarga del paso 9) rasterizado con el perfil de salida.
+
+    Returns:
+    --------
+    BytesIO : Imagen del gráfico, o None si hubo un error
+    """
+    return generar_grafico_necesidades(necesidades, **_perfil(perfil)['grafico'])
+
+
+def tamanos_por_perfil(datos_completos, conjunto='completo'):
+    """
+    Genera el reporte con cada perfil de salida y devuelve su tamaño.
+
+    Returns:
+    --------
+    dict : {perfil: bytes del PDF} (None si el perfil falló)
+    """
+    tamanos = {}
+    for perfil in PERFILES_SALIDA:
+        buffer = generar_reporte(datos_completos, conjunto, perfil=perfil)
+        tamanos[perfil] = len(buffer.getvalue()) if buffer else None
+    return tamanos
+
+
 # ====================================================================
 # EJEMPLO DE USO
 # ====================================================================
@@ -1016,5 +1195,7 @@ if __name__ == "__main__":
         with open('ejemplo_reporte_financiero.pdf', 'wb') as f:
             f.write(pdf_buffer.getvalue())
         print("✅ PDF generado exitosamente: ejemplo_reporte_financiero.pdf")
+        for perfil, tamano in tamanos_por_perfil(datos_ejemplo).items():
+            print(f"   perfil {perfil}: {tamano / 1024:.1f} KB")
     else:
         print("❌ Error al generar PDF")
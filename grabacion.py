@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+"""
+GRABACIÓN Y REPRODUCCIÓN DE SESIONES
+Trazas anónimas de asesorías reales para benchmarks con tráfico de producción
+
+Grabación (opt-in): con RIZKORA_GRABACION=<directorio>, cada envío de paso
+(navegar_a_paso y el cierre del paso 9) agrega una línea JSONL con los datos
+de la sesión en ese momento, anonimizados:
+
+    {"sesion": "3f9a...", "secuencia": 4, "momento": 1791234567.2, "t": 312.4,
+     "paso_origen": 4, "paso_destino": 5, "datos": {...}}
+
+Los textos libres (nombres, teléfono, correo, comentarios...) se sustituyen
+por texto con la misma forma (dígitos → 0, letras → x), así los reportes
+ocupan lo mismo que los reales; los montos y respuestas Sí/No se conservan.
+Los cuasi-identificadores se generalizan: edades (cliente, pareja, hijos,
+dependientes, referidos) al quinquenio, la fecha de nacimiento al 1 de enero
+de su año, las fechas de asesoría y segunda cita al día 1 del mes y la hora de
+la segunda cita a la hora en punto. El agente se sustituye por un seudónimo
+estable para poder agrupar por agente; la sal RIZKORA_GRABACION_SAL es
+obligatoria, y sin ella la grabación queda deshabilitada.
+
+Reproducción:
+    python grabacion.py trazas/ --aceleracion 10 --hilos 4
+
+Vuelve a pasar cada envío por el motor financiero y los generadores de
+reportes respetando los tiempos entre envíos (divididos entre la
+aceleración; 0 = lo más rápido posible) y reporta p50/p95 por operación.
+"""
+
+import argparse
+import glob
+import hashlib
+import os
+import statistics
+import threading
+import time
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time as hora
+
+from modelo_datos import RegistroDict, restaurar_registros
+from serializacion import a_json_bytes, leer_fecha, leer_jsonl
+
+# Campos de texto libre que pueden identificar al cliente o a terceros
+CAMPOS_TEXTO_LIBRE = frozenset({
+    'nombre', 'telefono', 'correo', 'ocupacion', 'nombre_pareja',
+    'responsable1', 'responsable2', 'reflexion', 'descripcion',
+    'satisfaccion', 'parentesco', 'comentarios'
+})
+
+# Fechas que se generalizan al día 1 del mes (fecha_nacimiento va al 1 de enero)
+CAMPOS_FECHA_MES = frozenset({'fecha_asesoria', 'fecha_segunda_cita'})
+
+# Edades (cliente, hijos, dependientes, referidos y pareja) y los plazos que se
+# calculan a partir de ellas → inicio del quinquenio
+CAMPOS_EDAD = frozenset({'edad', 'edad_pareja', 'anos_para_retiro', 'anos_restantes'})
+AMPLITUD_EDAD = 5
+
+_lock_grabacion = threading.Lock()
+_aviso_sin_sal = False
+
+# ================================
+# ANONIMIZACIÓN
+# ================================
+
+def _sal_seudonimos():
+    sal = os.environ.get('RIZKORA_GRABACION_SAL')
+    if not sal:
+        raise RuntimeError("RIZKORA_GRABACION_SAL no está configurada; es obligatoria para grabar trazas")
+    return sal
+
+
+def seudonimo(valor, prefijo):
+    """Seudónimo estable e irreversible de `valor` (mismo valor y sal → mismo seudónimo)."""
+    digest = hashlib.sha256(f"{_sal_seudonimos()}:{valor}".encode('utf-8')).hexdigest()
+    return f"{prefijo} {digest[:8]}"
+
+
+def _enmascarar(texto):
+    """Misma longitud y puntuación: dígitos → 0, letras → x."""
+    return ''.join('0' if c.isdigit() else 'x' if c.isalpha() else c for c in texto)
+
+
+def _generalizar_fecha(valor, clave):
+    """Fecha de nacimiento → 1 de enero de su año; fechas de cita → día 1 del mes."""
+    fecha = leer_fecha(valor)
+    if fecha is None:
+        return None
+    if clave == 'fecha_nacimiento':
+        return date(fecha.year, 1, 1)
+    return date(fecha.year, fecha.month, 1)
+
+
+def _generalizar_hora(valor):
+    """Hora → hora en punto (None si no se puede leer)."""
+    if isinstance(valor, str):
+        try:
+            valor = hora.fromisoformat(valor)
+        except ValueError:
+            return None
+    return valor.replace(minute=0, second=0, microsecond=0)
+
+
+def anonimizar(valor, clave=None):
+    """
+    Copia anonimizada de la asesoría (o de cualquier parte de ella).
+
+    Parameters:
+    -----------
+    valor : dict, list o escalar
+        st.session_state.datos o una de sus secciones
+    clave : str
+        Nombre del campo que contiene `valor` (decide cómo se anonimiza)
+    """
+    if isinstance(valor, RegistroDict):
+        valor = valor.como_compacto()  # Misma forma compacta que las exportaciones
+    if isinstance(valor, Mapping):
+        return {k: anonimizar(v, k) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [anonimizar(v, clave) for v in valor]
+    if valor is None or valor == '':
+        return valor
+    if clave in CAMPOS_EDAD and isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return int(valor) // AMPLITUD_EDAD * AMPLITUD_EDAD
+    if clave == 'fecha_nacimiento' or clave in CAMPOS_FECHA_MES:
+        return _generalizar_fecha(valor, clave)
+    if clave == 'hora_segunda_cita':
+        return _generalizar_hora(valor)
+    if not isinstance(valor, str):
+        return valor
+    if clave == 'nombre_agente':
+        return seudonimo(valor, 'Agente')
+    if clave in CAMPOS_TEXTO_LIBRE:
+        return _enmascarar(valor)
+    return valor
+
+# ================================
+# GRABACIÓN
+# ================================
+
+def directorio_grabacion():
+    """
+    Directorio de RIZKORA_GRABACION, o None si la grabación está deshabilitada.
+
+    Sin RIZKORA_GRABACION_SAL la grabación se deshabilita (con un aviso): una
+    sal aleatoria por proceso daría seudónimos distintos en cada réplica.
+    """
+    global _aviso_sin_sal
+    directorio = os.environ.get('RIZKORA_GRABACION') or None
+    if directorio is not None and not os.environ.get('RIZKORA_GRABACION_SAL'):
+        if not _aviso_sin_sal:
+            print("RIZKORA_GRABACION está configurada sin RIZKORA_GRABACION_SAL; la grabación queda deshabilitada")
+            _aviso_sin_sal = True
+        return None
+    return directorio
+
+
+def grabar_envio(token_sesion, secuencia, t, paso_origen, paso_destino, datos, directorio=None):
+    """
+    Agrega un envío de paso a la traza del día (un archivo por proceso).
+
+    Parameters:
+    -----------
+    token_sesion : str
+        Token de la sesión; solo se guarda su hash
+    secuencia : int
+        Número de envío dentro de la sesión
+    t : float
+        Segundos desde el primer envío de la sesión
+    paso_origen, paso_destino : int
+        Paso enviado y paso al que se navega (None al finalizar la asesoría)
+    datos : dict
+        st.session_state.datos (se anonimiza antes de escribir)
+
+    Returns:
+    --------
+    str : Ruta del archivo de la traza, o None si la grabación está deshabilitada
+    """
+    directorio = directorio or directorio_grabacion()
+    if directorio is None:
+        return None
+
+    registro = {
+        'sesion': hashlib.sha256(token_sesion.encode('utf-8')).hexdigest()[:16],
+        'secuencia': secuencia,
+        'momento': round(time.time(), 3),
+        't': round(t, 3),
+        'paso_origen': paso_origen,
+        'paso_destino': paso_destino,
+        'datos': anonimizar(datos)
+    }
+    linea = a_json_bytes(registro) + b'\n'
+
+    ruta = os.path.join(directorio, f"grabacion_{date.today():%Y%m%d}_{os.getpid()}.jsonl")
+    with _lock_grabacion:
+        os.makedirs(directorio, exist_ok=True)
+        with open(ruta, 'ab') as archivo:
+            archivo.write(linea)
+    return ruta
+
+# ================================
+# REPRODUCCIÓN
+# ================================
+
+def leer_trazas(origen):
+    """Envíos grabados de un archivo o de todos los *.jsonl de un directorio, en orden de llegada."""
+    rutas = sorted(glob.glob(os.path.join(origen, '*.jsonl'))) if os.path.isdir(origen) else [origen]
+    envios = [registro for ruta in rutas for registro in leer_jsonl(ruta)]
+    envios.sort(key=lambda registro: (registro['momento'], registro['sesion'], registro['secuencia']))
+    return envios
+
+
+def procesar_envio(envio):
+    """
+    Repite el trabajo que la app hace tras el envío y devuelve sus tiempos.
+
+    - Paso 3: recalcula flujo y capacidad de ahorro y genera el reporte parcial
+    - Pasos 4 a 8: detecta necesidades (resumen del paso 8, guardado en Sheets)
+    - Cierre: reporte completo y gráfico de necesidades
+
+    Returns:
+    --------
+    dict : {operación: segundos}
+    """
+    from generar_pdf_mejorado import generar_reporte
+    from graficos import generar_grafico_necesidades
+    from modulo_financiero import (
+        calcular_capacidad_ahorro,
+        calcular_flujo_financiero,
+        detectar_necesidades_financieras
+    )
+
+    datos = restaurar_registros(envio['datos'])
+    paso = envio['paso_origen']
+    tiempos = {}
+
+    def medir(operacion, funcion, *args, **kwargs):
+        inicio = time.perf_counter()
+        resultado = funcion(*args, **kwargs)
+        tiempos[operacion] = time.perf_counter() - inicio
+        return resultado
+
+    if paso == 3 and datos.get('flujo_financiero'):
+        flujo = datos['flujo_financiero']
+        flujo = medir('motor', calcular_flujo_financiero, datos['ingresos'].get('ingreso_mensual', 0),
+                      flujo.get('detalle_gastos_fijos', {}), flujo.get('detalle_gastos_variables', {}),
+                      flujo.get('detalle_deudas', {}))
+        calcular_capacidad_ahorro(flujo)
+        medir('pdf parcial', generar_reporte, datos, 'parcial', usar_cache=False)
+    elif envio['paso_destino'] is None:
+        necesidades = medir('motor', detectar_necesidades_financieras, datos)
+        medir('pdf completo', generar_reporte, datos, 'completo', usar_cache=False)
+        medir('grafico', generar_grafico_necesidades, necesidades)
+    elif paso >= 4:
+        medir('motor', detectar_necesidades_financieras, datos)
+    return tiempos
+
+
+def reproducir(origen, aceleracion=1.0, hilos=4):
+    """
+    Reproduce las trazas grabadas respetando sus tiempos relativos.
+
+    Parameters:
+    -----------
+    origen : str
+        Archivo JSONL o directorio de trazas
+    aceleracion : float
+        Factor de aceleración del reloj (10 = diez veces más rápido); 0 = sin esperas
+    hilos : int
+        Envíos procesados en paralelo (como sesiones simultáneas del servidor)
+
+    Returns:
+    --------
+    dict : {operación: [segundos, ...]} más 'retraso' (atraso frente al horario);
+        los envíos que fallan se reportan y no entran en los tiempos
+    """
+    envios = leer_trazas(origen)
+    if not envios:
+        print(f"Sin trazas en {origen}")
+        return {}
+
+    resultados = {'retraso': []}
+    lock = threading.Lock()
+    inicio_traza = envios[0]['momento']
+    inicio = time.perf_counter()
+
+    def ejecutar(envio, programado):
+        retraso = max(0.0, time.perf_counter() - programado)
+        tiempos = procesar_envio(envio)
+        with lock:
+            resultados['retraso'].append(retraso)
+            for operacion, segundos in tiempos.items():
+                resultados.setdefault(operacion, []).append(segundos)
+
+    futuros = []
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        for envio in envios:
+            programado = inicio
+            if aceleracion:
+                programado += (envio['momento'] - inicio_traza) / aceleracion
+                espera = programado - time.perf_counter()
+                if espera > 0:
+                    time.sleep(espera)
+            futuros.append((envio, pool.submit(ejecutar, envio, programado)))
+    duracion = time.perf_counter() - inicio
+
+    fallidos = 0
+    for envio, futuro in futuros:
+        try:
+            futuro.result()
+        except Exception as e:
+            fallidos += 1
+            print(f"Error al reproducir el envío del paso {envio.get('paso_origen')} "
+                  f"(sesión {envio.get('sesion')}): {e}")
+
+    sesiones = len({envio['sesion'] for envio in envios})
+    print(f"Reproducción: {len(envios)} envíos de {sesiones} sesiones en {duracion:.1f} s "
+          f"(aceleración {aceleracion or 'máxima'}, {hilos} hilos)")
+    if fallidos:
+        print(f"  {fallidos} de {len(envios)} envíos fallaron")
+    for operacion, valores in resultados.items():
+        if not valores:
+            continue
+        valores = sorted(valor * 1000 for valor in valores)
+        p95 = valores[min(len(valores) - 1, int(len(valores) * 0.95))]
+        print(f"  {operacion:<14} mediana {statistics.median(valores):9.1f} ms   "
+              f"p95 {p95:9.1f} ms   (n={len(valores)})")
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reproduce trazas grabadas con RIZKORA_GRABACION")
+    parser.add_argument('origen', help="Archivo JSONL o directorio de trazas")
+    parser.add_argument('--aceleracion', type=float, default=1.0,
+                        help="Factor de aceleración del reloj (0 = sin esperas)")
+    parser.add_argument('--hilos', type=int, default=4, help="Envíos procesados en paralelo")
+    args = parser.parse_args()
+
+    reproducir(args.origen, args.aceleracion, args.hilos)
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+GRÁFICOS DE LA ASESORÍA
+Gráficos de matplotlib para los reportes PDF y las descargas de la app
+
+Se usa la API orientada a objetos (Figure + FigureCanvasAgg) en lugar de
+pyplot: cada llamada crea su propia figura, que no se registra en el
+administrador global de figuras de pyplot. Así las sesiones de Streamlit
+(un hilo por sesión) o un pool de hilos pueden generar gráficos en paralelo
+sin carreras y sin plt.close().
+
+Cada figura vive dentro del contexto _figura(), que la vacía al salir aunque
+el gráfico falle a medio camino; así un servidor de larga duración no
+acumula figuras (ni buffers) de renders fallidos.
+"""
+
+from contextlib import contextmanager
+from io import BytesIO
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from estilos_pdf import COLORES
+
+# ================================
+# FIGURAS
+# ================================
+
+
+@contextmanager
+def _figura(tamano):
+    """
+    Figura independiente de pyplot con su propio canvas Agg.
+
+    Al salir, con o sin excepción, se vacían ejes y artistas: rompe los ciclos
+    de referencias figura ↔ ejes ↔ artistas para que la memoria se libere por
+    conteo de referencias, sin esperar al recolector de ciclos.
+    """
+    fig = Figure(figsize=tamano)
+    FigureCanvasAgg(fig)
+    try:
+        yield fig
+    finally:
+        fig.clear()
+
+
+def _guardar_grafico(fig, formato='png', dpi=150, calidad=None):
+    """Guarda la figura en un buffer con el formato/resolución del perfil de salida."""
+    buffer = BytesIO()
+    extra = {'pil_kwargs': {'quality': calidad}} if formato == 'jpeg' and calidad else {}
+    try:
+        # FigureCanvasAgg.print_figure, sin pasar por el backend de pyplot
+        fig.savefig(buffer, format=formato, dpi=dpi, bbox_inches='tight', **extra)
+    except Exception:
+        buffer.close()
+        raise
+    buffer.seek(0)
+    return buffer
+
+
+def generar_grafico_flujo_financiero(flujo_financiero, formato='png', dpi=150, calidad=None):
+    """
+    Genera un gráfico visual del flujo financiero
+
+    Parameters:
+    -----------
+    flujo_financiero : dict
+        st.session_state.datos['flujo_financiero']
+    formato, dpi, calidad :
+        Salida de la imagen (ver PERFILES_SALIDA['...']['grafico']); la figura
+        mide 10" de ancho y en el PDF se dibuja a 6", así que la resolución
+        efectiva en la página es dpi × 1.67
+    """
+    try:
+        with _figura((10, 4)) as fig:
+            ax1, ax2 = fig.subplots(1, 2)
+        
+            # Gráfico 1: Distribución de gastos (pastel)
+            categorias = []
+            valores = []
+            colores_grafico = []
+        
+            if flujo_financiero.get('gastos_fijos', 0) > 0:
+                categorias.append('Gastos\nFijos')
+                valores.append(flujo_financiero['gastos_fijos'])
+                colores_grafico.append(COLORES['azul_claro'])
+        
+            if flujo_financiero.get('gastos_variables', 0) > 0:
+                categorias.append('Gastos\nVariables')
+                valores.append(flujo_financiero['gastos_variables'])
+                colores_grafico.append(COLORES['verde_agua'])
+        
+            if flujo_financiero.get('deudas', 0) > 0:
+                categorias.append('Deudas')
+                valores.append(flujo_financiero['deudas'])
+                colores_grafico.append(COLORES['rojo'])
+        
+            if flujo_financiero.get('flujo_libre', 0) > 0:
+                categorias.append('Flujo\nLibre')
+                valores.append(flujo_financiero['flujo_libre'])
+                colores_grafico.append(COLORES['verde'])
+        
+            if valores:
+                wedges, texts, autotexts = ax1.pie(
+                    valores,
+                    labels=categorias,
+                    colors=colores_grafico,
+                    autopct='%1.1f%%',
+                    startangle=90,
+                    textprops={'fontsize': 8, 'weight': 'bold'}
+                )
+            
+                for autotext in autotexts:
+                    autotext.set_color('white')
+                    autotext.set_fontsize(8)
+        
+            ax1.set_title('Distribución del Ingreso', fontsize=10, fontweight='bold', pad=10)
+        
+            # Gráfico 2: Comparación de porcentajes (barras horizontales)
+            categorias_pct = ['G. Fijos', 'G. Variables', 'Deudas', 'Flujo Libre']
+            valores_pct = [
+                flujo_financiero.get('porcentaje_gastos_fijos', 0),
+                flujo_financiero.get('porcentaje_gastos_variables', 0),
+                flujo_financiero.get('porcentaje_deudas', 0),
+                flujo_financiero.get('porcentaje_flujo', 0)
+            ]
+            colores_barras = [COLORES['azul_claro'], COLORES['verde_agua'], COLORES['rojo'], COLORES['verde']]
+        
+            bars = ax2.barh(categorias_pct, valores_pct, color=colores_barras, edgecolor='black', linewidth=1)
+        
+            # Agregar valores en las barras
+            for i, (bar, val) in enumerate(zip(bars, valores_pct)):
+                width = bar.get_width()
+                ax2.text(width + 1, bar.get_y() + bar.get_height()/2, 
+                        f'{val:.1f}%', ha='left', va='center', fontsize=8, fontweight='bold')
+        
+            ax2.set_xlabel('Porcentaje del Ingreso (%)', fontsize=9, fontweight='bold')
+            ax2.set_title('Análisis por Categoría', fontsize=10, fontweight='bold', pad=10)
+            ax2.set_xlim(0, max(valores_pct) + 15)
+            ax2.grid(axis='x', alpha=0.3, linestyle='--')
+        
+            fig.tight_layout()
+        
+            # Guardar en buffer
+            buffer = _guardar_grafico(fig, formato, dpi, calidad)
+        
+            return buffer
+        
+    except Exception as e:
+        print(f"Error al generar gráfico de flujo: {str(e)}")
+        return None
+
+
+def generar_grafico_necesidades(necesidades, formato='png', dpi=150, calidad=None):
+    """
+    Genera el gráfico de pastel con la distribución de necesidades
+    
+    Parameters:
+    -----------
+    necesidades : dict
+        Resultado de detectar_necesidades_financieras()
+    formato, dpi, calidad :
+        Salida de la imagen (ver PERFILES_SALIDA)
+    
+    Returns:
+    --------
+    BytesIO : PNG del gráfico, o None si no hay necesidades con monto
+    """
+    try:
+        # Filtrar solo necesidades con monto > 0
+        labels = []
+        valores = []
+        colores = []
+        
+        color_map = {
+            'proteccion': COLORES['azul_principal'],
+            'retiro': COLORES['verde_oscuro'],
+            'educacion': COLORES['verde_agua'],
+            'ahorro': COLORES['amarillo']
+        }
+        
+        nombre_map = {
+            'proteccion': 'Protección',
+            'retiro': 'Retiro',
+            'educacion': 'Educación',
+            'ahorro': 'Ahorro/Proyecto'
+        }
+        
+        for key, valor in necesidades['montos'].items():
+            if valor > 0:
+                labels.append(nombre_map[key])
+                valores.append(valor)
+                colores.append(color_map[key])
+        
+        if not valores:
+            return None
+        
+        # Crear gráfico de pastel
+        with _figura((10, 6)) as fig:
+            ax = fig.subplots()
+            wedges, texts, autotexts = ax.pie(
+                valores,
+                labels=labels,
+                colors=colores,
+                autopct='%1.1f%%',
+                startangle=90,
+                textprops={'fontsize': 11, 'weight': 'bold'}
+            )
+        
+            ax.set_title('Distribución de Necesidades Financieras', 
+                        fontsize=14, 
+                        fontweight='bold',
+                        color=COLORES['azul_principal'],
+                        pad=20)
+        
+            # Mejorar estilo
+            for autotext in autotexts:
+                autotext.set_color('white')
+                autotext.set_fontsize(10)
+                autotext.set_weight('bold')
+        
+            fig.tight_layout()
+        
+            # Guardar en buffer
+            buffer = _guardar_grafico(fig, formato, dpi, calidad)
+        
+            return buffer
+        
+    except Exception as e:
+        print(f"Error al generar gráfico de necesidades: {str(e)}")
+        return None
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""
+LIBRO PDF DE ASESORÍAS
+Un solo PDF por agente y día con todas las asesorías cerradas, con índice y marcadores
+
+Las asesorías se leen en streaming de un JSONL exportado (serializacion.
+escribir_jsonl) y cada cliente se arma con el mismo motor de reportes
+(generar_pdf_mejorado, conjunto 'completo'). En memoria solo vive la story
+de un cliente a la vez: StoryPerezosa la va rellenando a medida que
+ReportLab consume los flowables.
+
+El índice necesita dos pasadas (multiBuild): la primera registra en qué
+página cae cada cliente y sección, la segunda dibuja el índice con esos
+números. En cada pasada el JSONL se vuelve a leer desde el disco.
+
+Uso:
+    python libro_pdf.py asesorias.jsonl [directorio_destino] [dd/mm/aaaa]
+"""
+
+import os
+import re
+from datetime import datetime
+
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import BaseDocTemplate, Frame, PageTemplate, Paragraph, Spacer, PageBreak
+from reportlab.platypus.tableofcontents import TableOfContents
+
+from estilos_pdf import COLORES, ESTILOS
+from generar_pdf_mejorado import codificacion_perfil, construir_story, opciones_documento
+from modelo_datos import restaurar_registros
+from serializacion import FORMATO_FECHA, leer_fecha, leer_jsonl
+
+# Estilos propios del libro (derivados del registro compartido)
+ESTILO_CLIENTE = ParagraphStyle(
+    'LibroCliente',
+    parent=ESTILOS['titulo'],
+    fontSize=16,
+    spaceAfter=12
+)
+
+ESTILOS_INDICE = [
+    ParagraphStyle('IndiceCliente', parent=ESTILOS['Normal'], fontName='Helvetica-Bold',
+                   fontSize=11, leftIndent=0, firstLineIndent=0, spaceBefore=6, leading=14),
+    ParagraphStyle('IndiceSeccion', parent=ESTILOS['Normal'], fontSize=9,
+                   leftIndent=18, firstLineIndent=0, leading=11),
+]
+
+# Agente con el que se agrupan (y se seleccionan) las asesorías sin nombre_agente
+SIN_AGENTE = 'sin_agente'
+# Lo mismo para las asesorías sin fecha_asesoria (fecha=None no filtra por fecha)
+SIN_FECHA = 'sin_fecha'
+
+# Estilos cuyos párrafos entran al índice y a los marcadores, con su nivel
+NIVELES_INDICE = {
+    ESTILO_CLIENTE.name: 0,
+    ESTILOS['subtitulo'].name: 1,
+}
+
+# ================================
+# STORY PEREZOSA
+# ================================
+
+class StoryPerezosa(list):
+    """
+    Lista de flowables que se rellena bajo demanda desde un generador.
+
+    BaseDocTemplate.build solo usa len(), [0], del [0] y la inserción de
+    fragmentos al inicio, así que basta con tener siempre unos cuantos
+    flowables cargados. Copiarla con [:] (lo que hace multiBuild en cada
+    pasada) devuelve una story nueva desde el principio de la fábrica.
+    """
+
+    # Flowables cargados por adelantado (handle_keepWithNext mira los siguientes)
+    MINIMO_CARGADO = 8
+
+    def __init__(self, fabrica):
+        super().__init__()
+        self._fabrica = fabrica
+        self._fuente = fabrica()
+        # multiBuild busca los flowables de índice recorriendo lo ya cargado:
+        # el primer bloque de la fábrica (portada e índice) se carga de inmediato
+        self._rellenar()
+
+    def _rellenar(self):
+        while self._fuente is not None and list.__len__(self) < self.MINIMO_CARGADO:
+            try:
+                self.extend(next(self._fuente))
+            except StopIteration:
+                self._fuente = None
+
+    def __len__(self):
+        self._rellenar()
+        return list.__len__(self)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            if indice == slice(None, None, None):
+                return StoryPerezosa(self._fabrica)
+            raise TypeError("StoryPerezosa solo admite la copia completa [:]")
+        self._rellenar()
+        return list.__getitem__(self, indice)
+
+# ================================
+# DOCUMENTO
+# ================================
+
+class LibroDocTemplate(BaseDocTemplate):
+    """Documento con índice, marcadores por cliente/sección y pie con número de página."""
+
+    def __init__(self, destino, titulo, **kwargs):
+        super().__init__(destino, pagesize=letter, title=titulo,
+                         rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=72, **kwargs)
+        self.titulo = titulo
+        marco = Frame(self.leftMargin, self.bottomMargin, self.width, self.height, id='normal')
+        self.addPageTemplates([PageTemplate(id='pagina', frames=[marco], onPage=self._pie_pagina)])
+
+    def beforeDocument(self):
+        # Las claves de los marcadores deben coincidir entre pasadas
+        self._marcas = 0
+
+    def _pie_pagina(self, canv, doc):
+        canv.saveState()
+        canv.setFont('Helvetica', 8)
+        canv.setFillColor(COLORES['azul_principal'])
+        canv.drawString(self.leftMargin, 0.5 * inch, self.titulo)
+        canv.drawRightString(self.leftMargin + self.width, 0.5 * inch, f"Página {doc.page}")
+        canv.restoreState()
+
+    def afterFlowable(self, flowable):
+        if not isinstance(flowable, Paragraph):
+            return
+        nivel = NIVELES_INDICE.get(flowable.style.name)
+        if nivel is None:
+            return
+        texto = flowable.getPlainText()
+        self._marcas += 1
+        clave = f"m{self._marcas}"
+        self.canv.bookmarkPage(clave)
+        self.canv.addOutlineEntry(texto, clave, level=nivel, closed=nivel > 0)
+        self.notify('TOCEntry', (nivel, texto, self.page, clave))
+
+# ================================
+# SELECCIÓN Y ARMADO
+# ================================
+
+def _datos(registro):
+    """Acepta registros exportados ({'datos_completos': ...}) o datos directos."""
+    return restaurar_registros(registro.get('datos_completos', registro))
+
+
+def _clave_agente(datos_gen):
+    """Agente de la asesoría; las que no lo tienen se agrupan bajo SIN_AGENTE."""
+    return datos_gen.get('nombre_agente') or SIN_AGENTE
+
+
+def _clave_fecha(datos_gen):
+    """Fecha (date) de la asesoría; las que no la tienen se agrupan bajo SIN_FECHA."""
+    return leer_fecha(datos_gen.get('fecha_asesoria')) or SIN_FECHA
+
+
+def _coincide(datos, agente, fecha):
+    datos_gen = datos.get('datos_generales', {})
+    if agente is not None and _clave_agente(datos_gen) != agente:
+        return False
+    if fecha is not None and _clave_fecha(datos_gen) != fecha:
+        return False
+    return True
+
+
+def _stories_clientes(origen, agente, fecha, perfil):
+    """Genera, cliente por cliente, los flowables de su capítulo."""
+    for registro in leer_jsonl(origen):
+        datos = _datos(registro)
+        if not _coincide(datos, agente, fecha):
+            continue
+        datos_gen = datos.get('datos_generales', {})
+        encabezado = datos_gen.get('nombre', 'Cliente')
+        fecha_cliente = leer_fecha(datos_gen.get('fecha_asesoria'))
+        if fecha_cliente:
+            encabezado += f" — {fecha_cliente.strftime(FORMATO_FECHA)}"
+        # Sin caché de secciones: un libro no debe desplazar las sesiones activas
+        yield [PageBreak(), Paragraph(encabezado, ESTILO_CLIENTE)] + construir_story(datos, 'completo', usar_cache=False, perfil=perfil)
+
+
+def generar_libro(origen, destino, agente=None, fecha=None, perfil='archivo'):
+    """
+    Genera el libro PDF de las asesorías de un agente en un día.
+
+    Parameters:
+    -----------
+    origen : str
+        Ruta del JSONL de asesorías exportadas (se lee una vez por pasada)
+    destino : str o archivo binario
+        Ruta del PDF o un objeto con write(bytes)
+    agente : str, optional
+        nombre_agente a incluir (SIN_AGENTE para las asesorías sin agente); None incluye a todos
+    fecha : date o str, optional
+        fecha_asesoria a incluir ('dd/mm/aaaa' o date; SIN_FECHA para las
+        asesorías sin fecha); None incluye todas
+    perfil : str
+        Perfil de salida (generar_pdf_mejorado.PERFILES_SALIDA); por defecto 'archivo'
+
+    Returns:
+    --------
+    dict : {'asesorias', 'paginas', 'pasadas'}
+    """
+    if fecha is not None and fecha != SIN_FECHA:
+        fecha = leer_fecha(fecha)
+
+    titulo = "Libro de asesorías"
+    if agente:
+        titulo += f" — {agente}"
+    if fecha == SIN_FECHA:
+        titulo += " — sin fecha"
+    elif fecha:
+        titulo += f" — {fecha.strftime(FORMATO_FECHA)}"
+
+    indice = TableOfContents()
+    indice.levelStyles = ESTILOS_INDICE
+
+    contador = {'asesorias': 0}
+
+    def fabrica():
+        contador['asesorias'] = 0
+        yield [
+            Paragraph(titulo, ESTILOS['titulo']),
+            Paragraph(f"Generado: {datetime.now().strftime('%d/%m/%Y %H:%M')}", ESTILOS['Normal']),
+            Spacer(1, 0.3 * inch),
+            indice
+        ]
+        for story_cliente in _stories_clientes(origen, agente, fecha, perfil):
+            contador['asesorias'] += 1
+            yield story_cliente
+
+    doc = LibroDocTemplate(destino, titulo, **opciones_documento(perfil))
+    with codificacion_perfil(perfil):
+        pasadas = doc.multiBuild(StoryPerezosa(fabrica))
+
+    return {'asesorias': contador['asesorias'], 'paginas': doc.page, 'pasadas': pasadas}
+
+
+def agentes_por_dia(origen):
+    """Recorre el JSONL una vez y devuelve {(agente, date o SIN_FECHA): número de asesorías}."""
+    grupos = {}
+    for registro in leer_jsonl(origen):
+        datos_gen = _datos(registro).get('datos_generales', {})
+        clave = (_clave_agente(datos_gen), _clave_fecha(datos_gen))
+        grupos[clave] = grupos.get(clave, 0) + 1
+    return grupos
+
+
+def _nombre_archivo(agente, fecha):
+    base = re.sub(r'[^\w-]+', '_', agente).strip('_') or SIN_AGENTE
+    return f"libro_{base}_{SIN_FECHA if fecha == SIN_FECHA else fecha.strftime('%Y%m%d')}.pdf"
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    if len(sys.argv) < 2:
+        print("Uso: python libro_pdf.py asesorias.jsonl [directorio_destino] [dd/mm/aaaa]")
+        sys.exit(1)
+
+    origen = sys.argv[1]
+    directorio = sys.argv[2] if len(sys.argv) > 2 else 'libros'
+    solo_fecha = leer_fecha(sys.argv[3]) if len(sys.argv) > 3 else None
+    os.makedirs(directorio, exist_ok=True)
+
+    for (agente, fecha), cantidad in sorted(agentes_por_dia(origen).items(), key=lambda g: (datetime.min.date() if g[0][1] == SIN_FECHA else g[0][1], g[0][0])):
+        if solo_fecha and fecha != solo_fecha:
+            continue
+        ruta = os.path.join(directorio, _nombre_archivo(agente, fecha))
+        inicio = time.perf_counter()
+        resumen = generar_libro(origen, ruta, agente=agente, fecha=fecha)
+        print(f"✅ {ruta}: {resumen['asesorias']} asesorías, {resumen['paginas']} páginas, "
+              f"{resumen['pasadas']} pasadas ({time.perf_counter() - inicio:.1f}s)")
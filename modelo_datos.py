@@ -0,0 +1,444 @@
+# -*- coding: utf-8 -*-
+"""
+MODELO DE DATOS DE LA ASESORÍA
+Dataclasses con __slots__ para las secciones de st.session_state.datos
+
+Cada registro se comporta como un dict de solo lectura (registro['campo'],
+registro.get('campo'), dict(registro)), así que el código existente del PDF,
+la exportación y Google Sheets sigue funcionando sin cambios.
+
+Los campos de presentación (color, semáforo, mensajes) no se almacenan:
+se derivan de los enums EstadoFinanciero, NivelInversion y CalificacionSalud
+mediante tablas de consulta compartidas. Al guardar (JSON, trazas) cada
+registro se escribe en forma compacta: solo sus campos propios, con los enums
+como códigos enteros pequeños y estables (como_compacto / desde_dict).
+
+Los montos del motor financiero (flujo y capacidad de ahorro) se guardan en
+centavos enteros (campos '<monto>_centavos'); la clave '<monto>' los expone
+en pesos para la UI, el PDF y Sheets.
+"""
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field, fields
+from datetime import date
+from enum import Enum
+from typing import Optional
+
+COLORES_FINANCIEROS = {
+    'rojo': '#ef5350',
+    'amarillo': '#ff9800',
+    'verde': '#66bb6a',
+    'verde_agua': '#00bfa5',
+    'azul': '#064c78'
+}
+
+# ================================
+# ENUMS Y TABLAS DE PRESENTACIÓN
+# ================================
+
+class EstadoFinanciero(Enum):
+    NEGATIVO = "negativo"
+    CRITICO = "crítico"
+    AJUSTADO = "ajustado"
+    SALUDABLE = "saludable"
+    EXCELENTE = "excelente"
+
+    @property
+    def codigo(self):
+        return _PRESENTACION_ESTADO[self][0]
+
+    @property
+    def color(self):
+        return _PRESENTACION_ESTADO[self][1]
+
+    @property
+    def semaforo(self):
+        return _PRESENTACION_ESTADO[self][2]
+
+    @property
+    def mensaje(self):
+        return _PRESENTACION_ESTADO[self][3]
+
+    @classmethod
+    def desde_codigo(cls, codigo):
+        return _ESTADO_POR_CODIGO[codigo]
+
+
+# Códigos estables (se guardan en exportaciones): ordenados de peor a mejor
+_PRESENTACION_ESTADO = {
+    EstadoFinanciero.NEGATIVO: (0, COLORES_FINANCIEROS['rojo'], "🔴", "URGENTE: Tus gastos superan tus ingresos"),
+    EstadoFinanciero.CRITICO: (1, COLORES_FINANCIEROS['rojo'], "🔴", "ATENCIÓN: Tu margen financiero es muy ajustado"),
+    EstadoFinanciero.AJUSTADO: (2, COLORES_FINANCIEROS['amarillo'], "🟡", "PRECAUCIÓN: Tu margen financiero es limitado"),
+    EstadoFinanciero.SALUDABLE: (3, COLORES_FINANCIEROS['verde_agua'], "🟢", "BIEN: Tienes un margen financiero saludable"),
+    EstadoFinanciero.EXCELENTE: (4, COLORES_FINANCIEROS['verde'], "🟢", "EXCELENTE: Tu situación financiera es óptima"),
+}
+_ESTADO_POR_CODIGO = {presentacion[0]: estado for estado, presentacion in _PRESENTACION_ESTADO.items()}
+
+
+class NivelInversion(Enum):
+    BASICO = "basico"
+    MODERADO = "moderado"
+    AVANZADO = "avanzado"
+    OPTIMO = "optimo"
+
+    @property
+    def codigo(self):
+        return _PRESENTACION_NIVEL[self][0]
+
+    @property
+    def mensaje(self):
+        return _PRESENTACION_NIVEL[self][1]
+
+    @classmethod
+    def desde_codigo(cls, codigo):
+        return _NIVEL_POR_CODIGO[codigo]
+
+
+_PRESENTACION_NIVEL = {
+    NivelInversion.BASICO: (1, "Tu margen es ajustado. Considera invertir conservadoramente mientras mejoras tu flujo."),
+    NivelInversion.MODERADO: (2, "Tienes capacidad de ahorro. Puedes comenzar a invertir de forma estructurada."),
+    NivelInversion.AVANZADO: (3, "Excelente posición financiera. Puedes destinar una buena parte al ahorro e inversión."),
+    NivelInversion.OPTIMO: (4, "Tu situación financiera es óptima. Maximiza tu capacidad de inversión."),
+}
+_NIVEL_POR_CODIGO = {presentacion[0]: nivel for nivel, presentacion in _PRESENTACION_NIVEL.items()}
+
+
+class CalificacionSalud(Enum):
+    CRITICA = "CRÍTICA"
+    REGULAR = "REGULAR"
+    BUENA = "BUENA"
+    MUY_BUENA = "MUY BUENA"
+    EXCELENTE = "EXCELENTE"
+
+    @property
+    def codigo(self):
+        return _PRESENTACION_CALIFICACION[self][0]
+
+    @property
+    def mensaje(self):
+        return _PRESENTACION_CALIFICACION[self][1]
+
+    @classmethod
+    def desde_codigo(cls, codigo):
+        return _CALIFICACION_POR_CODIGO[codigo]
+
+
+_PRESENTACION_CALIFICACION = {
+    CalificacionSalud.CRITICA: (0, "Tu salud financiera requiere acción inmediata. Prioriza estabilización."),
+    CalificacionSalud.REGULAR: (1, "Tu salud financiera requiere atención. Trabaja en las áreas de mejora identificadas."),
+    CalificacionSalud.BUENA: (2, "Tu salud financiera es aceptable pero hay áreas importantes de mejora."),
+    CalificacionSalud.MUY_BUENA: (3, "Tu salud financiera es sólida. Pequeños ajustes te llevarán a la excelencia."),
+    CalificacionSalud.EXCELENTE: (4, "Tu salud financiera es excepcional. Continúa maximizando tu patrimonio."),
+}
+_CALIFICACION_POR_CODIGO = {presentacion[0]: calificacion for calificacion, presentacion in _PRESENTACION_CALIFICACION.items()}
+
+# ================================
+# MONTOS EN CENTAVOS
+# ================================
+
+SUFIJO_CENTAVOS = '_centavos'
+
+
+def a_centavos(monto):
+    """Pesos (float, int o None) a centavos enteros, redondeando al centavo más cercano."""
+    return round((monto or 0) * 100)
+
+
+def a_pesos(centavos):
+    """Centavos enteros a pesos (float)."""
+    return centavos / 100
+
+
+MENSAJE_SIN_CAPACIDAD = "⚠️ Tus gastos superan tus ingresos. Es prioritario ordenar tus finanzas antes de considerar inversiones."
+
+# ================================
+# BASE: REGISTRO COMPATIBLE CON DICT
+# ================================
+
+class RegistroDict(Mapping):
+    """
+    Base para dataclasses con slots que se leen como diccionarios.
+
+    Las subclases declaran en _DERIVADOS los nombres de propiedades que
+    también se exponen como claves (p. ej. 'color_estado'), en _OCULTOS los
+    campos internos que no se exponen (p. ej. el enum 'estado'), en _ENUMS
+    el enum de cada campo que se guarda como código y en _MONTOS los montos
+    que se guardan en centavos (campo 'flujo_libre_centavos', clave
+    'flujo_libre' en pesos).
+    """
+    __slots__ = ()
+    _DERIVADOS = ()
+    _OCULTOS = ()
+    _ENUMS = {}
+    _MONTOS = ()
+    _CLAVES = ()
+
+    def __getitem__(self, clave):
+        if clave in self._CLAVES:
+            return getattr(self, clave)
+        raise KeyError(clave)
+
+    def __iter__(self):
+        return iter(self._CLAVES)
+
+    def __len__(self):
+        return len(self._CLAVES)
+
+    def como_dict(self):
+        """Copia como dict plano (incluye los campos derivados)."""
+        return {clave: getattr(self, clave) for clave in self._CLAVES}
+
+    def como_compacto(self):
+        """Forma de almacenamiento: solo campos propios, enums como códigos enteros."""
+        compacto = {f.name: getattr(self, f.name) for f in fields(self)}
+        for clave in self._ENUMS:
+            if compacto[clave] is not None:
+                compacto[clave] = compacto[clave].codigo
+        return compacto
+
+    @classmethod
+    def desde_dict(cls, datos):
+        """
+        Construye el registro desde un dict, en forma compacta o expandida
+        (ignora claves derivadas o desconocidas).
+        """
+        if isinstance(datos, cls):
+            return datos
+        nombres = {f.name for f in fields(cls)}
+        valores = {clave: valor for clave, valor in datos.items() if clave in nombres}
+        for monto in cls._MONTOS:
+            if monto in datos and monto + SUFIJO_CENTAVOS not in valores:  # Forma expandida o anterior, en pesos
+                valores[monto + SUFIJO_CENTAVOS] = a_centavos(datos[monto])
+        for clave, enum in cls._ENUMS.items():
+            if isinstance(valores.get(clave), int):
+                valores[clave] = enum.desde_codigo(valores[clave])
+        return cls(**valores)
+
+
+def _lector_pesos(campo):
+    return property(lambda self: getattr(self, campo) / 100)
+
+
+def registro(cls):
+    """
+    Aplica @dataclass(slots=True) y registra las claves visibles como dict.
+
+    Cada monto de _MONTOS recibe una propiedad en pesos que ocupa, entre las
+    claves, el lugar de su campo en centavos.
+    """
+    cls = dataclass(slots=True)(cls)
+    for monto in cls._MONTOS:
+        setattr(cls, monto, _lector_pesos(monto + SUFIJO_CENTAVOS))
+    visibles = {monto + SUFIJO_CENTAVOS: monto for monto in cls._MONTOS}
+    cls._CLAVES = tuple(
+        visibles.get(f.name, f.name) for f in fields(cls) if f.name not in cls._OCULTOS
+    ) + tuple(cls._DERIVADOS)
+    return cls
+
+# ================================
+# SECCIONES DE LA ASESORÍA
+# ================================
+
+@registro
+class DatosGenerales(RegistroDict):
+    nombre: str = ''
+    telefono: str = ''
+    correo: str = ''
+    ocupacion: str = ''
+    estado_civil: str = ''
+    fecha_nacimiento: Optional[date] = None
+    edad: Optional[int] = None
+    fumador: str = ''
+    tipo_cita: str = ''
+    nombre_agente: str = ''
+    fecha_asesoria: Optional[date] = None
+
+
+@registro
+class FlujoFinanciero(RegistroDict):
+    ingreso_mensual_centavos: int = 0
+    gastos_fijos_centavos: int = 0
+    gastos_variables_centavos: int = 0
+    deudas_centavos: int = 0
+    gastos_totales_centavos: int = 0
+    flujo_libre_centavos: int = 0
+    porcentaje_flujo: float = 0.0
+    porcentaje_gastos_fijos: float = 0.0
+    porcentaje_gastos_variables: float = 0.0
+    porcentaje_deudas: float = 0.0
+    estado: EstadoFinanciero = EstadoFinanciero.CRITICO
+    detalle_gastos_fijos: dict = field(default_factory=dict)
+    detalle_gastos_variables: dict = field(default_factory=dict)
+    detalle_deudas: dict = field(default_factory=dict)
+
+    _DERIVADOS = ('estado_financiero', 'color_estado', 'semaforo', 'mensaje_estado')
+    _OCULTOS = ('estado',)
+    _ENUMS = {'estado': EstadoFinanciero}
+    _MONTOS = ('ingreso_mensual', 'gastos_fijos', 'gastos_variables', 'deudas',
+               'gastos_totales', 'flujo_libre')
+
+    @property
+    def estado_financiero(self):
+        return self.estado.value
+
+    @property
+    def color_estado(self):
+        return self.estado.color
+
+    @property
+    def semaforo(self):
+        return self.estado.semaforo
+
+    @property
+    def mensaje_estado(self):
+        return self.estado.mensaje
+
+    @classmethod
+    def desde_dict(cls, datos):
+        if isinstance(datos, cls):
+            return datos
+        datos = dict(datos)
+        if 'estado_financiero' in datos:  # Forma expandida
+            datos['estado'] = EstadoFinanciero(datos.pop('estado_financiero'))
+        return super(FlujoFinanciero, cls).desde_dict(datos)
+
+
+@registro
+class CapacidadAhorro(RegistroDict):
+    ahorro_posible: bool = False
+    rango_min_centavos: int = 0
+    rango_max_centavos: int = 0
+    ahorro_sugerido_centavos: int = 0
+    ahorro_minimo_centavos: int = 0
+    ahorro_optimo_centavos: int = 0
+    porcentaje_min: float = 0.0
+    porcentaje_max: float = 0.0
+    estado: EstadoFinanciero = EstadoFinanciero.NEGATIVO
+    nivel: Optional[NivelInversion] = None
+
+    _DERIVADOS = ('mensaje', 'puede_invertir', 'estado_base', 'nivel_inversion',
+                  'recomendacion', 'nivel_urgencia')
+    _OCULTOS = ('estado', 'nivel')
+    _ENUMS = {'estado': EstadoFinanciero, 'nivel': NivelInversion}
+    _MONTOS = ('rango_min', 'rango_max', 'ahorro_sugerido', 'ahorro_minimo', 'ahorro_optimo')
+
+    @property
+    def mensaje(self):
+        return self.nivel.mensaje if self.ahorro_posible and self.nivel else MENSAJE_SIN_CAPACIDAD
+
+    @property
+    def puede_invertir(self):
+        return self.ahorro_posible
+
+    @property
+    def estado_base(self):
+        return self.estado.value
+
+    @property
+    def nivel_inversion(self):
+        return self.nivel.value if self.nivel else None
+
+    @property
+    def recomendacion(self):
+        return None if self.ahorro_posible else "reducir_gastos_urgente"
+
+    @property
+    def nivel_urgencia(self):
+        return None if self.ahorro_posible else "critico"
+
+    @classmethod
+    def desde_dict(cls, datos):
+        if isinstance(datos, cls):
+            return datos
+        datos = dict(datos)
+        if 'estado_base' in datos:  # Forma expandida
+            datos['estado'] = EstadoFinanciero(datos.pop('estado_base'))
+            nivel = datos.pop('nivel_inversion', None)
+            datos['nivel'] = NivelInversion(nivel) if nivel else None
+        return super(CapacidadAhorro, cls).desde_dict(datos)
+
+
+@registro
+class Retiro(RegistroDict):
+    edad_retiro: int = 65
+    ingreso_mensual_retiro_centavos: int = 0
+    anos_para_retiro: int = 0
+    anos_en_retiro: int = 0
+    monto_anual_retiro_centavos: int = 0
+    monto_total_retiro_centavos: int = 0
+    ahorro_mensual_sugerido_centavos: int = 0
+
+    _MONTOS = ('ingreso_mensual_retiro', 'monto_anual_retiro', 'monto_total_retiro', 'ahorro_mensual_sugerido')
+
+
+@registro
+class EducacionHijo(RegistroDict):
+    nombre: str = ''
+    edad: int = 0
+    costo_anual: float = 0.0
+    anos_restantes: int = 0
+    costo_total: float = 0.0
+    ahorro_mensual: float = 0.0
+
+
+@registro
+class Educacion(RegistroDict):
+    aplica: bool = False
+    hijos: list = field(default_factory=list)
+    monto_total_educacion: float = 0.0
+    ahorro_mensual_total: float = 0.0
+
+
+@registro
+class SaludFinanciera(RegistroDict):
+    puntuacion: int = 0
+    calificacion_salud: CalificacionSalud = CalificacionSalud.CRITICA
+    areas_fortaleza: list = field(default_factory=list)
+    areas_mejora: list = field(default_factory=list)
+
+    _DERIVADOS = ('puntuacion_maxima', 'calificacion', 'estado_general', 'porcentaje_salud')
+    _OCULTOS = ('calificacion_salud',)
+    _ENUMS = {'calificacion_salud': CalificacionSalud}
+
+    @property
+    def puntuacion_maxima(self):
+        return 100
+
+    @property
+    def calificacion(self):
+        return self.calificacion_salud.value
+
+    @property
+    def estado_general(self):
+        return self.calificacion_salud.mensaje
+
+    @property
+    def porcentaje_salud(self):
+        return round((self.puntuacion / 100) * 100, 1)
+
+# ================================
+# CARGA DE ASESORÍAS GUARDADAS
+# ================================
+
+# Secciones que se guardan como registros compactos y se restauran al leer
+REGISTROS_POR_SECCION = {
+    'flujo_financiero': FlujoFinanciero,
+    'capacidad_ahorro': CapacidadAhorro,
+    'retiro': Retiro,
+}
+
+
+def restaurar_registros(datos):
+    """
+    Copia de la asesoría con las secciones compactas convertidas de nuevo en registros.
+
+    Las asesorías leídas de JSON (exportaciones, trazas) traen el flujo, la
+    capacidad de ahorro y el retiro en forma compacta (montos en centavos,
+    sin color, semáforo ni mensajes); al restaurarlas como registros esos
+    campos vuelven a derivarse.
+    """
+    datos = dict(datos)
+    for seccion, clase in REGISTROS_POR_SECCION.items():
+        if datos.get(seccion):
+            datos[seccion] = clase.desde_dict(datos[seccion])
+    return datos
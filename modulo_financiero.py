@@ -6,22 +6,30 @@ Para integración con Asesoría Financiera Rizkora
 Este módulo contiene las funciones principales para el análisis de flujo financiero.
 Puedes importar estas funciones en tu código principal.
 
+Los montos se calculan en centavos enteros (int64 en los cálculos por lote):
+las entradas en pesos se convierten una sola vez con a_centavos() y los
+resultados se leen en pesos desde los registros (flujo['flujo_libre']), así
+que el cálculo por cliente, el PDF, Sheets y los lotes dan los mismos totales.
+
 Autor: Rizkora
 Versión: 3.0
 Fecha: 2026
 """
 
-# ================================
-# CONSTANTES
-# ================================
+from collections import ChainMap
 
-COLORES_FINANCIEROS = {
-    'rojo': '#ef5350',
-    'amarillo': '#ff9800',
-    'verde': '#66bb6a',
-    'verde_agua': '#00bfa5',
-    'azul': '#064c78'
-}
+from modelo_datos import (
+    CalificacionSalud,
+    EstadoFinanciero,
+    FlujoFinanciero,
+    CapacidadAhorro,
+    Retiro,
+    SaludFinanciera,
+    a_centavos,
+    a_pesos
+)
+from reglas_recomendaciones import evaluar_recomendaciones, texto_recomendacion
+from umbrales import politica_actual
 
 # ================================
 # FUNCIÓN PRINCIPAL: FLUJO FINANCIERO
@@ -47,7 +55,7 @@ def calcular_flujo_financiero(ingreso_mensual, gastos_fijos, gastos_variables, d
     
     Returns:
     --------
-    dict : Análisis completo del flujo financiero
+    FlujoFinanciero : Análisis completo del flujo financiero (se lee como dict)
     
     Example:
     --------
@@ -59,79 +67,57 @@ def calcular_flujo_financiero(ingreso_mensual, gastos_fijos, gastos_variables, d
     'saludable'
     """
     
-    # Calcular totales
-    total_gastos_fijos = sum(gastos_fijos.values()) if gastos_fijos else 0
-    total_gastos_variables = sum(gastos_variables.values()) if gastos_variables else 0
-    total_deudas = sum(deudas.values()) if deudas else 0
+    # Calcular totales (en centavos: sumas exactas)
+    ingreso = a_centavos(ingreso_mensual)
+    total_gastos_fijos = sum(map(a_centavos, gastos_fijos.values())) if gastos_fijos else 0
+    total_gastos_variables = sum(map(a_centavos, gastos_variables.values())) if gastos_variables else 0
+    total_deudas = sum(map(a_centavos, deudas.values())) if deudas else 0
     
     gastos_totales = total_gastos_fijos + total_gastos_variables + total_deudas
-    flujo_libre = ingreso_mensual - gastos_totales
+    flujo_libre = ingreso - gastos_totales
     
     # Calcular porcentajes
-    if ingreso_mensual > 0:
-        porcentaje_flujo = (flujo_libre / ingreso_mensual) * 100
-        porcentaje_gastos_fijos = (total_gastos_fijos / ingreso_mensual) * 100
-        porcentaje_gastos_variables = (total_gastos_variables / ingreso_mensual) * 100
-        porcentaje_deudas = (total_deudas / ingreso_mensual) * 100
+    if ingreso > 0:
+        porcentaje_flujo = (flujo_libre / ingreso) * 100
+        porcentaje_gastos_fijos = (total_gastos_fijos / ingreso) * 100
+        porcentaje_gastos_variables = (total_gastos_variables / ingreso) * 100
+        porcentaje_deudas = (total_deudas / ingreso) * 100
     else:
         porcentaje_flujo = 0
         porcentaje_gastos_fijos = 0
         porcentaje_gastos_variables = 0
         porcentaje_deudas = 0
     
-    # Determinar estado financiero con sistema de semáforo
+    # Determinar estado financiero con sistema de semáforo (cortes en umbrales.json)
+    # (color, semáforo y mensaje se derivan del estado en EstadoFinanciero)
     if flujo_libre < 0:
-        estado = "negativo"
-        color = COLORES_FINANCIEROS['rojo']
-        semaforo = "🔴"
-        mensaje = "URGENTE: Tus gastos superan tus ingresos"
-    elif porcentaje_flujo < 10:
-        estado = "crítico"
-        color = COLORES_FINANCIEROS['rojo']
-        semaforo = "🔴"
-        mensaje = "ATENCIÓN: Tu margen financiero es muy ajustado"
-    elif porcentaje_flujo < 20:
-        estado = "ajustado"
-        color = COLORES_FINANCIEROS['amarillo']
-        semaforo = "🟡"
-        mensaje = "PRECAUCIÓN: Tu margen financiero es limitado"
-    elif porcentaje_flujo < 30:
-        estado = "saludable"
-        color = COLORES_FINANCIEROS['verde_agua']
-        semaforo = "🟢"
-        mensaje = "BIEN: Tienes un margen financiero saludable"
+        estado = EstadoFinanciero.NEGATIVO
     else:
-        estado = "excelente"
-        color = COLORES_FINANCIEROS['verde']
-        semaforo = "🟢"
-        mensaje = "EXCELENTE: Tu situación financiera es óptima"
-    
-    return {
-        # Datos básicos
-        "ingreso_mensual": round(ingreso_mensual, 2),
-        "gastos_fijos": round(total_gastos_fijos, 2),
-        "gastos_variables": round(total_gastos_variables, 2),
-        "deudas": round(total_deudas, 2),
-        "gastos_totales": round(gastos_totales, 2),
-        "flujo_libre": round(flujo_libre, 2),
+        estado = EstadoFinanciero(politica_actual()['estado_flujo'].valor(porcentaje_flujo))
+    
+    return FlujoFinanciero(
+        # Datos básicos (centavos)
+        ingreso_mensual_centavos=ingreso,
+        gastos_fijos_centavos=total_gastos_fijos,
+        gastos_variables_centavos=total_gastos_variables,
+        deudas_centavos=total_deudas,
+        gastos_totales_centavos=gastos_totales,
+        flujo_libre_centavos=flujo_libre,
         
         # Porcentajes
-        "porcentaje_flujo": round(porcentaje_flujo, 2),
-        "porcentaje_gastos_fijos": round(porcentaje_gastos_fijos, 2),
-        "porcentaje_gastos_variables": round(porcentaje_gastos_variables, 2),
-        "porcentaje_deudas": round(porcentaje_deudas, 2),
+        porcentaje_flujo=round(porcentaje_flujo, 2),
+        porcentaje_gastos_fijos=round(porcentaje_gastos_fijos, 2),
+        porcentaje_gastos_variables=round(porcentaje_gastos_variables, 2),
+        porcentaje_deudas=round(porcentaje_deudas, 2),
         
         # Estado financiero
-        "estado_financiero": estado,
-        "color_estado": color,
-        "semaforo": semaforo,
-        "mensaje_estado": mensaje,
+        estado=estado,
         
         # Detalles para análisis
-        "detalle_gastos_fijos": gastos_fijos,
-        "detalle_gastos_variables": gastos_variables,
-        "detalle_deudas": deudas
-    }
+        detalle_gastos_fijos=gastos_fijos,
+        detalle_gastos_variables=gastos_variables,
+        detalle_deudas=deudas
+    )
 
 # ================================
 # FUNCIÓN: CAPACIDAD DE AHORRO
@@ -148,7 +134,7 @@ def calcular_capacidad_ahorro(flujo_financiero):
     
     Returns:
     --------
-    dict : Capacidad de ahorro con rangos y recomendaciones
+    CapacidadAhorro : Capacidad de ahorro con rangos y recomendaciones (se lee como dict)
     
     Example:
     --------
@@ -158,67 +144,41 @@ def calcular_capacidad_ahorro(flujo_financiero):
     7500.0
     """
     
-    flujo_libre = flujo_financiero.get("flujo_libre", 0)
-    estado = flujo_financiero.get("estado_financiero", "crítico")
-    ingreso = flujo_financiero.get("ingreso_mensual", 0)
+    flujo_libre = a_centavos(flujo_financiero.get("flujo_libre", 0))
+    estado = EstadoFinanciero(flujo_financiero.get("estado_financiero", "crítico"))
+    ingreso = a_centavos(flujo_financiero.get("ingreso_mensual", 0))
     
     # Si el flujo es negativo, no hay capacidad de ahorro
-    if estado == "negativo":
-        return {
-            "ahorro_posible": False,
-            "rango_min": 0,
-            "rango_max": 0,
-            "ahorro_sugerido": 0,
-            "ahorro_minimo": 0,
-            "ahorro_optimo": 0,
-            "mensaje": "⚠️ Tus gastos superan tus ingresos. Es prioritario ordenar tus finanzas antes de considerar inversiones.",
-            "recomendacion": "reducir_gastos_urgente",
-            "puede_invertir": False,
-            "nivel_urgencia": "critico"
-        }
+    if estado is EstadoFinanciero.NEGATIVO:
+        return CapacidadAhorro(ahorro_posible=False, estado=estado)
     
-    # Definir porcentajes de ahorro según estado financiero
+    # Porcentajes de ahorro según estado financiero (bandas_ahorro de umbrales.json)
     # Estos porcentajes se aplican sobre el flujo libre disponible
-    if estado == "crítico":
-        min_pct, max_pct = 0.30, 0.50  # 30-50% del flujo libre
-        mensaje = "Tu margen es ajustado. Considera invertir conservadoramente mientras mejoras tu flujo."
-        nivel = "basico"
-    elif estado == "ajustado":
-        min_pct, max_pct = 0.40, 0.60  # 40-60% del flujo libre
-        mensaje = "Tienes capacidad de ahorro. Puedes comenzar a invertir de forma estructurada."
-        nivel = "moderado"
-    elif estado == "saludable":
-        min_pct, max_pct = 0.50, 0.70  # 50-70% del flujo libre
-        mensaje = "Excelente posición financiera. Puedes destinar una buena parte al ahorro e inversión."
-        nivel = "avanzado"
-    else:  # excelente
-        min_pct, max_pct = 0.60, 0.80  # 60-80% del flujo libre
-        mensaje = "Tu situación financiera es óptima. Maximiza tu capacidad de inversión."
-        nivel = "optimo"
-    
-    # Calcular rangos basados en flujo libre
-    rango_min = round(flujo_libre * min_pct, 2)
-    rango_max = round(flujo_libre * max_pct, 2)
-    ahorro_sugerido = round((rango_min + rango_max) / 2, 2)
+    # (el mensaje de cada nivel se deriva de NivelInversion)
+    politica = politica_actual()
+    min_pct, max_pct, nivel = politica.bandas_ahorro[estado.value]
     
-    # Cálculo adicional: ahorro mínimo recomendado (5%) y óptimo (10%) del ingreso total
-    ahorro_minimo = round(ingreso * 0.05, 2)  # 5% del ingreso
-    ahorro_optimo = round(ingreso * 0.10, 2)  # 10% del ingreso
+    # Calcular rangos basados en flujo libre (centavos; round() = np.rint del cálculo por lotes)
+    rango_min = round(flujo_libre * min_pct)
+    rango_max = round(flujo_libre * max_pct)
+    ahorro_sugerido = round((rango_min + rango_max) / 2)
     
-    return {
-        "ahorro_posible": True,
-        "rango_min": rango_min,
-        "rango_max": rango_max,
-        "ahorro_sugerido": ahorro_sugerido,
-        "ahorro_minimo": ahorro_minimo,
-        "ahorro_optimo": ahorro_optimo,
-        "mensaje": mensaje,
-        "porcentaje_min": round(min_pct * 100, 1),
-        "porcentaje_max": round(max_pct * 100, 1),
-        "puede_invertir": True,
-        "estado_base": estado,
-        "nivel_inversion": nivel
-    }
+    # Cálculo adicional: ahorro mínimo recomendado (5%) y óptimo (10%) del ingreso total
+    ahorro_minimo = round(ingreso * politica.ahorro_minimo)
+    ahorro_optimo = round(ingreso * politica.ahorro_optimo)
+    
+    return CapacidadAhorro(
+        ahorro_posible=True,
+        rango_min_centavos=rango_min,
+        rango_max_centavos=rango_max,
+        ahorro_sugerido_centavos=ahorro_sugerido,
+        ahorro_minimo_centavos=ahorro_minimo,
+        ahorro_optimo_centavos=ahorro_optimo,
+        porcentaje_min=round(min_pct * 100, 1),
+        porcentaje_max=round(max_pct * 100, 1),
+        estado=estado,
+        nivel=nivel
+    )
 
 # ================================
 # FUNCIÓN: VALIDAR INVERSIÓN
@@ -256,12 +216,15 @@ def validar_inversion_propuesta(inversion_propuesta, capacidad_ahorro):
             "accion_recomendada": "ordenar_finanzas"
         }
     
-    rango_min = capacidad_ahorro.get("rango_min", 0)
-    rango_max = capacidad_ahorro.get("rango_max", 0)
-    ahorro_sugerido = capacidad_ahorro.get("ahorro_sugerido", 0)
+    # Comparaciones en centavos; los montos se devuelven en pesos
+    propuesta = a_centavos(inversion_propuesta)
+    rango_min = a_centavos(capacidad_ahorro.get("rango_min", 0))
+    rango_max_centavos = a_centavos(capacidad_ahorro.get("rango_max", 0))
+    rango_max = a_pesos(rango_max_centavos)
+    ahorro_sugerido = a_pesos(a_centavos(capacidad_ahorro.get("ahorro_sugerido", 0)))
     
     # Validar si la inversión está dentro del rango
-    if inversion_propuesta < rango_min:
+    if propuesta < rango_min:
         return {
             "valida": True,
             "monto_ajustado": inversion_propuesta,
@@ -270,8 +233,8 @@ def validar_inversion_propuesta(inversion_propuesta, capacidad_ahorro):
             "accion_recomendada": "aceptar"
         }
     
-    elif inversion_propuesta <= rango_max:
-        porcentaje_uso = (inversion_propuesta / rango_max) * 100
+    elif propuesta <= rango_max_centavos:
+        porcentaje_uso = (propuesta / rango_max_centavos) * 100
         
         return {
             "valida": True,
@@ -282,8 +245,8 @@ def validar_inversion_propuesta(inversion_propuesta, capacidad_ahorro):
         }
     
     else:
-        exceso = inversion_propuesta - rango_max
-        porcentaje_exceso = (exceso / rango_max) * 100
+        exceso = propuesta - rango_max_centavos
+        porcentaje_exceso = (exceso / rango_max_centavos) * 100
         
         # Si el exceso es menor al 20%, ofrecer opción
         if porcentaje_exceso <= 20:
@@ -322,7 +285,7 @@ def generar_recomendaciones_financieras(flujo_financiero, capacidad_ahorro):
     
     Returns:
     --------
-    list : Lista de recomendaciones en orden de prioridad
+    list : Lista de recomendaciones en orden de prioridad (máximo 12)
     
     Example:
     --------
@@ -331,118 +294,51 @@ def generar_recomendaciones_financieras(flujo_financiero, capacidad_ahorro):
     >>>     print(rec)
     """
     
-    recomendaciones = []
-    estado = flujo_financiero.get("estado_financiero", "crítico")
-    porcentaje_deudas = flujo_financiero.get("porcentaje_deudas", 0)
-    porcentaje_gastos_fijos = flujo_financiero.get("porcentaje_gastos_fijos", 0)
-    porcentaje_flujo = flujo_financiero.get("porcentaje_flujo", 0)
-    
-    # ===========================================
-    # RECOMENDACIONES SEGÚN ESTADO FINANCIERO
-    # ===========================================
-    
-    if estado == "negativo":
-        recomendaciones.extend([
-            "🚨 URGENTE: Reduce gastos inmediatamente. Identifica gastos no esenciales que puedes eliminar",
-            "📊 Crea un presupuesto detallado y realiza seguimiento diario de gastos",
-            "💳 Evita nuevas deudas. Congela uso de tarjetas de crédito",
-            "🔍 Busca fuentes adicionales de ingreso (freelance, venta de artículos, etc.)",
-            "📞 Considera asesoría de consolidación de deudas",
-            "🏦 Contacta a tus acreedores para renegociar tasas o plazos",
-            "💰 Establece como meta alcanzar un flujo libre positivo en 3 meses"
-        ])
-    
-    elif estado == "crítico":
-        recomendaciones.extend([
-            "⚠️ Crea un fondo de emergencia pequeño (equivalente a 1 mes de gastos básicos)",
-            "💰 Reduce gastos variables en al menos 10-15%",
-            "📝 Revisa y elimina suscripciones no esenciales (streaming, gimnasio, etc.)",
-            "💳 Prioriza pagar deudas de alto interés (tarjetas de crédito)",
-            "📈 Busca oportunidades de incrementar ingresos en tu trabajo actual",
-            "🎯 Establece como meta alcanzar un flujo libre del 15% en 6 meses"
-        ])
-    
-    elif estado == "ajustado":
-        recomendaciones.extend([
-            "💪 Incrementa tu fondo de emergencia a 3 meses de gastos",
-            "📈 Inicia inversiones pequeñas pero constantes",
-            "🎯 Mantén gastos bajo control, evita gastos hormiga",
-            "📊 Busca formas de diversificar tus fuentes de ingreso",
-            "💳 Acelera el pago de deudas cuando sea posible",
-            "🏦 Investiga opciones de inversión con bajo riesgo para iniciar"
-        ])
-    
-    elif estado == "saludable":
-        recomendaciones.extend([
-            "🎯 Maximiza aportaciones a planes de retiro (PPR, Afore voluntaria)",
-            "📈 Diversifica tus inversiones en diferentes instrumentos",
-            "🏦 Mantén un fondo de emergencia robusto (6 meses de gastos)",
-            "🎓 Invierte en educación financiera y personal",
-            "💼 Considera inversiones de mediano plazo (CETES, fondos indexados)",
-            "📊 Evalúa oportunidades de inversión en bienes raíces o negocios"
-        ])
-    
-    else:  # excelente
-        recomendaciones.extend([
-            "🚀 Optimiza tu estrategia fiscal con un contador especializado",
-            "📈 Implementa estrategia de inversión avanzada y diversificada",
-            "🏠 Evalúa inversión en bienes raíces como fuente de ingreso pasivo",
-            "👨‍👩‍👧 Inicia planificación patrimonial (testamento, fideicomisos)",
-            "💼 Considera asesoría financiera especializada para maximizar rendimientos",
-            "🌍 Explora inversiones internacionales para diversificación global"
-        ])
-    
-    # ===========================================
-    # RECOMENDACIONES POR DEUDAS
-    # ===========================================
-    
-    if porcentaje_deudas > 30:
-        recomendaciones.insert(0, f"🚨 CRÍTICO: Tus deudas representan el {porcentaje_deudas:.1f}% de tu ingreso (más del 30%). Prioriza su reducción inmediata")
-    elif porcentaje_deudas > 20:
-        recomendaciones.insert(0, f"⚠️ ATENCIÓN: Tus deudas representan el {porcentaje_deudas:.1f}% de tu ingreso. Trabaja en reducirlas por debajo del 20%")
-    elif porcentaje_deudas > 0:
-        recomendaciones.append(f"✅ Tus deudas están en un nivel manejable ({porcentaje_deudas:.1f}%). Mantén este control")
-    
-    # ===========================================
-    # RECOMENDACIONES POR GASTOS FIJOS
-    # ===========================================
-    
-    if porcentaje_gastos_fijos > 60:
-        recomendaciones.append(f"🏠 Tus gastos fijos son muy altos ({porcentaje_gastos_fijos:.1f}%). Evalúa opciones para reducirlos (mudanza, renegociación, etc.)")
-    elif porcentaje_gastos_fijos > 50:
-        recomendaciones.append(f"⚠️ Tus gastos fijos son elevados ({porcentaje_gastos_fijos:.1f}%). Busca formas graduales de reducirlos")
-    
-    # ===========================================
-    # RECOMENDACIONES SEGÚN CAPACIDAD DE AHORRO
-    # ===========================================
-    
-    if capacidad_ahorro.get('ahorro_posible'):
-        nivel = capacidad_ahorro.get('nivel_inversion', 'basico')
-        
-        if nivel == 'basico':
-            recomendaciones.append("💎 Inicia con inversiones de bajo riesgo: CETES, cuenta de ahorro con rendimientos")
-        elif nivel == 'moderado':
-            recomendaciones.append("💎 Considera fondos de inversión mixtos y CETES Plus")
-        elif nivel == 'avanzado':
-            recomendaciones.append("💎 Diversifica en fondos indexados, PPR y bonos corporativos")
-        else:  # optimo
-            recomendaciones.append("💎 Explora portafolio completo: acciones, bienes raíces, fondos internacionales")
-    
-    # ===========================================
-    # RECOMENDACIÓN DE FONDO DE EMERGENCIA
-    # ===========================================
-    
-    if porcentaje_flujo >= 20:
-        recomendaciones.append("🏦 Prioridad: Establece fondo de emergencia de 6 meses antes de inversiones agresivas")
-    else:
-        recomendaciones.append("🏦 Prioridad: Establece fondo de emergencia de 3 meses como mínimo")
-    
-    return recomendaciones[:12]  # Máximo 12 recomendaciones
+    # Reglas declarativas compiladas en reglas_recomendaciones.py; el texto se
+    # genera aquí, a partir de los códigos, solo para mostrarlo
+    valores = ChainMap(flujo_financiero, capacidad_ahorro)
+    return [texto_recomendacion(codigo, valores) for codigo in evaluar_recomendaciones(flujo_financiero, capacidad_ahorro)]
 
 # ================================
 # FUNCIÓN: ANÁLISIS DE SALUD FINANCIERA
 # ================================
 
+# Escalas de puntuación y campo del flujo que evalúa cada una
+_ESCALAS_SALUD = (
+    ('puntos_flujo', 'porcentaje_flujo'),
+    ('puntos_deudas', 'porcentaje_deudas'),
+    ('puntos_gastos_fijos', 'porcentaje_gastos_fijos'),
+    ('puntos_gastos_variables', 'porcentaje_gastos_variables'),
+)
+
+# Área de cada tramo: (es_fortaleza, texto), o None si el tramo no se menciona
+_AREAS_SALUD = {
+    'puntos_flujo': (
+        (False, "URGENTE: Flujo negativo, gastos superan ingresos"),
+        (False, "Flujo libre crítico, acción urgente requerida"),
+        (False, "Flujo libre limitado, busca incrementarlo"),
+        (True, "Buen flujo libre de efectivo"),
+        (True, "Excelente flujo libre de efectivo"),
+    ),
+    'puntos_deudas': (
+        (True, "Sin deudas, excelente posición"),
+        (True, "Nivel de deudas bajo y manejable"),
+        (False, "Nivel de deudas moderado, mantén control"),
+        (False, "Nivel de deudas alto, requiere plan de reducción"),
+    ),
+    'puntos_gastos_fijos': (
+        (True, "Gastos fijos bajo control"),
+        None,
+        (False, "Gastos fijos muy elevados, busca reducirlos"),
+    ),
+    'puntos_gastos_variables': (
+        (True, "Gastos variables controlados"),
+        None,
+        (False, "Gastos variables elevados, identifica gastos hormiga"),
+    ),
+}
+
+
 def analizar_salud_financiera(flujo_financiero):
     """
     Genera un análisis detallado de la salud financiera del cliente.
@@ -454,7 +350,7 @@ def analizar_salud_financiera(flujo_financiero):
     
     Returns:
     --------
-    dict : Análisis con puntuación y áreas de mejora
+    SaludFinanciera : Análisis con puntuación y áreas de mejora (se lee como dict)
     
     Example:
     --------
@@ -463,89 +359,291 @@ def analizar_salud_financiera(flujo_financiero):
     >>> print(f"Estado: {analisis['calificacion']}")
     """
     
+    politica = politica_actual()
     puntuacion = 0
     areas_fortaleza = []
     areas_mejora = []
     
-    # Evaluar flujo libre (0-35 puntos)
-    porcentaje_flujo = flujo_financiero.get("porcentaje_flujo", 0)
-    if porcentaje_flujo >= 30:
-        puntuacion += 35
-        areas_fortaleza.append("Excelente flujo libre de efectivo")
-    elif porcentaje_flujo >= 20:
-        puntuacion += 28
-        areas_fortaleza.append("Buen flujo libre de efectivo")
-    elif porcentaje_flujo >= 10:
-        puntuacion += 18
-        areas_mejora.append("Flujo libre limitado, busca incrementarlo")
-    elif porcentaje_flujo >= 0:
-        puntuacion += 8
-        areas_mejora.append("Flujo libre crítico, acción urgente requerida")
-    else:
-        areas_mejora.append("URGENTE: Flujo negativo, gastos superan ingresos")
-    
-    # Evaluar nivel de deudas (0-30 puntos)
-    porcentaje_deudas = flujo_financiero.get("porcentaje_deudas", 0)
-    if porcentaje_deudas == 0:
-        puntuacion += 30
-        areas_fortaleza.append("Sin deudas, excelente posición")
-    elif porcentaje_deudas <= 15:
-        puntuacion += 25
-        areas_fortaleza.append("Nivel de deudas bajo y manejable")
-    elif porcentaje_deudas <= 30:
-        puntuacion += 15
-        areas_mejora.append("Nivel de deudas moderado, mantén control")
-    else:
-        puntuacion += 5
-        areas_mejora.append("Nivel de deudas alto, requiere plan de reducción")
-    
-    # Evaluar gastos fijos (0-20 puntos)
-    porcentaje_gastos_fijos = flujo_financiero.get("porcentaje_gastos_fijos", 0)
-    if porcentaje_gastos_fijos <= 50:
-        puntuacion += 20
-        areas_fortaleza.append("Gastos fijos bajo control")
-    elif porcentaje_gastos_fijos <= 60:
-        puntuacion += 12
-    else:
-        puntuacion += 5
-        areas_mejora.append("Gastos fijos muy elevados, busca reducirlos")
-    
-    # Evaluar gastos variables (0-15 puntos)
-    porcentaje_gastos_variables = flujo_financiero.get("porcentaje_gastos_variables", 0)
-    if porcentaje_gastos_variables <= 20:
-        puntuacion += 15
-        areas_fortaleza.append("Gastos variables controlados")
-    elif porcentaje_gastos_variables <= 30:
-        puntuacion += 10
-    else:
-        puntuacion += 5
-        areas_mejora.append("Gastos variables elevados, identifica gastos hormiga")
-    
-    # Determinar calificación
-    if puntuacion >= 85:
-        calificacion = "EXCELENTE"
-        estado_general = "Tu salud financiera es excepcional. Continúa maximizando tu patrimonio."
-    elif puntuacion >= 70:
-        calificacion = "MUY BUENA"
-        estado_general = "Tu salud financiera es sólida. Pequeños ajustes te llevarán a la excelencia."
-    elif puntuacion >= 55:
-        calificacion = "BUENA"
-        estado_general = "Tu salud financiera es aceptable pero hay áreas importantes de mejora."
-    elif puntuacion >= 40:
-        calificacion = "REGULAR"
-        estado_general = "Tu salud financiera requiere atención. Trabaja en las áreas de mejora identificadas."
-    else:
-        calificacion = "CRÍTICA"
-        estado_general = "Tu salud financiera requiere acción inmediata. Prioriza estabilización."
+    # Flujo libre (0-35), deudas (0-30), gastos fijos (0-20) y variables (0-15);
+    # los puntos de cada tramo vienen de umbrales.json
+    for escala, campo in _ESCALAS_SALUD:
+        tramo = politica[escala].tramo(flujo_financiero.get(campo, 0))
+        puntuacion += politica[escala].valores[tramo]
+        area = _AREAS_SALUD[escala][tramo]
+        if area is not None:
+            (areas_fortaleza if area[0] else areas_mejora).append(area[1])
+    
+    # Determinar calificación (el mensaje se deriva de CalificacionSalud)
+    calificacion = CalificacionSalud(politica['calificacion_salud'].valor(puntuacion))
+    
+    return SaludFinanciera(
+        puntuacion=puntuacion,
+        calificacion_salud=calificacion,
+        areas_fortaleza=areas_fortaleza,
+        areas_mejora=areas_mejora
+    )
+
+# ================================
+# CÁLCULO POR LOTES
+# ================================
+
+def _a_centavos_lote(montos):
+    """Arreglo de pesos a centavos int64 (np.rint redondea igual que round())."""
+    import numpy as np
+    
+    return np.rint(np.asarray(montos, dtype=np.float64) * 100).astype(np.int64)
+
+
+def calcular_flujo_financiero_lote(ingreso_mensual, gastos_fijos, gastos_variables, deudas):
+    """
+    calcular_flujo_financiero() sobre arreglos de totales (un elemento por cliente).
+    
+    Usa las mismas escalas de umbrales.json que el cálculo por cliente
+    (np.searchsorted en lugar de bisect) y la misma aritmética en centavos,
+    así que ambos dan resultados idénticos.
+    
+    Parameters:
+    -----------
+    ingreso_mensual, gastos_fijos, gastos_variables, deudas : array-like
+        Totales mensuales por cliente, en pesos
+    
+    Returns:
+    --------
+    dict : Arreglos numpy con los montos de FlujoFinanciero en centavos
+           ('flujo_libre_centavos', ..., int64), sus porcentajes y 'estado'
+           (código de EstadoFinanciero, int8)
+    """
+    return calcular_flujo_centavos_lote(
+        _a_centavos_lote(ingreso_mensual),
+        _a_centavos_lote(gastos_fijos),
+        _a_centavos_lote(gastos_variables),
+        _a_centavos_lote(deudas)
+    )
+
+
+def calcular_flujo_centavos_lote(ingreso, total_gastos_fijos, total_gastos_variables, total_deudas):
+    """
+    Igual que calcular_flujo_financiero_lote(), con los totales ya en centavos
+    (arreglos int64 de cualquier forma compatible por broadcasting).
+    """
+    import numpy as np
+    
+    ingreso, total_gastos_fijos, total_gastos_variables, total_deudas = np.broadcast_arrays(
+        ingreso, total_gastos_fijos, total_gastos_variables, total_deudas
+    )
+    
+    gastos_totales = total_gastos_fijos + total_gastos_variables + total_deudas
+    flujo_libre = ingreso - gastos_totales
+    
+    con_ingreso = ingreso > 0
+    divisor = np.where(con_ingreso, ingreso, 1)
+    porcentajes = {
+        campo: np.where(con_ingreso, total / divisor * 100, 0.0)
+        for campo, total in (
+            ('porcentaje_flujo', flujo_libre),
+            ('porcentaje_gastos_fijos', total_gastos_fijos),
+            ('porcentaje_gastos_variables', total_gastos_variables),
+            ('porcentaje_deudas', total_deudas),
+        )
+    }
+    
+    escala = politica_actual()['estado_flujo']
+    codigos = np.array([EstadoFinanciero(valor).codigo for valor in escala.valores], dtype=np.int8)
+    estado = np.where(flujo_libre < 0, EstadoFinanciero.NEGATIVO.codigo,
+                      codigos[escala.tramos_lote(porcentajes['porcentaje_flujo'])]).astype(np.int8)
+    
+    return {
+        'ingreso_mensual_centavos': ingreso,
+        'gastos_fijos_centavos': total_gastos_fijos,
+        'gastos_variables_centavos': total_gastos_variables,
+        'deudas_centavos': total_deudas,
+        'gastos_totales_centavos': gastos_totales,
+        'flujo_libre_centavos': flujo_libre,
+        **{campo: np.round(valores, 2) for campo, valores in porcentajes.items()},
+        'estado': estado
+    }
+
+
+def calcular_capacidad_ahorro_lote(flujo_lote):
+    """
+    calcular_capacidad_ahorro() sobre el resultado de calcular_flujo_financiero_lote().
+    
+    Returns:
+    --------
+    dict : Arreglos numpy 'ahorro_posible', 'rango_min_centavos',
+           'rango_max_centavos', 'ahorro_sugerido_centavos',
+           'ahorro_minimo_centavos', 'ahorro_optimo_centavos' (int64) y 'nivel'
+           (código de NivelInversion; 0 sin capacidad de ahorro)
+    """
+    import numpy as np
     
+    politica = politica_actual()
+    
+    # Banda de cada estado indexada por su código (sin banda para NEGATIVO)
+    tamano = max(estado.codigo for estado in EstadoFinanciero) + 1
+    min_pct = np.zeros(tamano)
+    max_pct = np.zeros(tamano)
+    nivel = np.zeros(tamano, dtype=np.int8)
+    for valor, (minimo, maximo, nivel_inversion) in politica.bandas_ahorro.items():
+        codigo = EstadoFinanciero(valor).codigo
+        min_pct[codigo], max_pct[codigo], nivel[codigo] = minimo, maximo, nivel_inversion.codigo
+    
+    estado = flujo_lote['estado']
+    flujo_libre = flujo_lote['flujo_libre_centavos']
+    ingreso = flujo_lote['ingreso_mensual_centavos']
+    ahorro_posible = estado != EstadoFinanciero.NEGATIVO.codigo
+    
+    def redondear(centavos):
+        return np.rint(centavos).astype(np.int64)
+    
+    rango_min = redondear(flujo_libre * min_pct[estado])
+    rango_max = redondear(flujo_libre * max_pct[estado])
+    return {
+        'ahorro_posible': ahorro_posible,
+        'rango_min_centavos': rango_min,
+        'rango_max_centavos': rango_max,
+        'ahorro_sugerido_centavos': redondear((rango_min + rango_max) / 2),
+        'ahorro_minimo_centavos': np.where(ahorro_posible, redondear(ingreso * politica.ahorro_minimo), 0),
+        'ahorro_optimo_centavos': np.where(ahorro_posible, redondear(ingreso * politica.ahorro_optimo), 0),
+        'nivel': nivel[estado]
+    }
+
+# ================================
+# FUNCIÓN: RETIRO
+# ================================
+
+ESPERANZA_VIDA = 80
+
+# Superficie de sensibilidad del paso 6: edades de retiro × múltiplos del ingreso deseado
+EDADES_RETIRO_SUPERFICIE = tuple(range(50, 76))
+FACTORES_INGRESO_RETIRO = tuple(round(0.5 + 0.1 * i, 1) for i in range(16))  # 50 % a 200 %
+
+
+def calcular_retiro(edad_actual, edad_retiro, ingreso_mensual_retiro):
+    """
+    Proyección simplificada de retiro (sin inflación ni rendimientos).
+    
+    Parameters:
+    -----------
+    edad_actual, edad_retiro : int
+    ingreso_mensual_retiro : float
+        Ingreso mensual deseado durante el retiro
+    
+    Returns:
+    --------
+    Retiro : Años para y en el retiro, monto total y ahorro mensual requerido
+    """
+    anos_para_retiro = edad_retiro - edad_actual
+    anos_en_retiro = max(1, ESPERANZA_VIDA - edad_retiro)
+    
+    # Montos en centavos: el total y la mensualidad se redondean una sola vez
+    ingreso = a_centavos(ingreso_mensual_retiro)
+    monto_anual = ingreso * 12
+    monto_total = monto_anual * anos_en_retiro
+    
+    return Retiro(
+        edad_retiro=edad_retiro,
+        ingreso_mensual_retiro_centavos=ingreso,
+        anos_para_retiro=anos_para_retiro,
+        anos_en_retiro=anos_en_retiro,
+        monto_anual_retiro_centavos=monto_anual,
+        monto_total_retiro_centavos=monto_total,
+        ahorro_mensual_sugerido_centavos=round(monto_total / max(1, anos_para_retiro * 12))
+    )
+
+
+def calcular_superficie_retiro(edad_actual, edades_retiro, ingresos_mensuales):
+    """
+    calcular_retiro() para todas las combinaciones edad de retiro × ingreso
+    deseado, en un solo broadcast de NumPy.
+    
+    Parameters:
+    -----------
+    edad_actual : int
+    edades_retiro : array-like
+        Edades de retiro (filas)
+    ingresos_mensuales : array-like
+        Ingresos mensuales deseados (columnas)
+    
+    Returns:
+    --------
+    dict : 'edades_retiro', 'ingresos_mensuales' y las matrices
+           'monto_total_retiro' y 'ahorro_mensual_sugerido' (NaN en las edades
+           que no son mayores a la edad actual)
+    """
+    import numpy as np
+    
+    edades = np.asarray(edades_retiro, dtype=np.int64)
+    ingresos = np.asarray(ingresos_mensuales, dtype=np.float64)
+    
+    # Mismos centavos y redondeos que calcular_retiro(); a pesos solo al final
+    ingresos_centavos = np.rint(ingresos * 100).astype(np.int64)
+    anos_para_retiro = (edades - edad_actual)[:, None]
+    anos_en_retiro = np.maximum(1, ESPERANZA_VIDA - edades)[:, None]
+    monto_total = ingresos_centavos[None, :] * 12 * anos_en_retiro
+    ahorro_mensual = np.rint(monto_total / np.maximum(1, anos_para_retiro * 12))
+    
+    valida = anos_para_retiro > 0
+    return {
+        'edades_retiro': edades,
+        'ingresos_mensuales': ingresos,
+        'monto_total_retiro': np.where(valida, a_pesos(monto_total), np.nan),
+        'ahorro_mensual_sugerido': np.where(valida, a_pesos(ahorro_mensual), np.nan)
+    }
+
+# ================================
+# FUNCIÓN: DETECCIÓN DE NECESIDADES
+# ================================
+
+def detectar_necesidades_financieras(datos):
+    """
+    Detecta y prioriza necesidades financieras a partir de los datos de la asesoría.
+
+    Parameters:
+    -----------
+    datos : dict
+        Estructura completa de la asesoría (equivalente a st.session_state.datos)
+
+    Returns:
+    --------
+    dict : Necesidad principal, montos por pilar y pilares ordenados por monto
+
+    Example:
+    --------
+    >>> necesidades = detectar_necesidades_financieras(st.session_state.datos)
+    >>> print(necesidades['principal'])
+    'retiro'
+    """
+
+    perfil = datos.get('perfil_familiar', {})
+
+    necesidades = {
+        'proteccion': 0,
+        'retiro': 0,
+        'educacion': 0,
+        'ahorro': 0
+    }
+
+    # Protección (si tiene dependientes)
+    if perfil.get('tiene_pareja') or perfil.get('tiene_hijos') or perfil.get('tiene_dependientes'):
+        necesidades['proteccion'] = datos.get('proteccion', {}).get('monto_proteccion_sugerido', 0)
+
+    # Retiro
+    necesidades['retiro'] = datos.get('retiro', {}).get('monto_total_retiro', 0)
+
+    # Educación
+    necesidades['educacion'] = datos.get('educacion', {}).get('monto_total_educacion', 0)
+
+    # Ahorro/Proyecto
+    necesidades['ahorro'] = datos.get('ahorro', {}).get('inversion_requerida', 0)
+
+    # Ordenar por prioridad (mayor monto)
+    necesidades_ordenadas = sorted(necesidades.items(), key=lambda x: x[1], reverse=True)
+
     return {
-        "puntuacion": puntuacion,
-        "puntuacion_maxima": 100,
-        "calificacion": calificacion,
-        "estado_general": estado_general,
-        "areas_fortaleza": areas_fortaleza,
-        "areas_mejora": areas_mejora,
-        "porcentaje_salud": round((puntuacion / 100) * 100, 1)
+        'principal': necesidades_ordenadas[0][0] if necesidades_ordenadas[0][1] > 0 else 'ninguna',
+        'montos': necesidades,
+        'prioridades': necesidades_ordenadas
     }
 
 # ================================
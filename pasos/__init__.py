@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+"""
+PASOS DE LA ASESORÍA
+Un módulo por paso (paso1.py ... paso9.py), cada uno con una función mostrar()
+
+Los módulos se importan la primera vez que alguna sesión visita el paso, así
+que un rerun solo carga y ejecuta el código del paso activo.
+"""
+
+import importlib
+
+TOTAL_PASOS = 9
+
+
+def mostrar_paso(step):
+    """Dibuja el paso `step` (1 a 9) importando su módulo bajo demanda."""
+    if not 1 <= step <= TOTAL_PASOS:
+        raise ValueError(f"Paso desconocido: {step}")
+    importlib.import_module(f'pasos.paso{step}').mostrar()
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+PASO 1: DATOS GENERALES
+Nombre, contacto, ocupación y datos del agente
+"""
+
+import streamlit as st
+from datetime import date
+from modelo_datos import DatosGenerales
+from utilidades_app import calcular_edad, validar_email, validar_telefono, navegar_a_paso
+
+
+def mostrar():
+    """Dibuja el paso 1 en la página principal"""
+    st.header("1️⃣ Datos Generales")
+    
+    # Inicializar edad calculada en session state
+    if 'edad_calculada_temp' not in st.session_state:
+        st.session_state.edad_calculada_temp = None
+    
+    with st.form("form_datos_generales"):
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            nombre = st.text_input("Nombre completo*", 
+                                  value=st.session_state.datos['datos_generales'].get('nombre', ''))
+            telefono = st.text_input("Teléfono* (10 dígitos)", 
+                                    value=st.session_state.datos['datos_generales'].get('telefono', ''),
+                                    placeholder="5512345678")
+            correo = st.text_input("Correo electrónico*", 
+                                  value=st.session_state.datos['datos_generales'].get('correo', ''),
+                                  placeholder="ejemplo@email.com")
+            ocupacion = st.text_input("Ocupación*", 
+                                     value=st.session_state.datos['datos_generales'].get('ocupacion', ''))
+        
+        with col2:
+            estado_civil = st.selectbox("Estado civil*", 
+                                       ["", "Soltero", "Casado", "Unión libre", "Divorciado", "Viudo"],
+                                       index=["", "Soltero", "Casado", "Unión libre", "Divorciado", "Viudo"].index(
+                                           st.session_state.datos['datos_generales'].get('estado_civil', '')))
+            
+            # Fecha de nacimiento con columnas para botón
+            st.write("**Fecha de nacimiento***")
+            col_fecha, col_boton = st.columns([3, 1])
+            
+            with col_fecha:
+                fecha_nacimiento = st.date_input(
+                    "Fecha",
+                    value=st.session_state.datos['datos_generales'].get('fecha_nacimiento', date.today()),
+                    min_value=date(1920, 1, 1),
+                    max_value=date.today(),
+                    label_visibility="collapsed"
+                )
+            
+            with col_boton:
+                calcular_edad_btn = st.form_submit_button("🔢 Calcular", use_container_width=True)
+            
+            # Mostrar edad si fue calculada
+            if st.session_state.edad_calculada_temp:
+                st.success(f"✅ Edad: **{st.session_state.edad_calculada_temp} años**")
+            
+            fumador = st.radio("¿Ha fumado en los últimos 2 años?*", 
+                              ["Sí", "No"],
+                              index=0 if st.session_state.datos['datos_generales'].get('fumador') == "Sí" else 1)
+            
+            tipo_cita = st.radio("Tipo de cita*", 
+                               ["Presencial", "Virtual"],
+                               index=0 if st.session_state.datos['datos_generales'].get('tipo_cita') == "Presencial" else 1)
+        
+        col3, col4 = st.columns(2)
+        with col3:
+            nombre_agente = st.text_input("Nombre del agente*", 
+                                         value=st.session_state.datos['datos_generales'].get('nombre_agente', ''))
+        with col4:
+            fecha_asesoria = st.date_input("Fecha de asesoría*",
+                                          value=st.session_state.datos['datos_generales'].get('fecha_asesoria', date.today()))
+        
+        submitted = st.form_submit_button("➡️ Siguiente", type="primary", use_container_width=True)
+        
+        # Manejar botón de calcular edad
+        if calcular_edad_btn:
+            edad = calcular_edad(fecha_nacimiento)
+            if edad:
+                st.session_state.edad_calculada_temp = edad
+                st.rerun()
+        
+        if submitted:
+            errores = []
+            
+            # Validaciones
+            if not nombre.strip():
+                errores.append("El nombre es obligatorio")
+            if not telefono.strip() or not validar_telefono(telefono):
+                errores.append("El teléfono debe tener 10 dígitos")
+            if not correo.strip() or not validar_email(correo):
+                errores.append("El correo electrónico no es válido")
+            if not ocupacion.strip():
+                errores.append("La ocupación es obligatoria")
+            if not estado_civil:
+                errores.append("El estado civil es obligatorio")
+            if not nombre_agente.strip():
+                errores.append("El nombre del agente es obligatorio")
+            
+            if errores:
+                for error in errores:
+                    st.error(f"❌ {error}")
+            else:
+                # Usar edad calculada si existe, si no calcularla ahora
+                edad_final = st.session_state.edad_calculada_temp
+                if not edad_final:
+                    edad_final = calcular_edad(fecha_nacimiento)
+                
+                # Guardar datos
+                st.session_state.datos['datos_generales'] = DatosGenerales(
+                    nombre=nombre.strip(),
+                    telefono=telefono.strip(),
+                    correo=correo.strip(),
+                    ocupacion=ocupacion.strip(),
+                    estado_civil=estado_civil,
+                    fecha_nacimiento=fecha_nacimiento,
+                    edad=edad_final,
+                    fumador=fumador,
+                    tipo_cita=tipo_cita,
+                    nombre_agente=nombre_agente.strip(),
+                    fecha_asesoria=fecha_asesoria
+                )
+                
+                # Limpiar edad temporal
+                st.session_state.edad_calculada_temp = None
+                
+                st.success("✅ Datos guardados correctamente")
+                navegar_a_paso(2)
@@ -0,0 +1,648 @@
+# -*- coding: utf-8 -*-
+"""
+PASO 3: INGRESOS Y CAPACIDAD
+Ingresos, gastos, deudas, flujo libre y capacidad de ahorro
+"""
+
+import streamlit as st
+from datetime import datetime
+from modulo_financiero import (
+    calcular_flujo_financiero,
+    calcular_capacidad_ahorro,
+    validar_inversion_propuesta,
+    generar_recomendaciones_financieras
+)
+from generar_pdf_mejorado import generar_reporte
+from deudas import (
+    CATEGORIAS_DEUDA,
+    ESTRATEGIAS,
+    NOMBRES_DEUDA,
+    NOMBRES_ESTRATEGIA,
+    TASA_CONSOLIDACION_PREDETERMINADA,
+    comparar_estrategias
+)
+from escenarios import (
+    NOMBRES_SECCION,
+    RECORTES_PREDETERMINADOS,
+    categorias_ajustables,
+    malla_escenarios
+)
+from modelo_datos import EstadoFinanciero
+from umbrales import politica_actual
+from utilidades_app import (
+    formatear_moneda,
+    guardar_sesion,
+    navegar_a_paso,
+    enviar_trabajo,
+    estado_trabajo,
+    mostrar_trabajo_en_curso
+)
+
+
+def mostrar():
+    """Dibuja el paso 3 en la página principal"""
+    st.header("3️⃣ Análisis Financiero Integral")
+    
+    st.info("""
+    📊 **Análisis de Flujo Financiero**
+    
+    Realizaremos un análisis detallado de tus ingresos, gastos y capacidad de ahorro.
+    Esta información es fundamental para diseñar un plan financiero personalizado.
+    """)
+    
+    with st.form("form_analisis_financiero"):
+        # SECCIÓN 1: INGRESOS
+        st.subheader("💰 Ingresos")
+        
+        ingreso_mensual = st.number_input(
+            "Ingreso mensual neto* (después de impuestos)", 
+            min_value=0.0, 
+            value=float(st.session_state.datos['ingresos'].get('ingreso_mensual', 0)),
+            step=1000.0,
+            format="%.2f",
+            help="Ingresa tu sueldo neto mensual después de deducciones de ley"
+        )
+        
+        st.markdown("---")
+        
+        # SECCIÓN 2: GASTOS FIJOS
+        st.subheader("🏠 Gastos Fijos Mensuales")
+        st.write("Gastos que pagas regularmente cada mes por el mismo monto")
+        
+        col1, col2 = st.columns(2)
+        
+        gastos_fijos_previos = st.session_state.datos.get('flujo_financiero', {}).get('detalle_gastos_fijos', {})
+        
+        with col1:
+            gasto_vivienda = st.number_input("Vivienda (renta/hipoteca)", min_value=0.0,
+                value=float(gastos_fijos_previos.get('vivienda', 0)), step=500.0, format="%.2f")
+            
+            gasto_servicios = st.number_input("Servicios (luz, agua, gas, internet)", min_value=0.0,
+                value=float(gastos_fijos_previos.get('servicios', 0)), step=100.0, format="%.2f")
+            
+            gasto_transporte = st.number_input("Transporte (gasolina, transporte público)", min_value=0.0,
+                value=float(gastos_fijos_previos.get('transporte', 0)), step=100.0, format="%.2f")
+        
+        with col2:
+            gasto_alimentacion = st.number_input("Alimentación (supermercado)", min_value=0.0,
+                value=float(gastos_fijos_previos.get('alimentacion', 0)), step=500.0, format="%.2f")
+            
+            gasto_seguros = st.number_input("Seguros (auto, vida, gastos médicos)", min_value=0.0,
+                value=float(gastos_fijos_previos.get('seguros', 0)), step=100.0, format="%.2f")
+            
+            gasto_educacion = st.number_input("Educación (colegiaturas, libros)", min_value=0.0,
+                value=float(gastos_fijos_previos.get('educacion', 0)), step=500.0, format="%.2f")
+        
+        st.markdown("---")
+        
+        # SECCIÓN 3: GASTOS VARIABLES
+        st.subheader("🛍️ Gastos Variables Mensuales")
+        st.write("Gastos que varían mes con mes")
+        
+        col1, col2 = st.columns(2)
+        
+        gastos_variables_previos = st.session_state.datos.get('flujo_financiero', {}).get('detalle_gastos_variables', {})
+        
+        with col1:
+            gasto_entretenimiento = st.number_input("Entretenimiento (cine, salidas, hobbies)", 
+                min_value=0.0, value=float(gastos_variables_previos.get('entretenimiento', 0)), step=100.0, format="%.2f")
+            
+            gasto_ropa = st.number_input("Ropa y calzado", min_value=0.0,
+                value=float(gastos_variables_previos.get('ropa', 0)), step=100.0, format="%.2f")
+        
+        with col2:
+            gasto_salud = st.number_input("Salud (medicamentos, consultas)", min_value=0.0,
+                value=float(gastos_variables_previos.get('salud', 0)), step=100.0, format="%.2f")
+            
+            gasto_otros_variables = st.number_input("Otros gastos variables", min_value=0.0,
+                value=float(gastos_variables_previos.get('otros', 0)), step=100.0, format="%.2f")
+        
+        st.markdown("---")
+        
+        # SECCIÓN 4: DEUDAS
+        st.subheader("💳 Pagos de Deudas Mensuales")
+        st.write("Pagos mínimos o mensuales de tus deudas")
+        
+        col1, col2 = st.columns(2)
+        
+        deudas_previas = st.session_state.datos.get('flujo_financiero', {}).get('detalle_deudas', {})
+        
+        with col1:
+            pago_tarjetas = st.number_input("Tarjetas de crédito", min_value=0.0,
+                value=float(deudas_previas.get('tarjetas', 0)), step=500.0, format="%.2f")
+            
+            pago_prestamos = st.number_input("Préstamos personales", min_value=0.0,
+                value=float(deudas_previas.get('prestamos', 0)), step=500.0, format="%.2f")
+        
+        with col2:
+            pago_credito_auto = st.number_input("Crédito automotriz", min_value=0.0,
+                value=float(deudas_previas.get('auto', 0)), step=500.0, format="%.2f")
+            
+            pago_otras_deudas = st.number_input("Otras deudas", min_value=0.0,
+                value=float(deudas_previas.get('otras', 0)), step=100.0, format="%.2f")
+        
+        # Saldos y tasas (opcional): habilitan el plan para liquidar deudas
+        saldos_previos = st.session_state.datos.get('deudas', {})
+        saldos_deudas = {}
+        with st.expander("Saldos y tasas (opcional, para el plan de pago de deudas)"):
+            for categoria in CATEGORIAS_DEUDA:
+                previa = saldos_previos.get(categoria, {})
+                col1, col2 = st.columns(2)
+                with col1:
+                    saldo = st.number_input(f"{NOMBRES_DEUDA[categoria]}: saldo pendiente", min_value=0.0,
+                        value=float(previa.get('saldo', 0)), step=1000.0, format="%.2f")
+                with col2:
+                    tasa = st.number_input(f"{NOMBRES_DEUDA[categoria]}: tasa anual (%)", min_value=0.0,
+                        max_value=200.0, value=float(previa.get('tasa_anual', 0)), step=1.0, format="%.1f")
+                if saldo > 0:
+                    saldos_deudas[categoria] = {'saldo': saldo, 'tasa_anual': tasa}
+        
+        st.markdown("---")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.form_submit_button("⬅️ Anterior", use_container_width=True):
+                navegar_a_paso(2)
+        with col2:
+            submitted = st.form_submit_button("📊 Calcular Análisis", type="primary", use_container_width=True)
+        
+        if submitted:
+            if ingreso_mensual <= 0:
+                st.error("❌ El ingreso mensual debe ser mayor a 0")
+            else:
+                # Preparar datos de gastos
+                gastos_fijos = {
+                    'vivienda': gasto_vivienda,
+                    'servicios': gasto_servicios,
+                    'transporte': gasto_transporte,
+                    'alimentacion': gasto_alimentacion,
+                    'seguros': gasto_seguros,
+                    'educacion': gasto_educacion
+                }
+                
+                gastos_variables = {
+                    'entretenimiento': gasto_entretenimiento,
+                    'ropa': gasto_ropa,
+                    'salud': gasto_salud,
+                    'otros': gasto_otros_variables
+                }
+                
+                deudas = {
+                    'tarjetas': pago_tarjetas,
+                    'prestamos': pago_prestamos,
+                    'auto': pago_credito_auto,
+                    'otras': pago_otras_deudas
+                }
+                
+                # Calcular flujo financiero usando el módulo
+                flujo = calcular_flujo_financiero(ingreso_mensual, gastos_fijos, gastos_variables, deudas)
+                
+                # Calcular capacidad de ahorro
+                capacidad = calcular_capacidad_ahorro(flujo)
+                
+                # Guardar en session state
+                st.session_state.datos['flujo_financiero'] = flujo
+                st.session_state.datos['capacidad_ahorro'] = capacidad
+                st.session_state.datos['deudas'] = saldos_deudas
+                st.session_state.datos['ingresos'] = {
+                    'ingreso_mensual': ingreso_mensual,
+                    'ingreso_anual': ingreso_mensual * 12,
+                    'ahorro_ideal_10': ingreso_mensual * 12 * 0.10,
+                    'ahorro_conservador_7': ingreso_mensual * 0.07,
+                    'inversion_mensual': capacidad.get('ahorro_sugerido', 0)
+                }
+                
+                guardar_sesion()
+                st.success("✅ Análisis financiero completado")
+                st.rerun()
+    
+    # MOSTRAR RESULTADOS SI YA SE CALCULÓ
+    if st.session_state.datos.get('flujo_financiero') and st.session_state.datos.get('capacidad_ahorro'):
+        resultados_analisis()
+
+
+@st.fragment
+def resultados_analisis():
+    """
+    Resultados del análisis, reporte parcial e inversión mensual
+    
+    Es un fragmento: sus botones y formularios solo vuelven a ejecutar esta
+    región. navegar_a_paso() y st.rerun() siguen recargando toda la app.
+    """
+    st.markdown("---")
+    st.header("📊 Resultados del Análisis")
+    
+    flujo = st.session_state.datos['flujo_financiero']
+    capacidad = st.session_state.datos['capacidad_ahorro']
+    
+    # TARJETA DE ESTADO FINANCIERO
+    estado = flujo['estado_financiero']
+    semaforo = flujo['semaforo']
+    color = flujo['color_estado']
+    
+    st.markdown(f"""
+    <div style='background-color: {color}; padding: 20px; border-radius: 10px; text-align: center;'>
+        <h2 style='color: white; margin: 0;'>{semaforo} Estado Financiero: {estado.upper()}</h2>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("###")
+    
+    # MÉTRICAS PRINCIPALES
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("💰 Ingreso Mensual", formatear_moneda(flujo['ingreso_mensual']))
+    
+    with col2:
+        st.metric("💸 Gastos Totales", formatear_moneda(flujo['gastos_totales']),
+            delta=f"-{flujo['porcentaje_gastos_fijos'] + flujo['porcentaje_gastos_variables'] + flujo['porcentaje_deudas']:.1f}%",
+            delta_color="inverse")
+    
+    with col3:
+        st.metric("✨ Flujo Libre", formatear_moneda(flujo['flujo_libre']),
+            delta=f"{flujo['porcentaje_flujo']:.1f}%",
+            delta_color="normal" if flujo['flujo_libre'] > 0 else "inverse")
+    
+    with col4:
+        if capacidad['ahorro_posible']:
+            st.metric("💎 Ahorro Sugerido", formatear_moneda(capacidad['ahorro_sugerido']))
+        else:
+            st.metric("⚠️ Ahorro", "$0.00", delta="No disponible", delta_color="inverse")
+    
+    st.markdown("---")
+    
+    # DESGLOSE DETALLADO
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("📋 Desglose de Gastos")
+        
+        import pandas as pd
+        desglose_data = {
+            'Categoría': ['Gastos Fijos', 'Gastos Variables', 'Deudas', 'Flujo Libre'],
+            'Monto': [
+                formatear_moneda(flujo['gastos_fijos']),
+                formatear_moneda(flujo['gastos_variables']),
+                formatear_moneda(flujo['deudas']),
+                formatear_moneda(flujo['flujo_libre'])
+            ],
+            '% Ingreso': [
+                f"{flujo['porcentaje_gastos_fijos']:.1f}%",
+                f"{flujo['porcentaje_gastos_variables']:.1f}%",
+                f"{flujo['porcentaje_deudas']:.1f}%",
+                f"{flujo['porcentaje_flujo']:.1f}%"
+            ]
+        }
+        
+        df_desglose = pd.DataFrame(desglose_data)
+        st.dataframe(df_desglose, use_container_width=True, hide_index=True)
+    
+    with col2:
+        st.subheader("💡 Indicadores Clave")
+        
+        # Tramos según umbrales.json (mismas escalas que el motor financiero)
+        politica = politica_actual()
+        
+        # Indicador de salud financiera (el tramo negativo se muestra como crítico)
+        pct = flujo['porcentaje_flujo']
+        tramo = politica['estado_flujo'].tramo(pct)
+        if tramo == 4:
+            st.success(f"✅ Flujo libre excelente: {pct:.1f}%")
+        elif tramo == 3:
+            st.info(f"👍 Flujo libre saludable: {pct:.1f}%")
+        elif tramo == 2:
+            st.warning(f"⚠️ Flujo libre ajustado: {pct:.1f}%")
+        else:
+            st.error(f"🚨 Flujo libre crítico: {pct:.1f}%")
+        
+        # Indicador de deudas (sin deudas y bajo control se muestran igual)
+        pct = flujo['porcentaje_deudas']
+        tramo = politica['indicador_deudas'].tramo(pct)
+        if tramo <= 1:
+            st.success(f"✅ Deudas bajo control: {pct:.1f}%")
+        elif tramo == 2:
+            st.warning(f"⚠️ Deudas moderadas: {pct:.1f}%")
+        else:
+            st.error(f"🚨 Deudas altas: {pct:.1f}%")
+        
+        # Indicador de gastos fijos
+        pct = flujo['porcentaje_gastos_fijos']
+        if politica['indicador_gastos_fijos'].tramo(pct) == 0:
+            st.success(f"✅ Gastos fijos adecuados: {pct:.1f}%")
+        else:
+            st.warning(f"⚠️ Gastos fijos elevados: {pct:.1f}%")
+    
+    st.markdown("---")
+    
+    # CAPACIDAD DE AHORRO
+    st.subheader("💎 Capacidad de Ahorro e Inversión")
+    
+    if capacidad['ahorro_posible']:
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.metric("Rango Mínimo", formatear_moneda(capacidad['rango_min']),
+                f"{capacidad['porcentaje_min']:.0f}% del flujo")
+        
+        with col2:
+            st.metric("Ahorro Sugerido", formatear_moneda(capacidad['ahorro_sugerido']), "Recomendado")
+        
+        with col3:
+            st.metric("Rango Máximo", formatear_moneda(capacidad['rango_max']),
+                f"{capacidad['porcentaje_max']:.0f}% del flujo")
+        
+        st.info(f"💡 {capacidad['mensaje']}")
+        
+        # Referencias adicionales
+        st.write("**Referencias de ahorro ideal:**")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.write(f"• Ahorro mínimo (5% ingreso): {formatear_moneda(capacidad['ahorro_minimo'])}")
+        with col2:
+            st.write(f"• Ahorro óptimo (10% ingreso): {formatear_moneda(capacidad['ahorro_optimo'])}")
+        
+    else:
+        st.error("⚠️ " + capacidad['mensaje'])
+        st.warning("""
+        **Recomendación Urgente:**
+        
+        1. Reducir gastos no esenciales
+        2. Generar un plan de pago de deudas
+        3. Buscar formas de aumentar ingresos
+        4. Estabilizar tu situación financiera
+        """)
+    
+    simulador_escenarios(flujo)
+    plan_deudas(flujo)
+    
+    st.markdown("---")
+    st.subheader("📄 Generar Reporte de Análisis Financiero")
+
+    st.info("""
+    💡 **Reporte Parcial de Análisis**
+
+    Puedes generar un PDF profesional con el análisis realizado hasta este momento:
+    - ✅ Datos generales del cliente
+    - ✅ Perfil familiar
+    - ✅ Análisis completo de flujo financiero
+    - ✅ Capacidad de ahorro calculada
+    
+    Este reporte es útil para que revises tu situación antes de continuar.
+    """)
+
+    col_pdf1, col_pdf2, col_pdf3 = st.columns([1, 2, 1])
+    
+    with col_pdf2:
+        if st.button("📑 Generar Reporte PDF", type="primary", use_container_width=True):
+            # Solo las secciones hasta el paso 3
+            enviar_trabajo('pdf_parcial', generar_reporte, st.session_state.datos, 'parcial', tipo='render')
+        
+        estado, pdf_buffer = estado_trabajo('pdf_parcial')
+        if estado == 'listo' and pdf_buffer:
+            st.success("✅ Reporte generado exitosamente")
+            
+            # Botón de descarga
+            nombre_archivo = f"analisis_financiero_{st.session_state.datos['datos_generales'].get('nombre', 'cliente').replace(' ', '_')}_{datetime.now().strftime('%Y%m%d')}.pdf"
+            
+            st.download_button(
+                label="📥 Descargar Reporte de Análisis Financiero",
+                data=pdf_buffer,
+                file_name=nombre_archivo,
+                mime="application/pdf",
+                use_container_width=True,
+                key="download_pdf_paso3"
+            )
+        elif estado == 'listo':
+            st.error("❌ Error al generar el reporte PDF")
+        elif estado == 'error':
+            st.error(f"❌ Error al generar PDF: {pdf_buffer}")
+        elif estado:
+            mostrar_trabajo_en_curso('pdf_parcial', "Generando reporte PDF...")
+    
+    st.markdown("---")
+    
+    # RECOMENDACIONES PERSONALIZADAS
+    st.subheader("🎯 Recomendaciones Personalizadas")
+    
+    recomendaciones = generar_recomendaciones_financieras(flujo, capacidad)
+    
+    for i, rec in enumerate(recomendaciones, 1):
+        st.write(f"{i}. {rec}")
+    
+    st.markdown("---")
+    
+    # PREGUNTA FINAL: INVERSIÓN MENSUAL
+    st.subheader("💼 Capacidad de Inversión Mensual")
+    
+    if capacidad['ahorro_posible']:
+        with st.form("form_inversion_mensual"):
+            st.write(f"""
+            Tu capacidad de ahorro está entre **{formatear_moneda(capacidad['rango_min'])}** 
+            y **{formatear_moneda(capacidad['rango_max'])}** mensuales.
+            
+            ¿Cuánto estarías dispuesto a invertir mensualmente?
+            """)
+            
+            inversion_propuesta = st.number_input(
+                "Inversión mensual propuesta*",
+                min_value=0.0,
+                max_value=float(capacidad['rango_max'] * 1.5),
+                value=float(capacidad['ahorro_sugerido']),
+                step=100.0,
+                format="%.2f"
+            )
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.form_submit_button("⬅️ Regresar", use_container_width=True):
+                    st.session_state.datos.pop('flujo_financiero', None)
+                    st.session_state.datos.pop('capacidad_ahorro', None)
+                    st.rerun()
+            
+            with col2:
+                if st.form_submit_button("➡️ Continuar", type="primary", use_container_width=True):
+                    # Validar inversión propuesta
+                    validacion = validar_inversion_propuesta(inversion_propuesta, capacidad)
+                    
+                    if validacion['valida']:
+                        st.session_state.datos['ingresos']['inversion_mensual'] = inversion_propuesta
+                        st.success(validacion['mensaje'])
+                        navegar_a_paso(4)
+                    else:
+                        st.warning(validacion['mensaje'])
+                        st.session_state.datos['ingresos']['inversion_mensual'] = validacion['monto_ajustado']
+                        
+                        if st.button("Aceptar monto ajustado", type="primary"):
+                            navegar_a_paso(4)
+    else:
+        st.error("""
+        ⚠️ **No puedes continuar con inversiones ahora**
+        
+        Tu situación requiere estabilización financiera primero.
+        """)
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("⬅️ Regresar", use_container_width=True):
+                st.session_state.datos.pop('flujo_financiero', None)
+                st.session_state.datos.pop('capacidad_ahorro', None)
+                st.rerun()
+        
+        with col2:
+            if st.button("Continuar ➡️", type="secondary", use_container_width=True):
+                st.session_state.datos['ingresos']['inversion_mensual'] = 0
+                navegar_a_paso(4)
+
+
+@st.fragment
+def simulador_escenarios(flujo):
+    """
+    ¿Qué pasaría si...? Recortes por categoría sobre el flujo capturado
+    
+    La malla completa de recortes (filas × columnas) se calcula una sola vez
+    en escenarios.py y queda en caché; los sliders solo la consultan. Es un
+    fragmento: moverlos no vuelve a ejecutar el resto de los resultados.
+    """
+    import pandas as pd
+    
+    with st.expander("🔮 ¿Qué pasaría si...? Simulador de escenarios"):
+        categorias = categorias_ajustables(flujo)
+        if not categorias:
+            st.info("Captura gastos o pagos de deudas para simular escenarios.")
+            return
+        
+        etiquetas = {
+            f"{NOMBRES_SECCION[seccion]}: {categoria.capitalize()} ({formatear_moneda(monto)})": (seccion, categoria)
+            for seccion, categoria, monto in categorias
+        }
+        opciones = list(etiquetas)
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            eje_filas = st.selectbox("Recortar (filas)", opciones, key="escenario_eje_filas")
+        with col2:
+            eje_columnas = st.selectbox("Y además recortar (columnas)",
+                ["(ninguna)"] + [opcion for opcion in opciones if opcion != eje_filas],
+                key="escenario_eje_columnas")
+        
+        factores = [1 - recorte / 100 for recorte in RECORTES_PREDETERMINADOS]
+        ejes = [(*etiquetas[eje_filas], factores)]
+        if eje_columnas in etiquetas:
+            ejes.append((*etiquetas[eje_columnas], factores))
+        malla = malla_escenarios(flujo, ejes)
+        
+        # Mapa de calor: filas = recorte del primer eje, columnas = recorte del segundo
+        recortes = [f"-{recorte}%" for recorte in RECORTES_PREDETERMINADOS]
+        columnas = recortes if len(ejes) == 2 else ["Sin otro recorte"]
+        forma = (len(recortes), len(columnas))
+        
+        metrica = st.radio("Mostrar", ["Flujo libre", "Ahorro sugerido", "Estado financiero"],
+            horizontal=True, key="escenario_metrica")
+        
+        if metrica == "Estado financiero":
+            estados = [[EstadoFinanciero.desde_codigo(int(codigo)) for codigo in fila]
+                       for fila in malla['estado'].reshape(forma)]
+            tabla = pd.DataFrame([[f"{e.semaforo} {e.value}" for e in fila] for fila in estados],
+                index=recortes, columns=columnas)
+            colores = pd.DataFrame([[f"background-color: {e.color}; color: white" for e in fila] for fila in estados],
+                index=recortes, columns=columnas)
+            estilo = tabla.style.apply(lambda _: colores, axis=None)
+        else:
+            campo = 'flujo_libre_centavos' if metrica == "Flujo libre" else 'ahorro_sugerido_centavos'
+            tabla = pd.DataFrame(malla[campo].reshape(forma) / 100, index=recortes, columns=columnas)
+            estilo = tabla.style.background_gradient(cmap='RdYlGn', axis=None).format("${:,.0f}")
+        st.dataframe(estilo, use_container_width=True)
+        
+        # Punto seleccionado (consulta de la malla, sin recalcular)
+        indice = []
+        for eje, etiqueta in zip(ejes, (eje_filas, eje_columnas)):
+            recorte = st.select_slider(f"Recorte en {eje[1].capitalize()}", options=RECORTES_PREDETERMINADOS,
+                format_func=lambda r: f"-{r}%", key=f"escenario_recorte_{etiqueta}")
+            indice.append(RECORTES_PREDETERMINADOS.index(recorte))
+        indice = tuple(indice)
+        
+        estado = EstadoFinanciero.desde_codigo(int(malla['estado'][indice]))
+        flujo_libre = malla['flujo_libre_centavos'][indice] / 100
+        ahorro = malla['ahorro_sugerido_centavos'][indice] / 100
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Flujo libre", formatear_moneda(flujo_libre),
+                formatear_moneda(flujo_libre - flujo['flujo_libre']))
+        with col2:
+            st.metric("Estado financiero", f"{estado.semaforo} {estado.value.upper()}",
+                f"{malla['porcentaje_flujo'][indice]:.1f}% del ingreso", delta_color="off")
+        with col3:
+            st.metric("Ahorro sugerido", formatear_moneda(ahorro),
+                formatear_moneda(ahorro - st.session_state.datos['capacidad_ahorro']['ahorro_sugerido']))
+
+
+@st.fragment
+def plan_deudas(flujo):
+    """
+    Plan para liquidar deudas: avalancha, bola de nieve y consolidación
+    
+    Simula mes a mes con los pagos, saldos y tasas capturados (deudas.py).
+    Cada simulación toma unos milisegundos, así que se recalcula en vivo al
+    cambiar el pago adicional o la tasa de consolidación.
+    """
+    import pandas as pd
+    
+    if not flujo.get('deudas'):
+        return
+    
+    with st.expander("💳 Plan para liquidar deudas"):
+        if not st.session_state.datos.get('deudas'):
+            st.info("Captura el saldo y la tasa de tus deudas en el formulario "
+                    "(«Saldos y tasas») para comparar estrategias de pago.")
+            return
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            extra = st.number_input("Pago adicional mensual", min_value=0.0,
+                value=0.0, step=500.0, format="%.2f", key="deudas_pago_adicional",
+                help=f"Tu flujo libre actual es de {formatear_moneda(flujo['flujo_libre'])}")
+        with col2:
+            tasa_consolidacion = st.number_input("Tasa anual del crédito de consolidación (%)", min_value=0.0,
+                max_value=200.0, value=TASA_CONSOLIDACION_PREDETERMINADA, step=1.0, format="%.1f",
+                key="deudas_tasa_consolidacion")
+        
+        resultados = comparar_estrategias(st.session_state.datos, extra, tasa_consolidacion)
+        
+        filas = []
+        for estrategia in ESTRATEGIAS:
+            r = resultados[estrategia]
+            orden = sorted(r['liquidacion_por_deuda'].items(), key=lambda d: (d[1] is None, d[1] or 0))
+            filas.append({
+                'Estrategia': NOMBRES_ESTRATEGIA[estrategia],
+                'Liquidación': f"{r['fecha_liquidacion']:%m/%Y}" if r['fecha_liquidacion'] else "No se liquida",
+                'Meses': str(r['meses']) if r['meses'] is not None else "—",
+                'Intereses': formatear_moneda(r['interes_total']) if r['interes_total'] is not None else "—",
+                'Total pagado': formatear_moneda(r['total_pagado']) if r['total_pagado'] is not None else "—",
+                'Flujo liberado': formatear_moneda(r['flujo_liberado']),
+                'Orden de liquidación': " → ".join(
+                    f"{NOMBRES_DEUDA[categoria]} ({'mes ' + str(mes) if mes is not None else 'sin liquidar'})"
+                    for categoria, mes in orden)
+            })
+        st.dataframe(pd.DataFrame(filas), use_container_width=True, hide_index=True)
+        
+        # Ahorro en intereses frente a seguir con los pagos actuales
+        base = resultados['minimos']
+        liquidables = [e for e in ESTRATEGIAS[1:] if resultados[e]['interes_total'] is not None]
+        if liquidables:
+            mejor = min(liquidables, key=lambda e: (resultados[e]['interes_total'], resultados[e]['meses']))
+            r = resultados[mejor]
+            if base['interes_total'] is None:
+                st.success(f"✅ Con {NOMBRES_ESTRATEGIA[mejor].lower()} terminas de pagar en {r['meses']} meses; "
+                           f"con los pagos actuales las deudas no se liquidan.")
+            elif r['interes_total'] < base['interes_total']:
+                st.success(f"✅ {NOMBRES_ESTRATEGIA[mejor]}: ahorras "
+                           f"{formatear_moneda(base['interes_total'] - r['interes_total'])} en intereses y terminas "
+                           f"{base['meses'] - r['meses']} meses antes. Al terminar liberas "
+                           f"{formatear_moneda(r['flujo_liberado'])} al mes.")
+        else:
+            st.error("🚨 Con estos pagos las deudas no se liquidan: los intereses superan lo que se abona.")
+        
+        # Saldo total mes a mes por estrategia
+        saldos = pd.DataFrame({NOMBRES_ESTRATEGIA[e]: pd.Series(resultados[e]['saldos']) for e in ESTRATEGIAS})
+        st.line_chart(saldos.ffill().fillna(0), x_label="Mes", y_label="Saldo total")
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+PASO 4: PROTECCIÓN FINANCIERA
+Suma asegurada para proteger a los dependientes
+"""
+
+import streamlit as st
+from utilidades_app import formatear_moneda, navegar_a_paso
+
+
+def mostrar():
+    """Dibuja el paso 4 en la página principal"""
+    st.header("4️⃣ Protección Financiera")
+    
+    # Verificar si tiene dependientes
+    tiene_dependientes = (
+        st.session_state.datos['perfil_familiar'].get('tiene_pareja') == "Sí" or
+        st.session_state.datos['perfil_familiar'].get('tiene_hijos') == "Sí" or
+        st.session_state.datos['perfil_familiar'].get('tiene_dependientes') == "Sí"
+    )
+    
+    if not tiene_dependientes:
+        st.info("✅ No tienes dependientes económicos registrados. Esta sección se omitirá.")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("⬅️ Anterior", use_container_width=True):
+                navegar_a_paso(3)
+        with col2:
+            if st.button("➡️ Siguiente", type="primary", use_container_width=True):
+                st.session_state.datos['proteccion'] = {
+                    'aplica': False
+                }
+                navegar_a_paso(5)
+    else:
+        with st.form("form_proteccion"):
+            st.write("""
+            La protección financiera asegura que tu familia pueda mantener su nivel de vida 
+            en caso de fallecimiento, invalidez o enfermedad grave.
+            """)
+            
+            reflexion = st.text_area(
+                "¿Qué pasaría con tu familia si fallecieras, tuvieras invalidez o enfermedad grave?",
+                value=st.session_state.datos['proteccion'].get('reflexion', ''),
+                height=100
+            )
+            
+            st.subheader("Personas Responsables")
+            col1, col2 = st.columns(2)
+            with col1:
+                responsable1 = st.text_input("Responsable 1", 
+                                            value=st.session_state.datos['proteccion'].get('responsable1', ''))
+            with col2:
+                responsable2 = st.text_input("Responsable 2 (opcional)", 
+                                            value=st.session_state.datos['proteccion'].get('responsable2', ''))
+            
+            presupuesto_mensual = st.number_input(
+                "¿Cuál es el presupuesto mensual requerido para mantener a tu familia?*",
+                min_value=0.0,
+                value=float(st.session_state.datos['proteccion'].get('presupuesto_mensual', 0)),
+                step=1000.0,
+                format="%.2f"
+            )
+            
+            if presupuesto_mensual > 0:
+                presupuesto_anual = presupuesto_mensual * 12
+                monto_proteccion = presupuesto_anual * 10  # 10 años de protección
+                
+                st.markdown("---")
+                st.subheader("📊 Cálculo de Protección")
+                
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Presupuesto Mensual", formatear_moneda(presupuesto_mensual))
+                with col2:
+                    st.metric("Presupuesto Anual", formatear_moneda(presupuesto_anual))
+                with col3:
+                    st.metric("Protección Sugerida (10 años)", formatear_moneda(monto_proteccion))
+                
+                st.success(f"""
+                💡 **Recomendación de Protección:**
+                Se sugiere una protección de **{formatear_moneda(monto_proteccion)}** para cubrir 10 años 
+                del presupuesto familiar en caso de contingencia.
+                """)
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.form_submit_button("⬅️ Anterior", use_container_width=True):
+                    navegar_a_paso(3)
+            with col2:
+                submitted = st.form_submit_button("➡️ Siguiente", type="primary", use_container_width=True)
+            
+            if submitted:
+                if presupuesto_mensual <= 0:
+                    st.error("❌ El presupuesto mensual debe ser mayor a 0")
+                elif not responsable1.strip():
+                    st.error("❌ Debe indicar al menos un responsable")
+                else:
+                    # Guardar datos
+                    st.session_state.datos['proteccion'] = {
+                        'aplica': True,
+                        'reflexion': reflexion,
+                        'responsable1': responsable1.strip(),
+                        'responsable2': responsable2.strip() if responsable2 else '',
+                        'presupuesto_mensual': presupuesto_mensual,
+                        'presupuesto_anual': presupuesto_mensual * 12,
+                        'monto_proteccion_sugerido': presupuesto_mensual * 12 * 10
+                    }
+                    
+                    st.success("✅ Protección financiera configurada")
+                    navegar_a_paso(5)
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+PASO 5: AHORRO / CRISIS / PROYECTOS
+Fondo de emergencia, crisis y proyectos
+"""
+
+import streamlit as st
+from utilidades_app import formatear_moneda, navegar_a_paso
+
+
+def mostrar():
+    """Dibuja el paso 5 en la página principal"""
+    st.header("5️⃣ Ahorro / Crisis / Proyectos")
+    
+    with st.form("form_ahorro"):
+        preparado_crisis = st.radio(
+            "¿Estás preparado para una crisis financiera?*",
+            ["Sí", "No", "Parcialmente"],
+            index=["Sí", "No", "Parcialmente"].index(st.session_state.datos['ahorro'].get('preparado_crisis', 'No'))
+        )
+        
+        if preparado_crisis in ["No", "Parcialmente"]:
+            st.info("""
+            💡 **Recomendación:**
+            Es importante contar con un fondo de emergencia equivalente a 3-6 meses de tus gastos mensuales.
+            """)
+        
+        st.markdown("---")
+        st.subheader("Proyectos a Mediano/Largo Plazo")
+        
+        tiene_proyecto = st.radio("¿Tienes un proyecto a mediano o largo plazo?*", ["Sí", "No"],
+                                 index=0 if st.session_state.datos['ahorro'].get('tiene_proyecto') == "Sí" else 1)
+        
+        proyecto_info = {}
+        if tiene_proyecto == "Sí":
+            descripcion_proyecto = st.text_input("Describe tu proyecto", 
+                                                value=st.session_state.datos['ahorro'].get('descripcion_proyecto', ''),
+                                                placeholder="Ej: Comprar casa, iniciar negocio, viaje...")
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                costo_proyecto = st.number_input("Costo estimado del proyecto*", 
+                                                min_value=0.0,
+                                                value=float(st.session_state.datos['ahorro'].get('costo_proyecto', 0)),
+                                                step=10000.0,
+                                                format="%.2f")
+            with col2:
+                ahorro_actual = st.number_input("Ahorro actual disponible", 
+                                               min_value=0.0,
+                                               value=float(st.session_state.datos['ahorro'].get('ahorro_actual', 0)),
+                                               step=1000.0,
+                                               format="%.2f")
+            with col3:
+                plazo_anos = st.number_input("Plazo en años*", 
+                                            min_value=1, max_value=30,
+                                            value=st.session_state.datos['ahorro'].get('plazo_anos', 5))
+            
+            if costo_proyecto > 0 and plazo_anos > 0:
+                inversion_requerida = max(0, costo_proyecto - ahorro_actual)
+                ahorro_mensual_sugerido = inversion_requerida / (plazo_anos * 12)
+                
+                st.markdown("---")
+                st.subheader("📊 Cálculo del Proyecto")
+                
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Costo Total", formatear_moneda(costo_proyecto))
+                with col2:
+                    st.metric("Inversión Requerida", formatear_moneda(inversion_requerida))
+                with col3:
+                    st.metric("Ahorro Mensual Sugerido", formatear_moneda(ahorro_mensual_sugerido))
+                
+                proyecto_info = {
+                    'descripcion': descripcion_proyecto,
+                    'costo': costo_proyecto,
+                    'ahorro_actual': ahorro_actual,
+                    'plazo_anos': plazo_anos,
+                    'inversion_requerida': inversion_requerida,
+                    'ahorro_mensual_sugerido': ahorro_mensual_sugerido
+                }
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.form_submit_button("⬅️ Anterior", use_container_width=True):
+                navegar_a_paso(4)
+        with col2:
+            submitted = st.form_submit_button("➡️ Siguiente", type="primary", use_container_width=True)
+        
+        if submitted:
+            errores = []
+            
+            if tiene_proyecto == "Sí":
+                if not descripcion_proyecto.strip():
+                    errores.append("Describe tu proyecto")
+                if costo_proyecto <= 0:
+                    errores.append("El costo del proyecto debe ser mayor a 0")
+                if plazo_anos <= 0:
+                    errores.append("El plazo debe ser mayor a 0")
+            
+            if errores:
+                for error in errores:
+                    st.error(f"❌ {error}")
+            else:
+                # Guardar datos
+                st.session_state.datos['ahorro'] = {
+                    'preparado_crisis': preparado_crisis,
+                    'tiene_proyecto': tiene_proyecto,
+                    **proyecto_info
+                }
+                
+                st.success("✅ Información de ahorro guardada")
+                navegar_a_paso(6)
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+PASO 6: RETIRO
+Edad de retiro, ingreso deseado y monto a acumular
+"""
+
+import streamlit as st
+from modulo_financiero import (
+    EDADES_RETIRO_SUPERFICIE,
+    FACTORES_INGRESO_RETIRO,
+    calcular_retiro,
+    calcular_superficie_retiro
+)
+from utilidades_app import formatear_moneda, navegar_a_paso
+
+
+def mostrar():
+    """Dibuja el paso 6 en la página principal"""
+    st.header("6️⃣ Retiro")
+    
+    edad_actual = st.session_state.datos['datos_generales'].get('edad') or 30  # DatosGenerales guarda edad=None si no se capturó
+    
+    with st.form("form_retiro"):
+        st.write(f"**Tu edad actual:** {edad_actual} años")
+        
+        edad_retiro = st.number_input("¿A qué edad te gustaría retirarte?*", 
+                                     min_value=edad_actual + 1, 
+                                     max_value=80,
+                                     value=st.session_state.datos['retiro'].get('edad_retiro', 65))
+        
+        ingreso_mensual_retiro = st.number_input(
+            "¿Cuánto te gustaría recibir mensualmente en el retiro?*",
+            min_value=0.0,
+            value=float(st.session_state.datos['retiro'].get('ingreso_mensual_retiro', 0)),
+            step=1000.0,
+            format="%.2f"
+        )
+        
+        if ingreso_mensual_retiro > 0 and edad_retiro > edad_actual:
+            # Cálculo simplificado (sin inflación ni rendimientos), el mismo que se guarda
+            retiro = calcular_retiro(edad_actual, edad_retiro, ingreso_mensual_retiro)
+            anos_para_retiro = retiro['anos_para_retiro']
+            anos_en_retiro = retiro['anos_en_retiro']
+            monto_anual_retiro = retiro['monto_anual_retiro']
+            monto_total_retiro = retiro['monto_total_retiro']
+            ahorro_mensual_retiro = retiro['ahorro_mensual_sugerido']
+            
+            st.markdown("---")
+            st.subheader("📊 Proyección de Retiro")
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("Años para el retiro", f"{anos_para_retiro} años")
+                st.metric("Años en retiro", f"{anos_en_retiro} años")
+                st.metric("Ingreso anual deseado", formatear_moneda(monto_anual_retiro))
+            
+            with col2:
+                st.metric("Monto total requerido", formatear_moneda(monto_total_retiro))
+                st.metric("Ahorro mensual sugerido", formatear_moneda(ahorro_mensual_retiro))
+            
+            st.info(f"""
+            💡 **Proyección de Retiro:**
+            - Te faltan **{anos_para_retiro} años** para retirarte
+            - Vivirás aproximadamente **{anos_en_retiro} años** en retiro
+            - Necesitarás un total de **{formatear_moneda(monto_total_retiro)}**
+            - Se sugiere ahorrar **{formatear_moneda(ahorro_mensual_retiro)}** mensuales
+            
+            *Nota: Este es un cálculo simplificado. Se recomienda una asesoría detallada considerando inflación y rendimientos.*
+            """)
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.form_submit_button("⬅️ Anterior", use_container_width=True):
+                navegar_a_paso(5)
+        with col2:
+            submitted = st.form_submit_button("➡️ Siguiente", type="primary", use_container_width=True)
+        
+        if submitted:
+            if ingreso_mensual_retiro <= 0:
+                st.error("❌ El ingreso mensual de retiro debe ser mayor a 0")
+            elif edad_retiro <= edad_actual:
+                st.error("❌ La edad de retiro debe ser mayor a tu edad actual")
+            else:
+                # Guardar datos
+                st.session_state.datos['retiro'] = calcular_retiro(edad_actual, edad_retiro, ingreso_mensual_retiro)
+                
+                st.success("✅ Plan de retiro configurado")
+                navegar_a_paso(7)
+    
+    explorador_retiro(edad_actual)
+
+
+def superficie_retiro_cliente(edad_actual, ingreso_base):
+    """
+    Superficie edad de retiro × ingreso deseado del cliente en curso.
+    
+    Se calcula una vez por cliente (en un solo broadcast) y se guarda en
+    st.session_state; solo se recalcula si cambian la edad o el ingreso base.
+    """
+    clave = (edad_actual, ingreso_base)
+    guardada = st.session_state.get('superficie_retiro')
+    if guardada is None or guardada['clave'] != clave:
+        ingresos = [round(ingreso_base * factor, 2) for factor in FACTORES_INGRESO_RETIRO]
+        guardada = {
+            'clave': clave,
+            'superficie': calcular_superficie_retiro(edad_actual, EDADES_RETIRO_SUPERFICIE, ingresos)
+        }
+        st.session_state.superficie_retiro = guardada
+    return guardada['superficie']
+
+
+@st.fragment
+def explorador_retiro(edad_actual):
+    """
+    Explorador de escenarios de retiro (edad × ingreso deseado)
+    
+    Es un fragmento y consulta la superficie precalculada: mover los sliders
+    no recalcula nada ni vuelve a ejecutar la app.
+    """
+    import pandas as pd
+    
+    with st.expander("🔭 Explorar edad de retiro e ingreso deseado"):
+        if edad_actual >= EDADES_RETIRO_SUPERFICIE[-1]:
+            st.info(f"El explorador cubre retiros hasta los {EDADES_RETIRO_SUPERFICIE[-1]} años.")
+            return
+        
+        datos = st.session_state.datos
+        ingreso_base = (datos['retiro'].get('ingreso_mensual_retiro')
+                        or datos.get('ingresos', {}).get('ingreso_mensual')
+                        or 20000.0)
+        superficie = superficie_retiro_cliente(edad_actual, float(ingreso_base))
+        
+        edades = [int(edad) for edad in superficie['edades_retiro'] if edad > edad_actual]
+        ingresos = [float(ingreso) for ingreso in superficie['ingresos_mensuales']]
+        fila_inicial = len(superficie['edades_retiro']) - len(edades)
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            edad = st.select_slider("Edad de retiro", options=edades,
+                value=min(max(datos['retiro'].get('edad_retiro', 65), edades[0]), edades[-1]),
+                key="explorador_edad_retiro")
+        with col2:
+            ingreso = st.select_slider("Ingreso mensual deseado", options=ingresos,
+                value=ingresos[FACTORES_INGRESO_RETIRO.index(1.0)],
+                format_func=formatear_moneda, key="explorador_ingreso_retiro")
+        
+        i = list(superficie['edades_retiro']).index(edad)
+        j = ingresos.index(ingreso)
+        ahorro = superficie['ahorro_mensual_sugerido'][i, j]
+        capacidad = datos.get('capacidad_ahorro') or {}
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Años para el retiro", f"{edad - edad_actual} años")
+        with col2:
+            st.metric("Monto total requerido", formatear_moneda(superficie['monto_total_retiro'][i, j]))
+        with col3:
+            if capacidad.get('ahorro_posible'):
+                st.metric("Ahorro mensual requerido", formatear_moneda(ahorro),
+                    f"{formatear_moneda(capacidad['ahorro_sugerido'] - ahorro)} vs. ahorro sugerido",
+                    delta_color="normal")
+            else:
+                st.metric("Ahorro mensual requerido", formatear_moneda(ahorro))
+        
+        # Mapa de calor del ahorro mensual requerido (filas = edad, columnas = ingreso)
+        tabla = pd.DataFrame(
+            superficie['ahorro_mensual_sugerido'][fila_inicial:],
+            index=[f"{edad} años" for edad in edades],
+            columns=[formatear_moneda(ingreso) for ingreso in ingresos]
+        )
+        st.dataframe(tabla.style.background_gradient(cmap='RdYlGn_r', axis=None).format("${:,.0f}"),
+            use_container_width=True)
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+PASO 7: EDUCACIÓN
+Costo y plazo de la educación de los hijos
+"""
+
+import streamlit as st
+from modelo_datos import Educacion, EducacionHijo
+from utilidades_app import formatear_moneda, navegar_a_paso
+
+
+def mostrar():
+    """Dibuja el paso 7 en la página principal"""
+    st.header("7️⃣ Educación")
+    
+    tiene_hijos = st.session_state.datos['perfil_familiar'].get('tiene_hijos') == "Sí"
+    
+    if not tiene_hijos:
+        st.info("✅ No tienes hijos registrados. Esta sección se omitirá.")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("⬅️ Anterior", use_container_width=True):
+                navegar_a_paso(6)
+        with col2:
+            if st.button("➡️ Siguiente", type="primary", use_container_width=True):
+                st.session_state.datos['educacion'] = Educacion(aplica=False)
+                navegar_a_paso(8)
+    else:
+        hijos = st.session_state.datos['perfil_familiar'].get('hijos', [])
+        
+        with st.form("form_educacion"):
+            st.write("Planifica la educación universitaria de tus hijos")
+            
+            educacion_hijos = []
+            monto_total_educacion = 0
+            
+            for i, hijo in enumerate(hijos):
+                st.subheader(f"👤 {hijo['nombre']} ({hijo['edad']} años)")
+                
+                col1, col2 = st.columns(2)
+                with col1:
+                    costo_anual_universidad = st.number_input(
+                        f"Costo anual estimado de universidad",
+                        min_value=0.0,
+                        value=float(st.session_state.datos['educacion'].get(f'costo_hijo_{i}', 100000)),
+                        step=10000.0,
+                        format="%.2f",
+                        key=f"costo_univ_{i}"
+                    )
+                
+                with col2:
+                    edad_universidad = 18
+                    anos_restantes = max(0, edad_universidad - hijo['edad'])
+                    st.metric("Años hasta universidad", f"{anos_restantes} años")
+                
+                # Calcular costo total (4 años de universidad)
+                costo_total_hijo = costo_anual_universidad * 4
+                
+                # Ahorro mensual sugerido
+                if anos_restantes > 0:
+                    ahorro_mensual_hijo = costo_total_hijo / (anos_restantes * 12)
+                else:
+                    ahorro_mensual_hijo = costo_anual_universidad / 12
+                
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.metric("Costo total estimado (4 años)", formatear_moneda(costo_total_hijo))
+                with col2:
+                    st.metric("Ahorro mensual sugerido", formatear_moneda(ahorro_mensual_hijo))
+                
+                educacion_hijos.append(EducacionHijo(
+                    nombre=hijo['nombre'],
+                    edad=hijo['edad'],
+                    costo_anual=costo_anual_universidad,
+                    anos_restantes=anos_restantes,
+                    costo_total=costo_total_hijo,
+                    ahorro_mensual=ahorro_mensual_hijo
+                ))
+                
+                monto_total_educacion += costo_total_hijo
+                
+                st.markdown("---")
+            
+            # Resumen total
+            st.subheader("📊 Resumen Total de Educación")
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("Inversión Total en Educación", formatear_moneda(monto_total_educacion))
+            with col2:
+                ahorro_mensual_total = sum([h['ahorro_mensual'] for h in educacion_hijos])
+                st.metric("Ahorro Mensual Total Sugerido", formatear_moneda(ahorro_mensual_total))
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.form_submit_button("⬅️ Anterior", use_container_width=True):
+                    navegar_a_paso(6)
+            with col2:
+                submitted = st.form_submit_button("➡️ Siguiente", type="primary", use_container_width=True)
+            
+            if submitted:
+                # Guardar datos
+                st.session_state.datos['educacion'] = Educacion(
+                    aplica=True,
+                    hijos=educacion_hijos,
+                    monto_total_educacion=monto_total_educacion,
+                    ahorro_mensual_total=sum([h.ahorro_mensual for h in educacion_hijos])
+                )
+                
+                st.success("✅ Plan educativo configurado")
+                navegar_a_paso(8)
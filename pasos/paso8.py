@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+PASO 8: RESUMEN Y NECESIDADES
+Resumen de la asesoría y necesidades detectadas
+"""
+
+import streamlit as st
+import pandas as pd
+from utilidades_app import formatear_moneda, navegar_a_paso, detectar_necesidades
+
+
+def mostrar():
+    """Dibuja el paso 8 en la página principal"""
+    st.header("8️⃣ Resumen y Detección de Necesidades")
+    
+    # Detectar necesidades
+    necesidades = detectar_necesidades()
+    
+    # Información del cliente
+    st.subheader("👤 Información del Cliente")
+    datos_gen = st.session_state.datos['datos_generales']
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.write(f"**Nombre:** {datos_gen.get('nombre')}")
+        st.write(f"**Edad:** {datos_gen.get('edad')} años")
+        st.write(f"**Ocupación:** {datos_gen.get('ocupacion')}")
+    with col2:
+        st.write(f"**Estado Civil:** {datos_gen.get('estado_civil')}")
+        st.write(f"**Teléfono:** {datos_gen.get('telefono')}")
+        st.write(f"**Correo:** {datos_gen.get('correo')}")
+    with col3:
+        st.write(f"**Fumador:** {datos_gen.get('fumador')}")
+        st.write(f"**Tipo de Cita:** {datos_gen.get('tipo_cita')}")
+        st.write(f"**Agente:** {datos_gen.get('nombre_agente')}")
+    
+    st.markdown("---")
+    
+    # Necesidad Principal
+    st.subheader("🎯 Necesidad Principal Detectada")
+    
+    necesidad_principal = necesidades['principal']
+    if necesidad_principal == 'proteccion':
+        st.error("🛡️ **PROTECCIÓN FINANCIERA**")
+        st.write("Tu familia necesita protección en caso de contingencia.")
+    elif necesidad_principal == 'retiro':
+        st.warning("👴 **RETIRO**")
+        st.write("Es prioritario planificar tu retiro para asegurar tu futuro.")
+    elif necesidad_principal == 'educacion':
+        st.info("🎓 **EDUCACIÓN**")
+        st.write("La educación de tus hijos requiere planificación financiera.")
+    elif necesidad_principal == 'ahorro':
+        st.success("💰 **AHORRO/PROYECTO**")
+        st.write("Tu proyecto requiere un plan de ahorro estructurado.")
+    else:
+        st.info("ℹ️ No se detectaron necesidades específicas prioritarias.")
+    
+    st.markdown("---")
+    
+    # Tabla de montos
+    st.subheader("💰 Montos Estimados por Pilar")
+    
+    datos_tabla = {
+        'Pilar': ['Protección', 'Retiro', 'Educación', 'Ahorro/Proyecto'],
+        'Monto Estimado': [
+            formatear_moneda(necesidades['montos']['proteccion']),
+            formatear_moneda(necesidades['montos']['retiro']),
+            formatear_moneda(necesidades['montos']['educacion']),
+            formatear_moneda(necesidades['montos']['ahorro'])
+        ],
+        'Prioridad': []
+    }
+    
+    # Asignar prioridades
+    for pilar in datos_tabla['Pilar']:
+        pilar_key = pilar.lower().replace('/', '').replace(' ', '').replace('proyecto', '')
+        if pilar_key == 'ahorroproyecto':
+            pilar_key = 'ahorro'
+        
+        # Buscar en prioridades
+        encontrado = False
+        for idx, (p, m) in enumerate(necesidades['prioridades'], 1):
+            if p == pilar_key:
+                datos_tabla['Prioridad'].append(f"#{idx}")
+                encontrado = True
+                break
+        
+        if not encontrado:
+            datos_tabla['Prioridad'].append("-")
+    
+    df_resumen = pd.DataFrame(datos_tabla)
+    st.dataframe(df_resumen, use_container_width=True, hide_index=True)
+    
+    st.markdown("---")
+    
+    # Capacidad vs Necesidad
+    st.subheader("📊 Análisis de Capacidad")
+    
+    inversion_mensual = st.session_state.datos['ingresos'].get('inversion_mensual', 0)
+    ingreso_mensual = st.session_state.datos['ingresos'].get('ingreso_mensual', 0)
+    
+    # Calcular necesidad mensual total estimada
+    necesidad_mensual_total = 0
+    
+    # Protección (estimado 2-5% del ingreso)
+    if necesidades['montos']['proteccion'] > 0:
+        necesidad_mensual_total += ingreso_mensual * 0.03
+    
+    # Retiro
+    necesidad_mensual_total += st.session_state.datos['retiro'].get('ahorro_mensual_sugerido', 0)
+    
+    # Educación
+    necesidad_mensual_total += st.session_state.datos['educacion'].get('ahorro_mensual_total', 0)
+    
+    # Proyecto
+    if st.session_state.datos['ahorro'].get('tiene_proyecto') == "Sí":
+        necesidad_mensual_total += st.session_state.datos['ahorro'].get('ahorro_mensual_sugerido', 0)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Inversión Mensual Disponible", formatear_moneda(inversion_mensual))
+    with col2:
+        st.metric("Necesidad Mensual Estimada", formatear_moneda(necesidad_mensual_total))
+    with col3:
+        brecha = inversion_mensual - necesidad_mensual_total
+        st.metric("Brecha", formatear_moneda(brecha), 
+                 delta="Superávit" if brecha >= 0 else "Déficit")
+    
+    if brecha < 0:
+        st.warning(f"""
+        ⚠️ **Atención:** Existe un déficit de {formatear_moneda(abs(brecha))} entre tu capacidad 
+        de inversión y las necesidades detectadas. Se recomienda:
+        - Priorizar las necesidades más urgentes
+        - Considerar aumentar la capacidad de ahorro
+        - Explorar opciones de inversión con mejores rendimientos
+        """)
+    else:
+        st.success(f"""
+        ✅ **Excelente:** Tu capacidad de inversión cubre las necesidades detectadas con un 
+        margen de {formatear_moneda(brecha)}. Esto permite:
+        - Cubrir todas las necesidades identificadas
+        - Tener un margen de seguridad
+        - Considerar objetivos adicionales
+        """)
+    
+    st.markdown("---")
+    
+    # Recomendaciones
+    st.subheader("📋 Recomendaciones para la Asesoría")
+    
+    recomendaciones = []
+    
+    if necesidades['montos']['proteccion'] > 0:
+        recomendaciones.append(f"🛡️ **Protección:** Considerar un seguro de vida por {formatear_moneda(necesidades['montos']['proteccion'])}")
+    
+    if necesidades['montos']['retiro'] > 0:
+        recomendaciones.append(f"👴 **Retiro:** Iniciar plan de retiro con ahorro mensual de {formatear_moneda(st.session_state.datos['retiro'].get('ahorro_mensual_sugerido', 0))}")
+    
+    if necesidades['montos']['educacion'] > 0:
+        recomendaciones.append(f"🎓 **Educación:** Plan educativo que requiere {formatear_moneda(st.session_state.datos['educacion'].get('ahorro_mensual_total', 0))} mensuales")
+    
+    if necesidades['montos']['ahorro'] > 0:
+        recomendaciones.append(f"💰 **Proyecto:** Ahorro sistemático de {formatear_moneda(st.session_state.datos['ahorro'].get('ahorro_mensual_sugerido', 0))} mensuales")
+    
+    if st.session_state.datos['ahorro'].get('preparado_crisis') in ["No", "Parcialmente"]:
+        recomendaciones.append("🚨 **Fondo de Emergencia:** Crear fondo equivalente a 3-6 meses de gastos")
+    
+    for rec in recomendaciones:
+        st.write(rec)
+    
+    st.markdown("---")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("⬅️ Anterior", use_container_width=True):
+            navegar_a_paso(7)
+    with col2:
+        if st.button("➡️ Siguiente", type="primary", use_container_width=True):
+            navegar_a_paso(9)
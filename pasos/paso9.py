@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+"""
+PASO 9: CIERRE
+Satisfacción, segunda cita, referidos y descargas finales
+"""
+
+import streamlit as st
+from datetime import datetime, date
+from generar_pdf_mejorado import generar_grafico_necesidades_perfil, generar_reporte
+from utilidades_app import (
+    init_google_sheets,
+    guardar_asesoria_sheets,
+    guardar_sesion,
+    grabar_paso,
+    navegar_a_paso,
+    exportar_json,
+    enviar_trabajo,
+    estado_trabajo,
+    mostrar_trabajo_en_curso,
+    generar_graficos_necesidades,
+    detectar_necesidades
+)
+
+
+def mostrar():
+    """Dibuja el paso 9 en la página principal"""
+    st.header("9️⃣ Cierre de la Asesoría")
+    
+    with st.form("form_cierre"):
+        st.subheader("📝 Retroalimentación")
+        
+        satisfaccion = st.text_area(
+            "¿Qué fue lo que más te agradó de esta asesoría?*",
+            value=st.session_state.datos['cierre'].get('satisfaccion', ''),
+            height=100
+        )
+        
+        segunda_cita = st.radio("¿Te gustaría agendar una segunda cita?*", ["Sí", "No"],
+                               index=0 if st.session_state.datos['cierre'].get('segunda_cita') == "Sí" else 1)
+        
+        fecha_segunda_cita = None
+        hora_segunda_cita = None
+        if segunda_cita == "Sí":
+            col1, col2 = st.columns(2)
+            with col1:
+                fecha_segunda_cita = st.date_input("Fecha de segunda cita",
+                                                   value=st.session_state.datos['cierre'].get('fecha_segunda_cita', date.today()),
+                                                   min_value=date.today())
+            with col2:
+                hora_segunda_cita = st.time_input("Hora de segunda cita",
+                                                 value=st.session_state.datos['cierre'].get('hora_segunda_cita'))
+        
+        st.markdown("---")
+        st.subheader("👥 Referidos")
+        st.write("¿Conoces a alguien que pudiera beneficiarse de una asesoría financiera?")
+        
+        num_referidos = st.number_input("¿Cuántos referidos tienes?", 
+                                       min_value=0, max_value=5,
+                                       value=st.session_state.datos['cierre'].get('num_referidos', 0))
+        
+        referidos = []
+        referidos_previos = st.session_state.datos['cierre'].get('referidos', [])
+        
+        for i in range(num_referidos):
+            st.write(f"**Referido {i+1}**")
+            col1, col2 = st.columns(2)
+            with col1:
+                nombre_ref = st.text_input(f"Nombre", 
+                                          value=referidos_previos[i]['nombre'] if i < len(referidos_previos) else '',
+                                          key=f"nombre_ref_{i}")
+                edad_ref = st.number_input(f"Edad", 
+                                          min_value=18, max_value=100,
+                                          value=referidos_previos[i]['edad'] if i < len(referidos_previos) else 30,
+                                          key=f"edad_ref_{i}")
+            with col2:
+                parentesco_ref = st.text_input(f"Parentesco/Relación", 
+                                              value=referidos_previos[i]['parentesco'] if i < len(referidos_previos) else '',
+                                              placeholder="Ej: Hermano, Amigo, Compañero",
+                                              key=f"parentesco_ref_{i}")
+                comentarios_ref = st.text_area(f"Comentarios", 
+                                              value=referidos_previos[i]['comentarios'] if i < len(referidos_previos) else '',
+                                              key=f"comentarios_ref_{i}",
+                                              height=60)
+            
+            referidos.append({
+                'nombre': nombre_ref,
+                'edad': edad_ref,
+                'parentesco': parentesco_ref,
+                'comentarios': comentarios_ref
+            })
+            
+            st.markdown("---")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.form_submit_button("⬅️ Anterior", use_container_width=True):
+                navegar_a_paso(8)
+        with col2:
+            submitted = st.form_submit_button("✅ Finalizar Asesoría", type="primary", use_container_width=True)
+        
+        if submitted:
+            if not satisfaccion.strip():
+                st.error("❌ Por favor comparte tu experiencia con la asesoría")
+            else:
+                # Guardar datos
+                st.session_state.datos['cierre'] = {
+                    'satisfaccion': satisfaccion,
+                    'segunda_cita': segunda_cita,
+                    'fecha_segunda_cita': fecha_segunda_cita,
+                    'hora_segunda_cita': hora_segunda_cita,
+                    'num_referidos': num_referidos,
+                    'referidos': referidos
+                }
+                grabar_paso(None)
+                
+                st.success("✅ ¡Asesoría completada exitosamente!")
+                st.balloons()
+                
+                # Guardar automáticamente en Google Sheets si está habilitado
+                if st.session_state.google_sheets_habilitado:
+                    enviar_trabajo('sheets_cierre', guardar_asesoria_sheets, st.session_state.datos, init_google_sheets())
+                
+                # Reporte y gráfico finales en segundo plano (se descargan abajo)
+                enviar_trabajo('pdf_final', generar_reporte, st.session_state.datos, 'completo', tipo='render')
+                enviar_trabajo('grafico_final', generar_grafico_necesidades_perfil, detectar_necesidades(), tipo='render')
+                
+                # Mostrar resumen final
+                st.markdown("---")
+                st.subheader("📊 Resumen Final")
+                
+                necesidades = detectar_necesidades()
+                
+                # Mostrar gráfico
+                grafico_buffer = generar_graficos_necesidades()
+                if grafico_buffer:
+                    st.image(grafico_buffer, use_container_width=True)
+                
+                st.write(f"""
+                **Cliente:** {st.session_state.datos['datos_generales'].get('nombre')}
+                
+                **Necesidad Principal:** {necesidades['principal'].upper()}
+                
+                **Próximos Pasos:**
+                - Revisar propuestas específicas para las necesidades detectadas
+                - {"Agendar segunda cita para el " + str(fecha_segunda_cita) if segunda_cita == "Sí" else "Dar seguimiento vía telefónica"}
+                - {f"Contactar a {num_referidos} referido(s)" if num_referidos > 0 else ""}
+                
+                **Agente:** {st.session_state.datos['datos_generales'].get('nombre_agente')}
+                **Fecha:** {st.session_state.datos['datos_generales'].get('fecha_asesoria')}
+                """)
+    
+    # BOTONES DE DESCARGA FUERA DEL FORMULARIO
+    # Solo mostrar si ya se completó la asesoría
+    if st.session_state.step == 9 and st.session_state.datos['cierre'].get('satisfaccion'):
+        area_descargas()
+
+
+@st.fragment
+def area_descargas():
+    """
+    Resultado del guardado en Sheets, descargas finales y nueva asesoría
+    
+    Es un fragmento: "Actualizar" y las descargas solo vuelven a ejecutar
+    esta región; el reinicio de la asesoría recarga toda la app.
+    """
+    # Resultado del guardado automático en Google Sheets
+    estado, resultado = estado_trabajo('sheets_cierre')
+    if estado == 'listo':
+        exito, mensaje = resultado
+        if exito:
+            st.success(f"☁️ {mensaje}")
+        else:
+            st.warning(f"⚠️ {mensaje}")
+    elif estado == 'error':
+        st.warning(f"⚠️ Error al guardar: {resultado}")
+    elif estado:
+        mostrar_trabajo_en_curso('sheets_cierre', "Guardando en Google Sheets...")
+    
+    # Botones de exportar
+    st.markdown("---")
+    st.subheader("💾 Descargar Reporte")
+    
+    # Asesoría restaurada de un snapshot (o trabajos purgados): volver a generarlos
+    if 'pdf_final' not in st.session_state.trabajos:
+        enviar_trabajo('pdf_final', generar_reporte, st.session_state.datos, 'completo', tipo='render')
+    if 'grafico_final' not in st.session_state.trabajos:
+        enviar_trabajo('grafico_final', generar_grafico_necesidades_perfil, detectar_necesidades(), tipo='render')
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        json_data = exportar_json()
+        st.download_button(
+            label="📄 Descargar JSON",
+            data=json_data,
+            file_name=f"asesoria_{st.session_state.datos['datos_generales'].get('nombre', 'cliente').replace(' ', '_')}_{datetime.now().strftime('%Y%m%d')}.json",
+            mime="application/json",
+            use_container_width=True,
+            key="download_json_final"
+        )
+    
+    with col2:
+        estado, pdf_buffer = estado_trabajo('pdf_final')
+        if estado == 'listo' and pdf_buffer:
+            st.download_button(
+                label="📑 Descargar PDF",
+                data=pdf_buffer,
+                file_name=f"asesoria_{st.session_state.datos['datos_generales'].get('nombre', 'cliente').replace(' ', '_')}_{datetime.now().strftime('%Y%m%d')}.pdf",
+                mime="application/pdf",
+                use_container_width=True,
+                key="download_pdf_final"
+            )
+        elif estado in ('listo', 'error'):
+            st.error("❌ Error al generar el reporte PDF")
+        elif estado:
+            mostrar_trabajo_en_curso('pdf_final', "Generando reporte PDF...")
+    
+    with col3:
+        estado, grafico_buffer = estado_trabajo('grafico_final')
+        if estado == 'listo' and grafico_buffer:
+            st.download_button(
+                label="📊 Descargar Gráfico",
+                data=grafico_buffer,
+                file_name=f"grafico_necesidades_{datetime.now().strftime('%Y%m%d')}.png",
+                mime="image/png",
+                use_container_width=True,
+                key="download_grafico_final"
+            )
+        elif estado and estado not in ('listo', 'error'):
+            mostrar_trabajo_en_curso('grafico_final', "Generando gráfico...")
+    
+    # Botón para nueva asesoría
+    st.markdown("---")
+    st.subheader("🔄 Nueva Asesoría")
+    
+    # Mostrar advertencia y botón de confirmación
+    if not st.session_state.confirmar_reinicio:
+        if st.button("🆕 Iniciar Nueva Asesoría", type="secondary", use_container_width=True):
+            st.session_state.confirmar_reinicio = True
+            st.rerun()
+    else:
+        st.warning("⚠️ **¿Estás seguro?** Se perderán todos los datos de la asesoría actual.")
+        
+        col_confirm1, col_confirm2 = st.columns(2)
+        
+        with col_confirm1:
+            if st.button("✅ Sí, iniciar nueva", type="primary", use_container_width=True):
+                # Limpiar todos los datos
+                st.session_state.step = 1
+                st.session_state.datos = {
+                    'datos_generales': {},
+                    'perfil_familiar': {},
+                    'ingresos': {},
+                    'proteccion': {},
+                    'ahorro': {},
+                    'retiro': {},
+                    'educacion': {},
+                    'cierre': {}
+                }
+                st.session_state.confirmar_reinicio = False
+                st.session_state.edad_calculada_temp = None
+                st.session_state.trabajos = {}
+                guardar_sesion()
+                st.success("✅ Datos limpiados. Iniciando nueva asesoría...")
+                st.rerun()
+        
+        with col_confirm2:
+            if st.button("❌ Cancelar", type="secondary", use_container_width=True):
+                st.session_state.confirmar_reinicio = False
+                st.rerun()
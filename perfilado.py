@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+PERFILADO POR RERUN
+cProfile de una ejecución completa del script de la app
+
+Cuando un agente reporta un paso lento, se perfila su sesión y se obtiene
+un archivo pstats etiquetado con el paso y la sesión:
+
+    perfiles/perfil_paso3_5c1e0a9b27f4_20261019-101512-123.prof
+
+Activación (por defecto no se perfila nada):
+    - RIZKORA_PERFILADO=<directorio>      perfila todos los reruns del servidor
+    - RIZKORA_PERFILADO_URL=1             permite ?perfilar=1 en la URL para
+                                          perfilar solo esa sesión (en perfiles/)
+    - RIZKORA_PERFILADO_URL=<directorio>  lo mismo, guardando en ese directorio
+    - RIZKORA_PERFILADO=0                 deshabilita el perfilado, también por URL
+
+Sin RIZKORA_PERFILADO_URL el parámetro de la URL se ignora: cualquiera que
+abra la app podría activarlo. Cada directorio conserva solo los
+RIZKORA_PERFILADO_MAXIMO perfiles más recientes (50 por defecto).
+
+Los archivos se abren con pstats, snakeviz o se convierten a flamegraph
+(p. ej. `flameprof perfil.prof > perfil.svg`). La barra lateral muestra las
+20 funciones con más tiempo propio del último rerun perfilado, con el nombre
+del archivo sin la ruta del servidor.
+"""
+
+import cProfile
+import hashlib
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+DIRECTORIO_PREDETERMINADO = 'perfiles'
+FUNCIONES_RESUMEN = 20
+MAXIMO_PERFILES = int(os.environ.get('RIZKORA_PERFILADO_MAXIMO', '50'))
+
+_lock_perfilado = threading.Lock()
+
+
+def directorio_perfilado(parametros=None):
+    """
+    Directorio donde guardar el perfil de este rerun, o None si no se perfila.
+
+    Parameters:
+    -----------
+    parametros : dict
+        Parámetros de la URL (st.query_params)
+    """
+    configurado = os.environ.get('RIZKORA_PERFILADO')
+    if configurado == '0':
+        return None
+    if configurado:
+        return configurado
+    por_url = os.environ.get('RIZKORA_PERFILADO_URL')
+    if not por_url or por_url == '0':
+        return None
+    if parametros is not None and parametros.get('perfilar') == '1':
+        return DIRECTORIO_PREDETERMINADO if por_url == '1' else por_url
+    return None
+
+
+def _limpiar_perfiles(directorio, maximo=MAXIMO_PERFILES):
+    """Borra los perfiles más antiguos del directorio hasta dejar `maximo`."""
+    perfiles = sorted(
+        (entrada for entrada in os.scandir(directorio)
+         if entrada.name.startswith('perfil_') and entrada.name.endswith('.prof')),
+        key=lambda entrada: entrada.stat().st_mtime
+    )
+    for entrada in perfiles[:max(len(perfiles) - maximo, 0)]:
+        try:
+            os.remove(entrada.path)
+        except FileNotFoundError:
+            pass
+
+
+def _nombre_funcion(funcion):
+    """archivo.py:línea(función), sin la ruta del servidor."""
+    archivo, linea, nombre = funcion
+    if archivo == '~' and linea == 0:
+        return nombre  # función integrada
+    return f"{os.path.basename(archivo)}:{linea}({nombre})"
+
+
+def resumen_perfil(perfil, limite=FUNCIONES_RESUMEN):
+    """
+    Funciones con más tiempo propio.
+
+    Returns:
+    --------
+    list : [{'funcion', 'llamadas', 'propio_ms', 'acumulado_ms'}, ...]
+    """
+    estadisticas = pstats.Stats(perfil).stats
+    filas = sorted(estadisticas.items(), key=lambda item: item[1][2], reverse=True)[:limite]
+    return [
+        {
+            'funcion': _nombre_funcion(funcion),
+            'llamadas': llamadas,
+            'propio_ms': round(propio * 1000, 2),
+            'acumulado_ms': round(acumulado * 1000, 2)
+        }
+        for funcion, (_, llamadas, propio, acumulado, _) in filas
+    ]
+
+
+@contextmanager
+def perfilar_rerun(paso, token_sesion, parametros=None, estado=None):
+    """
+    Perfila el bloque (un rerun del script) si el perfilado está activo.
+
+    El perfil se guarda también cuando el rerun termina con st.rerun() o
+    st.stop(), que interrumpen el script con una excepción.
+
+    Parameters:
+    -----------
+    paso : int
+        Paso en que empezó el rerun
+    token_sesion : str
+        Token de la sesión; el archivo lleva solo su hash
+    parametros : dict
+        Parámetros de la URL (st.query_params)
+    estado : dict
+        Donde dejar el resumen del perfil (st.session_state['ultimo_perfil'])
+    """
+    directorio = directorio_perfilado(parametros)
+    if directorio is None:
+        yield
+        return
+
+    perfil = cProfile.Profile()
+    try:
+        perfil.enable()
+    except ValueError:
+        # Python 3.12+: solo un perfilador activo por intérprete; otra sesión lo tiene
+        yield
+        return
+
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        perfil.disable()
+        duracion = time.perf_counter() - inicio
+        try:
+            sesion = hashlib.sha256(token_sesion.encode('utf-8')).hexdigest()[:12]
+            marca = datetime.now().strftime('%Y%m%d-%H%M%S-%f')[:-3]
+            ruta = os.path.join(directorio, f"perfil_paso{paso}_{sesion}_{marca}.prof")
+            with _lock_perfilado:
+                os.makedirs(directorio, exist_ok=True)
+                perfil.dump_stats(ruta)
+                _limpiar_perfiles(directorio)
+            if estado is not None:
+                estado['ultimo_perfil'] = {
+                    'paso': paso,
+                    'archivo': os.path.basename(ruta),
+                    'duracion_ms': round(duracion * 1000, 1),
+                    'funciones': resumen_perfil(perfil)
+                }
+        except Exception as e:
+            print(f"Error al guardar perfil: {e}")
@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+PRUEBA DE CARGA
+Agentes simulados recorriendo los 9 pasos de la app en paralelo
+
+Cada agente es una sesión headless de streamlit.testing.v1.AppTest que carga
+una asesoría de datos_sinteticos.py y avanza paso a paso pulsando el botón
+principal de cada formulario; los formularios se precargan con los datos de
+la sesión. Google Sheets se sustituye por un cliente falso en memoria con
+latencia configurable, de modo que no se escribe en ninguna hoja real.
+
+AppTest usa un Runtime de Streamlit global al proceso y no admite sesiones
+simultáneas en hilos, así que cada agente corre en su propio proceso: la
+prueba mide la contención de CPU entre agentes, no el GIL compartido de un
+único servidor.
+
+Uso:
+    python prueba_carga.py                          # 4 agentes, 1 asesoría cada uno
+    python prueba_carga.py --agentes 16 --asesorias 3 --latencia-sheets 0.3
+
+Reporta p50/p95/p99 en milisegundos por paso, más el tiempo hasta que el PDF
+final y el guardado en Sheets (trabajos en segundo plano) están listos.
+"""
+
+import argparse
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Sin snapshots en disco: cada agente simulado es efímero
+os.environ.setdefault('RIZKORA_ALMACEN_SESIONES', 'memoria')
+
+from datos_sinteticos import generar_asesoria_sintetica
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'asesoria_rizkora.py')
+
+# Botón que avanza cada paso, en orden de aparición (el paso 3 calcula y luego continúa)
+BOTONES_PASO = {
+    1: ['➡️ Siguiente'],
+    2: ['➡️ Siguiente'],
+    3: ['📊 Calcular Análisis', ('➡️ Continuar', 'Continuar ➡️')],
+    4: ['➡️ Siguiente'],
+    5: ['➡️ Siguiente'],
+    6: ['➡️ Siguiente'],
+    7: ['➡️ Siguiente'],
+    8: ['➡️ Siguiente'],
+    9: ['✅ Finalizar Asesoría'],
+}
+
+# Campos que el agente escribe a mano: el paso 5 no precarga lo que guardó y
+# el cierre empieza vacío para que "Finalizar" haga todo el trabajo de una
+# asesoría nueva. Etiqueta -> (sección, clave) de la asesoría sintética
+CAMPOS_PASO = {
+    5: {
+        'Describe tu proyecto': ('ahorro', 'descripcion'),
+        'Costo estimado del proyecto*': ('ahorro', 'costo'),
+    },
+    9: {
+        '¿Qué fue lo que más te agradó de esta asesoría?*': ('cierre', 'satisfaccion'),
+    },
+}
+
+# ================================
+# GOOGLE SHEETS FALSO
+# ================================
+
+class HojaFalsa:
+    """Worksheet en memoria con la latencia de una llamada a la API."""
+
+    def __init__(self, latencia):
+        self.latencia = latencia
+        self.filas = []
+        self._lock = threading.Lock()
+
+    def update(self, rango, valores):
+        time.sleep(self.latencia)
+        with self._lock:
+            self.filas[:0] = valores
+
+    def append_row(self, fila, value_input_option=None):
+        time.sleep(self.latencia)
+        with self._lock:
+            self.filas.append(fila)
+
+
+class ClienteSheetsFalso:
+    """Sustituto de gspread.Client para guardar_asesoria_sheets()."""
+
+    def __init__(self, latencia=0.2):
+        self.latencia = latencia
+        self.hoja = HojaFalsa(latencia)
+
+    def open(self, nombre):
+        time.sleep(self.latencia)
+        return self
+
+    def worksheet(self, titulo):
+        time.sleep(self.latencia)
+        return self.hoja
+
+# ================================
+# AGENTE SIMULADO
+# ================================
+
+def _boton(at, etiquetas):
+    etiquetas = etiquetas if isinstance(etiquetas, tuple) else (etiquetas,)
+    for boton in at.button:
+        if boton.label in etiquetas and not boton.disabled:
+            return boton
+    raise LookupError(f"Paso {at.session_state.step}: no se encontró el botón {etiquetas}")
+
+
+def _rellenar(at, paso, datos):
+    for elemento in list(at.text_input) + list(at.text_area) + list(at.number_input):
+        if elemento.label in CAMPOS_PASO.get(paso, {}):
+            seccion, clave = CAMPOS_PASO[paso][elemento.label]
+            valor = datos[seccion].get(clave)
+            if valor is not None:
+                elemento.set_value(valor)
+
+
+def _esperar_trabajo(at, clave, timeout=120):
+    """Segundos desde el envío hasta el final del trabajo de la sesión."""
+    from trabajos import ejecutor_predeterminado
+
+    id_trabajo = at.session_state.trabajos.get(clave)
+    if id_trabajo is None:
+        raise RuntimeError(f"La sesión no envió el trabajo '{clave}'")
+    ejecutor = ejecutor_predeterminado()
+    ejecutor.resultado(id_trabajo, timeout=timeout)
+    return ejecutor.duracion(id_trabajo)
+
+
+def simular_agente(semilla, timeout=120):
+    """
+    Recorre una asesoría completa y devuelve los tiempos en segundos.
+
+    Returns:
+    --------
+    dict : {'inicio': s, 1: s, ..., 9: s, 'pdf': s, 'sheets': s}
+    """
+    from streamlit.testing.v1 import AppTest
+
+    tiempos = {}
+    at = AppTest.from_file(APP, default_timeout=timeout)
+
+    inicio = time.perf_counter()
+    at.run()
+    tiempos['inicio'] = time.perf_counter() - inicio
+
+    datos = generar_asesoria_sintetica(semilla)
+    at.session_state.datos = dict(datos, cierre={})
+    at.session_state.google_sheets_habilitado = True
+    at.session_state.step = 1
+    at.run()
+
+    for paso, botones in BOTONES_PASO.items():
+        _rellenar(at, paso, datos)
+        inicio = time.perf_counter()
+        for etiquetas in botones:
+            _boton(at, etiquetas).click().run()
+        tiempos[paso] = time.perf_counter() - inicio
+        if at.exception:
+            raise RuntimeError(f"Paso {paso}: {at.exception[0].message}")
+        if paso < 9 and at.session_state.step != paso + 1:
+            raise RuntimeError(f"Paso {paso}: la app no avanzó (sigue en el paso {at.session_state.step})")
+    if not at.session_state.datos['cierre'].get('satisfaccion'):
+        raise RuntimeError("Paso 9: la asesoría no se finalizó")
+
+    # Trabajos en segundo plano enviados al finalizar, medidos desde su envío
+    tiempos['pdf'] = _esperar_trabajo(at, 'pdf_final', timeout)
+    tiempos['sheets'] = _esperar_trabajo(at, 'sheets_cierre', timeout)
+    return tiempos
+
+# ================================
+# REPORTE
+# ================================
+
+def percentil(valores, p):
+    """Percentil por rango más cercano (valores ya ordenados)."""
+    return valores[min(len(valores) - 1, int(len(valores) * p))]
+
+
+def imprimir_reporte(resultados, segundos_totales):
+    etiquetas = [('inicio', 'primera carga')] + [(paso, f'paso {paso}') for paso in BOTONES_PASO]
+    etiquetas += [('pdf', 'PDF final listo'), ('sheets', 'Sheets guardado')]
+
+    print(f"  {'':<18} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}   (n={len(resultados)})")
+    for clave, nombre in etiquetas:
+        valores = sorted(r[clave] * 1000 for r in resultados)
+        print(f"  {nombre:<18} {percentil(valores, 0.50):10.1f} {percentil(valores, 0.95):10.1f} "
+              f"{percentil(valores, 0.99):10.1f}")
+    print(f"  {len(resultados)} asesorías en {segundos_totales:.1f} s "
+          f"({len(resultados) / segundos_totales * 60:.1f} asesorías/min)")
+
+
+def agente(numero, asesorias, latencia_sheets):
+    """
+    Proceso de un agente: `asesorias` asesorías seguidas contra un Sheets falso.
+
+    Returns:
+    --------
+    tuple : (tiempos de cada asesoría, filas guardadas en la hoja falsa)
+    """
+    import utilidades_app
+
+    # Antes de que la app o pasos.paso9 importen init_google_sheets
+    cliente = ClienteSheetsFalso(latencia_sheets)
+    utilidades_app.init_google_sheets = lambda: cliente
+
+    from trabajos import ejecutor_predeterminado
+
+    try:
+        resultados = [simular_agente(numero * asesorias + i) for i in range(asesorias)]
+    finally:
+        # Sus procesos de render no terminan solos y el agente esperaría por ellos al salir
+        ejecutor_predeterminado().cerrar()
+    return resultados, len(cliente.hoja.filas)
+
+
+def prueba_carga(agentes=4, asesorias=1, latencia_sheets=0.2):
+    """
+    Ejecuta `agentes` agentes simultáneos, cada uno con `asesorias` asesorías seguidas.
+
+    Returns:
+    --------
+    list : Tiempos de cada asesoría (ver simular_agente)
+    """
+    print(f"Prueba de carga: {agentes} agentes × {asesorias} asesoría(s), "
+          f"latencia de Sheets {latencia_sheets * 1000:.0f} ms")
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=agentes, mp_context=multiprocessing.get_context('spawn')) as pool:
+        futuros = [pool.submit(agente, numero, asesorias, latencia_sheets) for numero in range(agentes)]
+        lotes = [futuro.result() for futuro in futuros]
+    segundos_totales = time.perf_counter() - inicio
+
+    resultados = [tiempos for lote, _ in lotes for tiempos in lote]
+    imprimir_reporte(resultados, segundos_totales)
+    print(f"  filas guardadas en las hojas falsas: {sum(filas for _, filas in lotes)}")
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prueba de carga con agentes simulados")
+    parser.add_argument('--agentes', type=int, default=4, help="Agentes simultáneos")
+    parser.add_argument('--asesorias', type=int, default=1, help="Asesorías seguidas por agente")
+    parser.add_argument('--latencia-sheets', type=float, default=0.2,
+                        help="Segundos por llamada al Google Sheets falso")
+    args = parser.parse_args()
+
+    prueba_carga(args.agentes, args.asesorias, args.latencia_sheets)
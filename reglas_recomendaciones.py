@@ -0,0 +1,408 @@
+# -*- coding: utf-8 -*-
+"""
+REGLAS DE RECOMENDACIÓN
+Tabla declarativa de recomendaciones financieras, compilada por política de umbrales
+
+Cada regla es (código, prioridad, condiciones): si todas las condiciones se
+cumplen sobre los campos del flujo y de la capacidad de ahorro, la
+recomendación entra en la lista. Las listas se ordenan por prioridad (y por
+orden de la tabla dentro de la misma prioridad) y se limitan a
+MAXIMO_RECOMENDACIONES.
+
+Los cortes de deudas salen de la escala 'recomendacion_deudas' de
+umbrales.json (propia, independiente del indicador del paso 3 y del PDF);
+la tabla se recompila cuando cambia la política activa.
+
+Las mismas reglas compiladas se evalúan contra un cliente:
+
+    >>> evaluar_recomendaciones(flujo, capacidad)
+    [<Recomendacion.DEUDAS_ATENCION: 2>, <Recomendacion.AJUSTADO_FONDO_3_MESES: 30>, ...]
+
+o contra un DataFrame con una fila por cliente (columnas con los nombres de
+los campos, p. ej. la exportación analítica), en forma vectorizada:
+
+    >>> matriz = evaluar_recomendaciones_lote(df)   # DataFrame bool, una columna por código
+    >>> matriz.sum()                                 # clientes que reciben cada recomendación
+
+El texto se genera a partir del código solo al mostrarlo (texto_recomendacion).
+"""
+
+import operator
+from collections import ChainMap
+from enum import IntEnum
+
+from umbrales import politica_actual
+
+MAXIMO_RECOMENDACIONES = 12
+
+# ================================
+# CÓDIGOS Y TEXTOS
+# ================================
+
+class Recomendacion(IntEnum):
+    # Deudas (1-9)
+    DEUDAS_CRITICAS = 1
+    DEUDAS_ATENCION = 2
+    DEUDAS_MANEJABLES = 3
+
+    # Estado negativo (10-19)
+    NEGATIVO_REDUCIR_GASTOS = 10
+    NEGATIVO_PRESUPUESTO = 11
+    NEGATIVO_CONGELAR_TARJETAS = 12
+    NEGATIVO_INGRESOS_EXTRA = 13
+    NEGATIVO_CONSOLIDAR_DEUDAS = 14
+    NEGATIVO_RENEGOCIAR = 15
+    NEGATIVO_META_3_MESES = 16
+
+    # Estado crítico (20-29)
+    CRITICO_FONDO_1_MES = 20
+    CRITICO_REDUCIR_VARIABLES = 21
+    CRITICO_SUSCRIPCIONES = 22
+    CRITICO_DEUDAS_INTERES = 23
+    CRITICO_INCREMENTAR_INGRESOS = 24
+    CRITICO_META_6_MESES = 25
+
+    # Estado ajustado (30-39)
+    AJUSTADO_FONDO_3_MESES = 30
+    AJUSTADO_INVERSIONES_PEQUENAS = 31
+    AJUSTADO_GASTOS_HORMIGA = 32
+    AJUSTADO_DIVERSIFICAR_INGRESOS = 33
+    AJUSTADO_ACELERAR_DEUDAS = 34
+    AJUSTADO_BAJO_RIESGO = 35
+
+    # Estado saludable (40-49)
+    SALUDABLE_RETIRO = 40
+    SALUDABLE_DIVERSIFICAR = 41
+    SALUDABLE_FONDO_6_MESES = 42
+    SALUDABLE_EDUCACION = 43
+    SALUDABLE_MEDIANO_PLAZO = 44
+    SALUDABLE_BIENES_RAICES = 45
+
+    # Estado excelente (50-59)
+    EXCELENTE_FISCAL = 50
+    EXCELENTE_ESTRATEGIA = 51
+    EXCELENTE_BIENES_RAICES = 52
+    EXCELENTE_PATRIMONIAL = 53
+    EXCELENTE_ASESORIA = 54
+    EXCELENTE_INTERNACIONAL = 55
+
+    # Gastos fijos (60-69)
+    GASTOS_FIJOS_MUY_ALTOS = 60
+    GASTOS_FIJOS_ELEVADOS = 61
+
+    # Nivel de inversión (70-79)
+    INVERSION_BASICA = 70
+    INVERSION_MODERADA = 71
+    INVERSION_AVANZADA = 72
+    INVERSION_OPTIMA = 73
+
+    # Fondo de emergencia (80-89)
+    FONDO_6_MESES = 80
+    FONDO_3_MESES = 81
+
+
+# Plantillas: se formatean con los campos del flujo y la capacidad
+TEXTOS_RECOMENDACION = {
+    Recomendacion.DEUDAS_CRITICAS: "🚨 CRÍTICO: Tus deudas representan el {porcentaje_deudas:.1f}% de tu ingreso (más del {limite_deudas_altas:g}%). Prioriza su reducción inmediata",
+    Recomendacion.DEUDAS_ATENCION: "⚠️ ATENCIÓN: Tus deudas representan el {porcentaje_deudas:.1f}% de tu ingreso. Trabaja en reducirlas por debajo del {limite_deudas_manejables:g}%",
+    Recomendacion.DEUDAS_MANEJABLES: "✅ Tus deudas están en un nivel manejable ({porcentaje_deudas:.1f}%). Mantén este control",
+
+    Recomendacion.NEGATIVO_REDUCIR_GASTOS: "🚨 URGENTE: Reduce gastos inmediatamente. Identifica gastos no esenciales que puedes eliminar",
+    Recomendacion.NEGATIVO_PRESUPUESTO: "📊 Crea un presupuesto detallado y realiza seguimiento diario de gastos",
+    Recomendacion.NEGATIVO_CONGELAR_TARJETAS: "💳 Evita nuevas deudas. Congela uso de tarjetas de crédito",
+    Recomendacion.NEGATIVO_INGRESOS_EXTRA: "🔍 Busca fuentes adicionales de ingreso (freelance, venta de artículos, etc.)",
+    Recomendacion.NEGATIVO_CONSOLIDAR_DEUDAS: "📞 Considera asesoría de consolidación de deudas",
+    Recomendacion.NEGATIVO_RENEGOCIAR: "🏦 Contacta a tus acreedores para renegociar tasas o plazos",
+    Recomendacion.NEGATIVO_META_3_MESES: "💰 Establece como meta alcanzar un flujo libre positivo en 3 meses",
+
+    Recomendacion.CRITICO_FONDO_1_MES: "⚠️ Crea un fondo de emergencia pequeño (equivalente a 1 mes de gastos básicos)",
+    Recomendacion.CRITICO_REDUCIR_VARIABLES: "💰 Reduce gastos variables en al menos 10-15%",
+    Recomendacion.CRITICO_SUSCRIPCIONES: "📝 Revisa y elimina suscripciones no esenciales (streaming, gimnasio, etc.)",
+    Recomendacion.CRITICO_DEUDAS_INTERES: "💳 Prioriza pagar deudas de alto interés (tarjetas de crédito)",
+    Recomendacion.CRITICO_INCREMENTAR_INGRESOS: "📈 Busca oportunidades de incrementar ingresos en tu trabajo actual",
+    Recomendacion.CRITICO_META_6_MESES: "🎯 Establece como meta alcanzar un flujo libre del 15% en 6 meses",
+
+    Recomendacion.AJUSTADO_FONDO_3_MESES: "💪 Incrementa tu fondo de emergencia a 3 meses de gastos",
+    Recomendacion.AJUSTADO_INVERSIONES_PEQUENAS: "📈 Inicia inversiones pequeñas pero constantes",
+    Recomendacion.AJUSTADO_GASTOS_HORMIGA: "🎯 Mantén gastos bajo control, evita gastos hormiga",
+    Recomendacion.AJUSTADO_DIVERSIFICAR_INGRESOS: "📊 Busca formas de diversificar tus fuentes de ingreso",
+    Recomendacion.AJUSTADO_ACELERAR_DEUDAS: "💳 Acelera el pago de deudas cuando sea posible",
+    Recomendacion.AJUSTADO_BAJO_RIESGO: "🏦 Investiga opciones de inversión con bajo riesgo para iniciar",
+
+    Recomendacion.SALUDABLE_RETIRO: "🎯 Maximiza aportaciones a planes de retiro (PPR, Afore voluntaria)",
+    Recomendacion.SALUDABLE_DIVERSIFICAR: "📈 Diversifica tus inversiones en diferentes instrumentos",
+    Recomendacion.SALUDABLE_FONDO_6_MESES: "🏦 Mantén un fondo de emergencia robusto (6 meses de gastos)",
+    Recomendacion.SALUDABLE_EDUCACION: "🎓 Invierte en educación financiera y personal",
+    Recomendacion.SALUDABLE_MEDIANO_PLAZO: "💼 Considera inversiones de mediano plazo (CETES, fondos indexados)",
+    Recomendacion.SALUDABLE_BIENES_RAICES: "📊 Evalúa oportunidades de inversión en bienes raíces o negocios",
+
+    Recomendacion.EXCELENTE_FISCAL: "🚀 Optimiza tu estrategia fiscal con un contador especializado",
+    Recomendacion.EXCELENTE_ESTRATEGIA: "📈 Implementa estrategia de inversión avanzada y diversificada",
+    Recomendacion.EXCELENTE_BIENES_RAICES: "🏠 Evalúa inversión en bienes raíces como fuente de ingreso pasivo",
+    Recomendacion.EXCELENTE_PATRIMONIAL: "👨‍👩‍👧 Inicia planificación patrimonial (testamento, fideicomisos)",
+    Recomendacion.EXCELENTE_ASESORIA: "💼 Considera asesoría financiera especializada para maximizar rendimientos",
+    Recomendacion.EXCELENTE_INTERNACIONAL: "🌍 Explora inversiones internacionales para diversificación global",
+
+    Recomendacion.GASTOS_FIJOS_MUY_ALTOS: "🏠 Tus gastos fijos son muy altos ({porcentaje_gastos_fijos:.1f}%). Evalúa opciones para reducirlos (mudanza, renegociación, etc.)",
+    Recomendacion.GASTOS_FIJOS_ELEVADOS: "⚠️ Tus gastos fijos son elevados ({porcentaje_gastos_fijos:.1f}%). Busca formas graduales de reducirlos",
+
+    Recomendacion.INVERSION_BASICA: "💎 Inicia con inversiones de bajo riesgo: CETES, cuenta de ahorro con rendimientos",
+    Recomendacion.INVERSION_MODERADA: "💎 Considera fondos de inversión mixtos y CETES Plus",
+    Recomendacion.INVERSION_AVANZADA: "💎 Diversifica en fondos indexados, PPR y bonos corporativos",
+    Recomendacion.INVERSION_OPTIMA: "💎 Explora portafolio completo: acciones, bienes raíces, fondos internacionales",
+
+    Recomendacion.FONDO_6_MESES: "🏦 Prioridad: Establece fondo de emergencia de 6 meses antes de inversiones agresivas",
+    Recomendacion.FONDO_3_MESES: "🏦 Prioridad: Establece fondo de emergencia de 3 meses como mínimo",
+}
+
+# ================================
+# TABLA DE REGLAS
+# ================================
+
+# Valor de cada campo cuando el flujo o la capacidad no lo traen
+VALORES_PREDETERMINADOS = {
+    'estado_financiero': 'crítico',
+    'porcentaje_deudas': 0,
+    'porcentaje_gastos_fijos': 0,
+    'porcentaje_flujo': 0,
+    'ahorro_posible': False,
+    'nivel_inversion': 'basico',
+}
+
+# Prioridades: menor = más arriba en la lista
+PRIORIDAD_DEUDAS_ALTAS = 0
+PRIORIDAD_ESTADO = 10
+PRIORIDAD_DEUDAS_MANEJABLES = 20
+PRIORIDAD_GASTOS_FIJOS = 30
+PRIORIDAD_INVERSION = 40
+PRIORIDAD_FONDO = 50
+
+
+def _por_estado(estado, codigos):
+    return [(codigo, PRIORIDAD_ESTADO, [('estado_financiero', '==', estado)]) for codigo in codigos]
+
+
+def _por_nivel(nivel, codigo):
+    return (codigo, PRIORIDAD_INVERSION, [('ahorro_posible', '==', True), ('nivel_inversion', '==', nivel)])
+
+
+def _por_tramo(campo, escala, tramo):
+    """Condiciones para que `campo` caiga en el tramo `tramo` de una escala de umbrales."""
+    inferior, superior = ('>', '<=') if escala.incluye_corte == 'abajo' else ('>=', '<')
+    condiciones = []
+    if tramo > 0:
+        condiciones.append((campo, inferior, escala.cortes[tramo - 1]))
+    if tramo < len(escala.cortes):
+        condiciones.append((campo, superior, escala.cortes[tramo]))
+    return condiciones
+
+
+def construir_reglas(politica):
+    """
+    Tabla de reglas para una política de umbrales.
+
+    Las reglas de deudas usan los tramos de 'recomendacion_deudas'
+    (manejables, atención, críticas); el resto de la tabla es fija.
+
+    Returns:
+    --------
+    list : [(código, prioridad, [(campo, operador, valor), ...]), ...]
+    """
+    deudas = politica['recomendacion_deudas']
+    return [
+        (Recomendacion.DEUDAS_CRITICAS, PRIORIDAD_DEUDAS_ALTAS, _por_tramo('porcentaje_deudas', deudas, 3)),
+        (Recomendacion.DEUDAS_ATENCION, PRIORIDAD_DEUDAS_ALTAS, _por_tramo('porcentaje_deudas', deudas, 2)),
+        (Recomendacion.DEUDAS_MANEJABLES, PRIORIDAD_DEUDAS_MANEJABLES, _por_tramo('porcentaje_deudas', deudas, 1)),
+        *REGLAS_FIJAS
+    ]
+
+
+# (código, prioridad, [(campo, operador, valor), ...])
+REGLAS_FIJAS = [
+    *_por_estado('negativo', range(Recomendacion.NEGATIVO_REDUCIR_GASTOS, Recomendacion.NEGATIVO_META_3_MESES + 1)),
+    *_por_estado('crítico', range(Recomendacion.CRITICO_FONDO_1_MES, Recomendacion.CRITICO_META_6_MESES + 1)),
+    *_por_estado('ajustado', range(Recomendacion.AJUSTADO_FONDO_3_MESES, Recomendacion.AJUSTADO_BAJO_RIESGO + 1)),
+    *_por_estado('saludable', range(Recomendacion.SALUDABLE_RETIRO, Recomendacion.SALUDABLE_BIENES_RAICES + 1)),
+    *_por_estado('excelente', range(Recomendacion.EXCELENTE_FISCAL, Recomendacion.EXCELENTE_INTERNACIONAL + 1)),
+
+    (Recomendacion.GASTOS_FIJOS_MUY_ALTOS, PRIORIDAD_GASTOS_FIJOS, [('porcentaje_gastos_fijos', '>', 60)]),
+    (Recomendacion.GASTOS_FIJOS_ELEVADOS, PRIORIDAD_GASTOS_FIJOS, [('porcentaje_gastos_fijos', '>', 50), ('porcentaje_gastos_fijos', '<=', 60)]),
+
+    _por_nivel('basico', Recomendacion.INVERSION_BASICA),
+    _por_nivel('moderado', Recomendacion.INVERSION_MODERADA),
+    _por_nivel('avanzado', Recomendacion.INVERSION_AVANZADA),
+    _por_nivel('optimo', Recomendacion.INVERSION_OPTIMA),
+
+    (Recomendacion.FONDO_6_MESES, PRIORIDAD_FONDO, [('porcentaje_flujo', '>=', 20)]),
+    (Recomendacion.FONDO_3_MESES, PRIORIDAD_FONDO, [('porcentaje_flujo', '<', 20)]),
+]
+
+# ================================
+# COMPILACIÓN
+# ================================
+
+_OPERADORES = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+}
+
+
+def compilar_reglas(reglas):
+    """
+    Valida la tabla y la convierte en tuplas listas para evaluar.
+
+    Los operadores se resuelven a funciones de `operator`, que funcionan
+    igual con escalares que con columnas de pandas.
+
+    Returns:
+    --------
+    tuple : ((código, ((campo, operador, función, valor), ...)), ...)
+            en orden de prioridad
+    """
+    compiladas = []
+    for orden, (codigo, prioridad, condiciones) in enumerate(reglas):
+        codigo = Recomendacion(codigo)
+        if codigo not in TEXTOS_RECOMENDACION:
+            raise ValueError(f"Recomendación sin texto: {codigo.name}")
+        condiciones_compiladas = []
+        for campo, operador, valor in condiciones:
+            if operador not in _OPERADORES:
+                raise ValueError(f"Operador desconocido en {codigo.name}: {operador}")
+            if not isinstance(valor, (bool, int, float, str)):
+                raise ValueError(f"Valor no literal en {codigo.name}: {valor!r}")
+            condiciones_compiladas.append((campo, operador, _OPERADORES[operador], valor))
+        compiladas.append((prioridad, orden, codigo, tuple(condiciones_compiladas)))
+    compiladas.sort(key=lambda regla: regla[:2])
+    return tuple((codigo, condiciones) for _, _, codigo, condiciones in compiladas)
+
+
+def _generar_evaluador(reglas_compiladas, campos):
+    """
+    Genera una función con un `if` por regla para evaluar un cliente.
+
+    Los valores de la tabla son literales (validados en compilar_reglas), así
+    que la función no busca operadores ni recorre condiciones al evaluar.
+    """
+    variables = {campo: f"v{i}" for i, campo in enumerate(campos)}
+    lineas = ["def evaluar(valores):", "    codigos = []"]
+    lineas += [f"    {variable} = valores[{campo!r}]" for campo, variable in variables.items()]
+    espacio = {}
+    for i, (codigo, condiciones) in enumerate(reglas_compiladas):
+        espacio[f"c{i}"] = codigo
+        prueba = ' and '.join(f"{variables[campo]} {operador} {valor!r}" for campo, operador, _, valor in condiciones)
+        lineas += [f"    if {prueba}:", f"        codigos.append(c{i})"]
+    lineas.append("    return codigos")
+    exec(compile('\n'.join(lineas), '<reglas_recomendaciones>', 'exec'), espacio)
+    return espacio['evaluar']
+
+
+_reglas_politica = None  # (política, reglas compiladas, campos, evaluador)
+
+
+def reglas_compiladas(politica=None):
+    """
+    Reglas compiladas para una política (la activa por defecto).
+
+    Se recompilan solo cuando cambia la política (la recarga de umbrales.json
+    crea otro objeto), así que evaluar no repite la compilación.
+
+    Returns:
+    --------
+    tuple : (reglas compiladas, campos que leen las reglas, evaluador de un cliente)
+    """
+    global _reglas_politica
+    politica = politica or politica_actual()
+    cache = _reglas_politica
+    if cache is None or cache[0] is not politica:
+        compiladas = compilar_reglas(construir_reglas(politica))
+        # Campos que leen las reglas (se extraen una sola vez por cliente)
+        campos = tuple(dict.fromkeys(
+            campo for _, condiciones in compiladas for campo, _, _, _ in condiciones
+        ))
+        cache = _reglas_politica = (politica, compiladas, campos, _generar_evaluador(compiladas, campos))
+    return cache[1:]
+
+# ================================
+# EVALUACIÓN
+# ================================
+
+_FALTANTE = object()
+
+
+def evaluar_recomendaciones(flujo_financiero, capacidad_ahorro):
+    """
+    Códigos de recomendación para un cliente, en orden de prioridad.
+
+    Parameters:
+    -----------
+    flujo_financiero : dict
+        Resultado de calcular_flujo_financiero()
+    capacidad_ahorro : dict
+        Resultado de calcular_capacidad_ahorro()
+
+    Returns:
+    --------
+    list : Hasta MAXIMO_RECOMENDACIONES códigos Recomendacion
+    """
+    _, campos, evaluar = reglas_compiladas()
+    valores = {}
+    for campo in campos:
+        valor = flujo_financiero.get(campo, _FALTANTE)
+        if valor is _FALTANTE:
+            valor = capacidad_ahorro.get(campo, VALORES_PREDETERMINADOS.get(campo))
+        valores[campo] = valor
+    return evaluar(valores)[:MAXIMO_RECOMENDACIONES]
+
+
+def evaluar_recomendaciones_lote(df):
+    """
+    Evalúa todas las reglas sobre un DataFrame (una fila por cliente).
+
+    Las columnas que falten toman su valor de VALORES_PREDETERMINADOS.
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        Columnas con los campos del flujo y la capacidad de ahorro
+
+    Returns:
+    --------
+    pandas.DataFrame : bool, mismo índice que `df` y una columna por código en
+                       orden de prioridad; los primeros MAXIMO_RECOMENDACIONES
+                       True de cada fila son su lista de recomendaciones
+    """
+    import numpy as np
+    import pandas as pd
+
+    compiladas, _, _ = reglas_compiladas()
+    columnas = {}
+    for codigo, condiciones in compiladas:
+        cumple = np.ones(len(df), dtype=bool)
+        for campo, _, funcion, valor in condiciones:
+            serie = df[campo] if campo in df.columns else VALORES_PREDETERMINADOS.get(campo)
+            cumple &= np.asarray(funcion(serie, valor), dtype=bool)
+        columnas[codigo] = cumple
+    matriz = pd.DataFrame(columnas, index=df.index)
+
+    # Mismo límite que la evaluación individual
+    return matriz & (matriz.cumsum(axis=1) <= MAXIMO_RECOMENDACIONES)
+
+
+def texto_recomendacion(codigo, valores=None):
+    """
+    Texto de una recomendación para mostrarla.
+
+    Parameters:
+    -----------
+    codigo : Recomendacion o int
+    valores : dict
+        Campos del flujo/capacidad usados por la plantilla (porcentajes)
+    """
+    plantilla = TEXTOS_RECOMENDACION[Recomendacion(codigo)]
+    cortes_deudas = politica_actual()['recomendacion_deudas'].cortes
+    limites = {'limite_deudas_manejables': cortes_deudas[1], 'limite_deudas_altas': cortes_deudas[2]}
+    return plantilla.format_map(ChainMap(valores or {}, limites, VALORES_PREDETERMINADOS))
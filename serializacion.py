@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+SERIALIZACIÓN DE ASESORÍAS
+JSON compacto con un único hook para fechas y escritura JSONL en streaming
+
+Si orjson está instalado se usa como backend (mucho más rápido); si no,
+se usa el módulo json de la biblioteca estándar con el mismo hook.
+"""
+
+import json
+from collections.abc import Mapping
+from datetime import date, datetime, time
+from enum import Enum
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional
+    orjson = None
+
+from modelo_datos import RegistroDict
+from modulo_financiero import detectar_necesidades_financieras
+from reglas_recomendaciones import evaluar_recomendaciones
+
+FORMATO_FECHA = "%d/%m/%Y"
+FORMATO_FECHA_HORA = "%d/%m/%Y %H:%M:%S"
+FORMATO_HORA = "%H:%M"
+
+# ================================
+# HOOK DE SERIALIZACIÓN
+# ================================
+
+def serializar_valor(obj):
+    """
+    Hook `default=` para json/orjson: convierte los tipos no nativos de la asesoría.
+
+    Solo se invoca para los objetos que el serializador no sabe manejar,
+    así que el árbol de datos no se recorre ni se copia de antemano.
+    """
+    if isinstance(obj, datetime):
+        return obj.strftime(FORMATO_FECHA_HORA)
+    if isinstance(obj, date):
+        return obj.strftime(FORMATO_FECHA)
+    if isinstance(obj, time):
+        return obj.strftime(FORMATO_HORA)
+    if isinstance(obj, RegistroDict):
+        # Registros de modelo_datos: solo campos propios y enums como códigos
+        # (los textos de presentación se derivan al restaurarlos)
+        return obj.como_compacto()
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Tipo no serializable: {type(obj).__name__}")
+
+if orjson is not None:
+    # Las fechas pasan por el hook para conservar el formato dd/mm/aaaa; los
+    # registros de modelo_datos también, para guardarlos en forma compacta
+    _OPCIONES_ORJSON = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+                        | orjson.OPT_NON_STR_KEYS)
+
+
+def leer_fecha(valor):
+    """Inverso del hook para fechas: date/datetime/str ('dd/mm/aaaa' o ISO) → date (o None)."""
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    if isinstance(valor, str) and valor:
+        for formato in (FORMATO_FECHA, "%Y-%m-%d", FORMATO_FECHA_HORA):
+            try:
+                return datetime.strptime(valor, formato).date()
+            except ValueError:
+                continue
+    return None
+
+
+def a_json_bytes(obj, compacto=True):
+    """Serializa `obj` a JSON (UTF-8, bytes)."""
+    if orjson is not None:
+        opciones = _OPCIONES_ORJSON if compacto else _OPCIONES_ORJSON | orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=serializar_valor, option=opciones)
+    return a_json(obj, compacto).encode('utf-8')
+
+
+def a_json(obj, compacto=True):
+    """
+    Serializa `obj` a una cadena JSON.
+
+    Parameters:
+    -----------
+    obj : dict
+        Datos a serializar (pueden contener date, datetime y time)
+    compacto : bool
+        Sin espacios ni sangría (por defecto); False produce JSON legible con sangría 2
+
+    Returns:
+    --------
+    str : Documento JSON
+    """
+    if orjson is not None:
+        return a_json_bytes(obj, compacto).decode('utf-8')
+    if compacto:
+        return json.dumps(obj, default=serializar_valor, ensure_ascii=False, separators=(',', ':'))
+    return json.dumps(obj, default=serializar_valor, ensure_ascii=False, indent=2)
+
+
+def registro_exportacion(datos, necesidades=None):
+    """
+    Arma el registro que se exporta por asesoría.
+
+    Parameters:
+    -----------
+    datos : dict
+        Estructura completa de la asesoría (st.session_state.datos)
+    necesidades : dict, optional
+        Resultado previo de detectar_necesidades_financieras(); se calcula si no se pasa
+
+    Returns:
+    --------
+    dict : Registro con fecha de generación, datos completos, necesidades
+           detectadas y códigos de recomendación (reglas_recomendaciones.Recomendacion)
+    """
+    flujo = datos.get('flujo_financiero')
+    return {
+        'fecha_generacion': datetime.now().strftime(FORMATO_FECHA_HORA),
+        'datos_completos': datos,
+        'necesidades_detectadas': necesidades if necesidades is not None else detectar_necesidades_financieras(datos),
+        'recomendaciones': [
+            int(codigo) for codigo in evaluar_recomendaciones(flujo, datos.get('capacidad_ahorro') or {})
+        ] if flujo else []
+    }
+
+# ================================
+# JSONL EN STREAMING
+# ================================
+
+def escribir_jsonl(asesorias, destino):
+    """
+    Escribe asesorías como JSONL (un registro compacto por línea) sin
+    materializar la lista completa en memoria.
+
+    Parameters:
+    -----------
+    asesorias : iterable de dict
+        Asesorías (st.session_state.datos); se consumen una a una
+    destino : str o archivo binario
+        Ruta del archivo o un objeto con método write(bytes)
+
+    Returns:
+    --------
+    int : Número de asesorías escritas
+
+    Example:
+    --------
+    >>> escribir_jsonl(generar_asesorias_sinteticas(100000), 'asesorias.jsonl')
+    100000
+    """
+    if isinstance(destino, str):
+        with open(destino, 'wb') as archivo:
+            return escribir_jsonl(asesorias, archivo)
+
+    total = 0
+    for datos in asesorias:
+        destino.write(a_json_bytes(registro_exportacion(datos)))
+        destino.write(b'\n')
+        total += 1
+    return total
+
+
+def leer_jsonl(origen):
+    """
+    Lee perezosamente un archivo JSONL de asesorías exportadas.
+
+    Parameters:
+    -----------
+    origen : str o archivo
+        Ruta del archivo o un objeto iterable por líneas
+
+    Yields:
+    -------
+    dict : Un registro por línea (con 'datos_completos' y 'necesidades_detectadas')
+    """
+    if isinstance(origen, str):
+        with open(origen, 'rb') as archivo:
+            yield from leer_jsonl(archivo)
+        return
+
+    cargar = orjson.loads if orjson is not None else json.loads
+    for linea in origen:
+        if linea.strip():
+            yield cargar(linea)
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+SNAPSHOTS DE SESIÓN
+Guarda y restaura una asesoría en curso (datos + paso) en formato binario compacto
+
+Formato: cabecera de 5 bytes (b'RZKS' + versión de esquema) seguida de JSON
+comprimido con zlib. Los registros de modelo_datos se guardan en su forma
+compacta (como_compacto) y las fechas y horas en ISO, cada uno con una
+etiqueta de tipo, así que restaurar devuelve los mismos tipos que se
+guardaron: O(tamaño del snapshot).
+
+Los bytes se guardan en el almacén de sesiones configurado (ver
+almacen_sesiones.py), que puede ser compartido (Redis, SQLite, un
+directorio). Por eso el formato es JSON y no pickle: quien pueda escribir en
+el almacén puede alterar una asesoría, pero no ejecutar código en la app;
+decodificar solo construye tipos de datos y los registros de REGISTROS.
+"""
+
+import json
+import re
+import secrets
+import struct
+import time
+import zlib
+from collections.abc import Mapping
+from datetime import date, datetime
+from datetime import time as hora
+
+from almacen_sesiones import almacen_predeterminado
+from modelo_datos import (
+    CapacidadAhorro,
+    DatosGenerales,
+    Educacion,
+    EducacionHijo,
+    FlujoFinanciero,
+    RegistroDict,
+    Retiro,
+    SaludFinanciera
+)
+from serializacion import a_json_bytes
+
+MAGIA = b'RZKS'
+VERSION_ESQUEMA = 3  # 2: montos de flujo y capacidad en centavos; 3: JSON en lugar de pickle
+_CABECERA = struct.Struct('>4sB')
+
+_PATRON_TOKEN = re.compile(r'^[A-Za-z0-9_-]{16,64}$')
+
+# Registros que puede contener un snapshot (etiqueta → clase); cualquier otra
+# etiqueta invalida el snapshot completo
+REGISTROS = {clase.__name__: clase for clase in (
+    DatosGenerales, FlujoFinanciero, CapacidadAhorro, Retiro, EducacionHijo, Educacion, SaludFinanciera
+)}
+
+_ETIQUETA = '__rz__'
+
+# ================================
+# CODIFICACIÓN
+# ================================
+
+def _etiquetar(valor):
+    """Copia JSON-nativa de `valor` con etiquetas de tipo para registros, fechas y horas."""
+    if isinstance(valor, RegistroDict):
+        return {_ETIQUETA: type(valor).__name__, 'campos': _etiquetar(valor.como_compacto())}
+    if isinstance(valor, Mapping):
+        return {str(clave): _etiquetar(v) for clave, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_etiquetar(v) for v in valor]
+    if isinstance(valor, datetime):
+        return {_ETIQUETA: 'datetime', 'valor': valor.isoformat()}
+    if isinstance(valor, date):
+        return {_ETIQUETA: 'date', 'valor': valor.isoformat()}
+    if isinstance(valor, hora):
+        return {_ETIQUETA: 'time', 'valor': valor.isoformat()}
+    return valor
+
+
+def _restaurar(valor):
+    """Inverso de _etiquetar(); ValueError/TypeError/KeyError si una etiqueta no es válida."""
+    if isinstance(valor, list):
+        return [_restaurar(v) for v in valor]
+    if not isinstance(valor, dict):
+        return valor
+    etiqueta = valor.get(_ETIQUETA)
+    if etiqueta is None:
+        return {clave: _restaurar(v) for clave, v in valor.items()}
+    if etiqueta == 'datetime':
+        return datetime.fromisoformat(valor['valor'])
+    if etiqueta == 'date':
+        return date.fromisoformat(valor['valor'])
+    if etiqueta == 'time':
+        return hora.fromisoformat(valor['valor'])
+    return REGISTROS[etiqueta].desde_dict(_restaurar(valor['campos']))
+
+
+def codificar_snapshot(datos, step):
+    """
+    Codifica los datos de la asesoría y el paso actual en bytes.
+
+    Parameters:
+    -----------
+    datos : dict
+        st.session_state.datos
+    step : int
+        st.session_state.step
+
+    Returns:
+    --------
+    bytes : Snapshot con cabecera de versión
+    """
+    contenido = a_json_bytes({'datos': _etiquetar(datos), 'step': step, 'guardado': time.time()})
+    return _CABECERA.pack(MAGIA, VERSION_ESQUEMA) + zlib.compress(contenido, 1)
+
+
+def decodificar_snapshot(blob):
+    """
+    Decodifica un snapshot; devuelve None si el formato, la versión o el contenido no son válidos.
+
+    Returns:
+    --------
+    dict : {'datos': dict, 'step': int, 'guardado': float} o None
+    """
+    if not blob or len(blob) < _CABECERA.size:
+        return None
+    magia, version = _CABECERA.unpack_from(blob)
+    if magia != MAGIA or version != VERSION_ESQUEMA:
+        return None
+    try:
+        contenido = json.loads(zlib.decompress(memoryview(blob)[_CABECERA.size:]))
+        snapshot = {
+            'datos': _restaurar(contenido['datos']),
+            'step': int(contenido['step']),
+            'guardado': float(contenido['guardado'])
+        }
+    except (zlib.error, ValueError, TypeError, KeyError):
+        return None
+    if not isinstance(snapshot['datos'], dict):
+        return None
+    return snapshot
+
+# ================================
+# TOKENS Y ALMACENAMIENTO
+# ================================
+
+def nuevo_token():
+    """Genera un token de sesión aleatorio (seguro para URL)."""
+    return secrets.token_urlsafe(16)
+
+
+def token_valido(token):
+    return isinstance(token, str) and _PATRON_TOKEN.match(token) is not None
+
+
+def guardar_snapshot(token, datos, step, almacen=None):
+    """
+    Guarda el snapshot de la sesión `token` en el almacén de sesiones.
+
+    Parameters:
+    -----------
+    almacen : AlmacenSesiones, optional
+        Backend a usar; por defecto el configurado en RIZKORA_ALMACEN_SESIONES
+
+    Returns:
+    --------
+    bool : True si se guardó
+    """
+    if not token_valido(token):
+        return False
+    (almacen or almacen_predeterminado()).guardar(token, codificar_snapshot(datos, step))
+    return True
+
+
+def restaurar_snapshot(token, almacen=None):
+    """
+    Restaura el snapshot de la sesión `token`.
+
+    Returns:
+    --------
+    dict : {'datos': dict, 'step': int, 'guardado': float} o None si no existe
+    """
+    if not token_valido(token):
+        return None
+    return decodificar_snapshot((almacen or almacen_predeterminado()).cargar(token))
+
+
+def eliminar_snapshot(token, almacen=None):
+    """Elimina el snapshot de la sesión `token` si existe."""
+    if token_valido(token):
+        (almacen or almacen_predeterminado()).eliminar(token)
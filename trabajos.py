@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""
+TRABAJOS EN SEGUNDO PLANO
+Ejecutor del proceso para PDFs, gráficos y guardado en Google Sheets
+
+Generar un PDF o guardar en Sheets dentro del script de Streamlit bloquea el
+rerun de esa sesión durante todo el trabajo. Con este módulo la interfaz
+envía el trabajo, sigue respondiendo y recoge el resultado en un rerun
+posterior usando el id del trabajo:
+
+    >>> id_trabajo = ejecutor_predeterminado().enviar(generar_reporte, datos, 'completo', tipo='render')
+    >>> ejecutor_predeterminado().estado(id_trabajo)      # 'pendiente', 'en curso', 'listo', 'error'
+    >>> ejecutor_predeterminado().resultado(id_trabajo)   # BytesIO del PDF (o relanza el error)
+
+Tipos de trabajo:
+    - 'io':     pool de hilos; llamadas de red (Google Sheets) que liberan el GIL
+    - 'render': pool de procesos; ReportLab y matplotlib son CPU puro y en
+                hilos se serializan en el GIL. La función, sus argumentos y su
+                resultado deben poder serializarse con pickle.
+
+Los procesos usan el contexto 'spawn': hacer fork de un servidor con hilos
+(Streamlit) puede heredar locks tomados por otros hilos. Cada proceso nuevo
+arranca en frío (métricas de fuentes de ReportLab, caché de fuentes de
+matplotlib, backend Agg); con un `inicializador` (ejecutor_predeterminado usa
+calentamiento.calentar_proceso_render) ese costo se paga al arrancar el
+proceso, e iniciar_procesos() arranca todos de una vez al iniciar el servidor.
+
+Si un proceso del pool muere (falta de memoria, un segfault en ReportLab o
+matplotlib), el pool queda roto y rechaza todo trabajo nuevo con
+BrokenProcessPool. El ejecutor lo detecta, cierra el pool roto, crea otro y
+reenvía una vez los trabajos afectados (el que se estaba enviando y los que
+fallaron por la caída).
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+# Tiempo que se conserva un trabajo terminado sin que nadie lo recoja
+RETENCION_SEGUNDOS = 30 * 60
+
+
+class Trabajo:
+    """Registro de un trabajo enviado al ejecutor."""
+
+    __slots__ = ('id', 'tipo', 'futuro', 'enviado', 'terminado', 'llamada', 'pool', 'reintentado')
+
+    def __init__(self, id_trabajo, tipo, futuro, llamada=None, pool=None):
+        self.id = id_trabajo
+        self.tipo = tipo
+        self.futuro = futuro
+        self.enviado = time.time()
+        self.terminado = None
+        self.llamada = llamada  # (funcion, args, kwargs), para reenviarlo si el pool se rompe
+        self.pool = pool        # Pool de procesos que ejecuta el futuro actual
+        self.reintentado = False
+
+    def perdido_por_caida(self):
+        """True si el futuro actual falló porque murió un proceso del pool y aún puede reintentarse."""
+        futuro = self.futuro
+        return (self.tipo == 'render' and not self.reintentado and futuro.done() and not futuro.cancelled()
+                and isinstance(futuro.exception(), BrokenProcessPool))
+
+
+class EjecutorTrabajos:
+    """
+    Ejecuta funciones en segundo plano y guarda su estado por id de trabajo.
+
+    Parameters:
+    -----------
+    hilos : int
+        Tamaño del pool de hilos para trabajos 'io'
+    procesos : int
+        Tamaño del pool de procesos para trabajos 'render'
+        (por defecto, la mitad de los CPUs, mínimo 1)
+    inicializador : callable
+        Función sin argumentos que ejecuta cada proceso del pool al arrancar
+        (no debe lanzar excepciones: un inicializador fallido rompe el pool)
+    """
+
+    def __init__(self, hilos=8, procesos=None, inicializador=None):
+        self.hilos = hilos
+        self.procesos = procesos or max(1, (os.cpu_count() or 2) // 2)
+        self.inicializador = inicializador
+        self._pool_hilos = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix='trabajo-rizkora')
+        self._pool_procesos = None  # Se crea con el primer trabajo 'render'
+        self._trabajos = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, tipo):
+        if tipo == 'io':
+            return self._pool_hilos
+        if tipo == 'render':
+            if self._pool_procesos is None:
+                self._pool_procesos = ProcessPoolExecutor(
+                    max_workers=self.procesos,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=self.inicializador
+                )
+            return self._pool_procesos
+        raise ValueError(f"Tipo de trabajo desconocido: {tipo}")
+
+    def _reiniciar_procesos(self, roto):
+        """Sustituye el pool de procesos `roto` por uno nuevo (con el lock tomado)."""
+        if self._pool_procesos is roto:
+            print("Pool de procesos roto (un proceso terminó de forma inesperada); se crea uno nuevo")
+            roto.shutdown(wait=False)
+            self._pool_procesos = None
+            nuevo = self._pool('render')
+            if self.inicializador is not None:
+                # Los procesos de reemplazo se calientan ya, no con el próximo trabajo
+                self._arrancar_procesos(nuevo, os.getpid)
+            return nuevo
+        return self._pool('render')
+
+    def _arrancar_procesos(self, pool, funcion):
+        """
+        Envía un trabajo por proceso para que el pool los arranque todos
+        (con el lock tomado): sin procesos libres, cada submit() crea uno.
+        """
+        return [pool.submit(funcion) for _ in range(self.procesos)]
+
+    def iniciar_procesos(self, funcion=os.getpid, timeout=None):
+        """
+        Arranca todos los procesos del pool 'render' y espera a que estén listos.
+
+        Cada proceso ejecuta el inicializador al arrancar y luego `funcion`
+        (por defecto solo devuelve su pid).
+
+        Returns:
+        --------
+        int : Procesos que respondieron sin error
+        """
+        with self._lock:
+            futuros = self._arrancar_procesos(self._pool('render'), funcion)
+        wait(futuros, timeout=timeout)
+        return sum(1 for futuro in futuros if futuro.done() and not futuro.cancelled() and futuro.exception() is None)
+
+    def _enviar_al_pool(self, tipo, funcion, args, kwargs):
+        """
+        submit() al pool del tipo (con el lock tomado); si el pool de procesos
+        está roto, lo reinicia y reintenta una vez.
+
+        Returns:
+        --------
+        tuple : (pool, futuro)
+        """
+        pool = self._pool(tipo)
+        try:
+            return pool, pool.submit(funcion, *args, **kwargs)
+        except BrokenProcessPool:
+            pool = self._reiniciar_procesos(pool)
+            return pool, pool.submit(funcion, *args, **kwargs)
+
+    def _al_terminar(self, trabajo, futuro):
+        if trabajo.futuro is not futuro:
+            return
+        if trabajo.perdido_por_caida():
+            # El trabajo se perdió porque un proceso del pool murió: se reenvía
+            # una vez a un pool nuevo (solo el primer afectado reinicia el pool)
+            funcion, args, kwargs = trabajo.llamada
+            with self._lock:
+                pool = self._reiniciar_procesos(trabajo.pool)
+                try:
+                    nuevo = pool.submit(funcion, *args, **kwargs)
+                except BrokenProcessPool:
+                    nuevo = None
+                trabajo.reintentado = True
+                if nuevo is not None:
+                    trabajo.pool, trabajo.futuro = pool, nuevo
+            if nuevo is not None:
+                nuevo.add_done_callback(lambda terminado: self._al_terminar(trabajo, terminado))
+                return
+        trabajo.terminado = time.time()
+
+    def enviar(self, funcion, *args, tipo='io', **kwargs):
+        """
+        Envía `funcion(*args, **kwargs)` al pool del tipo indicado.
+
+        Returns:
+        --------
+        str : Id del trabajo, para consultar estado() y resultado()
+        """
+        id_trabajo = uuid.uuid4().hex
+        with self._lock:
+            self._purgar()
+            pool, futuro = self._enviar_al_pool(tipo, funcion, args, kwargs)
+            if tipo == 'render':
+                trabajo = Trabajo(id_trabajo, tipo, futuro, (funcion, args, kwargs), pool)
+            else:
+                trabajo = Trabajo(id_trabajo, tipo, futuro)
+            self._trabajos[id_trabajo] = trabajo
+        futuro.add_done_callback(lambda terminado: self._al_terminar(trabajo, terminado))
+        return id_trabajo
+
+    def estado(self, id_trabajo):
+        """
+        Estado del trabajo: 'pendiente', 'en curso', 'listo', 'error' o
+        'desconocido' (id inexistente, descartado o purgado).
+        """
+        trabajo = self._trabajos.get(id_trabajo)
+        if trabajo is None:
+            return 'desconocido'
+        futuro = trabajo.futuro
+        if trabajo.perdido_por_caida():
+            return 'pendiente'  # Se está reenviando a un pool nuevo
+        if not futuro.done():
+            return 'en curso' if futuro.running() else 'pendiente'
+        if futuro.cancelled() or futuro.exception() is not None:
+            return 'error'
+        return 'listo'
+
+    def resultado(self, id_trabajo, timeout=None):
+        """
+        Resultado del trabajo; espera hasta `timeout` segundos si no ha terminado.
+
+        Raises:
+        -------
+        KeyError : si el id no existe
+        Exception : la excepción que lanzó el trabajo
+        """
+        trabajo = self._trabajos.get(id_trabajo)
+        if trabajo is None:
+            raise KeyError(f"Trabajo desconocido: {id_trabajo}")
+        while True:
+            futuro = trabajo.futuro
+            try:
+                return futuro.result(timeout=timeout)
+            except BrokenProcessPool:
+                # Si el trabajo se reenvió tras la caída del pool, esperar el nuevo futuro
+                if not trabajo.reintentado and trabajo.tipo == 'render':
+                    time.sleep(0.01)
+                    continue
+                if trabajo.futuro is futuro:
+                    raise
+
+    def error(self, id_trabajo):
+        """Mensaje de error de un trabajo fallido, o None."""
+        trabajo = self._trabajos.get(id_trabajo)
+        if trabajo is None or not trabajo.futuro.done() or trabajo.perdido_por_caida():
+            return None
+        if trabajo.futuro.cancelled():
+            return "Trabajo cancelado"
+        excepcion = trabajo.futuro.exception()
+        return str(excepcion) if excepcion is not None else None
+
+    def duracion(self, id_trabajo):
+        """Segundos desde el envío hasta el final del trabajo (o hasta ahora si sigue corriendo)."""
+        trabajo = self._trabajos.get(id_trabajo)
+        if trabajo is None:
+            return None
+        return (trabajo.terminado or time.time()) - trabajo.enviado
+
+    def descartar(self, id_trabajo):
+        """Olvida un trabajo (lo cancela si aún no empezó)."""
+        with self._lock:
+            trabajo = self._trabajos.pop(id_trabajo, None)
+        if trabajo is not None:
+            trabajo.futuro.cancel()
+
+    def _purgar(self):
+        """Elimina los trabajos terminados hace más de RETENCION_SEGUNDOS (con el lock tomado)."""
+        limite = time.time() - RETENCION_SEGUNDOS
+        vencidos = [
+            id_trabajo for id_trabajo, trabajo in self._trabajos.items()
+            if trabajo.terminado is not None and trabajo.terminado < limite
+        ]
+        for id_trabajo in vencidos:
+            del self._trabajos[id_trabajo]
+
+    def cerrar(self, esperar=True):
+        """Cierra ambos pools."""
+        self._pool_hilos.shutdown(wait=esperar)
+        if self._pool_procesos is not None:
+            self._pool_procesos.shutdown(wait=esperar)
+
+
+_ejecutor_predeterminado = None
+_lock_ejecutor = threading.Lock()
+
+
+def ejecutor_predeterminado():
+    """Ejecutor del proceso, compartido por todas las sesiones."""
+    global _ejecutor_predeterminado
+    if _ejecutor_predeterminado is None:
+        with _lock_ejecutor:
+            if _ejecutor_predeterminado is None:
+                from calentamiento import calentamiento_habilitado, calentar_proceso_render
+                inicializador = calentar_proceso_render if calentamiento_habilitado() else None
+                _ejecutor_predeterminado = EjecutorTrabajos(inicializador=inicializador)
+    return _ejecutor_predeterminado
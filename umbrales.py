@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+UMBRALES FINANCIEROS
+Política de umbrales versionada (umbrales.json) compilada en escalas de cortes
+
+Cada escala es una lista ordenada de cortes y un valor por tramo:
+
+    "estado_flujo": {"cortes": [0, 10, 20, 30], "incluye_corte": "arriba",
+                     "valores": ["negativo", "crítico", "ajustado", "saludable", "excelente"]}
+
+"arriba": el corte pertenece al tramo superior (x >= corte, bisect_right);
+"abajo": al inferior (x <= corte, bisect_left). Una escala puede reutilizar
+los cortes de otra con "cortes_de". La misma escala compilada clasifica un
+valor (bisect) o un arreglo completo (np.searchsorted), así que el cálculo
+por cliente y el cálculo por lotes no pueden divergir.
+
+Recarga en caliente: politica_actual() revisa la fecha de modificación del
+archivo cada INTERVALO_REVISION segundos y, si cambió, compila la nueva
+política y la sustituye. Si el archivo nuevo es inválido se conserva la
+anterior. La ruta se configura con RIZKORA_UMBRALES (por defecto, el
+umbrales.json junto a este módulo).
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+
+from modelo_datos import CalificacionSalud, EstadoFinanciero, NivelInversion
+
+RUTA_PREDETERMINADA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'umbrales.json')
+INTERVALO_REVISION = 2.0
+
+# Escalas que el código espera y su número de tramos (los textos de cada
+# tramo viven en el código, así que una política no puede cambiarlo)
+TRAMOS_REQUERIDOS = {
+    'estado_flujo': 5,
+    'puntos_flujo': 5,
+    'puntos_deudas': 4,
+    'puntos_gastos_fijos': 3,
+    'puntos_gastos_variables': 3,
+    'calificacion_salud': 5,
+    'indicador_deudas': 4,
+    'recomendacion_deudas': 4,
+    'indicador_gastos_fijos': 3,
+}
+
+# Escalas cuyos valores deben ser miembros de un enum del modelo de datos
+ENUMS_ESCALA = {
+    'estado_flujo': EstadoFinanciero,
+    'calificacion_salud': CalificacionSalud,
+}
+
+ESTADOS_CON_AHORRO = ('crítico', 'ajustado', 'saludable', 'excelente')
+
+# ================================
+# ESCALAS
+# ================================
+
+class Escala:
+    """
+    Escala de cortes compilada.
+
+    Parameters:
+    -----------
+    nombre : str
+    cortes : list
+        Cortes en orden estrictamente creciente
+    valores : list
+        Un valor por tramo (len(cortes) + 1)
+    incluye_corte : str
+        'arriba' (x >= corte sube de tramo) o 'abajo' (x <= corte se queda)
+    """
+
+    __slots__ = ('nombre', 'cortes', 'valores', 'incluye_corte', '_buscar', '_lado', '_cortes_np', '_valores_np')
+
+    def __init__(self, nombre, cortes, valores, incluye_corte='arriba'):
+        cortes = tuple(float(corte) for corte in cortes)
+        if any(a >= b for a, b in zip(cortes, cortes[1:])):
+            raise ValueError(f"Escala '{nombre}': los cortes deben ser estrictamente crecientes")
+        if len(valores) != len(cortes) + 1:
+            raise ValueError(f"Escala '{nombre}': se esperaban {len(cortes) + 1} valores, hay {len(valores)}")
+        if incluye_corte not in ('arriba', 'abajo'):
+            raise ValueError(f"Escala '{nombre}': incluye_corte debe ser 'arriba' o 'abajo'")
+        self.nombre = nombre
+        self.cortes = cortes
+        self.valores = tuple(valores)
+        self.incluye_corte = incluye_corte
+        self._buscar = bisect_right if incluye_corte == 'arriba' else bisect_left
+        self._lado = 'right' if incluye_corte == 'arriba' else 'left'
+        self._cortes_np = None
+        self._valores_np = None
+
+    def tramo(self, x):
+        """Índice del tramo de `x` (0 = por debajo del primer corte)."""
+        return self._buscar(self.cortes, x)
+
+    def valor(self, x):
+        """Valor del tramo de `x`."""
+        return self.valores[self._buscar(self.cortes, x)]
+
+    def tramos_lote(self, x):
+        """Índices de tramo de un arreglo (np.searchsorted con el mismo criterio que tramo())."""
+        import numpy as np
+
+        if self._cortes_np is None:
+            self._cortes_np = np.asarray(self.cortes)
+        return np.searchsorted(self._cortes_np, x, side=self._lado)
+
+    def valores_lote(self, x):
+        """Valores del tramo de cada elemento de un arreglo."""
+        import numpy as np
+
+        if self._valores_np is None:
+            self._valores_np = np.asarray(self.valores)
+        return self._valores_np[self.tramos_lote(x)]
+
+    def __repr__(self):
+        return f"Escala({self.nombre!r}, cortes={list(self.cortes)}, valores={list(self.valores)})"
+
+
+class Politica:
+    """
+    Política de umbrales compilada (inmutable; la recarga crea otra).
+
+    Attributes:
+    -----------
+    version : str
+    escalas : dict
+        {nombre: Escala}
+    bandas_ahorro : dict
+        {estado: (fracción mínima, fracción máxima, NivelInversion)}
+    ahorro_minimo, ahorro_optimo : float
+        Fracciones del ingreso total
+    """
+
+    __slots__ = ('version', 'escalas', 'bandas_ahorro', 'ahorro_minimo', 'ahorro_optimo', 'origen')
+
+    def __init__(self, version, escalas, bandas_ahorro, ahorro_minimo, ahorro_optimo, origen=None):
+        self.version = version
+        self.escalas = escalas
+        self.bandas_ahorro = bandas_ahorro
+        self.ahorro_minimo = ahorro_minimo
+        self.ahorro_optimo = ahorro_optimo
+        self.origen = origen
+
+    def __getitem__(self, nombre):
+        return self.escalas[nombre]
+
+
+def compilar_politica(config, origen=None):
+    """
+    Valida una configuración (dict de umbrales.json) y la compila.
+
+    Raises:
+    -------
+    ValueError : si falta una escala, su número de tramos no coincide o
+                 los cortes no son crecientes
+    """
+    version = config.get('version')
+    if not version:
+        raise ValueError("La política de umbrales no tiene 'version'")
+
+    definiciones = config.get('escalas', {})
+    escalas = {}
+    for nombre, definicion in definiciones.items():
+        base = definiciones.get(definicion['cortes_de'], {}) if 'cortes_de' in definicion else definicion
+        if 'cortes' not in base:
+            raise ValueError(f"Escala '{nombre}': cortes_de apunta a una escala inexistente")
+        escalas[nombre] = Escala(nombre, base['cortes'], definicion['valores'],
+                                 base.get('incluye_corte', 'arriba'))
+
+    for nombre, tramos in TRAMOS_REQUERIDOS.items():
+        if nombre not in escalas:
+            raise ValueError(f"Falta la escala '{nombre}'")
+        if len(escalas[nombre].valores) != tramos:
+            raise ValueError(f"La escala '{nombre}' debe tener {tramos} tramos")
+    for nombre, enum in ENUMS_ESCALA.items():
+        for valor in escalas[nombre].valores:
+            enum(valor)  # ValueError si el valor no existe
+
+    bandas = config.get('bandas_ahorro', {})
+    bandas_ahorro = {}
+    for estado in ESTADOS_CON_AHORRO:
+        if estado not in bandas:
+            raise ValueError(f"Falta la banda de ahorro del estado '{estado}'")
+        banda = bandas[estado]
+        if not 0 <= banda['min'] <= banda['max'] <= 1:
+            raise ValueError(f"Banda de ahorro '{estado}': se requiere 0 <= min <= max <= 1")
+        bandas_ahorro[estado] = (float(banda['min']), float(banda['max']), NivelInversion(banda['nivel']))
+
+    ahorro_ingreso = config.get('ahorro_ingreso', {})
+    return Politica(
+        version=str(version),
+        escalas=escalas,
+        bandas_ahorro=bandas_ahorro,
+        ahorro_minimo=float(ahorro_ingreso.get('minimo', 0.05)),
+        ahorro_optimo=float(ahorro_ingreso.get('optimo', 0.10)),
+        origen=origen
+    )
+
+
+def cargar_politica(ruta):
+    """Lee y compila un archivo de umbrales."""
+    with open(ruta, encoding='utf-8') as archivo:
+        return compilar_politica(json.load(archivo), origen=ruta)
+
+# ================================
+# POLÍTICA ACTIVA (RECARGA EN CALIENTE)
+# ================================
+
+_politica = None
+_firma = None       # (ruta, mtime_ns, tamaño) del archivo cargado
+_revisado = 0.0
+_lock_politica = threading.Lock()
+
+
+def ruta_politica():
+    """Ruta del archivo de umbrales (RIZKORA_UMBRALES o umbrales.json del proyecto)."""
+    return os.environ.get('RIZKORA_UMBRALES') or RUTA_PREDETERMINADA
+
+
+def _firma_archivo(ruta):
+    estado = os.stat(ruta)
+    return ruta, estado.st_mtime_ns, estado.st_size
+
+
+def recargar_politica(forzar=False):
+    """
+    Vuelve a cargar la política si el archivo cambió (o siempre con `forzar`).
+
+    Returns:
+    --------
+    Politica : La política activa después de revisar
+    """
+    global _politica, _firma, _revisado
+    with _lock_politica:
+        _revisado = time.monotonic()
+        ruta = ruta_politica()
+        firma = None
+        try:
+            firma = _firma_archivo(ruta)
+            if forzar or _politica is None or firma != _firma:
+                _politica, _firma = cargar_politica(ruta), firma
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            if _politica is None:
+                raise
+            # Política nueva inválida o ilegible: se conserva la anterior y no
+            # se reintenta hasta que el archivo vuelva a cambiar
+            if firma is not None:
+                _firma = firma
+            print(f"Error al recargar umbrales de {ruta}: {e}")
+        return _politica
+
+
+def politica_actual():
+    """Política activa; revisa el archivo como mucho cada INTERVALO_REVISION segundos."""
+    politica = _politica
+    if politica is None or time.monotonic() - _revisado >= INTERVALO_REVISION:
+        politica = recargar_politica()
+    return politica
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+UTILIDADES DE LA APP
+Funciones auxiliares compartidas por asesoria_rizkora.py y los módulos de pasos/
+
+Google Sheets, validaciones, navegación entre pasos, snapshots de sesión y
+trabajos en segundo plano de la sesión actual.
+"""
+
+import streamlit as st
+from datetime import datetime, date
+import copy
+import gspread
+from google.oauth2.service_account import Credentials
+from modulo_financiero import detectar_necesidades_financieras
+from generar_pdf_mejorado import generar_grafico_necesidades_perfil
+from serializacion import a_json, registro_exportacion
+from snapshots import guardar_snapshot
+from grabacion import directorio_grabacion, grabar_envio
+from trabajos import ejecutor_predeterminado
+
+# ================================
+# CONFIGURACIÓN GOOGLE SHEETS
+# ================================
+@st.cache_resource
+def init_google_sheets():
+    """Inicializa conexión con Google Sheets"""
+    try:
+        if 'google_service_account' not in st.secrets:
+            return None
+        
+        creds = Credentials.from_service_account_info(
+            st.secrets["google_service_account"],
+            scopes=[
+                "https://www.googleapis.com/auth/spreadsheets",
+                "https://www.googleapis.com/auth/drive"
+            ]
+        )
+        
+        client = gspread.authorize(creds)
+        st.session_state.google_sheets_habilitado = True
+        return client
+    except Exception as e:
+        st.session_state.google_sheets_habilitado = False
+        return None
+
+def guardar_asesoria_sheets(datos_completos, client):
+    """
+    Guarda la asesoría en Google Sheets
+    
+    No toca st.session_state, para poder ejecutarse como trabajo en segundo
+    plano; el cliente se obtiene antes con init_google_sheets().
+    """
+    try:
+        if not client:
+            return False, "No se pudo conectar con Google Sheets"
+        
+        # Abrir o crear spreadsheet
+        try:
+            spreadsheet = client.open("asesorias_rizkora")
+        except:
+            spreadsheet = client.create("asesorias_rizkora")
+            spreadsheet.share('', perm_type='anyone', role='reader')
+        
+        # Preparar datos para la hoja
+        datos_gen = datos_completos['datos_generales']
+        necesidades = detectar_necesidades_financieras(datos_completos)
+        
+        fila_nueva = {
+            'Fecha Asesoría': str(datos_gen.get('fecha_asesoria', '')),
+            'Hora Registro': datetime.now().strftime("%H:%M:%S"),
+            'Agente': datos_gen.get('nombre_agente', ''),
+            'Cliente': datos_gen.get('nombre', ''),
+            'Edad': datos_gen.get('edad', ''),
+            'Teléfono': datos_gen.get('telefono', ''),
+            'Correo': datos_gen.get('correo', ''),
+            'Ocupación': datos_gen.get('ocupacion', ''),
+            'Estado Civil': datos_gen.get('estado_civil', ''),
+            'Fumador': datos_gen.get('fumador', ''),
+            'Tipo Cita': datos_gen.get('tipo_cita', ''),
+            'Ingreso Mensual': datos_completos['ingresos'].get('ingreso_mensual', 0),
+            'Inversión Mensual Disponible': datos_completos['ingresos'].get('inversion_mensual', 0),
+            'Necesidad Principal': necesidades['principal'].upper(),
+            'Monto Protección': necesidades['montos']['proteccion'],
+            'Monto Retiro': necesidades['montos']['retiro'],
+            'Monto Educación': necesidades['montos']['educacion'],
+            'Monto Ahorro/Proyecto': necesidades['montos']['ahorro'],
+            'Tiene Pareja': datos_completos['perfil_familiar'].get('tiene_pareja', 'No'),
+            'Tiene Hijos': datos_completos['perfil_familiar'].get('tiene_hijos', 'No'),
+            'Num Hijos': datos_completos['perfil_familiar'].get('num_hijos', 0),
+            'Segunda Cita': datos_completos['cierre'].get('segunda_cita', 'No'),
+            'Fecha Segunda Cita': str(datos_completos['cierre'].get('fecha_segunda_cita', '')),
+            'Num Referidos': datos_completos['cierre'].get('num_referidos', 0),
+            'Satisfacción': datos_completos['cierre'].get('satisfaccion', '')
+        }
+        
+        # Obtener o crear worksheet
+        try:
+            worksheet = spreadsheet.worksheet("Asesorías")
+        except:
+            worksheet = spreadsheet.add_worksheet(title="Asesorías", rows=1000, cols=25)
+            # Agregar encabezados
+            headers = list(fila_nueva.keys())
+            worksheet.update('A1', [headers])
+        
+        # Agregar nueva fila
+        worksheet.append_row(list(fila_nueva.values()), value_input_option='USER_ENTERED')
+        
+        return True, "Asesoría guardada exitosamente en Google Sheets"
+    
+    except Exception as e:
+        return False, f"Error al guardar: {str(e)}"
+
+# ================================
+# FUNCIONES AUXILIARES
+# ================================
+
+def calcular_edad(fecha_nacimiento):
+    """Calcula edad a partir de fecha de nacimiento"""
+    try:
+        if isinstance(fecha_nacimiento, str):
+            fecha_nac = datetime.strptime(fecha_nacimiento, "%d/%m/%Y").date()
+        else:
+            fecha_nac = fecha_nacimiento
+        
+        hoy = date.today()
+        edad = hoy.year - fecha_nac.year - ((hoy.month, hoy.day) < (fecha_nac.month, fecha_nac.day))
+        return edad
+    except:
+        return None
+
+def validar_email(email):
+    """Valida formato de email básico"""
+    import re
+    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+    return re.match(pattern, email) is not None
+
+def validar_telefono(telefono):
+    """Valida formato de teléfono (10 dígitos)"""
+    telefono_limpio = ''.join(filter(str.isdigit, telefono))
+    return len(telefono_limpio) == 10
+
+def formatear_moneda(monto):
+    """Formatea número como moneda"""
+    try:
+        return f"${float(monto):,.2f}"
+    except:
+        return "$0.00"
+
+def guardar_sesion():
+    """Guarda un snapshot de la asesoría en curso para poder restaurarla"""
+    try:
+        guardar_snapshot(st.session_state.token_sesion, st.session_state.datos, st.session_state.step)
+    except Exception:
+        pass  # El snapshot es opcional; nunca debe interrumpir la asesoría
+
+def grabar_paso(paso_destino):
+    """
+    Agrega el envío del paso actual a la traza anónima (opt-in con RIZKORA_GRABACION)
+    
+    paso_destino es None cuando se finaliza la asesoría.
+    """
+    if directorio_grabacion() is None:
+        return
+    ahora = datetime.now().timestamp()
+    inicio = st.session_state.setdefault('inicio_grabacion', ahora)
+    secuencia = st.session_state.get('secuencia_grabacion', 0) + 1
+    st.session_state.secuencia_grabacion = secuencia
+    try:
+        grabar_envio(st.session_state.token_sesion, secuencia, ahora - inicio,
+                     st.session_state.step, paso_destino, st.session_state.datos)
+    except Exception as e:
+        print(f"Error al grabar traza: {e}")  # La grabación nunca debe interrumpir la asesoría
+
+def navegar_a_paso(paso):
+    """Navega a un paso específico"""
+    grabar_paso(paso)
+    st.session_state.step = paso
+    guardar_sesion()
+    st.rerun()
+
+def exportar_json(compacto=True):
+    """Exporta datos a JSON (compacto por defecto)"""
+    return a_json(registro_exportacion(st.session_state.datos), compacto=compacto)
+
+def enviar_trabajo(clave, funcion, *args, tipo='io'):
+    """
+    Envía un trabajo en segundo plano y guarda su id en la sesión bajo `clave`
+    
+    Los datos (dicts) se copian: la sesión puede seguir editándolos mientras
+    el trabajo corre. Un trabajo anterior con la misma clave se descarta.
+    """
+    ejecutor = ejecutor_predeterminado()
+    anterior = st.session_state.trabajos.pop(clave, None)
+    if anterior:
+        ejecutor.descartar(anterior)
+    args = [copy.deepcopy(arg) if isinstance(arg, dict) else arg for arg in args]
+    st.session_state.trabajos[clave] = ejecutor.enviar(funcion, *args, tipo=tipo)
+
+def estado_trabajo(clave):
+    """
+    Estado del trabajo de la sesión guardado bajo `clave`
+    
+    Returns:
+    --------
+    tuple : (estado, resultado si está 'listo' o mensaje si hubo 'error');
+            (None, None) si no hay trabajo
+    """
+    id_trabajo = st.session_state.trabajos.get(clave)
+    if id_trabajo is None:
+        return None, None
+    ejecutor = ejecutor_predeterminado()
+    estado = ejecutor.estado(id_trabajo)
+    if estado == 'listo':
+        return estado, ejecutor.resultado(id_trabajo)
+    if estado == 'error':
+        return estado, ejecutor.error(id_trabajo)
+    if estado == 'desconocido':
+        # Purgado o de otra réplica/proceso: se puede volver a enviar
+        del st.session_state.trabajos[clave]
+        return None, None
+    return estado, None
+
+def mostrar_trabajo_en_curso(clave, mensaje):
+    """Aviso de trabajo en curso con un botón para consultar de nuevo"""
+    st.info(f"⏳ {mensaje}")
+    st.button("🔄 Actualizar", key=f"actualizar_{clave}", use_container_width=True)
+
+def generar_graficos_necesidades():
+    """Genera gráficos de distribución de necesidades"""
+    return generar_grafico_necesidades_perfil(detectar_necesidades())
+
+def detectar_necesidades():
+    """Detecta y prioriza necesidades financieras"""
+    return detectar_necesidades_financieras(st.session_state.datos)